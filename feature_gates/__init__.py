@@ -14,6 +14,8 @@ class _FeatureGatesConfig:
 
     sourcemap_enabled: bool
     sourcemap_debug: bool
+    sourcemap_paranoid: bool
+    definition_traces: bool
 
 
 class FeatureGates:
@@ -33,6 +35,8 @@ class FeatureGates:
     _gates: _FeatureGatesConfig = _FeatureGatesConfig(
         sourcemap_enabled=False,
         sourcemap_debug=False,
+        sourcemap_paranoid=False,
+        definition_traces=True,
     )
     _features: Final[set[str]] = set(vars(_gates).keys())
 
@@ -7,12 +7,19 @@ from pyteal.compiler import (
     MAX_TEAL_VERSION,
     MIN_PROGRAM_VERSION,
     MIN_TEAL_VERSION,
+    AssembledProgram,
+    AVMInterpreter,
+    BatchResult,
     Compilation,
     CompileOptions,
     CompileResults,
+    ExecutionResult,
+    MockLedger,
+    MockTransaction,
     OptimizeOptions,
     PyTealSourceMap,
     R3SourceMap,
+    assembleTeal,
     compileTeal,
 )
 from pyteal.config import (
@@ -42,18 +49,25 @@ __all__ = (
     + ir_all
     + [
         "AlgodClientError",
+        "AssembledProgram",
+        "assembleTeal",
+        "AVMInterpreter",
+        "BatchResult",
         "Compilation",
         "CompileOptions",
         "CompileResults",
         "compileTeal",
         "DEFAULT_PROGRAM_VERSION",
         "DEFAULT_TEAL_VERSION",
+        "ExecutionResult",
         "MAX_GROUP_SIZE",
         "MAX_PROGRAM_VERSION",
         "MAX_TEAL_VERSION",
         "METHOD_ARG_NUM_CUTOFF",
         "MIN_PROGRAM_VERSION",
         "MIN_TEAL_VERSION",
+        "MockLedger",
+        "MockTransaction",
         "NUM_SLOTS",
         "OptimizeOptions",
         "pragma",
@@ -10,12 +10,19 @@ from pyteal.compiler import (
     MAX_TEAL_VERSION,
     MIN_PROGRAM_VERSION,
     MIN_TEAL_VERSION,
+    AssembledProgram,
+    AVMInterpreter,
+    BatchResult,
     Compilation,
     CompileOptions,
     CompileResults,
+    ExecutionResult,
+    MockLedger,
+    MockTransaction,
     OptimizeOptions,
     PyTealSourceMap,
     R3SourceMap,
+    assembleTeal,
     compileTeal,
 )
 from pyteal.config import (
@@ -41,6 +48,7 @@ from pyteal.types import TealType
 
 __all__ = [
     "ABIReturnSubroutine",
+    "AVMInterpreter",
     "AccountParam",
     "AccountParamObject",
     "Add",
@@ -54,6 +62,7 @@ __all__ = [
     "Approve",
     "Arg",
     "Array",
+    "AssembledProgram",
     "Assert",
     "AssetHolding",
     "AssetHoldingObject",
@@ -62,6 +71,7 @@ __all__ = [
     "Balance",
     "BareCallActions",
     "Base64Decode",
+    "BatchResult",
     "BinaryExpr",
     "BitLen",
     "BitwiseAnd",
@@ -108,6 +118,7 @@ __all__ = [
     "Continue",
     "DEFAULT_PROGRAM_VERSION",
     "DEFAULT_TEAL_VERSION",
+    "DispatchCost",
     "Div",
     "Divw",
     "DynamicScratchVar",
@@ -127,6 +138,7 @@ __all__ = [
     "EnumInt",
     "Eq",
     "Err",
+    "ExecutionResult",
     "Exp",
     "Expr",
     "Extract",
@@ -174,6 +186,8 @@ __all__ = [
     "MethodSignature",
     "MinBalance",
     "Minus",
+    "MockLedger",
+    "MockTransaction",
     "Mod",
     "Mode",
     "Mul",
@@ -186,6 +200,7 @@ __all__ = [
     "OnComplete",
     "OnCompleteAction",
     "Op",
+    "OpPurity",
     "OpUp",
     "OpUpFeeSource",
     "OpUpMode",
@@ -231,6 +246,7 @@ __all__ = [
     "TealInputError",
     "TealInternalError",
     "TealLabel",
+    "TealMultiwayBlock",
     "TealOp",
     "TealPragma",
     "TealPragmaError",
@@ -252,6 +268,7 @@ __all__ = [
     "While",
     "WideRatio",
     "abi",
+    "assembleTeal",
     "compileTeal",
     "pragma",
 ]
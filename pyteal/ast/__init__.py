@@ -183,6 +183,7 @@ from pyteal.ast.ec import (
 from pyteal.ast.router import (
     BareCallActions,
     CallConfig,
+    DispatchCost,
     MethodConfig,
     OnCompleteAction,
     Router,
@@ -256,6 +257,7 @@ __all__ = [
     "Concat",
     "Cond",
     "Continue",
+    "DispatchCost",
     "Div",
     "Divw",
     "DynamicScratchVar",
@@ -31,11 +31,15 @@ class DynamicArrayTypeSpec(ArrayTypeSpec[T]):
         raise ValueError("Type is dynamic")
 
     def __eq__(self, other: object) -> bool:
-        return (
+        return self is other or (
             isinstance(other, DynamicArrayTypeSpec)
             and self.value_type_spec() == other.value_type_spec()
         )
 
+    def __hash__(self) -> int:
+        # the same for subclasses which are equal to a DynamicArrayTypeSpec, e.g. StringTypeSpec
+        return hash((self.value_type_spec(),))
+
     def __str__(self) -> str:
         return f"{self.value_type_spec()}[]"
 
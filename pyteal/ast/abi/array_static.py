@@ -60,12 +60,16 @@ class StaticArrayTypeSpec(ArrayTypeSpec[T], Generic[T, N]):
         return length * value_type.byte_length_static()
 
     def __eq__(self, other: object) -> bool:
-        return (
+        return self is other or (
             isinstance(other, StaticArrayTypeSpec)
             and self.value_type_spec() == other.value_type_spec()
             and self.length_static() == other.length_static()
         )
 
+    def __hash__(self) -> int:
+        # the same for subclasses which are equal to a StaticArrayTypeSpec, e.g. AddressTypeSpec
+        return hash((self.value_type_spec(), self.length_static()))
+
     def __str__(self) -> str:
         return f"{self.value_type_spec()}[{self.length_static()}]"
 
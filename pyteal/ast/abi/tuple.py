@@ -3,16 +3,19 @@ from typing import (
     List,
     Sequence,
     Dict,
+    Final,
     Generic,
     TypeVar,
     cast,
     overload,
     Any,
+    Optional,
     TypeAlias,
     get_args,
     get_origin,
 )
 from collections import OrderedDict
+from dataclasses import dataclass
 
 from pyteal.types import TealType
 from pyteal.errors import TealInputError, TealInternalError
@@ -29,45 +32,108 @@ from pyteal.ast.abi.type import TypeSpec, BaseType, ComputedValue
 from pyteal.ast.abi.bool import (
     Bool,
     BoolTypeSpec,
-    _consecutive_bool_instance_num,
     _consecutive_bool_type_spec_num,
     _bool_sequence_length,
     _encode_bool_sequence,
-    _bool_aware_static_byte_length,
 )
 from pyteal.ast.abi.uint import NUM_BITS_IN_BYTE, Uint16
 from pyteal.ast.abi.util import substring_for_decoding, type_spec_from_annotation
 
 
-def _encode_tuple(values: Sequence[BaseType]) -> Expr:
-    heads: List[Expr] = []
-    head_length_static: int = 0
+@dataclass(frozen=True)
+class _TupleLayout:
+    """The positions of the values of a tuple in its encoding, which are known at compile time."""
 
-    dynamicValueIndexToHeadIndex: Dict[int, int] = dict()
+    # the offset in bytes of each value's head, or of the bool sequence a Bool value is part of
+    head_offsets: tuple[int, ...]
+    # the offset in bits of each Bool value, or None for other values
+    bit_offsets: tuple[Optional[int], ...]
+    # the number of Bool values in the sequence each Bool value starts, or 0 if it doesn't start one
+    bool_sequence_lengths: tuple[int, ...]
+    # the index of the next dynamic value after each value, or None if there isn't one
+    next_dynamic_indexes: tuple[Optional[int], ...]
+    # the length in bytes of the heads of all the values
+    head_length: int
+    is_dynamic: bool
+
+
+def _tuple_layout(value_types: Sequence[TypeSpec]) -> _TupleLayout:
+    head_offsets: List[int] = []
+    bit_offsets: List[Optional[int]] = []
+    bool_sequence_lengths: List[int] = []
+
+    offset = 0
     ignoreNext = 0
-    for i, elem in enumerate(values):
+    for i, valueType in enumerate(value_types):
         if ignoreNext > 0:
+            # value is in the middle of a bool sequence
             ignoreNext -= 1
+            head_offsets.append(head_offsets[-1])
+            bit_offsets.append(cast(int, bit_offsets[-1]) + 1)
+            bool_sequence_lengths.append(0)
             continue
 
-        elemType = elem.type_spec()
+        head_offsets.append(offset)
 
-        if elemType == BoolTypeSpec():
-            numBools = _consecutive_bool_instance_num(values, i)
+        if valueType == BoolTypeSpec():
+            numBools = _consecutive_bool_type_spec_num(value_types, i)
             ignoreNext = numBools - 1
-            head_length_static += _bool_sequence_length(numBools)
-            heads.append(
-                _encode_bool_sequence(cast(Sequence[Bool], values[i : i + numBools]))
-            )
+            bit_offsets.append(offset * NUM_BITS_IN_BYTE)
+            bool_sequence_lengths.append(numBools)
+            offset += _bool_sequence_length(numBools)
+            continue
+
+        bit_offsets.append(None)
+        bool_sequence_lengths.append(0)
+        offset += 2 if valueType.is_dynamic() else valueType.byte_length_static()
+
+    next_dynamic_indexes: List[Optional[int]] = [None] * len(value_types)
+    next_dynamic_index: Optional[int] = None
+    for i in reversed(range(len(value_types))):
+        next_dynamic_indexes[i] = next_dynamic_index
+        if value_types[i].is_dynamic():
+            next_dynamic_index = i
+
+    return _TupleLayout(
+        head_offsets=tuple(head_offsets),
+        bit_offsets=tuple(bit_offsets),
+        bool_sequence_lengths=tuple(bool_sequence_lengths),
+        next_dynamic_indexes=tuple(next_dynamic_indexes),
+        head_length=offset,
+        is_dynamic=next_dynamic_index is not None,
+    )
+
+
+def _encode_tuple(
+    values: Sequence[BaseType], layout: Optional[_TupleLayout] = None
+) -> Expr:
+    if len(values) != 0 and not isinstance(values[0], BaseType):
+        raise TypeError(
+            "Sequence of types expected, but got {}".format(type(values[0]))
+        )
+    if layout is None:
+        layout = _tuple_layout([value.type_spec() for value in values])
+
+    heads: List[Expr] = []
+    head_length_static: int = layout.head_length
+
+    dynamicValueIndexToHeadIndex: Dict[int, int] = dict()
+    for i, elem in enumerate(values):
+        if layout.bit_offsets[i] is not None:
+            numBools = layout.bool_sequence_lengths[i]
+            if numBools > 0:
+                heads.append(
+                    _encode_bool_sequence(
+                        cast(Sequence[Bool], values[i : i + numBools])
+                    )
+                )
             continue
 
-        if elemType.is_dynamic():
-            head_length_static += 2
+        if elem.type_spec().is_dynamic():
             dynamicValueIndexToHeadIndex[i] = len(heads)
             heads.append(Seq())  # a placeholder
             continue
 
-        head_length_static += elemType.byte_length_static()
         heads.append(elem.encode())
 
     tail_offset = Uint16()
@@ -76,37 +142,34 @@ def _encode_tuple(values: Sequence[BaseType]) -> Expr:
     encoded_tail = alloc_abstract_var(TealType.bytes)
 
     firstDynamicTail = True
-    for i, elem in enumerate(values):
-        if elem.type_spec().is_dynamic():
-            if firstDynamicTail:
-                firstDynamicTail = False
-                updateVars = Seq(
-                    tail_holder.store(encoded_tail.load()),
-                    tail_offset.set(head_length_static),
-                )
-            else:
-                updateVars = Seq(
-                    tail_holder.store(Concat(tail_holder.load(), encoded_tail.load())),
-                    tail_offset.set(tail_offset_accumulator),
-                )
-
-            notLastDynamicValue = any(
-                [nextValue.type_spec().is_dynamic() for nextValue in values[i + 1 :]]
+    for i, headIndex in dynamicValueIndexToHeadIndex.items():
+        if firstDynamicTail:
+            firstDynamicTail = False
+            updateVars = Seq(
+                tail_holder.store(encoded_tail.load()),
+                tail_offset.set(head_length_static),
             )
-            if notLastDynamicValue:
-                updateAccumulator = tail_offset_accumulator.set(
-                    tail_offset.get() + Len(encoded_tail.load())
-                )
-            else:
-                updateAccumulator = Seq()
-
-            heads[dynamicValueIndexToHeadIndex[i]] = Seq(
-                encoded_tail.store(elem.encode()),
-                updateVars,
-                updateAccumulator,
-                tail_offset.encode(),
+        else:
+            updateVars = Seq(
+                tail_holder.store(Concat(tail_holder.load(), encoded_tail.load())),
+                tail_offset.set(tail_offset_accumulator),
             )
 
+        notLastDynamicValue = layout.next_dynamic_indexes[i] is not None
+        if notLastDynamicValue:
+            updateAccumulator = tail_offset_accumulator.set(
+                tail_offset.get() + Len(encoded_tail.load())
+            )
+        else:
+            updateAccumulator = Seq()
+
+        heads[headIndex] = Seq(
+            encoded_tail.store(values[i].encode()),
+            updateVars,
+            updateAccumulator,
+            tail_offset.encode(),
+        )
+
     toConcat = heads
     if not firstDynamicTail:
         toConcat.append(tail_holder.load())
@@ -118,76 +181,39 @@ def _encode_tuple(values: Sequence[BaseType]) -> Expr:
 
 
 def _index_tuple(
-    value_types: Sequence[TypeSpec], encoded: Expr, index: int, output: BaseType
+    value_types: Sequence[TypeSpec],
+    encoded: Expr,
+    index: int,
+    output: BaseType,
+    layout: Optional[_TupleLayout] = None,
 ) -> Expr:
     if not (0 <= index < len(value_types)):
         raise ValueError("Index outside of range")
 
-    offset = 0
-    ignoreNext = 0
-    lastBoolStart = 0
-    lastBoolLength = 0
-    for i, typeBefore in enumerate(value_types[:index]):
-        if ignoreNext > 0:
-            ignoreNext -= 1
-            continue
-
-        if typeBefore == BoolTypeSpec():
-            lastBoolStart = offset
-            lastBoolLength = _consecutive_bool_type_spec_num(value_types, i)
-            offset += _bool_sequence_length(lastBoolLength)
-            ignoreNext = lastBoolLength - 1
-            continue
-
-        if typeBefore.is_dynamic():
-            offset += 2
-            continue
-
-        offset += typeBefore.byte_length_static()
+    if layout is None:
+        layout = _tuple_layout(value_types)
+    offset = layout.head_offsets[index]
 
     valueType = value_types[index]
     if output.type_spec() != valueType:
         raise TypeError("Output type does not match value type")
 
     if type(output) is Bool:
-        if ignoreNext > 0:
-            # value is in the middle of a bool sequence
-            bitOffsetInBoolSeq = lastBoolLength - ignoreNext
-            bitOffsetInEncoded = lastBoolStart * NUM_BITS_IN_BYTE + bitOffsetInBoolSeq
-        else:
-            # value is the beginning of a bool sequence (or a single bool)
-            bitOffsetInEncoded = offset * NUM_BITS_IN_BYTE
+        bitOffsetInEncoded = cast(int, layout.bit_offsets[index])
         return output.decode_bit(encoded, Int(bitOffsetInEncoded))
 
     if valueType.is_dynamic():
-        hasNextDynamicValue = False
-        nextDynamicValueOffset = offset + 2
-        ignoreNext = 0
-        for i, typeAfter in enumerate(value_types[index + 1 :], start=index + 1):
-            if ignoreNext > 0:
-                ignoreNext -= 1
-                continue
-
-            if type(typeAfter) is BoolTypeSpec:
-                boolLength = _consecutive_bool_type_spec_num(value_types, i)
-                nextDynamicValueOffset += _bool_sequence_length(boolLength)
-                ignoreNext = boolLength - 1
-                continue
-
-            if typeAfter.is_dynamic():
-                hasNextDynamicValue = True
-                break
-
-            nextDynamicValueOffset += typeAfter.byte_length_static()
+        nextDynamicIndex = layout.next_dynamic_indexes[index]
 
         start_index = ExtractUint16(encoded, Int(offset))
-        if not hasNextDynamicValue:
+        if nextDynamicIndex is None:
             # This is the final dynamic value, so decode the substring from start_index to the end of
             # encoded
             return output.decode(encoded, start_index=start_index)
 
         # There is a dynamic value after this one, and end_index is where its tail starts, so decode
         # the substring from start_index to end_index
+        nextDynamicValueOffset = layout.head_offsets[nextDynamicIndex]
         end_index = ExtractUint16(encoded, Int(nextDynamicValueOffset))
         return output.decode(encoded, start_index=start_index, end_index=end_index)
 
@@ -198,7 +224,7 @@ def _index_tuple(
         if offset == 0:
             # This is the first and only value in the tuple, so decode all of encoded
             return output.decode(encoded)
-        if all(not x.is_dynamic() for x in value_types):
+        if not layout.is_dynamic:
             # This is the last element in tuple with all elements being static typed
             return output.decode(encoded, start_index=start_index)
 
@@ -213,11 +239,19 @@ def _index_tuple(
 class TupleTypeSpec(TypeSpec):
     def __init__(self, *value_type_specs: TypeSpec) -> None:
         super().__init__()
-        self.value_specs = list(value_type_specs)
+        self.value_specs: Final = tuple(value_type_specs)
+        self._layout_cache: Optional[_TupleLayout] = None
+
+    def _layout(self) -> _TupleLayout:
+        """Get the positions of this tuple's values in its encoding, computing them on first use."""
+        if self._layout_cache is None:
+            # TypeSpecs are immutable, but the layout only caches what they already describe
+            object.__setattr__(self, "_layout_cache", _tuple_layout(self.value_specs))
+        return cast(_TupleLayout, self._layout_cache)
 
     def value_type_specs(self) -> List[TypeSpec]:
         """Get the TypeSpecs for the values of this tuple."""
-        return self.value_specs
+        return list(self.value_specs)
 
     def length_static(self) -> int:
         """Get the number of values this tuple holds."""
@@ -268,22 +302,26 @@ class TupleTypeSpec(TypeSpec):
         raise TypeError(f"Cannot annotate tuple of length {len(vtses)}")
 
     def is_dynamic(self) -> bool:
-        return any(type_spec.is_dynamic() for type_spec in self.value_type_specs())
+        # the layout isn't used, since tuples of transaction types have none
+        return any(type_spec.is_dynamic() for type_spec in self.value_specs)
 
     def byte_length_static(self) -> int:
         if self.is_dynamic():
             raise ValueError("Type is dynamic")
-        return _bool_aware_static_byte_length(self.value_type_specs())
+        return self._layout().head_length
 
     def storage_type(self) -> TealType:
         return TealType.bytes
 
     def __eq__(self, other: object) -> bool:
-        return (
-            isinstance(other, TupleTypeSpec)
-            and self.value_type_specs() == other.value_type_specs()
+        return self is other or (
+            isinstance(other, TupleTypeSpec) and self.value_specs == other.value_specs
         )
 
+    def __hash__(self) -> int:
+        # the same for NamedTupleTypeSpecs, which can be equal to a TupleTypeSpec
+        return hash(self.value_specs)
+
     def __str__(self) -> str:
         return "({})".format(",".join(map(str, self.value_type_specs())))
 
@@ -353,7 +391,9 @@ class Tuple(BaseType):
                 raise TealInputError(
                     f"Input values do not match type at {index=}: {value.type_spec()} != {myType}"
                 )
-        return self._stored_value.store(_encode_tuple(values))
+        return self._stored_value.store(
+            _encode_tuple(values, self.type_spec()._layout())
+        )
 
     def encode(self) -> Expr:
         return self._stored_value.load()
@@ -399,11 +439,13 @@ class TupleElement(ComputedValue[T]):
         return self.tuple.type_spec().value_type_specs()[self.index]
 
     def store_into(self, output: T) -> Expr:
+        tuple_type_spec = self.tuple.type_spec()
         return _index_tuple(
-            self.tuple.type_spec().value_type_specs(),
+            tuple_type_spec.value_type_specs(),
             self.tuple.encode(),
             self.index,
             output,
+            tuple_type_spec._layout(),
         )
 
 
@@ -524,10 +566,10 @@ class NamedTupleTypeSpec(TupleTypeSpec):
         super().__init__(*value_type_specs)
 
     def __eq__(self, other: object) -> bool:
-        return (
+        return self is other or (
             isinstance(other, NamedTupleTypeSpec)
             and self.instance_class == other.instance_class
-            and self.value_type_specs() == other.value_type_specs()
+            and self.value_specs == other.value_specs
         )
 
     def annotation_type(self) -> "type[NamedTuple]":
@@ -3,7 +3,12 @@ import pytest
 
 import pyteal as pt
 from pyteal import abi
-from pyteal.ast.abi.tuple import _encode_tuple, _index_tuple, TupleElement
+from pyteal.ast.abi.tuple import (
+    _encode_tuple,
+    _index_tuple,
+    _tuple_layout,
+    TupleElement,
+)
 from pyteal.ast.abi.bool import _encode_bool_sequence
 from pyteal.ast.abi.util import substring_for_decoding
 from pyteal.ast.abi.type_test import ContainerType
@@ -619,6 +624,48 @@ def test_TupleTypeSpec_byte_length_static():
         ).byte_length_static()
 
 
+def test_TupleTypeSpec_layout():
+    spec = abi.TupleTypeSpec(
+        abi.Uint64TypeSpec(),
+        abi.BoolTypeSpec(),
+        abi.StringTypeSpec(),
+        *[abi.BoolTypeSpec()] * 9,
+        abi.Uint16TypeSpec(),
+        abi.DynamicArrayTypeSpec(abi.BoolTypeSpec()),
+        abi.BoolTypeSpec(),
+    )
+    layout = spec._layout()
+    assert spec._layout() is layout
+    assert layout == _tuple_layout(spec.value_type_specs())
+
+    assert layout.head_offsets == (0, 8, 9) + (11,) * 9 + (13, 15, 17)
+    assert layout.bit_offsets == (
+        (None, 64, None) + tuple(range(88, 97)) + (None, None, 136)
+    )
+    assert layout.bool_sequence_lengths == (0, 1, 0, 9) + (0,) * 8 + (0, 0, 1)
+    assert layout.next_dynamic_indexes == (2, 2, 13) + (13,) * 10 + (None, None)
+    assert layout.head_length == 18
+    assert layout.is_dynamic
+
+    static = abi.TupleTypeSpec(abi.BoolTypeSpec(), abi.Uint32TypeSpec())._layout()
+    assert static.next_dynamic_indexes == (None, None)
+    assert static.head_length == 5
+    assert not static.is_dynamic
+
+    empty = abi.TupleTypeSpec()._layout()
+    assert empty.head_offsets == ()
+    assert empty.head_length == 0
+    assert not empty.is_dynamic
+
+    # transaction types have no encoding, so a tuple of them has no layout
+    transactions = abi.TupleTypeSpec(
+        abi.PaymentTransactionTypeSpec(), abi.Uint64TypeSpec()
+    )
+    assert not transactions.is_dynamic()
+    with pytest.raises(pt.TealInputError):
+        transactions._layout()
+
+
 def test_Tuple_decode():
     encoded = pt.Bytes("encoded")
     tupleValue = abi.Tuple(abi.TupleTypeSpec(abi.Uint64TypeSpec()))
@@ -1,5 +1,6 @@
-from typing import TypeVar, Generic, Callable, Final, cast
-from abc import ABC, abstractmethod
+from typing import Any, TypeVar, Generic, Callable, Final, Optional, cast
+from abc import ABC, ABCMeta, abstractmethod
+from weakref import WeakValueDictionary
 
 from pyteal.ast.expr import Expr
 from pyteal.ast.abstractvar import AbstractVar, alloc_abstract_var
@@ -8,12 +9,90 @@ from pyteal.errors import TealInputError, TealTypeError
 from pyteal.types import TealType
 
 
-class TypeSpec(ABC):
+def _intern_key_arg(arg: Any) -> Optional[tuple]:
+    if isinstance(arg, TypeSpec):
+        # TypeSpec equality doesn't always tell ABI types apart, e.g. StaticArrayTypeSpec.__eq__
+        # accepts an AddressTypeSpec, so the key of an interned TypeSpec stands in for it
+        return getattr(arg, "_key", None)
+    try:
+        hash(arg)
+    except TypeError:
+        return None
+    # include the argument's type so that e.g. True and 1 aren't confused
+    return (type(arg), arg)
+
+
+def _intern_key(cls: type, args: tuple, kwargs: dict) -> Optional[tuple]:
+    """Get the key which identifies the TypeSpec created by cls(*args, **kwargs), or None if the
+    arguments can't be used in a key."""
+    key: list[Any] = [cls]
+    for arg in args:
+        arg_key = _intern_key_arg(arg)
+        if arg_key is None:
+            return None
+        key.append(arg_key)
+    for name, arg in sorted(kwargs.items()):
+        arg_key = _intern_key_arg(arg)
+        if arg_key is None:
+            return None
+        key.append((name, arg_key))
+    return tuple(key)
+
+
+class _TypeSpecMeta(ABCMeta):
+    """The metaclass of TypeSpecs, which interns them.
+
+    Creating a TypeSpec with the same arguments as an existing one returns the existing TypeSpec,
+    so that equal TypeSpecs are usually the same object and compare by identity. TypeSpecs are
+    immutable once created, since they are shared.
+    """
+
+    _interned: "WeakValueDictionary[tuple, TypeSpec]" = WeakValueDictionary()
+
+    def __call__(cls, *args, **kwargs):
+        key = _intern_key(cls, args, kwargs)
+        if key is not None:
+            spec = _TypeSpecMeta._interned.get(key)
+            if spec is not None:
+                return spec
+
+        spec = super().__call__(*args, **kwargs)
+        object.__setattr__(spec, "_key", key)
+        object.__setattr__(spec, "_frozen", True)
+        if key is not None:
+            _TypeSpecMeta._interned[key] = spec
+        return spec
+
+
+class TypeSpec(ABC, metaclass=_TypeSpecMeta):
     """TypeSpec represents a specification for an ABI type.
 
     Essentially this is a factory that can produce specific instances of ABI types.
+
+    TypeSpecs are immutable and hashable. They are interned, so creating a TypeSpec that is the same
+    as an existing one returns the existing TypeSpec.
     """
 
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # defining __eq__ without __hash__ makes a class unhashable, so inherit __hash__ instead
+        if "__eq__" in cls.__dict__ and cls.__dict__.get("__hash__") is None:
+            cls.__hash__ = next(  # type: ignore[method-assign]
+                base.__dict__["__hash__"]
+                for base in cls.__mro__[1:]
+                if base.__dict__.get("__hash__") is not None
+            )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name: str) -> None:
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__delattr__(name)
+
     @abstractmethod
     def new_instance(self) -> "BaseType":
         """Create a new instance of the specified type."""
@@ -56,6 +135,9 @@ class TypeSpec(ABC):
         """
         pass
 
+    def __hash__(self) -> int:
+        return hash(str(self))
+
     @abstractmethod
     def __str__(self) -> str:
         """Get the string representation of this ABI type, used for creating method signatures."""
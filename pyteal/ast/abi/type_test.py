@@ -1,3 +1,5 @@
+import pytest
+
 import pyteal as pt
 from pyteal import abi
 
@@ -48,3 +50,37 @@ def test_ComputedType_use():
 
         with pt.TealComponent.Context.ignoreExprEquality():
             assert actual == expected
+
+
+def test_TypeSpec_interned():
+    assert abi.Uint64TypeSpec() is abi.Uint64TypeSpec()
+    assert abi.StaticBytesTypeSpec(4) is abi.StaticBytesTypeSpec(4)
+    assert abi.StaticBytesTypeSpec(4) is not abi.StaticBytesTypeSpec(5)
+
+    tuple_spec = abi.TupleTypeSpec(
+        abi.StaticArrayTypeSpec(abi.BoolTypeSpec(), 3), abi.StringTypeSpec()
+    )
+    assert tuple_spec is abi.TupleTypeSpec(
+        abi.StaticArrayTypeSpec(abi.BoolTypeSpec(), 3), abi.StringTypeSpec()
+    )
+    assert abi.Uint64().type_spec() is abi.Uint64().type_spec()
+    assert tuple_spec.new_instance().type_spec() is tuple_spec
+
+    # TypeSpecs with the same encoding but different ABI types are not the same object
+    address = abi.AddressTypeSpec()
+    byte_array = abi.StaticArrayTypeSpec(abi.ByteTypeSpec(), 32)
+    assert byte_array is not address
+    assert hash(byte_array) == hash(address)
+    assert str(abi.TupleTypeSpec(address)) == "(address)"
+    assert str(abi.TupleTypeSpec(byte_array)) == "(byte[32])"
+
+    assert len({abi.BoolTypeSpec(), abi.BoolTypeSpec(), tuple_spec, tuple_spec}) == 2
+
+
+def test_TypeSpec_immutable():
+    spec = abi.StaticArrayTypeSpec(abi.Uint8TypeSpec(), 2)
+    with pytest.raises(AttributeError):
+        spec.array_length = 3  # type: ignore[misc]
+    with pytest.raises(AttributeError):
+        del spec.value_spec
+    assert spec.length_static() == 2
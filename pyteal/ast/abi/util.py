@@ -10,6 +10,8 @@ from typing import (
     get_origin,
 )
 
+from functools import lru_cache
+
 import algosdk.abi
 
 from pyteal.errors import TealInputError
@@ -18,6 +20,9 @@ from pyteal.ast.int import Int
 from pyteal.ast.substring import Extract, Substring, Suffix
 from pyteal.ast.abi.type import TypeSpec, BaseType
 
+# the number of annotations whose TypeSpecs type_spec_from_annotation caches
+_TYPE_SPEC_CACHE_SIZE = 1024
+
 
 def substring_for_decoding(
     encoded: Expr,
@@ -84,6 +89,8 @@ def type_spec_from_annotation(annotation: Any) -> TypeSpec:
     For example, calling this function with the input `abi.StaticArray[abi.Bool, Literal[5]]` would
     return `abi.StaticArrayTypeSpec(abi.BoolTypeSpec(), 5)`.
 
+    The TypeSpecs of the most recently converted annotations are cached.
+
     Args:
         annotation: An annotation representing an ABI type instance.
 
@@ -94,6 +101,14 @@ def type_spec_from_annotation(annotation: Any) -> TypeSpec:
     Returns:
         The TypeSpec that corresponds to the input annotation.
     """
+    try:
+        hash(annotation)
+    except TypeError:
+        return _type_spec_from_annotation(annotation)
+    return _cached_type_spec_from_annotation(annotation)
+
+
+def _type_spec_from_annotation(annotation: Any) -> TypeSpec:
     from pyteal.ast.abi.bool import BoolTypeSpec, Bool
     from pyteal.ast.abi.uint import (
         ByteTypeSpec,
@@ -336,6 +351,12 @@ def type_spec_from_annotation(annotation: Any) -> TypeSpec:
 T = TypeVar("T", bound=BaseType)
 
 
+# TypeSpecs are immutable, so cached TypeSpecs can be shared
+_cached_type_spec_from_annotation = lru_cache(maxsize=_TYPE_SPEC_CACHE_SIZE)(
+    _type_spec_from_annotation
+)
+
+
 def contains_type_spec(ts: TypeSpec, targets: Sequence[TypeSpec]) -> bool:
     from pyteal.ast.abi.array_dynamic import DynamicArrayTypeSpec
     from pyteal.ast.abi.array_static import StaticArrayTypeSpec
@@ -355,6 +355,8 @@ def test_type_spec_from_annotation(
 
     actual = abi.type_spec_from_annotation(annotation)
     assert actual == expected
+    assert hash(actual) == hash(expected)
+    assert abi.type_spec_from_annotation(annotation) is actual
 
     new_instance = actual.new_instance()
 
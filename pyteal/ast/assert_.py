@@ -37,7 +37,7 @@ class Assert(Expr):
             asserts: list[Expr] = []
             for cond in self.cond:
                 asrt = Assert(cond, comment=self.comment)
-                asrt.trace = cond.trace
+                asrt._trace = cond._trace
                 asrt._sframes_container = cond
                 asserts.append(asrt)
             return Seq(*asserts).__teal__(options)
@@ -4,6 +4,7 @@ from pyteal.types import TealType, require_type
 from pyteal.errors import verifyProgramVersion
 from pyteal.ir import TealOp, Op, TealBlock
 from pyteal.ast.expr import Expr
+from pyteal.ast.constantfolding import constant_values, evaluate_op, fold_constants
 
 if TYPE_CHECKING:
     from pyteal.compiler import CompileOptions
@@ -41,10 +42,23 @@ class BinaryExpr(Expr):
             "Program version too low to use op {}".format(self.op),
         )
 
+        folded = fold_constants(self, options)
+        if folded is not None:
+            return folded
+
         return TealBlock.FromOp(
             options, TealOp(self, self.op), self.argLeft, self.argRight
         )
 
+    def _constant_value(self, options: "CompileOptions") -> int | bytes | None:
+        if self.op.min_version > options.version:
+            return None
+
+        values = constant_values([self.argLeft, self.argRight], options)
+        if values is None:
+            return None
+        return evaluate_op(self.op, values, self)
+
     def __str__(self):
         return "({} {} {})".format(
             str(self.op).title().replace("_", ""), self.argLeft, self.argRight
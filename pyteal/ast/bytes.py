@@ -1,3 +1,4 @@
+import base64
 from typing import TYPE_CHECKING, cast, overload
 
 from pyteal.ast.leafexpr import LeafExpr
@@ -88,6 +89,21 @@ class Bytes(LeafExpr):
         op = TealOp(self, Op.byte, payload)
         return TealBlock.FromOp(options, op)
 
+    def _constant_value(self, options: "CompileOptions") -> int | bytes | None:
+        if self.base == "utf8":
+            # undo escapeStr, which leaves every character in the range of latin-1
+            return (
+                self.byte_str[1:-1]
+                .encode("latin-1")
+                .decode("unicode-escape")
+                .encode("latin-1")
+            )
+        if self.base == "base16":
+            return bytes.fromhex(self.byte_str)
+        if self.base == "base64":
+            return base64.b64decode(self.byte_str)
+        return base64.b32decode(self.byte_str + "=" * (-len(self.byte_str) % 8))
+
     def __str__(self):
         return f"({self.base} bytes: {self.byte_str})"
 
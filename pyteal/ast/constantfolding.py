@@ -0,0 +1,347 @@
+import hashlib
+from math import isqrt
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from pyteal.errors import TealCompileError
+from pyteal.ir import Op, TealBlock, TealOp, TealSimpleBlock
+from pyteal.util import escapeStr
+
+if TYPE_CHECKING:
+    from pyteal.ast.expr import Expr
+    from pyteal.compiler import CompileOptions
+
+ConstantValue = int | bytes
+
+MAX_UINT64 = 2**64 - 1
+MAX_BYTE_STRING_LENGTH = 4096
+
+
+class _Panic(Exception):
+    """Raised by an evaluator when the op it evaluates would fail at runtime."""
+
+
+class _ConstantPanicError(TealCompileError):
+    """Raised when a constant expression would fail at runtime if it is evaluated."""
+
+
+def _uint64(value: int) -> int:
+    if value > MAX_UINT64:
+        raise _Panic("overflow")
+    if value < 0:
+        raise _Panic("underflow")
+    return value
+
+
+def _uint64_arg(value: ConstantValue) -> int:
+    if type(value) is not int:
+        raise _Panic("expected a uint64 argument")
+    return value
+
+
+def _bytes_arg(value: ConstantValue) -> bytes:
+    if type(value) is not bytes:
+        raise _Panic("expected a byte string argument")
+    return value
+
+
+def _byte_string(value: bytes) -> bytes:
+    if len(value) > MAX_BYTE_STRING_LENGTH:
+        raise _Panic(
+            "byte string is longer than {} bytes".format(MAX_BYTE_STRING_LENGTH)
+        )
+    return value
+
+
+def _uint64_op(
+    f: Callable[[int, int], int]
+) -> Callable[[Sequence[ConstantValue]], ConstantValue]:
+    return lambda args: f(_uint64_arg(args[0]), _uint64_arg(args[1]))
+
+
+def _div(a: int, b: int) -> int:
+    if b == 0:
+        raise _Panic("division by zero")
+    return a // b
+
+
+def _mod(a: int, b: int) -> int:
+    if b == 0:
+        raise _Panic("modulo by zero")
+    return a % b
+
+
+def _exp(a: int, b: int) -> int:
+    if a == 0 and b == 0:
+        raise _Panic("0 to the power of 0")
+    if a > 1 and b >= 64:
+        # avoid computing enormous powers which are certain to overflow
+        raise _Panic("overflow")
+    return _uint64(a**b)
+
+
+def _shift(a: int, b: int, left: bool) -> int:
+    if b >= 64:
+        raise _Panic("shift amount must be less than 64")
+    return ((a << b) & MAX_UINT64) if left else a >> b
+
+
+def _compare(args: Sequence[ConstantValue], f: Callable[[bool], bool]) -> int:
+    left, right = args
+    if type(left) is not type(right):
+        raise _Panic("cannot compare a uint64 to a byte string")
+    return int(f(left == right))
+
+
+def _btoi(value: bytes) -> int:
+    if len(value) > 8:
+        raise _Panic("btoi argument is longer than 8 bytes")
+    return int.from_bytes(value, "big")
+
+
+def _bitlen(value: ConstantValue) -> int:
+    if isinstance(value, bytes):
+        return int.from_bytes(value, "big").bit_length()
+    return value.bit_length()
+
+
+def _bzero(n: int) -> bytes:
+    if n > MAX_BYTE_STRING_LENGTH:
+        raise _Panic(
+            "byte string is longer than {} bytes".format(MAX_BYTE_STRING_LENGTH)
+        )
+    return bytes(n)
+
+
+def _extract(value: bytes, start: int, length: int) -> bytes:
+    if start + length > len(value):
+        raise _Panic("extraction range is out of bounds")
+    return value[start : start + length]
+
+
+def _extract_uint(size: int) -> Callable[[Sequence[ConstantValue]], ConstantValue]:
+    def evaluate(args: Sequence[ConstantValue]) -> ConstantValue:
+        return int.from_bytes(
+            _extract(_bytes_arg(args[0]), _uint64_arg(args[1]), size), "big"
+        )
+
+    return evaluate
+
+
+def _getbyte(value: bytes, index: int) -> int:
+    if index >= len(value):
+        raise _Panic("index is out of bounds")
+    return value[index]
+
+
+def _hash(name: str) -> Optional[Callable[[Sequence[ConstantValue]], ConstantValue]]:
+    try:
+        hashlib.new(name)
+    except ValueError:
+        # not every build of hashlib supports every algorithm
+        return None
+    return lambda args: hashlib.new(name, _bytes_arg(args[0])).digest()
+
+
+# Functions which evaluate ops over constant arguments, keyed by op. Every op in this table must be
+# pure: its result can only depend on its arguments.
+_EVALUATORS: Dict[Op, Callable[[Sequence[ConstantValue]], ConstantValue]] = {
+    Op.add: _uint64_op(lambda a, b: _uint64(a + b)),
+    Op.minus: _uint64_op(lambda a, b: _uint64(a - b)),
+    Op.mul: _uint64_op(lambda a, b: _uint64(a * b)),
+    Op.div: _uint64_op(_div),
+    Op.mod: _uint64_op(_mod),
+    Op.exp: _uint64_op(_exp),
+    Op.shl: _uint64_op(lambda a, b: _shift(a, b, True)),
+    Op.shr: _uint64_op(lambda a, b: _shift(a, b, False)),
+    Op.bitwise_and: _uint64_op(lambda a, b: a & b),
+    Op.bitwise_or: _uint64_op(lambda a, b: a | b),
+    Op.bitwise_xor: _uint64_op(lambda a, b: a ^ b),
+    Op.logic_and: _uint64_op(lambda a, b: int(a != 0 and b != 0)),
+    Op.logic_or: _uint64_op(lambda a, b: int(a != 0 or b != 0)),
+    Op.lt: _uint64_op(lambda a, b: int(a < b)),
+    Op.gt: _uint64_op(lambda a, b: int(a > b)),
+    Op.le: _uint64_op(lambda a, b: int(a <= b)),
+    Op.ge: _uint64_op(lambda a, b: int(a >= b)),
+    Op.eq: lambda args: _compare(args, lambda equal: equal),
+    Op.neq: lambda args: _compare(args, lambda equal: not equal),
+    Op.logic_not: lambda args: int(_uint64_arg(args[0]) == 0),
+    Op.bitwise_not: lambda args: _uint64_arg(args[0]) ^ MAX_UINT64,
+    Op.sqrt: lambda args: isqrt(_uint64_arg(args[0])),
+    Op.bitlen: lambda args: _bitlen(args[0]),
+    Op.itob: lambda args: _uint64_arg(args[0]).to_bytes(8, "big"),
+    Op.btoi: lambda args: _btoi(_bytes_arg(args[0])),
+    Op.len: lambda args: len(_bytes_arg(args[0])),
+    Op.bzero: lambda args: _bzero(_uint64_arg(args[0])),
+    Op.concat: lambda args: _byte_string(_bytes_arg(args[0]) + _bytes_arg(args[1])),
+    Op.getbyte: lambda args: _getbyte(_bytes_arg(args[0]), _uint64_arg(args[1])),
+    Op.extract_uint16: _extract_uint(2),
+    Op.extract_uint32: _extract_uint(4),
+    Op.extract_uint64: _extract_uint(8),
+}
+
+for _op, _name in (
+    (Op.sha256, "sha256"),
+    (Op.sha512_256, "sha512_256"),
+    (Op.sha3_256, "sha3_256"),
+):
+    _evaluator = _hash(_name)
+    if _evaluator is not None:
+        _EVALUATORS[_op] = _evaluator
+
+
+def evaluate_op(
+    op: Op, args: Sequence[ConstantValue], expr: "Expr"
+) -> Optional[ConstantValue]:
+    """Evaluate an op over constant arguments.
+
+    Args:
+        op: The op to evaluate.
+        args: The values of the op's arguments.
+        expr: The expression which contains the op, used to report errors.
+
+    Returns:
+        The value the op produces, or None if the op cannot be evaluated at compile time.
+
+    Raises:
+        _ConstantPanicError: If executing the op with these arguments would always fail.
+    """
+    evaluator = _EVALUATORS.get(op)
+    if evaluator is None:
+        return None
+
+    try:
+        return evaluator(args)
+    except _Panic as panic:
+        raise _ConstantPanicError(
+            "Constant expression would fail at runtime ({}): {}".format(op, panic),
+            expr,
+        )
+
+
+def evaluate_extract(
+    value: ConstantValue, start: ConstantValue, length: ConstantValue, expr: "Expr"
+) -> bytes:
+    """Extract length bytes of value starting at start, like the extract3 op.
+
+    Raises:
+        _ConstantPanicError: If the range to extract is out of bounds.
+    """
+    try:
+        return _extract(_bytes_arg(value), _uint64_arg(start), _uint64_arg(length))
+    except _Panic as panic:
+        raise _ConstantPanicError(
+            "Constant expression would fail at runtime: {}".format(panic), expr
+        )
+
+
+def constant_value(expr: "Expr", options: "CompileOptions") -> Optional[ConstantValue]:
+    """Get the value an expression always evaluates to, if constant folding is enabled and the
+    value can be determined at compile time.
+
+    Results are cached for the duration of a compilation, so folding a deep expression only
+    evaluates each of its subexpressions once.
+
+    An expression which would fail at runtime has no constant value, so it is compiled to the ops
+    which fail. The failure is recorded in options, and check_constant_panics reports it once it
+    is known whether the expression is evaluated on every path through the program.
+    """
+    if not options.optimize.optimize_constant_folding(options.version):
+        return None
+
+    # the expression is kept in the cache along with its value so that its id can't be reused
+    cache: Dict[int, Tuple["Expr", Optional[ConstantValue]]] = options.constantValues
+    cached = cache.get(id(expr))
+    if cached is None:
+        try:
+            cached = (expr, expr._constant_value(options))
+        except _ConstantPanicError as panic:
+            options.constantPanics[id(expr)] = panic
+            cached = (expr, None)
+        cache[id(expr)] = cached
+    return cached[1]
+
+
+def constant_values(
+    exprs: Sequence["Expr"], options: "CompileOptions"
+) -> Optional[List[ConstantValue]]:
+    """Get the constant values of several expressions, or None if any of them is not constant."""
+    values: List[ConstantValue] = []
+    for expr in exprs:
+        value = constant_value(expr, options)
+        if value is None:
+            return None
+        values.append(value)
+    return values
+
+
+def _constant_op(expr: "Expr", value: ConstantValue) -> TealOp:
+    if type(value) is int:
+        return TealOp(expr, Op.int, value)
+
+    assert type(value) is bytes
+    if value.isascii() and value.decode("ascii").isprintable():
+        return TealOp(expr, Op.byte, escapeStr(value.decode("ascii")))
+    return TealOp(expr, Op.byte, "0x" + value.hex())
+
+
+def fold_constants(
+    expr: "Expr", options: "CompileOptions"
+) -> Optional[Tuple[TealBlock, TealSimpleBlock]]:
+    """Compile an expression to a single int or byte op if its value is known at compile time.
+
+    Returns:
+        The start and end blocks of the folded expression, or None if it cannot be folded.
+    """
+    value = constant_value(expr, options)
+    if value is None:
+        return None
+    return TealBlock.FromOp(options, _constant_op(expr, value))
+
+
+def check_constant_panics(start: TealBlock, options: "CompileOptions") -> None:
+    """Report a constant expression which would fail at runtime if every execution of the program
+    evaluates one.
+
+    Constant expressions which only fail on some paths, such as in a branch of an If expression or
+    in the body of a loop, are left for the program to evaluate at runtime.
+
+    Args:
+        start: The start block of the main program.
+        options: The compile options the main program was compiled with.
+
+    Raises:
+        TealCompileError: If every execution of the program would fail at one of these expressions.
+    """
+    panics = options.constantPanics
+    if len(panics) == 0:
+        return
+
+    # ids of the constant expressions which are evaluated by some execution of the program
+    reached: Set[int] = set()
+    visited: Set[int] = set()
+    stack: List[TealBlock] = [start]
+    while len(stack) != 0:
+        block = stack.pop()
+        if id(block) in visited:
+            continue
+        visited.add(id(block))
+
+        for stmt in block.ops:
+            if id(stmt.expr) in panics:
+                reached.add(id(stmt.expr))
+                break
+            if stmt.getOp() == Op.err:
+                break
+            if stmt.getOp() in (Op.return_, Op.callsub):
+                # the program can exit without failing; a subroutine is assumed to be able to
+                # exit the program as well
+                return
+        else:
+            outgoing = block.getOutgoing()
+            if len(outgoing) == 0:
+                return
+            stack.extend(outgoing)
+
+    for key, panic in panics.items():
+        if key in reached:
+            raise panic
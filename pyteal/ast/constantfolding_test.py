@@ -0,0 +1,301 @@
+import pytest
+
+import pyteal as pt
+from pyteal.ast.constantfolding import constant_value
+
+
+def folding_options(version: int = 8) -> pt.CompileOptions:
+    return pt.CompileOptions(
+        version=version, optimize=pt.OptimizeOptions(constant_folding=True)
+    )
+
+
+def test_constant_folding_disabled_by_default():
+    expr = pt.Int(2) * pt.Int(1000)
+    assert constant_value(expr, pt.CompileOptions()) is None
+
+    actual, _ = expr.__teal__(pt.CompileOptions())
+    actual.addIncoming()
+    actual = pt.TealBlock.NormalizeBlocks(actual)
+
+    assert [op.op for op in actual.ops] == [pt.Op.int, pt.Op.int, pt.Op.mul]
+
+
+@pytest.mark.parametrize(
+    "expr,expected",
+    [
+        (pt.Int(2) * pt.Int(1000), 2000),
+        (pt.Add(pt.Int(1), pt.Int(2), pt.Int(3)), 6),
+        (pt.Int(7) - pt.Int(7), 0),
+        (pt.Int(7) / pt.Int(2), 3),
+        (pt.Int(7) % pt.Int(2), 1),
+        (pt.Exp(pt.Int(2), pt.Int(63)), 2**63),
+        (pt.ShiftLeft(pt.Int(2**63 + 1), pt.Int(1)), 2),
+        (pt.ShiftRight(pt.Int(8), pt.Int(3)), 1),
+        (pt.BitwiseNot(pt.Int(0)), 2**64 - 1),
+        (pt.BitwiseXor(pt.Int(6), pt.Int(3)), 5),
+        (pt.And(pt.Int(1), pt.Int(2), pt.Int(0)), 0),
+        (pt.Or(pt.Int(0), pt.Int(5)), 1),
+        (pt.Not(pt.Int(0)), 1),
+        (pt.Int(1) < pt.Int(2), 1),
+        (pt.Int(1) >= pt.Int(2), 0),
+        (pt.Bytes("a") == pt.Bytes("a"), 1),
+        (pt.Bytes("a") != pt.Bytes("base16", "61"), 0),
+        (pt.Sqrt(pt.Int(17)), 4),
+        (pt.BitLen(pt.Bytes(b"\x00\x01")), 1),
+        (pt.Len(pt.Bytes("abc")), 3),
+        (pt.Btoi(pt.Bytes(b"\x01\x00")), 256),
+        (pt.Btoi(pt.Itob(pt.Int(5))), 5),
+        (pt.GetByte(pt.Bytes("abc"), pt.Int(1)), ord("b")),
+        (pt.ExtractUint16(pt.Bytes(b"\x00\x01\x02"), pt.Int(1)), 258),
+        (pt.Concat(pt.Bytes("a"), pt.Bytes("b"), pt.Bytes("c")), b"abc"),
+        (pt.Itob(pt.Int(5)), b"\x00\x00\x00\x00\x00\x00\x00\x05"),
+        (pt.Extract(pt.Bytes("abcdef"), pt.Int(0), pt.Int(4)), b"abcd"),
+        (pt.Extract(pt.Bytes("abcdef"), pt.Int(2), pt.Int(0)), b""),
+        (pt.Substring(pt.Bytes("abcdef"), pt.Int(1), pt.Int(3)), b"bc"),
+        (pt.Suffix(pt.Bytes("abcdef"), pt.Int(4)), b"ef"),
+        (pt.Suffix(pt.Bytes("abcdef"), pt.Int(6)), b""),
+        (pt.BytesZero(pt.Int(2)), b"\x00\x00"),
+        (pt.Bytes("\n😀\\"), "\n😀\\".encode()),
+        (pt.Bytes("base64", "Y29udGVudA=="), b"content"),
+        (pt.Bytes("base32", "NBSWY3DPEE"), b"hello!"),
+    ],
+)
+def test_constant_value(expr: pt.Expr, expected: int | bytes):
+    assert constant_value(expr, folding_options()) == expected
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        pt.Txn.fee(),
+        pt.EnumInt("NoOp"),
+        pt.Int(1) + pt.Txn.fee(),
+        pt.Concat(pt.Bytes("a"), pt.Txn.note()),
+        pt.Keccak256(pt.Bytes("a")),
+        pt.BytesAdd(pt.Bytes(b"\x01"), pt.Bytes(b"\x01")),
+    ],
+)
+def test_constant_value_not_constant(expr: pt.Expr):
+    assert constant_value(expr, folding_options()) is None
+
+
+def test_constant_value_version_too_low():
+    # ops which aren't available in the target version are left for the compiler to reject
+    assert constant_value(pt.Sqrt(pt.Int(4)), folding_options(version=3)) is None
+    assert (
+        constant_value(
+            pt.Extract(pt.Bytes("ab"), pt.Int(0), pt.Int(1)), folding_options(version=4)
+        )
+        is None
+    )
+
+    with pytest.raises(pt.TealInputError):
+        (pt.Int(1) + pt.Sqrt(pt.Int(4))).__teal__(folding_options(version=3))
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        pt.Int(2**63) * pt.Int(2),
+        pt.Mul(pt.Int(2**63), pt.Int(2), pt.Int(0)),
+        pt.Int(2**64 - 1) + pt.Int(1),
+        pt.Int(1) - pt.Int(2),
+        pt.Int(1) / pt.Int(0),
+        pt.Int(1) % pt.Int(0),
+        pt.Exp(pt.Int(0), pt.Int(0)),
+        pt.Exp(pt.Int(2), pt.Int(64)),
+        pt.ShiftLeft(pt.Int(1), pt.Int(64)),
+        pt.Btoi(pt.Bytes("123456789")),
+        pt.GetByte(pt.Bytes("abc"), pt.Int(3)),
+        pt.ExtractUint64(pt.Bytes("abc"), pt.Int(0)),
+        pt.Extract(pt.Bytes("abc"), pt.Int(2), pt.Int(2)),
+        pt.Substring(pt.Bytes("abc"), pt.Int(2), pt.Int(4)),
+        pt.Suffix(pt.Bytes("abc"), pt.Int(4)),
+        pt.Substring(pt.Bytes("abcd"), pt.Int(2) + pt.Int(1), pt.Int(1)),
+        pt.BytesZero(pt.Int(4097)),
+        pt.Concat(pt.BytesZero(pt.Int(4096)), pt.Bytes("a")),
+    ],
+)
+def test_constant_value_would_panic(expr: pt.Expr):
+    options = folding_options()
+    assert constant_value(expr, options) is None
+    assert list(options.constantPanics) == [id(expr)]
+
+    with pytest.raises(pt.TealCompileError):
+        pt.compileTeal(
+            pt.Pop(expr),
+            pt.Mode.Application,
+            version=8,
+            optimize=pt.OptimizeOptions(constant_folding=True),
+        )
+
+
+def test_fold_int():
+    left = pt.Int(2)
+    right = pt.Int(1000)
+    expr = left * right
+    options = folding_options()
+
+    expected = pt.TealSimpleBlock([pt.TealOp(expr, pt.Op.int, 2000)])
+
+    actual, _ = expr.__teal__(options)
+
+    assert actual == expected
+
+
+def test_fold_bytes():
+    expr = pt.Concat(pt.Bytes("a"), pt.Bytes("b"))
+    options = folding_options()
+
+    expected = pt.TealSimpleBlock([pt.TealOp(expr, pt.Op.byte, '"ab"')])
+
+    actual, _ = expr.__teal__(options)
+
+    assert actual == expected
+
+    expr = pt.Itob(pt.Int(5))
+    expected = pt.TealSimpleBlock([pt.TealOp(expr, pt.Op.byte, "0x0000000000000005")])
+
+    actual, _ = expr.__teal__(options)
+
+    assert actual == expected
+
+
+def test_fold_partially_constant():
+    fee = pt.Txn.fee()
+    product = pt.Int(2) * pt.Int(3)
+    expr = pt.Add(fee, product)
+    options = folding_options()
+
+    expected = pt.TealSimpleBlock(
+        [
+            pt.TealOp(fee, pt.Op.txn, "Fee"),
+            pt.TealOp(product, pt.Op.int, 6),
+            pt.TealOp(expr, pt.Op.add),
+        ]
+    )
+
+    actual, _ = expr.__teal__(options)
+    actual.addIncoming()
+    actual = pt.TealBlock.NormalizeBlocks(actual)
+
+    assert actual == expected
+
+
+def test_fold_program():
+    program = pt.Seq(
+        pt.Log(pt.Concat(pt.Bytes("id:"), pt.Itob(pt.Int(2) * pt.Int(1000)))),
+        pt.Return(pt.Len(pt.Extract(pt.Bytes("abcdef"), pt.Int(0), pt.Int(4)))),
+    )
+
+    expected = """#pragma version 8
+byte 0x69643a00000000000007d0
+log
+int 4
+return""".strip()
+
+    actual = pt.compileTeal(
+        program,
+        pt.Mode.Application,
+        version=8,
+        optimize=pt.OptimizeOptions(constant_folding=True),
+    )
+
+    assert actual == expected
+
+    with pytest.raises(pt.TealCompileError):
+        pt.compileTeal(
+            pt.Return(pt.Int(1) - pt.Int(2)),
+            pt.Mode.Application,
+            version=8,
+            optimize=pt.OptimizeOptions(constant_folding=True),
+        )
+
+
+@pytest.mark.parametrize(
+    "program",
+    [
+        pt.Return(pt.If(pt.Txn.fee() == pt.Int(0), pt.Int(1) / pt.Int(0), pt.Int(1))),
+        pt.Seq(
+            pt.If(pt.Txn.fee() == pt.Int(0)).Then(pt.Pop(pt.Int(1) - pt.Int(2))),
+            pt.Approve(),
+        ),
+        pt.Cond(
+            [pt.Txn.fee() == pt.Int(0), pt.Return(pt.Int(1) % pt.Int(0))],
+            [pt.Int(1), pt.Approve()],
+        ),
+        pt.Seq(
+            pt.For(
+                (i := pt.ScratchVar()).store(pt.Int(0)),
+                i.load() < pt.Txn.fee(),
+                i.store(i.load() + pt.Int(1)),
+            ).Do(pt.Pop(pt.Int(1) / pt.Int(0))),
+            pt.Approve(),
+        ),
+        pt.Seq(
+            pt.If(pt.Txn.fee() == pt.Int(0)).Then(pt.Approve()),
+            pt.Pop(pt.Int(1) / pt.Int(0)),
+            pt.Approve(),
+        ),
+        pt.Seq(pt.Approve(), pt.Pop(pt.Int(1) / pt.Int(0)), pt.Approve()),
+    ],
+)
+def test_fold_guarded_panic(program: pt.Expr):
+    # a constant expression which fails on some paths is left for the program to evaluate
+    actual = pt.compileTeal(
+        program,
+        pt.Mode.Application,
+        version=8,
+        optimize=pt.OptimizeOptions(constant_folding=True),
+    )
+    expected = pt.compileTeal(program, pt.Mode.Application, version=8)
+
+    assert actual == expected
+
+
+def test_fold_guarded_substring():
+    program = pt.Return(
+        pt.If(
+            pt.Txn.fee() == pt.Int(0),
+            pt.Len(pt.Substring(pt.Bytes("abcd"), pt.Int(2) + pt.Int(1), pt.Int(1))),
+            pt.Int(1),
+        )
+    )
+
+    actual = pt.compileTeal(
+        program,
+        pt.Mode.Application,
+        version=8,
+        optimize=pt.OptimizeOptions(constant_folding=True),
+    )
+
+    # the start index is folded, but the substring is left to fail at runtime
+    assert "int 3\nint 1\nsubstring3\n" in actual
+
+
+@pytest.mark.parametrize(
+    "program",
+    [
+        pt.Return(pt.Int(1) / pt.Int(0)),
+        pt.Seq(
+            pt.If(pt.Txn.fee() == pt.Int(0))
+            .Then(pt.Pop(pt.Int(1) / pt.Int(0)))
+            .Else(pt.Pop(pt.Int(1) - pt.Int(2))),
+            pt.Approve(),
+        ),
+        pt.Seq(
+            pt.If(pt.Txn.fee() == pt.Int(0)).Then(pt.Err()),
+            pt.Pop(pt.Int(1) / pt.Int(0)),
+            pt.Approve(),
+        ),
+    ],
+)
+def test_fold_certain_panic(program: pt.Expr):
+    with pytest.raises(pt.TealCompileError):
+        pt.compileTeal(
+            program,
+            pt.Mode.Application,
+            version=8,
+            optimize=pt.OptimizeOptions(constant_folding=True),
+        )
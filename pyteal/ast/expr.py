@@ -1,5 +1,10 @@
+import sys
+import traceback
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from types import CodeType, FrameType
+from typing import TYPE_CHECKING, Optional
+
+from feature_gates import FeatureGates
 
 from pyteal.ir import TealBlock, TealSimpleBlock
 from pyteal.stack_frame import NatalStackFrame
@@ -8,16 +13,57 @@ from pyteal.types import TealType
 if TYPE_CHECKING:
     from pyteal.compiler import CompileOptions
 
+# The code and line number of each frame of a call stack, most recent call first
+_RawTrace = tuple[tuple[CodeType, int], ...]
+
+
+def _capture_trace(frame: Optional[FrameType]) -> _RawTrace:
+    """Record the call stack ending at frame, without reading any source code."""
+    frames: list[tuple[CodeType, int]] = []
+    while frame is not None:
+        frames.append((frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    return tuple(frames)
+
+
+def _format_trace(raw: _RawTrace) -> list[str]:
+    """Format a recorded call stack like traceback.format_stack."""
+    return traceback.StackSummary.from_list(
+        [
+            (code.co_filename, lineno, code.co_name, None)
+            for code, lineno in reversed(raw)
+        ]
+    ).format()
+
 
 class Expr(ABC):
     """Abstract base class for PyTeal expressions."""
 
     def __init__(self):
-        import traceback
-
-        self.trace = traceback.format_stack()[0:-1]
+        # Formatting a trace is expensive, so only the code and line number of each frame are
+        # recorded here. The trace is formatted the first time it is needed to report an error.
+        self._trace: list[str] | _RawTrace | None = None
+        if FeatureGates.definition_traces():  # type: ignore[attr-defined]
+            self._trace = _capture_trace(sys._getframe(1))
         self.stack_frames: NatalStackFrame = NatalStackFrame()
 
+    @property
+    def trace(self) -> list[str]:
+        """The formatted call stack at the time this expression was created.
+
+        This is empty if definition traces were disabled with
+        :code:`FeatureGates.set_definition_traces(False)` when the expression was created.
+        """
+        if self._trace is None:
+            return []
+        if isinstance(self._trace, tuple):
+            self._trace = _format_trace(self._trace)
+        return self._trace
+
+    @trace.setter
+    def trace(self, trace: list[str]) -> None:
+        self._trace = trace
+
     def getDefinitionTrace(self) -> list[str]:
         return self.trace
 
@@ -41,6 +87,16 @@ class Expr(ABC):
         """Assemble TEAL IR for this component and its arguments."""
         pass
 
+    def _constant_value(self, options: "CompileOptions") -> int | bytes | None:
+        """Get the value this expression always evaluates to, or None if it is not known at compile
+        time.
+
+        This is used for constant folding. It should not be called directly; use
+        :code:`constant_value` from :code:`pyteal.ast.constantfolding` instead, which caches the
+        result.
+        """
+        return None
+
     def __lt__(self, other):
         from pyteal.ast.binaryexpr import Lt
 
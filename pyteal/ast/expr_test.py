@@ -0,0 +1,50 @@
+from feature_gates import FeatureGates
+
+import pyteal as pt
+
+
+def make_expr() -> pt.Expr:
+    return pt.Int(1)
+
+
+def test_definition_trace():
+    expr = make_expr()
+
+    # the trace is only formatted when it is first requested
+    assert isinstance(expr._trace, tuple)
+
+    trace = expr.getDefinitionTrace()
+    assert isinstance(expr._trace, list)
+    assert expr.getDefinitionTrace() is trace
+
+    # the most recent call is last, and the frame of Expr.__init__ is not included
+    assert "in make_expr\n" in trace[-2]
+    assert "return pt.Int(1)" in trace[-2]
+    assert "in __init__\n" in trace[-1]
+    assert "int.py" in trace[-1]
+    assert "in test_definition_trace\n" in trace[-3]
+
+    error = pt.TealCompileError("message", expr)
+    assert str(error) == (
+        "message\nTraceback of origin expression (most recent call last):\n"
+        + "".join(trace)
+    )
+
+
+def test_definition_trace_copied():
+    source = make_expr()
+    copy = pt.Int(2)
+    copy.trace = source.trace
+
+    assert copy.getDefinitionTrace() == source.getDefinitionTrace()
+
+
+def test_definition_trace_disabled():
+    FeatureGates.set_definition_traces(False)
+    try:
+        expr = make_expr()
+    finally:
+        FeatureGates.set_definition_traces(True)
+
+    assert expr.getDefinitionTrace() == []
+    assert str(pt.TealCompileError("message", expr)) == "message"
@@ -4,6 +4,11 @@ from pyteal.types import TealType, require_type
 from pyteal.errors import TealInputError
 from pyteal.ir import TealOp, Op, TealSimpleBlock
 from pyteal.ast.expr import Expr
+from pyteal.ast.constantfolding import (
+    constant_values,
+    evaluate_op,
+    fold_constants,
+)
 
 if TYPE_CHECKING:
     from pyteal.compiler import CompileOptions
@@ -32,6 +37,10 @@ class NaryExpr(Expr):
         self.args = args
 
     def __teal__(self, options: "CompileOptions"):
+        folded = fold_constants(self, options)
+        if folded is not None:
+            return folded
+
         start = None
         end = None
         for i, arg in enumerate(self.args):
@@ -47,6 +56,23 @@ class NaryExpr(Expr):
 
         return start, end
 
+    def _constant_value(self, options: "CompileOptions") -> int | bytes | None:
+        if self.op.min_version > options.version:
+            return None
+
+        values = constant_values(self.args, options)
+        if values is None:
+            return None
+
+        # evaluate from left to right like the compiled program, so that an intermediate result
+        # which overflows is detected
+        value: int | bytes | None = values[0]
+        for arg in values[1:]:
+            value = evaluate_op(self.op, [cast(int | bytes, value), arg], self)
+            if value is None:
+                return None
+        return value
+
     def __str__(self):
         ret_str = "(" + str(self.op).title().replace("_", "")
         for a in self.args:
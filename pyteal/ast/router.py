@@ -1,23 +1,30 @@
+import json
+import os
 from contextlib import contextmanager
 from dataclasses import astuple, dataclass, field
 from enum import IntFlag
-from typing import Callable, Final, Optional, cast
+from typing import TYPE_CHECKING, Callable, Final, Mapping, Optional, cast
 
 from algosdk import abi as sdk_abi
 from algosdk import encoding
 from algosdk.v2client.algod import AlgodClient
 
 from pyteal.ast import abi
+from pyteal.ast.abstractvar import AbstractVar
 from pyteal.ast.app import OnComplete
 from pyteal.ast.assert_ import Assert
+from pyteal.ast.binaryexpr import BytesLt, GetBit
+from pyteal.ast.bytes import Bytes
 from pyteal.ast.cond import Cond
 from pyteal.ast.expr import Expr
 from pyteal.ast.frame import FrameVar, Proto, ProtoStackLayout
+from pyteal.ast.if_ import If
 from pyteal.ast.int import EnumInt, Int
 from pyteal.ast.methodsig import MethodSignature
 from pyteal.ast.naryexpr import And, Or
 from pyteal.ast.return_ import Approve, Reject
 from pyteal.ast.scratch import ScratchSlot
+from pyteal.ast.scratchvar import ScratchVar
 from pyteal.ast.seq import Seq
 from pyteal.ast.subroutine import (
     ABIReturnSubroutine,
@@ -28,17 +35,53 @@ from pyteal.ast.subroutine import (
     SubroutineFnWrapper,
 )
 from pyteal.ast.txn import Txn
+from pyteal.ast.unaryexpr import Not
 from pyteal.compiler.compiler import DEFAULT_TEAL_VERSION, Compilation, OptimizeOptions
 from pyteal.compiler.sourcemap import PyTealSourceMap, _PyTealSourceMapper
 from pyteal.config import METHOD_ARG_NUM_CUTOFF
 from pyteal.errors import AlgodClientError, TealInputError, TealInternalError
+from pyteal.ir import (
+    Op,
+    TealBlock,
+    TealConditionalBlock,
+    TealMultiwayBlock,
+    TealOp,
+    TealSimpleBlock,
+)
 from pyteal.ir.ops import Mode
 from pyteal.stack_frame import NatalStackFrame
 from pyteal.types import TealType
 from pyteal.util import algod_with_assertion
 
+if TYPE_CHECKING:
+    from pyteal.compiler import CompileOptions
+
 ActionType = Expr | SubroutineFnWrapper | ABIReturnSubroutine
 
+# The strategies ASTBuilder.program_construction can use to dispatch ABI method calls:
+# * "cond": compare the first application argument to each method selector in turn.
+# * "match": push every method selector at once and jump to the matching method with a single
+#   match op. This requires at least version 8; earlier versions fall back to "cond".
+# * "binary_search": sort the method selectors at compile time and find the method with a
+#   balanced tree of b< comparisons. This requires at least version 4; earlier versions fall
+#   back to "cond".
+_DISPATCH_STRATEGIES: Final[tuple[str, ...]] = ("cond", "match", "binary_search")
+
+# match encodes its number of labels in a single byte
+_MAX_MATCH_TARGETS: Final[int] = 255
+
+# A method-frequency profile: either a mapping from method selector to call weight, or the path to a
+# JSON file containing such a mapping. See Router.compile for the accepted keys.
+MethodProfile = Mapping[str | bytes, float] | str | os.PathLike
+
+# The number of ops executed by each test of the Cond chain: push the first application argument
+# (or the number of arguments for bare calls), push the constant, ==, and bnz.
+_DISPATCH_OPS_PER_TEST: Final[int] = 4
+
+# Ranges of at most this many methods are searched by comparing the selector to each method in
+# turn, since splitting them further doesn't reduce the average number of ops executed.
+_BINARY_SEARCH_LEAF_SIZE: Final[int] = 3
+
 
 class CallConfig(IntFlag):
     """
@@ -136,6 +179,74 @@ class MethodConfig:
 MethodConfig.__module__ = "pyteal"
 
 
+# The OnComplete values an approval program can be called with, by the name of their field in
+# MethodConfig and BareCallActions, along with their numeric value.
+_APPROVAL_ON_COMPLETES: Final[dict[str, tuple[EnumInt, int]]] = {
+    "no_op": (OnComplete.NoOp, 0),
+    "opt_in": (OnComplete.OptIn, 1),
+    "close_out": (OnComplete.CloseOut, 2),
+    "update_application": (OnComplete.UpdateApplication, 4),
+    "delete_application": (OnComplete.DeleteApplication, 5),
+}
+
+
+def _call_configs(method_config: MethodConfig) -> dict[str, CallConfig]:
+    return {name: getattr(method_config, name) for name in _APPROVAL_ON_COMPLETES}
+
+
+def _on_completion_in(names: list[str]) -> Expr:
+    """Check if the OnCompletion of the current transaction is one of the named OnCompletes.
+
+    Several OnCompletes are checked at once by testing the bit of OnCompletion in a mask, which
+    requires program version 3 or higher.
+    """
+    if names == ["no_op"]:
+        return Not(Txn.on_completion())
+    if len(names) == 1:
+        return Txn.on_completion() == _APPROVAL_ON_COMPLETES[names[0]][0]
+    mask = sum(1 << _APPROVAL_ON_COMPLETES[name][1] for name in names)
+    return GetBit(Int(mask), Txn.on_completion())
+
+
+def _on_complete_guard(configs: dict[str, CallConfig]) -> Expr | int:
+    """Build a condition equivalent to `MethodConfig.approval_cond` for the given CallConfig of each
+    OnComplete, which reads the OnCompletion and ApplicationID of the transaction at most once.
+
+    Like `MethodConfig.approval_cond`, 1 is returned if every call is allowed and 0 if none is.
+    """
+    call = [name for name, config in configs.items() if config & CallConfig.CALL]
+    create = [name for name, config in configs.items() if config & CallConfig.CREATE]
+    if not call and not create:
+        return 0
+
+    def allowed(names: list[str]) -> Expr | int:
+        return (
+            1 if len(names) == len(_APPROVAL_ON_COMPLETES) else _on_completion_in(names)
+        )
+
+    if call == create:
+        return allowed(call)
+
+    on_call, on_create = allowed(call), allowed(create)
+    if not create:
+        return (
+            Txn.application_id()
+            if isinstance(on_call, int)
+            else And(Txn.application_id(), on_call)
+        )
+    if not call:
+        return (
+            Not(Txn.application_id())
+            if isinstance(on_create, int)
+            else And(Not(Txn.application_id()), on_create)
+        )
+    return If(
+        Txn.application_id(),
+        on_call if isinstance(on_call, Expr) else Int(on_call),
+        on_create if isinstance(on_create, Expr) else Int(on_create),
+    )
+
+
 @dataclass
 class OnCompleteAction:
     """
@@ -222,7 +333,14 @@ class BareCallActions:
     def is_empty(self) -> bool:
         return all([a.is_empty() for a in self.aslist()])
 
-    def approval_construction(self) -> Optional[Expr]:
+    def approval_construction(self, optimize_checks: bool = False) -> Optional[Expr]:
+        """Construct the part of the approval program which handles bare calls.
+
+        Args:
+            optimize_checks (optional): When `True`, a single bare call action is guarded by one
+                assertion on the OnCompletion and creation state of the call, and creation state
+                is checked with fewer ops. Defaults to `False`.
+        """
         oc_action_pair: list[tuple[EnumInt, OnCompleteAction]] = [
             (OnComplete.NoOp, self.no_op),
             (OnComplete.OptIn, self.opt_in),
@@ -233,6 +351,9 @@ class BareCallActions:
         if all(oca.is_empty() for _, oca in oc_action_pair):
             return None
 
+        if optimize_checks:
+            return self._optimized_approval_construction()
+
         conditions_n_branches: list[CondNode] = list()
         for oc, oca in oc_action_pair:
             if oca.is_empty():
@@ -263,6 +384,45 @@ class BareCallActions:
         cond.stack_frames = self.stack_frames
         return cond
 
+    def _optimized_approval_construction(self) -> Expr:
+        actions = {
+            name: oca
+            for name in _APPROVAL_ON_COMPLETES
+            if not (oca := cast(OnCompleteAction, getattr(self, name))).is_empty()
+        }
+
+        if len(actions) == 1:
+            ((name, oca),) = actions.items()
+            body = ASTBuilder.wrap_handler(False, cast(ActionType, oca.action))
+            guard = cast(Expr, _on_complete_guard({name: oca.call_config}))
+            action = Seq(Assert(guard), body)
+            oca.stack_frames.reframe(guard, action)
+            action.stack_frames = self.stack_frames
+            return action
+
+        conditions_n_branches: list[CondNode] = list()
+        for name, oca in actions.items():
+            wrapped_handler = ASTBuilder.wrap_handler(
+                False, cast(ActionType, oca.action)
+            )
+            match oca.call_config:
+                case CallConfig.ALL:
+                    cond_body = wrapped_handler
+                case CallConfig.CALL:
+                    cond_body = Seq(Assert(Txn.application_id()), wrapped_handler)
+                case CallConfig.CREATE:
+                    cond_body = Seq(Assert(Not(Txn.application_id())), wrapped_handler)
+                case _:
+                    raise TealInternalError(
+                        f"Unexpected CallConfig: {oca.call_config!r}"
+                    )
+            cn = CondNode(_on_completion_in([name]), cond_body)
+            cn.reframe_asts(oca.stack_frames)
+            conditions_n_branches.append(cn)
+        cond = Cond(*[[n.condition, n.branch] for n in conditions_n_branches])
+        cond.stack_frames = self.stack_frames
+        return cond
+
     def get_method_config(self) -> MethodConfig:
         return MethodConfig(
             no_op=self.no_op.call_config,
@@ -329,11 +489,27 @@ class CondWithMethod:
     method_sig: str
     condition: Expr | int
     method: ABIReturnSubroutine
+    method_config: Optional[MethodConfig] = None
+
+    def to_cond_node(
+        self,
+        use_frame_pt: bool = False,
+        guard: Expr | int | None = None,
+        lazy_args: bool = False,
+    ) -> CondNode:
+        """Convert this method into a `CondNode`.
 
-    def to_cond_node(self, use_frame_pt: bool = False) -> CondNode:
+        Args:
+            use_frame_pt (optional): Whether the method handler should use frame pointers.
+            guard (optional): The condition to assert before calling the method, in place of
+                `condition`. 1 skips the assertion, e.g. when it has already been checked.
+            lazy_args (optional): Whether the method arguments should be decoded where they are
+                passed to the handler, rather than stored first.
+        """
         walk_in_cond = Txn.application_args[0] == MethodSignature(self.method_sig)
 
-        if not (isinstance(self.condition, Expr) or self.condition == 1):
+        condition = self.condition if guard is None else guard
+        if not (isinstance(condition, Expr) or condition == 1):
             raise TealInputError("Invalid condition input for CondWithMethod")
 
         user_frames_holder: list[NatalStackFrame] = []
@@ -342,14 +518,15 @@ class CondWithMethod:
             self.method,
             use_frame_pt=use_frame_pt,
             handler_stack_frames_container=user_frames_holder,
+            lazy_args=lazy_args,
         )
         assert (
             ufhlen := len(user_frames_holder)
         ) == 1, f"Unexpected length for user_frames_holder: {ufhlen}"
         user_frames: NatalStackFrame = user_frames_holder[0]
 
-        if isinstance(self.condition, Expr):
-            res = Seq(Assert(self.condition), res)
+        if isinstance(condition, Expr):
+            res = Seq(Assert(condition), res)
 
         cn = CondNode(walk_in_cond, res)
         cn.reframe_asts(user_frames)
@@ -359,6 +536,213 @@ class CondWithMethod:
 CondWithMethod.__module__ = "pyteal"
 
 
+def _selector(method_sig: str) -> bytes:
+    return sdk_abi.Method.from_signature(method_sig).get_selector()
+
+
+def _dispatch_for_version(dispatch: str, version: int) -> str:
+    """Get the dispatch strategy to use in place of dispatch when compiling to version."""
+    if dispatch not in _DISPATCH_STRATEGIES:
+        raise TealInputError(
+            f"Unknown dispatch strategy {dispatch}, expected one of {_DISPATCH_STRATEGIES}"
+        )
+    if dispatch == "match" and version < Op.match.min_version:
+        return "cond"
+    if dispatch == "binary_search" and version < Op.b_lt.min_version:
+        return "cond"
+    return dispatch
+
+
+def _method_weights(profile: MethodProfile) -> dict[bytes, float]:
+    """Normalize a method-frequency profile to a mapping from selector to weight.
+
+    Keys may be method signatures, 4-byte selectors as bytes or hex strings (with or without a
+    "0x" prefix), or the empty string or bytes for bare calls. Weights of keys which refer to the
+    same selector are added together.
+    """
+    if isinstance(profile, (str, os.PathLike)):
+        try:
+            with open(profile) as f:
+                profile = json.load(f)
+        except (OSError, ValueError) as e:
+            raise TealInputError(f"Could not read method profile {profile}: {e}") from e
+        if not isinstance(profile, dict):
+            raise TealInputError("A method profile file must contain a JSON object")
+
+    weights: dict[bytes, float] = dict()
+    for key, weight in profile.items():
+        if isinstance(key, (bytes, bytearray)):
+            selector = bytes(key)
+        elif isinstance(key, str) and "(" in key:
+            selector = _selector(key)
+        elif isinstance(key, str):
+            try:
+                selector = bytes.fromhex(key.removeprefix("0x"))
+            except ValueError:
+                raise TealInputError(f"Invalid method profile key {key!r}")
+        else:
+            raise TealInputError(f"Invalid method profile key {key!r}")
+
+        if len(selector) not in (0, 4):
+            raise TealInputError(
+                f"Method profile key {key!r} is not a method selector or signature"
+            )
+        if (
+            isinstance(weight, bool)
+            or not isinstance(weight, (int, float))
+            or not weight >= 0
+        ):
+            raise TealInputError(
+                f"Method profile weight {weight!r} for {key!r} must be a non-negative number"
+            )
+        weights[selector] = weights.get(selector, 0) + weight
+
+    return weights
+
+
+class _MatchDispatch(Expr):
+    """Dispatches ABI method calls by matching the method selector in the first application
+    argument against every method's selector with a single match op.
+
+    The bare call conditions are tested first, exactly as in the Cond chain. If neither a bare call
+    condition holds nor a selector matches, the program fails.
+    """
+
+    def __init__(self, bare_calls: list[CondNode], methods: list[tuple[str, CondNode]]):
+        super().__init__()
+        if not 0 < len(methods) <= _MAX_MATCH_TARGETS:
+            raise TealInputError(
+                f"match dispatch requires between 1 and {_MAX_MATCH_TARGETS} methods, got {len(methods)}"
+            )
+        self.bare_calls = bare_calls
+        self.methods = methods
+        self.selector = Txn.application_args[0]
+
+    def __teal__(self, options: "CompileOptions"):
+        end = TealSimpleBlock([])
+
+        selectors = ["0x" + _selector(sig).hex() for sig, _ in self.methods]
+        signatures = ['"{}"'.format(sig) for sig, _ in self.methods]
+        pushBlock = TealSimpleBlock(
+            [
+                TealOp(self, Op.comment, " ".join(signatures)),
+                TealOp(self, Op.pushbytess, *selectors),
+            ]
+        )
+        selectorStart, selectorEnd = self.selector.__teal__(options)
+        pushBlock.setNextBlock(selectorStart)
+
+        matchBlock = TealMultiwayBlock([], Op.match, root_expr=self)
+        selectorEnd.setNextBlock(matchBlock)
+        targets: list[TealBlock] = []
+        for _, node in self.methods:
+            branchStart, branchEnd = node.branch.__teal__(options)
+            branchEnd.setNextBlock(end)
+            targets.append(branchStart)
+        matchBlock.setTargets(targets)
+        matchBlock.setDefaultBlock(TealSimpleBlock([TealOp(self, Op.err)]))
+
+        start: TealBlock = pushBlock
+        for node in reversed(self.bare_calls):
+            condStart, condEnd = node.condition.__teal__(options)
+            branchStart, branchEnd = node.branch.__teal__(options)
+
+            branchBlock = TealConditionalBlock([], root_expr=node.condition)
+            branchBlock.setTrueBlock(branchStart)
+            branchBlock.setFalseBlock(start)
+            condEnd.setNextBlock(branchBlock)
+            branchEnd.setNextBlock(end)
+            start = condStart
+
+        return start, end
+
+    def __str__(self):
+        ret_str = "(MatchDispatch"
+        for node in self.bare_calls:
+            ret_str += " [" + str(node.condition) + ", " + str(node.branch) + "]"
+        for sig, node in self.methods:
+            ret_str += ' ["' + sig + '", ' + str(node.branch) + "]"
+        ret_str += ")"
+        return ret_str
+
+    def type_of(self):
+        return TealType.none
+
+    def has_return(self):
+        return all(node.branch.has_return() for node in self.bare_calls) and all(
+            node.branch.has_return() for _, node in self.methods
+        )
+
+
+def _binary_search_dispatch(
+    bare_calls: list[CondNode], methods: list[tuple[str, CondNode]]
+) -> Expr:
+    """Dispatch ABI method calls with a binary search over the sorted method selectors.
+
+    The first application argument is stored to a scratch slot once. Each inner node of the search
+    tree compares it to a selector with b<, and each leaf compares it for equality to the
+    selectors of at most `_BINARY_SEARCH_LEAF_SIZE` methods, failing if none match. The bare call
+    conditions are tested first, exactly as in the Cond chain.
+    """
+    # as in the Cond chain, only the first method with a given selector can be called
+    cases: dict[bytes, tuple[str, CondNode]] = dict()
+    for sig, node in methods:
+        cases.setdefault(_selector(sig), (sig, node))
+    selectors = sorted(cases)
+
+    selector = ScratchVar(TealType.bytes)
+
+    def search(lo: int, hi: int) -> Expr:
+        if hi - lo <= _BINARY_SEARCH_LEAF_SIZE:
+            conditions_n_branches: list[list[Expr]] = []
+            for key in selectors[lo:hi]:
+                sig, node = cases[key]
+                cond = selector.load() == MethodSignature(sig)
+                node.condition.stack_frames.reframe(cond)
+                conditions_n_branches.append([cond, node.branch])
+            return Cond(*conditions_n_branches)
+
+        mid = (lo + hi) // 2
+        return If(
+            BytesLt(selector.load(), Bytes(selectors[mid])),
+            search(lo, mid),
+            search(mid, hi),
+        )
+
+    program: Expr = Seq(
+        selector.store(Txn.application_args[0]), search(0, len(selectors))
+    )
+    for node in reversed(bare_calls):
+        program = If(node.condition, node.branch, program)
+    return program
+
+
+class _DecodedArg(AbstractVar):
+    """An ABI method argument's storage which holds the expression that decodes it, rather than its
+    value, so that the argument is decoded from `Txn.application_args` each time it's loaded.
+    """
+
+    def __init__(self, stack_type: TealType) -> None:
+        self.stack_type = stack_type
+        self.decoded: Optional[Expr] = None
+
+    def store(self, value: Expr) -> Expr:
+        if self.decoded is not None:
+            raise TealInternalError("A lazily decoded method argument cannot be stored")
+        self.decoded = value
+        return Seq()
+
+    def load(self) -> Expr:
+        if self.decoded is None:
+            raise TealInternalError(
+                "A lazily decoded method argument has not been decoded"
+            )
+        return self.decoded
+
+    def storage_type(self) -> TealType:
+        return self.stack_type
+
+
 @dataclass
 class ASTBuilder:
     def __init__(self):
@@ -427,23 +811,19 @@ class ASTBuilder:
         txn_arg_vals: list[abi.Transaction],
         subroutine: ABIReturnSubroutine,
         use_frame_pt: bool = False,
+        lazy_args: bool = False,
     ) -> tuple[list[Expr], list[abi.BaseType], Optional[Proto]]:
         """
         Assumption: arg_vals = app_args_vals union with txn_arg_vals
+
+        If lazy_args is True, app args are not decoded into storage up front. Instead, each one
+        decodes its Txn.application_args entry wherever it's loaded, e.g. when passed to the handler.
         """
 
         # if subroutine has ABI output, then local variables start from 1
         # otherwise local variables start from 0
         index_start_from = 0 if subroutine.output_kwarg_info is None else 1
 
-        # prepare the local stack type list for local variable allocation
-        local_types: list[TealType] = [i._stored_value.storage_type() for i in arg_vals]
-
-        if subroutine.output_kwarg_info:
-            local_types = [
-                subroutine.output_kwarg_info.abi_type.storage_type()
-            ] + local_types
-
         # assign to a var here since we modify app_arg_vals later
         tuplify = len(app_arg_vals) > METHOD_ARG_NUM_CUTOFF
 
@@ -457,22 +837,49 @@ class ASTBuilder:
             ]
             app_arg_vals = app_arg_vals[: METHOD_ARG_NUM_CUTOFF - 1]
             app_args_tupled = abi.TupleTypeSpec(*last_arg_specs_grouped).new_instance()
-            local_types.append(app_args_tupled._stored_value.storage_type())
             app_arg_vals.append(app_args_tupled)
 
+        # the values which need local storage, i.e. every arg and the tuple'd app args
+        stored_vals: list[abi.BaseType] = list(arg_vals)
+        if tuplify:
+            stored_vals.append(app_arg_vals[-1])
+        if lazy_args:
+            stored_vals = [
+                val for val in stored_vals if all(val is not a for a in app_arg_vals)
+            ]
+
+        # prepare the local stack type list for local variable allocation
+        local_types: list[TealType] = [
+            i._stored_value.storage_type() for i in stored_vals
+        ]
+
+        if subroutine.output_kwarg_info:
+            local_types = [
+                subroutine.output_kwarg_info.abi_type.storage_type()
+            ] + local_types
+
         proto: Optional[Proto] = None
         if use_frame_pt:
             proto = Proto(0, 0, mem_layout=ProtoStackLayout([], local_types, 0))
-            for i, arg_val in enumerate(arg_vals):
-                arg_val._stored_value = FrameVar(proto, i + index_start_from)
-            if tuplify:
-                app_arg_vals[-1]._stored_value = FrameVar(proto, len(local_types) - 1)
+            for i, stored_val in enumerate(stored_vals):
+                stored_val._stored_value = FrameVar(proto, i + index_start_from)
 
         # decode app args
-        decode_instructions: list[Expr] = [
+        decode_instructions: list[Expr] = []
+        for idx, app_arg in enumerate(app_arg_vals):
+            if not lazy_args:
+                decode_instructions.append(
+                    app_arg.decode(Txn.application_args[idx + 1])
+                )
+                continue
+
+            decoded_arg = _DecodedArg(app_arg._stored_value.storage_type())
+            app_arg._stored_value = decoded_arg
             app_arg.decode(Txn.application_args[idx + 1])
-            for idx, app_arg in enumerate(app_arg_vals)
-        ]
+            if decoded_arg.decoded is None:
+                raise TealInternalError(
+                    f"Cannot lazily decode method argument of type {app_arg.type_spec()}"
+                )
 
         # "decode" transaction types by setting the relative index
         if len(txn_arg_vals) > 0:
@@ -528,6 +935,7 @@ class ASTBuilder:
         wrap_to_name: str | None = None,
         use_frame_pt: bool = False,
         handler_stack_frames_container: list[NatalStackFrame] | None = None,
+        lazy_args: bool = False,
     ) -> Expr:
         """This is a helper function that handles transaction arguments passing in bare-app-call/abi-method handlers.
         If `is_method_call` is True, then it can only be `ABIReturnSubroutine`,
@@ -542,6 +950,8 @@ class ASTBuilder:
             use_frame_pt: a boolean value that specify if router is compiled to frame pointer based code.
             handler_stack_frames_container: an optional list that is filled with NatalStackFrame's
                 used in source mapping.
+            lazy_args: a boolean value that specify if ABI method arguments are decoded from
+                Txn.application_args where they're passed to the handler, instead of being stored first.
         Returns:
             Expr:
                 - for bare-appcall it returns an expression that the handler takes no txn arg and Approve
@@ -619,9 +1029,9 @@ class ASTBuilder:
             )
 
         ret_expr, subdef = (
-            ASTBuilder.__de_abify_subroutine_frame_pointers(handler)
+            ASTBuilder.__de_abify_subroutine_frame_pointers(handler, lazy_args)
             if use_frame_pt
-            else ASTBuilder.__de_abify_subroutine_vanilla(handler)
+            else ASTBuilder.__de_abify_subroutine_vanilla(handler, lazy_args)
         )
         scavenge(subdef)
         return ret_expr
@@ -629,6 +1039,7 @@ class ASTBuilder:
     @staticmethod
     def __de_abify_subroutine_vanilla(
         handler: ActionType,
+        lazy_args: bool = False,
     ) -> tuple[Expr, SubroutineDefinition]:
         """This private function retains the previous (pre-frame-pointer) logic of handling ABIReturnSubroutine method's IO.
 
@@ -675,7 +1086,7 @@ class ASTBuilder:
             arg_vals,
             _,
         ) = ASTBuilder.__decode_constructions_and_args(
-            arg_vals, app_arg_vals, txn_arg_vals, handler
+            arg_vals, app_arg_vals, txn_arg_vals, handler, lazy_args=lazy_args
         )
 
         ret_expr: Expr
@@ -706,6 +1117,7 @@ class ASTBuilder:
     @staticmethod
     def __de_abify_subroutine_frame_pointers(
         handler: ActionType,
+        lazy_args: bool = False,
     ) -> tuple[Expr, SubroutineDefinition]:
         """This private function implements the frame-pointer-based logic of handling ABIReturnSubroutine method's IO.
 
@@ -771,6 +1183,7 @@ class ASTBuilder:
             txn_arg_vals,
             handler,
             use_frame_pt=True,
+            lazy_args=lazy_args,
         )
 
         subroutine_caster = Subroutine(TealType.none, f"{handler.name()}_caster")
@@ -812,18 +1225,142 @@ class ASTBuilder:
         )
 
     def add_method_to_ast(
-        self, method_signature: str, cond: Expr | int, handler: ABIReturnSubroutine
+        self,
+        method_signature: str,
+        cond: Expr | int,
+        handler: ABIReturnSubroutine,
+        method_config: Optional[MethodConfig] = None,
     ) -> None:
         if isinstance(cond, int) and cond == 0:
             return
-        self.methods_with_conds.append(CondWithMethod(method_signature, cond, handler))
+        self.methods_with_conds.append(
+            CondWithMethod(method_signature, cond, handler, method_config)
+        )
+
+    def ordered_methods(
+        self, method_weights: Optional[dict[bytes, float]] = None
+    ) -> list[CondWithMethod]:
+        """Get the methods in the order they are tested by the Cond chain.
+
+        Without weights, methods are tested in the order they were registered. Otherwise the
+        methods with the highest weight are tested first, and methods with equal weights (including
+        methods missing from the weights, which weigh 0) keep the order they were registered in.
+        """
+        if method_weights is None:
+            return list(self.methods_with_conds)
+        return sorted(
+            self.methods_with_conds,
+            key=lambda m: -method_weights.get(_selector(m.method_sig), 0),
+        )
 
-    def program_construction(self, use_frame_pt: bool = False) -> Expr:
-        conditions_n_branches: list[CondNode] = self.bare_calls + [
-            method_with_cond.to_cond_node(use_frame_pt=use_frame_pt)
-            for method_with_cond in self.methods_with_conds
+    def dispatch_cost(self, method_weights: dict[bytes, float]) -> "DispatchCost":
+        """Estimate the number of ops the Cond chain executes to dispatch a call, on average over
+        the calls described by method_weights.
+
+        Bare calls are always tested first, since testing a method reads the first application
+        argument, which bare calls don't have. Weights of selectors which aren't registered are
+        ignored.
+        """
+        bare_weight = method_weights.get(b"", 0) if self.bare_calls else 0
+
+        def expected_ops(methods: list[CondWithMethod]) -> float:
+            total = bare_weight
+            ops = bare_weight * _DISPATCH_OPS_PER_TEST
+            for i, method in enumerate(methods, start=len(self.bare_calls) + 1):
+                weight = method_weights.get(_selector(method.method_sig), 0)
+                total += weight
+                ops += weight * i * _DISPATCH_OPS_PER_TEST
+            return ops / total if total > 0 else 0.0
+
+        return DispatchCost(
+            registered=expected_ops(self.ordered_methods()),
+            profiled=expected_ops(self.ordered_methods(method_weights)),
+        )
+
+    def program_construction(
+        self,
+        use_frame_pt: bool = False,
+        dispatch: str = "cond",
+        method_weights: Optional[dict[bytes, float]] = None,
+        optimize_checks: bool = False,
+        lazy_args: bool = False,
+    ) -> Expr:
+        """Construct the approval program AST from the bare calls and methods.
+
+        Args:
+            use_frame_pt (optional): Whether method handlers should use frame pointers.
+            dispatch (optional): The strategy used to dispatch method calls, see
+                `_DISPATCH_STRATEGIES`. It's the caller's responsibility to only request "match"
+                or "binary_search" when compiling to a version which supports it. Defaults to
+                "cond".
+            method_weights (optional): A mapping from method selector to call weight, which orders
+                the methods as described in `ordered_methods`.
+            optimize_checks (optional): When `True`, the OnCompletion and creation state of a method
+                call are checked with a guard which reads each field at most once. If every method
+                has the same `MethodConfig`, the guard is checked once before the method is
+                dispatched, rather than by each method. Defaults to `False`.
+            lazy_args (optional): When `True`, method arguments are decoded from
+                `Txn.application_args` where they're passed to their handler, rather than stored
+                first. Defaults to `False`.
+        """
+        if dispatch not in _DISPATCH_STRATEGIES:
+            raise TealInputError(
+                f"Unknown dispatch strategy {dispatch}, expected one of {_DISPATCH_STRATEGIES}"
+            )
+
+        methods_with_conds = self.ordered_methods(method_weights)
+
+        guards: list[Expr | int | None] = [None] * len(methods_with_conds)
+        hoisted_guard: Expr | int = 1
+        if optimize_checks:
+            configs = {m.method_config for m in methods_with_conds}
+            if len(configs) == 1 and None not in configs:
+                hoisted_guard = _on_complete_guard(
+                    _call_configs(cast(MethodConfig, configs.pop()))
+                )
+                guards = [1] * len(methods_with_conds)
+            else:
+                guards = [
+                    _on_complete_guard(_call_configs(m.method_config))
+                    if m.method_config is not None
+                    else None
+                    for m in methods_with_conds
+                ]
+
+        method_nodes: list[CondNode] = [
+            method_with_cond.to_cond_node(
+                use_frame_pt=use_frame_pt, guard=guard, lazy_args=lazy_args
+            )
+            for method_with_cond, guard in zip(methods_with_conds, guards)
+        ]
+
+        methods = [
+            (method_with_cond.method_sig, node)
+            for method_with_cond, node in zip(methods_with_conds, method_nodes)
         ]
 
+        if isinstance(hoisted_guard, Expr):
+            # the guard is only checked for method calls, so bare calls are tested first
+            program: Expr
+            if dispatch == "match" and len(methods) <= _MAX_MATCH_TARGETS:
+                program = _MatchDispatch([], methods)
+            elif (
+                dispatch == "binary_search" and len(methods) > _BINARY_SEARCH_LEAF_SIZE
+            ):
+                program = _binary_search_dispatch([], methods)
+            else:
+                program = Cond(*[[n.condition, n.branch] for n in method_nodes])
+            program = Seq(Assert(hoisted_guard), program)
+            for node in reversed(self.bare_calls):
+                program = If(node.condition, node.branch, program)
+            return program
+
+        if dispatch == "match" and 0 < len(methods) <= _MAX_MATCH_TARGETS:
+            return _MatchDispatch(self.bare_calls, methods)
+        if dispatch == "binary_search" and len(methods) > _BINARY_SEARCH_LEAF_SIZE:
+            return _binary_search_dispatch(self.bare_calls, methods)
+
+        conditions_n_branches: list[CondNode] = self.bare_calls + method_nodes
         if not conditions_n_branches:
             return Reject()
         return Cond(*[[n.condition, n.branch] for n in conditions_n_branches])
@@ -832,6 +1369,30 @@ class ASTBuilder:
 ASTBuilder.__module__ = "pyteal"
 
 
+@dataclass(frozen=True)
+class DispatchCost:
+    """The expected number of ops that a router's Cond chain executes to dispatch a call, according
+    to a method-frequency profile.
+
+    Args:
+        registered: The expected number of ops when methods are tested in the order they were
+            registered.
+        profiled: The expected number of ops when methods are tested in order of their weight in
+            the profile.
+    """
+
+    registered: float
+    profiled: float
+
+    @property
+    def saving(self) -> float:
+        """The expected number of ops saved per call by ordering methods by the profile."""
+        return self.registered - self.profiled
+
+
+DispatchCost.__module__ = "pyteal"
+
+
 @dataclass(frozen=True)
 class RouterResults:
     approval_teal: str
@@ -839,6 +1400,7 @@ class RouterResults:
     abi_contract: sdk_abi.Contract
     approval_sourcemap: Optional[PyTealSourceMap] = None
     clear_sourcemap: Optional[PyTealSourceMap] = None
+    dispatch_cost: Optional[DispatchCost] = None
 
 
 RouterResults.__module__ = "pyteal"
@@ -856,6 +1418,7 @@ class _RouterBundle:
     approval_sourcemapper: Optional[_PyTealSourceMapper] = None
     clear_sourcemapper: Optional[_PyTealSourceMapper] = None
     input: Optional["_RouterCompileInput"] = None
+    dispatch_cost: Optional[DispatchCost] = None
 
     def get_results(self) -> RouterResults:
         approval_sourcemap: PyTealSourceMap | None = None
@@ -873,6 +1436,7 @@ class _RouterBundle:
             abi_contract=self.abi_contract,
             approval_sourcemap=approval_sourcemap,
             clear_sourcemap=clear_sourcemap,
+            dispatch_cost=self.dispatch_cost,
         )
 
 
@@ -889,6 +1453,8 @@ class _RouterCompileInput:
     annotate_teal: bool = False
     annotate_teal_headers: bool = False
     annotate_teal_concise: bool = True
+    dispatch: str = "cond"
+    method_profile: Optional[MethodProfile] = None
 
     def __post_init__(self):
         # The following params are non-sensical when truthy without sourcemaps.
@@ -906,8 +1472,8 @@ class _RouterCompileInput:
                 "In order annotate generated teal source, must set with_sourcemap True"
             )
 
-        if self.pcs_in_sourcemaps:
-            # bootstrap an algod_client if not provided, and in either case, run a healthcheck
+        if self.pcs_in_sourcemaps and self.algod_client is not None:
+            # run a healthcheck on the provided algod_client
             try:
                 self.algod_client = algod_with_assertion(self.algod_client)
             except AlgodClientError as ace:
@@ -915,6 +1481,10 @@ class _RouterCompileInput:
                     "algod_with_assertion has failed: are you sure there is an available node such as Sandbox?"
                 ) from ace
 
+        if self.method_profile is not None:
+            # read a profile file only once
+            self.method_profile = _method_weights(self.method_profile)
+
     def get_compilation(self, program: Expr) -> Compilation:
         return Compilation(
             ast=program,
@@ -1037,7 +1607,7 @@ class Router:
 
         method_approval_cond = method_config.approval_cond()
         self.approval_ast.add_method_to_ast(
-            method_signature, method_approval_cond, method_call
+            method_signature, method_approval_cond, method_call, method_config
         )
         self.method_configs[method_signature] = method_config
         return method_call
@@ -1140,6 +1710,8 @@ class Router:
         *,
         version: int = DEFAULT_TEAL_VERSION,
         optimize: OptimizeOptions | None = None,
+        dispatch: str = "cond",
+        method_profile: Optional[MethodProfile] = None,
     ) -> tuple[Expr, Expr, sdk_abi.Contract]:
         """
         Constructs ASTs for approval and clear-state programs from the registered methods and bare
@@ -1149,6 +1721,14 @@ class Router:
         Note that if no methods or bare app call actions have been registered to either the approval
         or clear state programs, then that program will reject all transactions.
 
+        Args:
+            version (optional): The TEAL version the programs will be compiled to.
+            optimize (optional): The `OptimizeOptions` the programs will be compiled with.
+            dispatch (optional): The strategy used to dispatch method calls, see `Router.compile`.
+                Defaults to "cond".
+            method_profile (optional): A method-frequency profile used to order the methods, see
+                `Router.compile`.
+
         Returns:
             A tuple of three objects.
 
@@ -1156,8 +1736,13 @@ class Router:
             * clear_state_program: an AST for clear-state program
             * contract: a Python SDK Contract object to allow clients to make off-chain calls
         """
+        optimize = optimize or OptimizeOptions()
+        optimize_checks = optimize.optimize_on_complete_checks(version)
+
         if not self.bare_call_actions.is_empty():
-            bare_call_approval = self.bare_call_actions.approval_construction()
+            bare_call_approval = self.bare_call_actions.approval_construction(
+                optimize_checks=optimize_checks
+            )
             if bare_call_approval:
                 self.approval_ast.bare_calls = [
                     CondNode(
@@ -1168,10 +1753,19 @@ class Router:
                 bare_call_approval.stack_frames.reframe(cond)
                 act.stack_frames = bare_call_approval.stack_frames
 
-        optimize = optimize or OptimizeOptions()
+        method_weights = (
+            _method_weights(method_profile) if method_profile is not None else None
+        )
+
         use_frame_pt = optimize.use_frame_pointers(version)
         return (
-            self.approval_ast.program_construction(use_frame_pt=use_frame_pt),
+            self.approval_ast.program_construction(
+                use_frame_pt=use_frame_pt,
+                dispatch=_dispatch_for_version(dispatch, version),
+                method_weights=method_weights,
+                optimize_checks=optimize_checks,
+                lazy_args=optimize.lazy_method_args(version),
+            ),
             self.clear_state,
             self.contract_construct(),
         )
@@ -1191,6 +1785,8 @@ class Router:
         version: int = DEFAULT_TEAL_VERSION,
         assemble_constants: bool = False,
         optimize: Optional[OptimizeOptions] = None,
+        dispatch: str = "cond",
+        method_profile: Optional[MethodProfile] = None,
     ) -> tuple[str, str, sdk_abi.Contract]:
         """
         Constructs and compiles approval and clear-state programs from the registered methods and
@@ -1215,6 +1811,8 @@ class Router:
             version=version,
             assemble_constants=assemble_constants,
             optimize=optimize,
+            dispatch=dispatch,
+            method_profile=method_profile,
         )
         cpb = self._build_impl(input)
 
@@ -1234,6 +1832,8 @@ class Router:
         annotate_teal: bool = False,
         annotate_teal_headers: bool = False,
         annotate_teal_concise: bool = True,
+        dispatch: str = "cond",
+        method_profile: Optional[MethodProfile] = None,
     ) -> RouterResults:
         """
         Constructs and compiles approval and clear-state programs from the registered methods and
@@ -1259,12 +1859,10 @@ class Router:
                 generated approval and clear TEAL program back to the original PyTeal source code.
                 Defaults to `False`.
             pcs_in_sourcemap (optional): When `True`, the compiler will include the program counter in
-                relevant sourcemap artifacts. This requires an `AlgodClient` (see next param).
-                Defaults to `False`.
+                relevant sourcemap artifacts. Defaults to `False`.
             algod_client (optional): An `AlgodClient` to use to fetch program counters. Defaults to `None`.
                 When `pcs_in_sourcemap` is `True` and `algod_client` is not provided, the compiler will
-                assume that an Algorand Sandbox algod client is running on the default port (4001) and -if
-                this is not the case- will raise an exception.
+                assemble the programs itself with :any:`assembleTeal` to find the program counters.
             annotate_teal (optional): When `True`, the compiler will produce a TEAL program with comments
                 that describe the PyTeal source code that generated each line of the program.
                 Defaults to `False`.
@@ -1272,7 +1870,23 @@ class Router:
                 line with column names will be added at the top of the annotated teal. Defaults to `False`.
             annotate_teal_concise (optional): When `True` along with `annotate_teal` being `True`, the compiler
                 will provide fewer columns in the annotated teal. Defaults to `True`.
-
+            dispatch (optional): The strategy used to dispatch ABI method calls in the approval program.
+                With "cond", the first application argument is compared to each method selector in turn,
+                so the cost of a call grows with the number of methods registered before it. With
+                "match", every selector is pushed at once and a single `match` op jumps to the method,
+                so the cost of a call doesn't depend on the method. With "binary_search", the method
+                is found with a binary search over the sorted selectors, so the cost of a call grows
+                with the logarithm of the number of methods. "match" requires version 8 or higher
+                and "binary_search" requires version 4 or higher; for earlier versions "cond" is used
+                instead. Defaults to "cond".
+            method_profile (optional): A method-frequency profile, used to test the most frequently
+                called methods first. Either a mapping from method to weight, such as the number of
+                calls, or the path to a JSON file containing such a mapping. Methods may be given by
+                signature, or by 4-byte selector as bytes or hex strings; the empty string stands for
+                bare calls. Methods with equal weights, or missing from the profile, keep the order
+                they were registered in. Bare calls are always tested first. With "cond" dispatch,
+                `RouterResults.dispatch_cost` reports the expected number of dispatch ops per call
+                with and without the profile. Defaults to None.
 
         Returns:
             A RouterResults containing the following:
@@ -1281,6 +1895,8 @@ class Router:
             * abi_contract (abi.Contract): a Python SDK Contract object to allow clients to make off-chain calls
             * approval_sourcemap (PyTealSourceMap | None): source map results for approval program
             * clear_sourcemap (PyTealSourceMap | None): source map results for clear-state program
+            * dispatch_cost (DispatchCost | None): the expected cost of dispatching a call, when a
+              method_profile is given
         """
         approval_filename = approval_filename or f"{self.name}_approval.teal"
         clear_filename = clear_filename or f"{self.name}_clear.teal"
@@ -1297,14 +1913,27 @@ class Router:
             annotate_teal=annotate_teal,
             annotate_teal_headers=annotate_teal_headers,
             annotate_teal_concise=annotate_teal_concise,
+            dispatch=dispatch,
+            method_profile=method_profile,
         )
         return self._build_impl(input).get_results()
 
     def _build_impl(self, input: _RouterCompileInput) -> _RouterBundle:
         with self._cleaning_context():
             ap, csp, contract = self._build_program(
-                version=input.version, optimize=input.optimize
+                version=input.version,
+                optimize=input.optimize,
+                dispatch=input.dispatch,
+                method_profile=input.method_profile,
             )
+            dispatch_cost: Optional[DispatchCost] = None
+            if (
+                input.method_profile is not None
+                and _dispatch_for_version(input.dispatch, input.version) == "cond"
+            ):
+                dispatch_cost = self.approval_ast.dispatch_cost(
+                    _method_weights(input.method_profile)
+                )
 
             abundle = input.get_compilation(ap)._compile_impl(
                 with_sourcemap=input.with_sourcemaps,
@@ -1340,6 +1969,7 @@ class Router:
             approval_sourcemapper=abundle.sourcemapper,
             clear_sourcemapper=csbundle.sourcemapper,
             input=input,
+            dispatch_cost=dispatch_cost,
         )
 
 
@@ -1,11 +1,14 @@
+import itertools
+import json
 import pytest
+import re
 import secrets
 import typing
 
 import algosdk.abi as sdk_abi
 
 import pyteal as pt
-from pyteal.ast.router import ASTBuilder
+from pyteal.ast.router import ASTBuilder, _on_complete_guard
 
 
 options = pt.CompileOptions(version=5)
@@ -1039,3 +1042,505 @@ def test_router_compile_program_idempotence():
         approval2 == approval1
     ), f"""{approval1=}
 {approval2=}"""
+
+
+def without_slots(teal: str) -> str:
+    # scratch slots aren't numbered consistently across compilations
+    return re.sub(r"^(load|store) \d+$", r"\1", teal, flags=re.MULTILINE)
+
+
+def dispatch_router() -> tuple[pt.Router, list[pt.ABIReturnSubroutine]]:
+    router = pt.Router(
+        "dispatcher",
+        pt.BareCallActions(no_op=pt.OnCompleteAction.create_only(pt.Approve())),
+    )
+    methods = [add, sub, mul, div, mod]
+    for method in methods:
+        router.add_method_handler(method)
+    return router, methods
+
+
+def test_router_dispatch_invalid():
+    router, _ = dispatch_router()
+    with pytest.raises(pt.TealInputError):
+        router.compile(version=8, dispatch="jump")
+
+    with pytest.raises(pt.TealInputError):
+        ASTBuilder().program_construction(dispatch="jump")
+
+
+def test_router_dispatch_match_falls_back_before_v8():
+    router, _ = dispatch_router()
+
+    for version in range(6, 8):
+        matched = router.compile(version=version, dispatch="match")
+        chained = router.compile(version=version, dispatch="cond")
+        assert without_slots(matched.approval_teal) == without_slots(
+            chained.approval_teal
+        )
+        assert "match" not in matched.approval_teal.split()
+
+
+@pytest.mark.parametrize("assemble_constants", [False, True])
+def test_router_dispatch_match(assemble_constants: bool):
+    router, methods = dispatch_router()
+    matched = router.compile(
+        version=8, dispatch="match", assemble_constants=assemble_constants
+    )
+    chained = router.compile(
+        version=8, dispatch="cond", assemble_constants=assemble_constants
+    )
+    assert matched.clear_teal == chained.clear_teal
+    assert matched.abi_contract.dictify() == chained.abi_contract.dictify()
+
+    lines = matched.approval_teal.splitlines()
+    selectors = ["0x" + m.method_spec().get_selector().hex() for m in methods]
+    signatures = ['"{}"'.format(m.method_signature()) for m in methods]
+    push = "pushbytess {}".format(" ".join(selectors))
+    assert push in lines
+    assert lines[lines.index(push) - 1] == "// {}".format(" ".join(signatures))
+    match = lines[lines.index(push) + 2]
+    assert match.startswith("match ") and len(match.split()) == len(methods) + 1
+    assert lines[lines.index(push) + 3] == "err"
+
+    matchProgram = pt.AVMInterpreter(matched.approval_teal)
+    condProgram = pt.AVMInterpreter(chained.approval_teal)
+
+    def app_call(*args: bytes, **fields) -> pt.MockTransaction:
+        return pt.MockTransaction(
+            {"ApplicationID": 1, "ApplicationArgs": list(args), **fields}
+        )
+
+    calls = [
+        app_call(
+            m.method_spec().get_selector(),
+            (7).to_bytes(8, "big"),
+            (3).to_bytes(8, "big"),
+        )
+        for m in methods
+    ]
+    for i, call in enumerate(calls):
+        matchResult = matchProgram.run(call)
+        condResult = condProgram.run(call)
+        assert matchResult.approved and condResult.approved
+        assert matchResult.logs == condResult.logs
+        if i == 0:
+            assert matchResult.cost <= condResult.cost
+        else:
+            assert matchResult.cost < condResult.cost
+
+    for call in [
+        app_call(b"\x00\x01\x02\x03"),
+        app_call(),
+        app_call(ApplicationID=0),
+        app_call(methods[0].method_spec().get_selector(), OnCompletion=1),
+    ]:
+        assert matchProgram.run(call).approved == condProgram.run(call).approved
+
+    # bare calls are still tested before the selector
+    assert matchProgram.run(app_call(ApplicationID=0)).approved
+
+
+def test_router_dispatch_binary_search():
+    router = pt.Router(
+        "searcher",
+        pt.BareCallActions(no_op=pt.OnCompleteAction.create_only(pt.Approve())),
+    )
+
+    def constant_method(i: int) -> pt.ABIReturnSubroutine:
+        def constant(*, output: pt.abi.Uint64) -> pt.Expr:
+            return output.set(pt.Int(i))
+
+        constant.__name__ = f"constant_{i}"
+        return pt.ABIReturnSubroutine(constant)
+
+    methods = [router.add_method_handler(constant_method(i)) for i in range(20)]
+
+    searched = router.compile(version=6, dispatch="binary_search")
+    chained = router.compile(version=6, dispatch="cond")
+    assert searched.clear_teal == chained.clear_teal
+    assert searched.approval_teal.count("\nb<\n") == 7
+
+    searchProgram = pt.AVMInterpreter(searched.approval_teal)
+    condProgram = pt.AVMInterpreter(chained.approval_teal)
+
+    def app_call(*args: bytes, **fields) -> pt.MockTransaction:
+        return pt.MockTransaction(
+            {"ApplicationID": 1, "ApplicationArgs": list(args), **fields}
+        )
+
+    searchCosts, condCosts = [], []
+    for i, method in enumerate(methods):
+        call = app_call(method.method_spec().get_selector())
+        searchResult = searchProgram.run(call)
+        condResult = condProgram.run(call)
+        assert searchResult.approved and condResult.approved
+        assert searchResult.logs == condResult.logs
+        assert searchResult.last_log() == pt.RETURN_HASH_PREFIX + i.to_bytes(8, "big")
+        searchCosts.append(searchResult.cost)
+        condCosts.append(condResult.cost)
+    assert max(searchCosts) < max(condCosts)
+    assert sum(searchCosts) < sum(condCosts)
+
+    for call in [
+        app_call(b"\x00\x00\x00\x00"),
+        app_call(b"\xff\xff\xff\xff"),
+        app_call(methods[0].method_spec().get_selector()[:2]),
+        app_call(),
+        app_call(ApplicationID=0),
+        app_call(methods[0].method_spec().get_selector(), OnCompletion=1),
+    ]:
+        assert searchProgram.run(call).approved == condProgram.run(call).approved
+
+
+def test_router_dispatch_binary_search_falls_back():
+    router, _ = dispatch_router()
+
+    # b< is not available before version 4
+    searched = router._build_program(version=3, dispatch="binary_search")[0]
+    assert type(searched) is pt.Cond
+
+    # a handful of methods are compared to the selector in turn
+    few = pt.Router("few")
+    few.add_method_handler(add)
+    few.add_method_handler(sub)
+    searched = few.compile(version=6, dispatch="binary_search")
+    chained = few.compile(version=6, dispatch="cond")
+    assert without_slots(searched.approval_teal) == without_slots(chained.approval_teal)
+
+
+def test_router_method_profile_order():
+    router, methods = dispatch_router()
+    signatures = [m.method_signature() for m in methods]
+    selectors = [m.method_spec().get_selector() for m in methods]
+
+    def method_order(profile) -> list[str]:
+        teal = router.compile(version=6, method_profile=profile).approval_teal
+        return re.findall(r'^method "(.*)"$', teal, flags=re.MULTILINE)
+
+    assert method_order(None) == signatures
+    assert method_order({}) == signatures
+
+    # keys may be signatures, selectors or hex selectors, and equal weights keep their order
+    profile: dict[str | bytes, float] = {
+        signatures[4]: 10,
+        selectors[2]: 3,
+        "0x" + selectors[3].hex(): 3,
+        selectors[1].hex(): 1.5,
+    }
+    expected = [signatures[i] for i in (4, 2, 3, 1, 0)]
+    assert method_order(profile) == expected
+    assert method_order(dict(reversed(profile.items()))) == expected
+
+    # weights for the same method are added together
+    assert method_order({signatures[1]: 2, selectors[1]: 2, signatures[0]: 3}) == [
+        signatures[i] for i in (1, 0, 2, 3, 4)
+    ]
+
+    # the order also applies to match dispatch
+    teal = router.compile(
+        version=8, dispatch="match", method_profile=profile
+    ).approval_teal
+    assert (
+        "pushbytess {}\n".format(
+            " ".join("0x" + selectors[i].hex() for i in (4, 2, 3, 1, 0))
+        )
+        in teal
+    )
+
+
+def test_router_method_profile_file(tmp_path):
+    router, methods = dispatch_router()
+    profile = {m.method_signature(): i for i, m in enumerate(methods)}
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(profile))
+
+    from_file = router.compile(version=6, method_profile=str(path))
+    from_path = router.compile_program(version=6, method_profile=path)[0]
+    from_dict = router.compile(version=6, method_profile=profile)
+    assert (
+        without_slots(from_file.approval_teal)
+        == without_slots(from_dict.approval_teal)
+        == without_slots(from_path)
+    )
+    assert from_file.dispatch_cost == from_dict.dispatch_cost
+
+    with pytest.raises(pt.TealInputError):
+        router.compile(version=6, method_profile=str(tmp_path / "missing.json"))
+
+    path.write_text("[1, 2]")
+    with pytest.raises(pt.TealInputError):
+        router.compile(version=6, method_profile=path)
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [
+        {"nonsense": 1},
+        {"0x0102": 1},
+        {b"\x01\x02\x03": 1},
+        {7: 1},
+        {"add(uint64,uint64)uint64": -1},
+        {"add(uint64,uint64)uint64": "1"},
+        {"add(uint64,uint64)uint64": True},
+        {"add(uint64,uint64)uint64": float("nan")},
+    ],
+)
+def test_router_method_profile_invalid(profile):
+    router, _ = dispatch_router()
+    with pytest.raises(pt.TealInputError):
+        router.compile(version=6, method_profile=profile)
+
+
+def test_router_method_profile_dispatch_cost():
+    router, methods = dispatch_router()
+    weights = [1, 0, 2, 0, 90]
+    bare_weight = 7
+    profile: dict[str | bytes, float] = {
+        m.method_signature(): w for m, w in zip(methods, weights)
+    }
+    profile[""] = bare_weight
+    profile["0x00000000"] = 1000
+
+    profiled = router.compile(version=6, method_profile=profile)
+    registered = router.compile(version=6)
+    assert registered.dispatch_cost is None
+    assert (
+        router.compile(
+            version=8, dispatch="match", method_profile=profile
+        ).dispatch_cost
+        is None
+    )
+
+    cost = profiled.dispatch_cost
+    assert cost is not None
+    total = sum(weights) + bare_weight
+    assert cost.registered == pytest.approx(
+        (bare_weight * 4 + sum(w * 4 * (i + 2) for i, w in enumerate(weights))) / total
+    )
+    assert cost.profiled == pytest.approx(
+        (bare_weight * 4 + 90 * 8 + 2 * 12 + 16) / total
+    )
+    assert cost.saving == pytest.approx(cost.registered - cost.profiled)
+
+    # the estimate matches the difference in the cost of executing each call
+    profiledProgram = pt.AVMInterpreter(profiled.approval_teal)
+    registeredProgram = pt.AVMInterpreter(registered.approval_teal)
+    saving = 0
+    for method, weight in zip(methods, weights):
+        call = pt.MockTransaction(
+            {
+                "ApplicationID": 1,
+                "ApplicationArgs": [
+                    method.method_spec().get_selector(),
+                    (7).to_bytes(8, "big"),
+                    (3).to_bytes(8, "big"),
+                ],
+            }
+        )
+        profiledResult = profiledProgram.run(call)
+        registeredResult = registeredProgram.run(call)
+        assert profiledResult.approved and registeredResult.approved
+        saving += weight * (registeredResult.cost - profiledResult.cost)
+    assert saving / total == pytest.approx(cost.saving)
+
+
+ON_COMPLETE_NAMES = [
+    "no_op",
+    "opt_in",
+    "close_out",
+    "update_application",
+    "delete_application",
+]
+
+
+@pytest.mark.parametrize(
+    "configs",
+    [
+        dict(zip(ON_COMPLETE_NAMES, combination))
+        for combination in itertools.product(
+            [pt.CallConfig.NEVER, pt.CallConfig.CALL, pt.CallConfig.CREATE],
+            [pt.CallConfig.NEVER, pt.CallConfig.ALL],
+            [pt.CallConfig.NEVER, pt.CallConfig.CALL],
+            [pt.CallConfig.NEVER, pt.CallConfig.CALL, pt.CallConfig.ALL],
+            [pt.CallConfig.NEVER, pt.CallConfig.CREATE],
+        )
+    ],
+)
+def test_on_complete_guard(configs: dict[str, pt.CallConfig]):
+    method_config = pt.MethodConfig(**configs)
+    expected = method_config.approval_cond()
+    guard = _on_complete_guard(configs)
+
+    if isinstance(expected, int):
+        assert guard == expected
+        return
+    assert isinstance(guard, pt.Expr)
+
+    def program(cond: pt.Expr) -> pt.AVMInterpreter:
+        return pt.AVMInterpreter(
+            pt.compileTeal(pt.Return(cond), pt.Mode.Application, version=6)
+        )
+
+    expectedProgram, guardProgram = program(expected), program(guard)
+    for app_id in (0, 1):
+        for on_completion in range(6):
+            call = pt.MockTransaction(
+                {"ApplicationID": app_id, "OnCompletion": on_completion}
+            )
+            expectedResult = expectedProgram.run(call)
+            guardResult = guardProgram.run(call)
+            assert guardResult.approved == expectedResult.approved
+            assert guardResult.cost <= expectedResult.cost
+
+
+def checked_router(mixed: bool) -> pt.Router:
+    router = pt.Router(
+        "checked",
+        pt.BareCallActions(
+            no_op=pt.OnCompleteAction.create_only(pt.Approve()),
+            opt_in=pt.OnCompleteAction.call_only(pt.Approve()),
+            close_out=pt.OnCompleteAction.always(pt.Approve()),
+            delete_application=pt.OnCompleteAction.call_only(pt.Approve()),
+        ),
+    )
+    config = pt.MethodConfig(no_op=pt.CallConfig.CALL, opt_in=pt.CallConfig.ALL)
+    for i, method in enumerate([add, sub, mul, div, mod]):
+        if mixed and i % 2:
+            method_config = pt.MethodConfig(
+                no_op=pt.CallConfig.ALL, update_application=pt.CallConfig.CALL
+            )
+        else:
+            method_config = config
+        router.add_method_handler(method, method_config=method_config)
+    return router
+
+
+@pytest.mark.parametrize("mixed", [False, True])
+@pytest.mark.parametrize(
+    "version, dispatch", [(6, "cond"), (6, "binary_search"), (8, "match")]
+)
+def test_router_optimize_on_complete_checks(mixed: bool, version: int, dispatch: str):
+    router = checked_router(mixed)
+    checked = router.compile(
+        version=version,
+        dispatch=dispatch,
+        optimize=pt.OptimizeOptions(on_complete_checks=True),
+    )
+    unchecked = router.compile(version=version, dispatch=dispatch)
+    assert checked.clear_teal == unchecked.clear_teal
+    assert checked.abi_contract.dictify() == unchecked.abi_contract.dictify()
+    assert len(checked.approval_teal.splitlines()) < len(
+        unchecked.approval_teal.splitlines()
+    )
+
+    checkedProgram = pt.AVMInterpreter(checked.approval_teal)
+    uncheckedProgram = pt.AVMInterpreter(unchecked.approval_teal)
+    selectors = [m.method_spec().get_selector() for m in [add, sub, mul, div, mod]]
+    calls: list[list[int | bytes]] = [[]] + [
+        [s, (7).to_bytes(8, "big"), (3).to_bytes(8, "big")] for s in selectors
+    ]
+    for args in calls:
+        for app_id in (0, 1):
+            for on_completion in range(6):
+                call = pt.MockTransaction(
+                    {
+                        "ApplicationID": app_id,
+                        "OnCompletion": on_completion,
+                        "ApplicationArgs": args,
+                    }
+                )
+                checkedResult = checkedProgram.run(call)
+                uncheckedResult = uncheckedProgram.run(call)
+                assert checkedResult.approved == uncheckedResult.approved
+                assert checkedResult.logs == uncheckedResult.logs
+                if checkedResult.approved:
+                    assert checkedResult.cost <= uncheckedResult.cost
+
+
+def test_router_optimize_on_complete_checks_no_op_only():
+    router, methods = dispatch_router()
+    checked = router.compile(
+        version=8, optimize=pt.OptimizeOptions(on_complete_checks=True)
+    ).approval_teal
+    unchecked = router.compile(version=8).approval_teal
+
+    # NoOp only methods are guarded once, before the method is dispatched
+    assert checked.count("txn OnCompletion\n") == 2
+    assert unchecked.count("txn OnCompletion\n") == len(methods) + 1
+    assert "int NoOp\n==" not in checked
+
+
+@pt.ABIReturnSubroutine
+def mixed_args(
+    flag: pt.abi.Bool,
+    small: pt.abi.Uint8,
+    owner: pt.abi.Address,
+    pair: pt.abi.Tuple2[pt.abi.Uint16, pt.abi.String],
+    *,
+    output: pt.abi.String,
+) -> pt.Expr:
+    return pt.Seq(
+        (second := pt.abi.String()).set(pair[1]),
+        output.set(
+            pt.Concat(flag.encode(), small.encode(), owner.encode(), second.get())
+        ),
+    )
+
+
+@pytest.mark.parametrize("version", [6, 8])
+def test_router_lazy_method_args(version: int):
+    router = pt.Router("lazy")
+    methods = [add, qrem, many_args, mixed_args, txn_amount]
+    for method in methods:
+        router.add_method_handler(method)
+
+    lazy = router.compile(
+        version=version, optimize=pt.OptimizeOptions(lazy_method_args=True)
+    )
+    eager = router.compile(version=version)
+    assert lazy.clear_teal == eager.clear_teal
+    assert lazy.abi_contract.dictify() == eager.abi_contract.dictify()
+    assert len(lazy.approval_teal.splitlines()) < len(eager.approval_teal.splitlines())
+
+    def encode(method: pt.ABIReturnSubroutine, *values) -> list[int | bytes]:
+        spec = method.method_spec()
+        encoded: list[int | bytes] = [spec.get_selector()]
+        return encoded + [
+            arg.type.encode(value) for arg, value in zip(spec.args, values)
+        ]
+
+    # the app args after the 14th are passed in a tuple
+    last_args = sdk_abi.ABIType.from_string("(" + ",".join(["uint64"] * 6) + ")")
+    calls: list[list[int | bytes]] = [
+        encode(add, 7, 3),
+        encode(qrem, 7, 3),
+        encode(many_args, *range(14)) + [last_args.encode(list(range(14, 20)))],
+        encode(mixed_args, True, 200, bytes(range(32)), [513, "pair"]),
+    ]
+
+    lazyProgram = pt.AVMInterpreter(lazy.approval_teal)
+    eagerProgram = pt.AVMInterpreter(eager.approval_teal)
+    for args in calls:
+        call = pt.MockTransaction({"ApplicationID": 1, "ApplicationArgs": args})
+        lazyResult = lazyProgram.run(call)
+        eagerResult = eagerProgram.run(call)
+        assert lazyResult.approved and eagerResult.approved
+        assert lazyResult.logs == eagerResult.logs
+        assert lazyResult.cost < eagerResult.cost
+
+    group = [
+        pt.MockTransaction({"TypeEnum": 1, "Amount": 42}),
+        pt.MockTransaction(
+            {
+                "ApplicationID": 1,
+                "ApplicationArgs": [txn_amount.method_spec().get_selector()],
+                "GroupIndex": 1,
+            }
+        ),
+    ]
+    lazyResult = lazyProgram.run(group, group_index=1)
+    eagerResult = eagerProgram.run(group, group_index=1)
+    assert lazyResult.approved and eagerResult.approved
+    assert lazyResult.last_log() == pt.RETURN_HASH_PREFIX + (42).to_bytes(8, "big")
+    assert lazyResult.logs == eagerResult.logs
@@ -1113,7 +1113,7 @@ class SubroutineEval:
         subroutine.stack_frames.reframe(*body_ops)
         body_ops.append(subroutine_body)
         sd = SubroutineDeclaration(subroutine, Seq(body_ops), deferred_expr)
-        sd.trace = subroutine_body.trace
+        sd._trace = subroutine_body._trace
         return sd
 
     @classmethod
@@ -6,6 +6,12 @@ from pyteal.ir import TealOp, Op, TealBlock, TealSimpleBlock
 from pyteal.ast.expr import Expr
 from pyteal.ast.int import Int
 from pyteal.ast.ternaryexpr import TernaryExpr
+from pyteal.ast.constantfolding import (
+    _ConstantPanicError,
+    constant_values,
+    evaluate_extract,
+    fold_constants,
+)
 
 if TYPE_CHECKING:
     from pyteal.compiler import CompileOptions
@@ -48,6 +54,10 @@ class SubstringExpr(Expr):
                 return Op.substring3
 
     def __teal__(self, options: "CompileOptions"):
+        folded = fold_constants(self, options)
+        if folded is not None:
+            return folded
+
         if not isinstance(self.startArg, Int) or not isinstance(self.endArg, Int):
             return TernaryExpr(
                 Op.substring3,
@@ -96,6 +106,22 @@ class SubstringExpr(Expr):
                 self.endArg,
             )
 
+    def _constant_value(self, options: "CompileOptions") -> int | bytes | None:
+        if Op.substring.min_version > options.version:
+            return None
+
+        values = constant_values([self.stringArg, self.startArg, self.endArg], options)
+        if values is None:
+            return None
+
+        string, start, end = values
+        if type(start) is int and type(end) is int and end < start:
+            raise _ConstantPanicError(
+                "The end index must be greater than or equal to the start index",
+                self,
+            )
+        return evaluate_extract(string, start, cast(int, end) - cast(int, start), self)
+
     def __str__(self):
         return "(Substring {} {} {})".format(self.stringArg, self.startArg, self.endArg)
 
@@ -129,6 +155,10 @@ class ExtractExpr(Expr):
             return Op.extract3
 
     def __teal__(self, options: "CompileOptions"):
+        folded = fold_constants(self, options)
+        if folded is not None:
+            return folded
+
         if not isinstance(self.startArg, Int) or not isinstance(self.lenArg, Int):
             return TernaryExpr(
                 Op.extract3,
@@ -159,6 +189,16 @@ class ExtractExpr(Expr):
                 self.lenArg,
             )
 
+    def _constant_value(self, options: "CompileOptions") -> int | bytes | None:
+        if Op.extract3.min_version > options.version:
+            return None
+
+        values = constant_values([self.stringArg, self.startArg, self.lenArg], options)
+        if values is None:
+            return None
+        string, start, length = values
+        return evaluate_extract(string, start, length, self)
+
     def __str__(self):
         return "(Extract {} {} {})".format(self.stringArg, self.startArg, self.lenArg)
 
@@ -205,6 +245,10 @@ class SuffixExpr(Expr):
             "Program version too low to use op {}".format(op),
         )
 
+        folded = fold_constants(self, options)
+        if folded is not None:
+            return folded
+
         if op == Op.extract:
             # if possible, exploit optimization in the extract opcode that takes the suffix
             # when the length argument is 0
@@ -229,6 +273,19 @@ class SuffixExpr(Expr):
             nextBlockEnd.setNextBlock(finalBlock)
             return strBlockStart, finalBlock
 
+    def _constant_value(self, options: "CompileOptions") -> int | bytes | None:
+        if self.__get_op(options).min_version > options.version:
+            return None
+
+        values = constant_values([self.stringArg, self.startArg], options)
+        if values is None:
+            return None
+
+        string, start = values
+        if type(string) is not bytes or type(start) is not int:
+            return None
+        return evaluate_extract(string, start, max(len(string) - start, 0), self)
+
     def __str__(self):
         return "(Suffix {} {})".format(self.stringArg, self.startArg)
 
@@ -63,7 +63,7 @@ class TxnField(Enum):
     application_args = (26, "ApplicationArgs", TealType.bytes, True, 2)
     num_app_args = (27, "NumAppArgs", TealType.uint64, False, 2)
     accounts = (28, "Accounts", TealType.bytes, True, 2)
-    num_accounts = (2, "NumAccounts", TealType.uint64, False, 2)
+    num_accounts = (29, "NumAccounts", TealType.uint64, False, 2)
     approval_program = (30, "ApprovalProgram", TealType.bytes, False, 2)
     clear_state_program = (31, "ClearStateProgram", TealType.bytes, False, 2)
     rekey_to = (32, "RekeyTo", TealType.bytes, False, 2)
@@ -1,3 +1,4 @@
+from pyteal.compiler.assembler import AssembledProgram, assembleTeal
 from pyteal.compiler.compiler import (
     MAX_TEAL_VERSION,
     MIN_TEAL_VERSION,
@@ -10,6 +11,13 @@ from pyteal.compiler.compiler import (
     CompileResults,
     compileTeal,
 )
+from pyteal.compiler.interpreter import (
+    AVMInterpreter,
+    BatchResult,
+    ExecutionResult,
+    MockLedger,
+    MockTransaction,
+)
 from pyteal.compiler.optimizer import OptimizeOptions
 from pyteal.compiler.sourcemap import PyTealSourceMap, R3SourceMap
 
@@ -25,6 +33,13 @@ __all__ = [
     "Compilation",
     "CompileResults",
     "compileTeal",
+    "AssembledProgram",
+    "assembleTeal",
+    "AVMInterpreter",
+    "BatchResult",
+    "ExecutionResult",
+    "MockLedger",
+    "MockTransaction",
     "OptimizeOptions",
     "PyTealSourceMap",
     "R3SourceMap",
@@ -0,0 +1,814 @@
+import base64
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from algosdk import encoding
+
+from pyteal.ast.acct import AccountParamField
+from pyteal.ast.base64decode import Base64Encoding
+from pyteal.ast.block import BlockField
+from pyteal.ast.ec import EllipticCurve
+from pyteal.ast.ecdsa import EcdsaCurve
+from pyteal.ast.global_ import GlobalField
+from pyteal.ast.jsonref import JsonRefType
+from pyteal.ast.txn import TxnField
+from pyteal.ast.vrfverify import VrfVerifyStandard
+from pyteal.errors import TealInputError
+
+# The first version which reorders constants by how often they are used, and which pushes
+# constants that are only used once, like the assembler of algod
+OPTIMIZE_CONSTANTS_VERSION = 4
+
+# The first version which allows branching backwards
+BACK_BRANCH_VERSION = 4
+
+_TXN_FIELDS: Dict[str, int] = {f.arg_name: f.id for f in TxnField}
+_GLOBAL_FIELDS: Dict[str, int] = {f.arg_name: f.id for f in GlobalField}
+_ASSET_HOLDING_FIELDS: Dict[str, int] = {"AssetBalance": 0, "AssetFrozen": 1}
+_ASSET_PARAMS_FIELDS: Dict[str, int] = {
+    name: i
+    for i, name in enumerate(
+        [
+            "AssetTotal",
+            "AssetDecimals",
+            "AssetDefaultFrozen",
+            "AssetUnitName",
+            "AssetName",
+            "AssetURL",
+            "AssetMetadataHash",
+            "AssetManager",
+            "AssetReserve",
+            "AssetFreeze",
+            "AssetClawback",
+            "AssetCreator",
+        ]
+    )
+}
+_APP_PARAMS_FIELDS: Dict[str, int] = {
+    name: i
+    for i, name in enumerate(
+        [
+            "AppApprovalProgram",
+            "AppClearStateProgram",
+            "AppGlobalNumUint",
+            "AppGlobalNumByteSlice",
+            "AppLocalNumUint",
+            "AppLocalNumByteSlice",
+            "AppExtraProgramPages",
+            "AppCreator",
+            "AppAddress",
+        ]
+    )
+}
+_ACCT_PARAMS_FIELDS: Dict[str, int] = {f.arg_name: f.id for f in AccountParamField}
+_BLOCK_FIELDS: Dict[str, int] = {f.arg_name: f.id for f in BlockField}
+_ECDSA_CURVES: Dict[str, int] = {c.arg_name: c.id for c in EcdsaCurve}
+_EC_GROUPS: Dict[str, int] = {g.arg_name: g.id for g in EllipticCurve}
+_BASE64_ENCODINGS: Dict[str, int] = {e.arg_name: e.id for e in Base64Encoding}
+_JSON_REF_TYPES: Dict[str, int] = {t.arg_name: t.id for t in JsonRefType}
+_VRF_STANDARDS: Dict[str, int] = {s.arg_name: s.id for s in VrfVerifyStandard}
+
+# named constants which can be used with the int pseudo-op
+_NAMED_INTS: Dict[str, int] = {
+    "unknown": 0,
+    "pay": 1,
+    "keyreg": 2,
+    "acfg": 3,
+    "axfer": 4,
+    "afrz": 5,
+    "appl": 6,
+    "NoOp": 0,
+    "OptIn": 1,
+    "CloseOut": 2,
+    "ClearState": 3,
+    "UpdateApplication": 4,
+    "DeleteApplication": 5,
+}
+
+# Kinds of immediate arguments. A dict is a field group, which maps the names of its fields to the
+# byte that encodes them.
+_UINT8 = "uint8"
+_INT8 = "int8"
+_LABEL = "label"
+_LABELS = "labels"
+_VARUINT = "varuint"
+_BYTES = "bytes"
+_VARUINTS = "varuints"
+_BYTESES = "byteses"
+
+_Immediate = Union[str, Dict[str, int]]
+
+# The opcode and immediate arguments of every op, keyed by name
+_OPCODES: Dict[str, Tuple[int, List[_Immediate]]] = {
+    "err": (0x00, []),
+    "sha256": (0x01, []),
+    "keccak256": (0x02, []),
+    "sha512_256": (0x03, []),
+    "ed25519verify": (0x04, []),
+    "ecdsa_verify": (0x05, [_ECDSA_CURVES]),
+    "ecdsa_pk_decompress": (0x06, [_ECDSA_CURVES]),
+    "ecdsa_pk_recover": (0x07, [_ECDSA_CURVES]),
+    "+": (0x08, []),
+    "-": (0x09, []),
+    "/": (0x0A, []),
+    "*": (0x0B, []),
+    "<": (0x0C, []),
+    ">": (0x0D, []),
+    "<=": (0x0E, []),
+    ">=": (0x0F, []),
+    "&&": (0x10, []),
+    "||": (0x11, []),
+    "==": (0x12, []),
+    "!=": (0x13, []),
+    "!": (0x14, []),
+    "len": (0x15, []),
+    "itob": (0x16, []),
+    "btoi": (0x17, []),
+    "%": (0x18, []),
+    "|": (0x19, []),
+    "&": (0x1A, []),
+    "^": (0x1B, []),
+    "~": (0x1C, []),
+    "mulw": (0x1D, []),
+    "addw": (0x1E, []),
+    "divmodw": (0x1F, []),
+    "intcblock": (0x20, [_VARUINTS]),
+    "intc": (0x21, [_UINT8]),
+    "intc_0": (0x22, []),
+    "intc_1": (0x23, []),
+    "intc_2": (0x24, []),
+    "intc_3": (0x25, []),
+    "bytecblock": (0x26, [_BYTESES]),
+    "bytec": (0x27, [_UINT8]),
+    "bytec_0": (0x28, []),
+    "bytec_1": (0x29, []),
+    "bytec_2": (0x2A, []),
+    "bytec_3": (0x2B, []),
+    "arg": (0x2C, [_UINT8]),
+    "arg_0": (0x2D, []),
+    "arg_1": (0x2E, []),
+    "arg_2": (0x2F, []),
+    "arg_3": (0x30, []),
+    "txn": (0x31, [_TXN_FIELDS]),
+    "global": (0x32, [_GLOBAL_FIELDS]),
+    "gtxn": (0x33, [_UINT8, _TXN_FIELDS]),
+    "load": (0x34, [_UINT8]),
+    "store": (0x35, [_UINT8]),
+    "txna": (0x36, [_TXN_FIELDS, _UINT8]),
+    "gtxna": (0x37, [_UINT8, _TXN_FIELDS, _UINT8]),
+    "gtxns": (0x38, [_TXN_FIELDS]),
+    "gtxnsa": (0x39, [_TXN_FIELDS, _UINT8]),
+    "gload": (0x3A, [_UINT8, _UINT8]),
+    "gloads": (0x3B, [_UINT8]),
+    "gaid": (0x3C, [_UINT8]),
+    "gaids": (0x3D, []),
+    "loads": (0x3E, []),
+    "stores": (0x3F, []),
+    "bnz": (0x40, [_LABEL]),
+    "bz": (0x41, [_LABEL]),
+    "b": (0x42, [_LABEL]),
+    "return": (0x43, []),
+    "assert": (0x44, []),
+    "bury": (0x45, [_UINT8]),
+    "popn": (0x46, [_UINT8]),
+    "dupn": (0x47, [_UINT8]),
+    "pop": (0x48, []),
+    "dup": (0x49, []),
+    "dup2": (0x4A, []),
+    "dig": (0x4B, [_UINT8]),
+    "swap": (0x4C, []),
+    "select": (0x4D, []),
+    "cover": (0x4E, [_UINT8]),
+    "uncover": (0x4F, [_UINT8]),
+    "concat": (0x50, []),
+    "substring": (0x51, [_UINT8, _UINT8]),
+    "substring3": (0x52, []),
+    "getbit": (0x53, []),
+    "setbit": (0x54, []),
+    "getbyte": (0x55, []),
+    "setbyte": (0x56, []),
+    "extract": (0x57, [_UINT8, _UINT8]),
+    "extract3": (0x58, []),
+    "extract_uint16": (0x59, []),
+    "extract_uint32": (0x5A, []),
+    "extract_uint64": (0x5B, []),
+    "replace2": (0x5C, [_UINT8]),
+    "replace3": (0x5D, []),
+    "base64_decode": (0x5E, [_BASE64_ENCODINGS]),
+    "json_ref": (0x5F, [_JSON_REF_TYPES]),
+    "balance": (0x60, []),
+    "app_opted_in": (0x61, []),
+    "app_local_get": (0x62, []),
+    "app_local_get_ex": (0x63, []),
+    "app_global_get": (0x64, []),
+    "app_global_get_ex": (0x65, []),
+    "app_local_put": (0x66, []),
+    "app_global_put": (0x67, []),
+    "app_local_del": (0x68, []),
+    "app_global_del": (0x69, []),
+    "asset_holding_get": (0x70, [_ASSET_HOLDING_FIELDS]),
+    "asset_params_get": (0x71, [_ASSET_PARAMS_FIELDS]),
+    "app_params_get": (0x72, [_APP_PARAMS_FIELDS]),
+    "acct_params_get": (0x73, [_ACCT_PARAMS_FIELDS]),
+    "min_balance": (0x78, []),
+    "pushbytes": (0x80, [_BYTES]),
+    "pushint": (0x81, [_VARUINT]),
+    "pushbytess": (0x82, [_BYTESES]),
+    "pushints": (0x83, [_VARUINTS]),
+    "ed25519verify_bare": (0x84, []),
+    "callsub": (0x88, [_LABEL]),
+    "retsub": (0x89, []),
+    "proto": (0x8A, [_UINT8, _UINT8]),
+    "frame_dig": (0x8B, [_INT8]),
+    "frame_bury": (0x8C, [_INT8]),
+    "switch": (0x8D, [_LABELS]),
+    "match": (0x8E, [_LABELS]),
+    "shl": (0x90, []),
+    "shr": (0x91, []),
+    "sqrt": (0x92, []),
+    "bitlen": (0x93, []),
+    "exp": (0x94, []),
+    "expw": (0x95, []),
+    "bsqrt": (0x96, []),
+    "divw": (0x97, []),
+    "sha3_256": (0x98, []),
+    "b+": (0xA0, []),
+    "b-": (0xA1, []),
+    "b/": (0xA2, []),
+    "b*": (0xA3, []),
+    "b<": (0xA4, []),
+    "b>": (0xA5, []),
+    "b<=": (0xA6, []),
+    "b>=": (0xA7, []),
+    "b==": (0xA8, []),
+    "b!=": (0xA9, []),
+    "b%": (0xAA, []),
+    "b|": (0xAB, []),
+    "b&": (0xAC, []),
+    "b^": (0xAD, []),
+    "b~": (0xAE, []),
+    "bzero": (0xAF, []),
+    "log": (0xB0, []),
+    "itxn_begin": (0xB1, []),
+    "itxn_field": (0xB2, [_TXN_FIELDS]),
+    "itxn_submit": (0xB3, []),
+    "itxn": (0xB4, [_TXN_FIELDS]),
+    "itxna": (0xB5, [_TXN_FIELDS, _UINT8]),
+    "itxn_next": (0xB6, []),
+    "gitxn": (0xB7, [_UINT8, _TXN_FIELDS]),
+    "gitxna": (0xB8, [_UINT8, _TXN_FIELDS, _UINT8]),
+    "box_create": (0xB9, []),
+    "box_extract": (0xBA, []),
+    "box_replace": (0xBB, []),
+    "box_del": (0xBC, []),
+    "box_len": (0xBD, []),
+    "box_get": (0xBE, []),
+    "box_put": (0xBF, []),
+    "txnas": (0xC0, [_TXN_FIELDS]),
+    "gtxnas": (0xC1, [_UINT8, _TXN_FIELDS]),
+    "gtxnsas": (0xC2, [_TXN_FIELDS]),
+    "args": (0xC3, []),
+    "gloadss": (0xC4, []),
+    "itxnas": (0xC5, [_TXN_FIELDS]),
+    "gitxnas": (0xC6, [_UINT8, _TXN_FIELDS]),
+    "vrf_verify": (0xD0, [_VRF_STANDARDS]),
+    "block": (0xD1, [_BLOCK_FIELDS]),
+    "box_splice": (0xD2, []),
+    "box_resize": (0xD3, []),
+    "ec_add": (0xE0, [_EC_GROUPS]),
+    "ec_scalar_mul": (0xE1, [_EC_GROUPS]),
+    "ec_pairing_check": (0xE2, [_EC_GROUPS]),
+    "ec_multi_scalar_mul": (0xE3, [_EC_GROUPS]),
+    "ec_subgroup_check": (0xE4, [_EC_GROUPS]),
+    "ec_map_to": (0xE5, [_EC_GROUPS]),
+}
+
+# Ops which are assembled as a different op when given one more immediate argument, e.g.
+# `txn ApplicationArgs 0` is the same as `txna ApplicationArgs 0`
+_ARRAY_FORMS: Dict[str, str] = {
+    "txn": "txna",
+    "gtxn": "gtxna",
+    "gtxns": "gtxnsa",
+    "itxn": "itxna",
+    "gitxn": "gitxna",
+}
+
+
+def _varuint(value: int) -> bytes:
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+def _base64_vlq(value: int) -> str:
+    chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+    vlq = (-value << 1) | 1 if value < 0 else value << 1
+    encoded = ""
+    while True:
+        digit = vlq & 0x1F
+        vlq >>= 5
+        if vlq:
+            digit |= 0x20
+        encoded += chars[digit]
+        if not vlq:
+            return encoded
+
+
+def _fields(line: str) -> List[str]:
+    """Split a line of TEAL into its fields, keeping quoted strings whole and dropping comments."""
+    fields: List[str] = []
+    current = ""
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char == '"':
+            end = i + 1
+            while end < len(line) and line[end] != '"':
+                end += 2 if line[end] == "\\" else 1
+            current += line[i : end + 1]
+            i = end + 1
+            continue
+        if line.startswith("//", i):
+            break
+        if char.isspace():
+            if current:
+                fields.append(current)
+            current = ""
+        else:
+            current += char
+        i += 1
+    if current:
+        fields.append(current)
+    return fields
+
+
+def _parse_uint(arg: str) -> int:
+    if arg in _NAMED_INTS:
+        return _NAMED_INTS[arg]
+    try:
+        if len(arg) > 1 and arg[0] == "0" and arg[1].isdigit():
+            # like Go, a leading 0 means octal
+            value = int(arg, 8)
+        else:
+            value = int(arg, 0)
+    except ValueError:
+        raise TealInputError("Unable to parse integer: {}".format(arg))
+    if not 0 <= value < 2**64:
+        raise TealInputError("Integer out of range: {}".format(arg))
+    return value
+
+
+def _parse_string(arg: str) -> bytes:
+    if len(arg) < 2 or not (arg[0] == arg[-1] == '"'):
+        raise TealInputError("Unable to parse string: {}".format(arg))
+
+    escapes = {"n": b"\n", "r": b"\r", "t": b"\t", "\\": b"\\", '"': b'"'}
+    value = bytearray()
+    body = arg[1:-1]
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if char != "\\":
+            value += char.encode("utf-8")
+            i += 1
+            continue
+        escaped = body[i + 1 : i + 2]
+        if escaped in escapes:
+            value += escapes[escaped]
+            i += 2
+        elif escaped == "x" and i + 4 <= len(body):
+            value.append(int(body[i + 2 : i + 4], 16))
+            i += 4
+        else:
+            raise TealInputError("Invalid escape sequence in string: {}".format(arg))
+    return bytes(value)
+
+
+def _decode(encoding_name: str, value: str) -> bytes:
+    try:
+        if encoding_name in ("base64", "b64"):
+            return base64.b64decode(value, validate=True)
+        padding = "=" * (-len(value) % 8)
+        return base64.b32decode(value + padding)
+    except ValueError:
+        raise TealInputError(
+            "Unable to decode {} value: {}".format(encoding_name, value)
+        )
+
+
+def _parse_bytes(args: List[str]) -> Tuple[bytes, int]:
+    """Parse a byte string from the start of args, in any of the forms accepted by the byte
+    pseudo-op.
+
+    Returns:
+        The byte string, and the number of args it was made of.
+    """
+    if len(args) == 0:
+        raise TealInputError("Expected a byte string")
+
+    arg = args[0]
+    if arg.startswith("0x"):
+        try:
+            return bytes.fromhex(arg[2:]), 1
+        except ValueError:
+            raise TealInputError("Unable to decode hex value: {}".format(arg))
+    if arg.startswith('"'):
+        return _parse_string(arg), 1
+    for name in ("base64", "b64", "base32", "b32"):
+        if arg == name:
+            if len(args) < 2:
+                raise TealInputError("{} needs a value".format(name))
+            return _decode(name, args[1]), 2
+        if arg.startswith(name + "(") and arg.endswith(")"):
+            return _decode(name, arg[len(name) + 1 : -1]), 1
+
+    raise TealInputError("Unable to parse byte string: {}".format(arg))
+
+
+@dataclass
+class _Instruction:
+    """One assembled op of a program. Its encoding isn't final until constants are placed and
+    labels are resolved."""
+
+    line: int
+    opcode: int
+    immediates: bytes = b""
+    # an int or byte string pseudo-op, whose encoding depends on the rest of the program
+    constant: Optional[Union[int, bytes]] = None
+    labels: List[str] = field(default_factory=list)
+    pc: int = 0
+
+    def has_label_count(self) -> bool:
+        return self.opcode in (_OPCODES["switch"][0], _OPCODES["match"][0])
+
+    def size(self) -> int:
+        # labels take 2 bytes each, and the count of a switch or match takes one more
+        labelBytes = 2 * len(self.labels) + int(self.has_label_count())
+        return 1 + len(self.immediates) + labelBytes
+
+
+@dataclass(frozen=True)
+class AssembledProgram:
+    """A TEAL program assembled into AVM bytecode.
+
+    Args:
+        bytecode: The assembled program.
+        pc_to_line: Maps the program counter of the first byte of each op to the 0-indexed line of
+            TEAL that the op was assembled from.
+    """
+
+    bytecode: bytes
+    pc_to_line: Dict[int, int]
+
+    def size(self) -> int:
+        """Get the size of the program in bytes."""
+        return len(self.bytecode)
+
+    def sourcemap(self) -> Dict[str, Any]:
+        """Get the map from program counters to lines of TEAL, in the same Source Map Revision 3
+        format that algod's compile endpoint returns.
+
+        Like algod, every program counter up to the start of the last op is mapped, and program
+        counters which aren't the start of an op are left blank to indicate that they belong to
+        the same line as the previous one.
+        """
+        segments: List[str] = []
+        previous = 0
+        for pc in range(max(self.pc_to_line, default=-1) + 1):
+            line = self.pc_to_line.get(pc)
+            if line is None:
+                segments.append("")
+                continue
+            segments.append("AA" + _base64_vlq(line - previous) + "A")
+            previous = line
+
+        return {
+            "version": 3,
+            "sources": [],
+            "names": [],
+            "mappings": ";".join(segments),
+        }
+
+
+AssembledProgram.__module__ = "pyteal"
+
+
+class _Assembler:
+    def __init__(self) -> None:
+        self.version = 0
+        # the line of the version pragma, which the start of the program is mapped to
+        self.pragma_line = 0
+        self.instructions: List[_Instruction] = []
+        # label -> index of the first instruction after it
+        self.labels: Dict[str, int] = dict()
+        self.intcblock: Optional[List[int]] = None
+        self.bytecblock: Optional[List[bytes]] = None
+        self.intcblocks = 0
+        self.bytecblocks = 0
+
+    def immediate(self, kind: _Immediate, args: List[str]) -> Tuple[bytes, int]:
+        """Encode the immediate argument at the start of args.
+
+        Returns:
+            The encoded argument, and the number of args it was made of.
+        """
+        if len(args) == 0:
+            raise TealInputError("Missing immediate argument")
+
+        arg = args[0]
+        if isinstance(kind, dict):
+            if arg not in kind:
+                raise TealInputError("Unknown field: {}".format(arg))
+            return bytes([kind[arg]]), 1
+        if kind == _UINT8:
+            value = _parse_uint(arg)
+            if value > 0xFF:
+                raise TealInputError(
+                    "Immediate argument is out of range: {}".format(arg)
+                )
+            return bytes([value]), 1
+        if kind == _INT8:
+            try:
+                value = int(arg, 0)
+            except ValueError:
+                raise TealInputError("Unable to parse integer: {}".format(arg))
+            if not -0x80 <= value <= 0x7F:
+                raise TealInputError(
+                    "Immediate argument is out of range: {}".format(arg)
+                )
+            return (value & 0xFF).to_bytes(1, "big"), 1
+        if kind == _VARUINT:
+            return _varuint(_parse_uint(arg)), 1
+        if kind == _BYTES:
+            data, consumed = _parse_bytes(args)
+            return _varuint(len(data)) + data, consumed
+        if kind == _VARUINTS:
+            values = [_parse_uint(a) for a in args]
+            return _varuint(len(values)) + b"".join(_varuint(v) for v in values), len(
+                args
+            )
+
+        assert kind == _BYTESES
+        encoded = b""
+        count = 0
+        consumed = 0
+        while consumed < len(args):
+            data, n = _parse_bytes(args[consumed:])
+            encoded += _varuint(len(data)) + data
+            count += 1
+            consumed += n
+        return _varuint(count) + encoded, consumed
+
+    def add(self, line: int, name: str, args: List[str]) -> None:
+        if name == "int":
+            if len(args) != 1:
+                raise TealInputError("int needs one argument")
+            self.instructions.append(
+                _Instruction(line, 0, constant=_parse_uint(args[0]))
+            )
+            return
+        if name in ("byte", "addr", "method"):
+            if name == "byte":
+                value, consumed = _parse_bytes(args)
+            elif name == "addr":
+                try:
+                    value, consumed = encoding.decode_address(args[0]), 1
+                except Exception:
+                    raise TealInputError("Invalid address: {}".format(" ".join(args)))
+            else:
+                signature, consumed = _parse_bytes(args)
+                value = encoding.checksum(signature)[:4]
+            if consumed != len(args):
+                raise TealInputError("{} needs one argument".format(name))
+            self.instructions.append(_Instruction(line, 0, constant=value))
+            return
+
+        spec = _OPCODES.get(name)
+        if name in _ARRAY_FORMS and spec is not None and len(args) > len(spec[1]):
+            name = _ARRAY_FORMS[name]
+            spec = _OPCODES[name]
+        if name == "arg" and len(args) == 1 and _parse_uint(args[0]) < 4:
+            spec, args = _OPCODES["arg_" + str(_parse_uint(args[0]))], []
+        if spec is None:
+            raise TealInputError("Unknown op: {}".format(name))
+
+        opcode, kinds = spec
+        instruction = _Instruction(line, opcode)
+        remaining = args
+        for kind in kinds:
+            if kind == _LABEL:
+                if len(remaining) == 0:
+                    raise TealInputError("{} needs a label".format(name))
+                instruction.labels = remaining[:1]
+                remaining = remaining[1:]
+                continue
+            if kind == _LABELS:
+                if len(remaining) > 0xFF:
+                    raise TealInputError("{} has too many labels".format(name))
+                instruction.labels = remaining
+                remaining = []
+                continue
+            encoded, consumed = self.immediate(kind, remaining)
+            instruction.immediates += encoded
+            remaining = remaining[consumed:]
+
+        if len(remaining) != 0:
+            raise TealInputError(
+                "Too many arguments for {}: {}".format(name, " ".join(args))
+            )
+
+        if name == "intcblock":
+            self.intcblocks += 1
+            self.intcblock = [_parse_uint(a) for a in args]
+        elif name == "bytecblock":
+            self.bytecblocks += 1
+            self.bytecblock = []
+            consumed = 0
+            while consumed < len(args):
+                value, n = _parse_bytes(args[consumed:])
+                self.bytecblock.append(value)
+                consumed += n
+
+        self.instructions.append(instruction)
+
+    def parse(self, teal: str) -> None:
+        for i, line in enumerate(teal.splitlines()):
+            fields = _fields(line)
+            if len(fields) == 0:
+                continue
+
+            if fields[0] == "#pragma":
+                if len(fields) == 3 and fields[1] == "version":
+                    if len(self.instructions) != 0:
+                        raise TealInputError("#pragma version must come before any ops")
+                    self.version = _parse_uint(fields[2])
+                    self.pragma_line = i
+                continue
+
+            if len(fields) == 1 and fields[0].endswith(":"):
+                label = fields[0][:-1]
+                if label in self.labels:
+                    raise TealInputError("Duplicate label: {}".format(label))
+                self.labels[label] = len(self.instructions)
+                continue
+
+            if self.version == 0:
+                # programs without a version pragma are version 1
+                self.version = 1
+            self.add(i, fields[0], fields[1:])
+
+    def place_constants(
+        self, kind: type, block: Optional[list], blocks: int
+    ) -> List[Any]:
+        """Choose how to encode each int or byte string pseudo-op of the program, like algod.
+
+        Returns:
+            The constants to put in a block at the start of the program, if the program doesn't
+            have its own block.
+        """
+        if kind is int:
+            ops = ("intc", "pushint", "intc_")
+        else:
+            ops = ("bytec", "pushbytes", "bytec_")
+        refs = [i for i in self.instructions if type(i.constant) is kind]
+
+        def encode_push(instruction: _Instruction) -> None:
+            instruction.opcode = _OPCODES[ops[1]][0]
+            value = instruction.constant
+            if isinstance(value, bytes):
+                instruction.immediates = _varuint(len(value)) + value
+            else:
+                assert isinstance(value, int)
+                instruction.immediates = _varuint(value)
+
+        def encode_ref(instruction: _Instruction, index: int) -> None:
+            if index < 4:
+                instruction.opcode = _OPCODES[ops[2] + str(index)][0]
+            elif index <= 0xFF:
+                instruction.opcode = _OPCODES[ops[0]][0]
+                instruction.immediates = bytes([index])
+            else:
+                raise TealInputError(
+                    "Cannot have more than 256 {} constants".format(
+                        "int" if kind is int else "byte"
+                    )
+                )
+
+        if blocks > 0:
+            assert block is not None
+            for instruction in refs:
+                if self.version >= BACK_BRANCH_VERSION or blocks > 1:
+                    # it's unknown which block is in effect when there are several, or when
+                    # control flow can go backwards, so push the value instead
+                    encode_push(instruction)
+                elif instruction.constant in block:
+                    encode_ref(instruction, block.index(instruction.constant))
+                else:
+                    raise TealInputError(
+                        "Value does not appear in the program's constant block: {!r}".format(
+                            instruction.constant
+                        )
+                    )
+            return []
+
+        # constants in order of first use
+        constants: List[Any] = []
+        frequency: Dict[Any, int] = dict()
+        for instruction in refs:
+            if instruction.constant not in frequency:
+                constants.append(instruction.constant)
+                frequency[instruction.constant] = 0
+            frequency[instruction.constant] += 1
+
+        if self.version >= OPTIMIZE_CONSTANTS_VERSION:
+            # the most frequently used constants get the smallest indexes, and constants which are
+            # used only once are pushed instead
+            constants.sort(key=lambda c: -frequency[c])
+            constants = [c for c in constants if frequency[c] > 1]
+
+        indexes = {c: i for i, c in enumerate(constants)}
+        for instruction in refs:
+            index = indexes.get(instruction.constant)
+            if index is None:
+                encode_push(instruction)
+            else:
+                encode_ref(instruction, index)
+        return constants
+
+    def assemble(self) -> AssembledProgram:
+        intcs = self.place_constants(int, self.intcblock, self.intcblocks)
+        bytecs = self.place_constants(bytes, self.bytecblock, self.bytecblocks)
+
+        prefix = _varuint(self.version)
+        if len(intcs) != 0:
+            prefix += bytes([_OPCODES["intcblock"][0]]) + _varuint(len(intcs))
+            prefix += b"".join(_varuint(c) for c in intcs)
+        if len(bytecs) != 0:
+            prefix += bytes([_OPCODES["bytecblock"][0]]) + _varuint(len(bytecs))
+            prefix += b"".join(_varuint(len(c)) + c for c in bytecs)
+
+        pc = len(prefix)
+        for instruction in self.instructions:
+            instruction.pc = pc
+            pc += instruction.size()
+        end = pc
+
+        def label_pc(label: str) -> int:
+            if label not in self.labels:
+                raise TealInputError("Reference to undefined label: {}".format(label))
+            index = self.labels[label]
+            return (
+                self.instructions[index].pc if index < len(self.instructions) else end
+            )
+
+        bytecode = bytearray(prefix)
+        # like algod, the version and constant blocks belong to the version pragma
+        pc_to_line: Dict[int, int] = {0: self.pragma_line}
+        for instruction in self.instructions:
+            pc_to_line[instruction.pc] = instruction.line
+            bytecode.append(instruction.opcode)
+            bytecode += instruction.immediates
+            if instruction.has_label_count():
+                bytecode.append(len(instruction.labels))
+            # offsets are relative to the op after the branch
+            following = instruction.pc + instruction.size()
+            for label in instruction.labels:
+                offset = label_pc(label) - following
+                if offset < 0 and self.version < BACK_BRANCH_VERSION:
+                    raise TealInputError(
+                        "Branching backwards to {} requires version {} or higher".format(
+                            label, BACK_BRANCH_VERSION
+                        )
+                    )
+                if not -0x8000 <= offset <= 0x7FFF:
+                    raise TealInputError("Branch to {} is too far".format(label))
+                bytecode += (offset & 0xFFFF).to_bytes(2, "big")
+
+        return AssembledProgram(bytes(bytecode), pc_to_line)
+
+
+def assembleTeal(teal: str) -> AssembledProgram:
+    """Assemble a TEAL program into AVM bytecode, without an algod node.
+
+    Constants are placed the same way algod's assembler places them: when there's no explicit
+    :code:`intcblock` or :code:`bytecblock`, the constants of the :code:`int`, :code:`byte`,
+    :code:`addr` and :code:`method` pseudo-ops are gathered into blocks at the start of the program
+    and, from version 4 on, ordered by how often they are used, with constants that are only used
+    once pushed instead. So the program counters of the assembled program match those of a source
+    map from algod.
+
+    Args:
+        teal: The TEAL program to assemble. Template variables must be replaced with values first.
+
+    Returns:
+        The assembled program, and a map from its program counters to lines of TEAL.
+
+    Raises:
+        TealInputError: if the program isn't valid TEAL.
+    """
+    assembler = _Assembler()
+    assembler.parse(teal)
+    return assembler.assemble()
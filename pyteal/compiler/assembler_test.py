@@ -0,0 +1,146 @@
+from pathlib import Path
+import re
+
+import pytest
+from algosdk import encoding
+from algosdk.source_map import SourceMap
+
+import pyteal as pt
+
+ANNOTATED_DIR = Path.cwd() / "tests" / "integration" / "teal" / "annotated"
+
+
+@pytest.mark.parametrize(
+    "teal,expected",
+    [
+        ("#pragma version 8\nint 1\nreturn", "08810143"),
+        # programs without a version pragma are version 1
+        ("int 1", "0120010122"),
+        # before version 4, every constant goes in the constant block
+        ("#pragma version 2\nint 1\nint 1\n+", "02200101222208"),
+        ("#pragma version 8\nint 1\nint 1\n+", "08200101222208"),
+        ("#pragma version 8\nint 300\nint 300\nint 5", "082001ac0222228105"),
+        ('#pragma version 8\nbyte "a"\nbyte "a"\nbyte 0x01', "08260101612828800101"),
+        ("#pragma version 8\nint pay\nint NoOp", "0881018100"),
+        ("#pragma version 8\ntxn Fee\ntxn ApplicationArgs 1", "083101361a01"),
+        ("#pragma version 8\narg 0\narg 4", "082d2c04"),
+        ("#pragma version 8\nframe_dig -1\nframe_bury 2", "088bff8c02"),
+        (
+            "#pragma version 8\naddr " + encoding.encode_address(bytes(32)),
+            "088020" + "00" * 32,
+        ),
+        ('#pragma version 8\nmethod "add(uint64,uint64)uint64"', "088004fe6bdf69"),
+        ("#pragma version 8\nbyte base64 AQI=\nbyte b32(AE)", "0880020102800101"),
+        ('#pragma version 8\nbyte "a\\"\\n\\x01" // comment', "08800461220a01"),
+        ("#pragma version 8\nintcblock 7 8\nint 8\nint 8", "082002070881088108"),
+    ],
+)
+def test_assemble(teal: str, expected: str):
+    assert pt.assembleTeal(teal).bytecode.hex() == expected
+
+
+def test_assemble_explicit_constant_block():
+    teal = "#pragma version 3\nintcblock 7 8\nint 8\nint 7"
+    assert pt.assembleTeal(teal).bytecode.hex() == "0320020708" + "2322"
+
+    with pytest.raises(pt.TealInputError):
+        pt.assembleTeal("#pragma version 3\nintcblock 7 8\nint 9")
+
+
+def test_assemble_branches():
+    teal = """#pragma version 8
+b end
+loop:
+int 1
+bnz loop
+end:
+callsub sub
+switch loop end
+sub:
+retsub"""
+
+    program = pt.assembleTeal(teal)
+    # offsets are relative to the op after the branch
+    assert program.bytecode.hex() == (
+        "08"
+        + "420005"  # b end: 1 to 4, end is at 9
+        + "8101"  # int 1: 4 to 6
+        + "40fffb"  # bnz loop: 6 to 9, loop is at 4
+        + "880006"  # callsub sub: 9 to 12, sub is at 18
+        + "8d02fff2fff7"  # switch loop end: 12 to 18
+        + "89"
+    )
+    assert program.pc_to_line == {0: 0, 1: 1, 4: 3, 6: 4, 9: 6, 12: 7, 18: 9}
+
+
+def test_assemble_backwards_branch_version_too_low():
+    with pytest.raises(pt.TealInputError):
+        pt.assembleTeal("#pragma version 3\nloop:\nb loop")
+
+
+@pytest.mark.parametrize(
+    "teal",
+    [
+        "#pragma version 8\nnot_an_op",
+        "#pragma version 8\ntxn NotAField",
+        "#pragma version 8\nint",
+        "#pragma version 8\nint -1",
+        "#pragma version 8\nint 18446744073709551616",
+        "#pragma version 8\nbyte 0xz",
+        '#pragma version 8\nbyte "\\q"',
+        "#pragma version 8\nb missing",
+        "#pragma version 8\npop 1",
+        "#pragma version 8\nload 256",
+        "#pragma version 8\nx:\nx:",
+        "int 1\n#pragma version 8",
+    ],
+)
+def test_assemble_invalid(teal: str):
+    with pytest.raises(pt.TealInputError):
+        pt.assembleTeal(teal)
+
+
+def test_sourcemap():
+    program = pt.assembleTeal("#pragma version 8\nint 1\n\n// comment\nreturn")
+    assert program.pc_to_line == {0: 0, 1: 1, 3: 4}
+
+    sourcemap = program.sourcemap()
+    assert sourcemap["mappings"] == "AAAA;AACA;;AAGA"
+
+    decoded = SourceMap(sourcemap)
+    assert decoded.pc_to_line == {0: 0, 1: 1, 2: 1, 3: 4}
+    assert decoded.line_to_pc == {0: [0], 1: [1, 2], 4: [3]}
+
+
+@pytest.mark.parametrize(
+    "filename",
+    sorted(p.name for p in ANNOTATED_DIR.glob("AlgoBank_*.tealf")),
+)
+def test_assemble_matches_algod(filename: str):
+    """The annotated programs were made with PC's from algod, so they check that the assembler
+    assigns the same program counters."""
+    lines = (ANNOTATED_DIR / filename).read_text().splitlines()
+    if lines[0].startswith("// GENERATED TEAL"):
+        lines = lines[1:]
+
+    teal = []
+    expected = dict()
+    for i, line in enumerate(lines):
+        teal.append(line.split("//")[0].rstrip())
+        match = re.search(r"//\s+\((\d+)\)", line)
+        if match:
+            expected[int(match.group(1))] = i
+
+    program = pt.assembleTeal("\n".join(teal))
+    assert program.pc_to_line == expected
+    assert program.size() == 351
+
+
+def test_compile_results_assemble():
+    program = pt.Seq(pt.Log(pt.Tmpl.Bytes("TMPL_NOTE")), pt.Approve())
+    results = pt.Compilation(program, pt.Mode.Application, version=8).compile()
+
+    assembled = results.assemble()
+    # the template is assembled as 0x00
+    assert assembled.bytecode.hex() == "08800100b0810143"
+    assert assembled.size() == 8
@@ -2,11 +2,26 @@ from dataclasses import dataclass
 from typing import Dict, Final, List, Optional, Set, Tuple, cast
 
 from algosdk.v2client.algod import AlgodClient
-
-from pyteal.ast import Expr, Return, Seq, SubroutineDeclaration, SubroutineDefinition
+from feature_gates import FeatureGates
+
+from pyteal.ast import (
+    Expr,
+    Return,
+    Seq,
+    SubroutineDeclaration,
+    SubroutineDefinition,
+    Tmpl,
+)
+from pyteal.ast.constantfolding import check_constant_panics
+from pyteal.compiler.assembler import AssembledProgram, assembleTeal
 from pyteal.compiler.constants import createConstantBlocks
 from pyteal.compiler.flatten import flattenBlocks, flattenSubroutines
-from pyteal.compiler.optimizer import OptimizeOptions, apply_global_optimizations
+from pyteal.compiler.optimizer import (
+    OptimizeOptions,
+    apply_common_subexpression_elimination,
+    apply_global_optimizations,
+    apply_peephole_optimizations,
+)
 from pyteal.compiler.scratchslots import (
     assignScratchSlotsToSubroutines,
     collect_unoptimized_slots,
@@ -18,9 +33,15 @@ from pyteal.compiler.sourcemap import (
 )
 from pyteal.compiler.subroutines import (
     resolveSubroutines,
+    findSlotsLiveAcrossCalls,
     spillLocalSlotsDuringRecursion,
 )
-from pyteal.errors import SourceMapDisabledError, TealInputError, TealInternalError
+from pyteal.errors import (
+    SourceMapDisabledError,
+    TealCompileError,
+    TealInputError,
+    TealInternalError,
+)
 from pyteal.ir import (
     Mode,
     Op,
@@ -67,6 +88,11 @@ class CompileOptions:
 
         self.currentSubroutine: Optional[SubroutineDefinition] = None
 
+        # id(expr) -> (expr, constant value of expr), see pyteal.ast.constantfolding
+        self.constantValues: Dict[int, Tuple[Expr, Optional[int | bytes]]] = dict()
+        # id(expr) -> error of a constant expr which would fail at runtime if it is evaluated
+        self.constantPanics: Dict[int, TealCompileError] = dict()
+
         self.breakBlocksStack: List[List[TealSimpleBlock]] = []
         self.continueBlocksStack: List[List[TealSimpleBlock]] = []
 
@@ -153,13 +179,13 @@ def compileSubroutine(
     if not ast.has_return():
         if ast.type_of() == TealType.none:
             ret_expr = Return()  # T2PT2
-            ret_expr.trace = ast.trace
+            ret_expr._trace = ast._trace
             seq_expr = Seq([ast, ret_expr])
-            seq_expr.trace = ret_expr.trace
+            seq_expr._trace = ret_expr._trace
             ast = seq_expr
         else:
             ret_expr = Return(ast)  # T2PT3
-            ret_expr.trace = ast.trace
+            ret_expr._trace = ast._trace
             ast = ret_expr
 
     options.setSubroutine(currentSubroutine)
@@ -208,6 +234,9 @@ def compileSubroutine(
     start = TealBlock.NormalizeBlocks(start)
     start.validateTree()
 
+    if currentSubroutine is None:
+        check_constant_panics(start, options)
+
     subroutine_start_blocks[currentSubroutine] = start
     subroutine_end_blocks[currentSubroutine] = end
 
@@ -252,6 +281,18 @@ class CompileResults:
     teal: str
     sourcemap: PyTealSourceMap | None = None
 
+    def assemble(self) -> AssembledProgram:
+        """Assemble the TEAL program into AVM bytecode without an algod node, e.g. to check the
+        size of the program.
+
+        Template variables are assembled as zero values, so the bytecode is only suitable for
+        measuring the program until they are replaced.
+        """
+        teal = self.teal
+        for placeholder in Tmpl.session_templates():
+            teal = teal.replace(placeholder, Tmpl.zero(placeholder))
+        return assembleTeal(teal)
+
 
 CompileResults.__module__ = "pyteal"
 
@@ -354,11 +395,10 @@ class Compilation:
                 each line of the generated TEAL program back to the original PyTeal source code. Defaults to `False`.
             teal_filename (optional): The filename to use in the sourcemap. Defaults to `None`.
             pcs_in_sourcemap (optional): When `True`, the compiler will include the program counter in
-                relevant sourcemap artifacts. This requires an `AlgodClient` (see next param). Defaults to `False`.
+                relevant sourcemap artifacts. Defaults to `False`.
             algod_client (optional): An `AlgodClient` to use to fetch program counters. Defaults to `None`.
                 When `pcs_in_sourcemap` is `True` and `algod_client` is not provided, the compiler will
-                assume that an Algorand Sandbox algod client is running on the default port (4001) and -if
-                this is not the case- will raise an exception.
+                assemble the program itself with :any:`assembleTeal` to find the program counters.
             annotate_teal (optional): When `True`, the compiler will produce a TEAL program with comments
                 that describe the PyTeal source code that generated each line of the program. Defaults to `False`.
             annotate_teal_headers (optional): When `True` along with `annotate_teal` being `True`, a header
@@ -372,7 +412,7 @@ class Compilation:
             * sourcemap (optional): if `with_sourcemap` is `True`, the following source map data is provided:
                 * teal_filename (optional): the TEAL filename, if this was provided
                 * r3_sourcemap: an `R3SourceMap` object that maps the generated TEAL program back to the original PyTeal source code and conforms to the specs of the `Source Map Revision 3 Proposal <https://sourcemaps.info/spec.html>`_
-                * pc_sourcemap (optional): if `pcs_in_sourcemap` is `True`, a `PCSourceMap` object that maps the program counters assembled by the `AlgodClient` which was utilized in the compilation back to the TEAL program which was generated by the compiler. This conforms to the specs of the `Source Map Revision 3 Proposal <https://sourcemaps.info/spec.html>`_
+                * pc_sourcemap (optional): if `pcs_in_sourcemap` is `True`, a `PCSourceMap` object that maps the program counters assembled by the `AlgodClient` which was utilized in the compilation (or by :any:`assembleTeal` when no client was given) back to the TEAL program which was generated by the compiler. This conforms to the specs of the `Source Map Revision 3 Proposal <https://sourcemaps.info/spec.html>`_
                 * annotated_teal (optional): if `annotate_teal` is `True`, the TEAL program with comments that describe the PyTeal source code that generated each line of the program
 
         Raises:
@@ -417,8 +457,8 @@ class Compilation:
                 "In order annotate generated teal source, must set with_sourcemap True"
             )
 
-        if pcs_in_sourcemap:
-            # bootstrap an algod_client if not provided, and in either case, run a healthcheck
+        if pcs_in_sourcemap and algod_client is not None:
+            # run a healthcheck on the provided algod_client
             algod_client = algod_with_assertion(
                 algod_client, msg="Adding PC's to sourcemap requires live Algod"
             )
@@ -440,12 +480,16 @@ class Compilation:
             subroutine_end_blocks,
         )
 
+        if options.optimize.optimize_common_subexpressions(self.version):
+            for start in subroutine_start_blocks.values():
+                apply_common_subexpression_elimination(start)
+
         # note: optimizations are off by default, in which case, apply_global_optimizations
         # won't make any changes. Because the optimizer is invoked on a subroutine's
         # control flow graph, the optimizer requires context across block boundaries. This
         # is necessary for the dependency checking of local slots. Global slots, slots
         # used by DynamicScratchVar, and reserved slots are not optimized.
-        if options.optimize.optimize_scratch_slots(self.version):
+        if options.optimize.optimize_slots(self.version):
             options.optimize._skip_slots = collect_unoptimized_slots(
                 subroutine_start_blocks
             )
@@ -454,14 +498,25 @@ class Compilation:
 
         localSlotAssignments: Dict[
             Optional[SubroutineDefinition], Set[int]
-        ] = assignScratchSlotsToSubroutines(subroutine_start_blocks)
+        ] = assignScratchSlotsToSubroutines(
+            subroutine_start_blocks,
+            reuseSlots=options.optimize.reuse_slots(self.version),
+        )
+
+        liveAcrossCalls: Optional[Dict[int, Set[int]]] = None
+        if options.optimize.spill_live_slots(self.version):
+            liveAcrossCalls = findSlotsLiveAcrossCalls(subroutine_start_blocks)
 
         subroutineMapping: Dict[
             Optional[SubroutineDefinition], List[TealComponent]
         ] = sort_subroutine_blocks(subroutine_start_blocks, subroutine_end_blocks)
 
         spillLocalSlotsDuringRecursion(
-            self.version, subroutineMapping, subroutineGraph, localSlotAssignments
+            self.version,
+            subroutineMapping,
+            subroutineGraph,
+            localSlotAssignments,
+            liveAcrossCalls,
         )
 
         subroutineLabels = resolveSubroutines(subroutineMapping)
@@ -469,6 +524,11 @@ class Compilation:
             subroutineMapping, subroutineLabels, options
         )
 
+        if options.optimize.optimize_peephole(self.version):
+            components = apply_peephole_optimizations(
+                components, hits=options.optimize.peephole_hits
+            )
+
         verifyOpsForVersion(components, options.version)
         verifyOpsForMode(components, options.mode)
 
@@ -515,6 +575,13 @@ class Compilation:
         )
         full_cpb.sourcemapper = source_mapper
 
+        # The source mapper maps the same components that the teal was assembled from, and
+        # validates that every line of the source map matches a line of the teal. Compiling
+        # the program a second time to check that source mapping didn't affect the teal at
+        # all doubles the cost of the build, so it's only done when paranoid.
+        if not FeatureGates.sourcemap_paranoid():  # type: ignore[attr-defined]
+            return full_cpb
+
         # run a second time without, and assert that the same teal is produced
         with sourcemapping_off_context():
             assert NatalStackFrame.sourcemapping_is_off()
@@ -1161,6 +1161,57 @@ retsub
     assert actual == expected
 
 
+def test_compile_subroutine_recursive_spill_live_slots():
+    @pt.Subroutine(pt.TealType.uint64)
+    def sumOfDoubles(n: pt.Expr) -> pt.Expr:
+        doubled = pt.ScratchVar(pt.TealType.uint64)
+        return pt.Seq(
+            doubled.store(n * pt.Int(2)),
+            pt.If(n == pt.Int(0))
+            .Then(pt.Int(0))
+            .Else(doubled.load() + sumOfDoubles(n - pt.Int(1))),
+        )
+
+    program = pt.Return(sumOfDoubles(pt.Int(10)))
+
+    # neither n nor doubled is needed after the recursive call, so nothing is spilled
+    expected = """#pragma version 5
+int 10
+callsub sumOfDoubles_0
+return
+
+// sumOfDoubles
+sumOfDoubles_0:
+store 0
+load 0
+int 2
+*
+store 1
+load 0
+int 0
+==
+bnz sumOfDoubles_0_l2
+load 1
+load 0
+int 1
+-
+callsub sumOfDoubles_0
++
+b sumOfDoubles_0_l3
+sumOfDoubles_0_l2:
+int 0
+sumOfDoubles_0_l3:
+retsub
+    """.strip()
+    actual = pt.compileTeal(
+        program,
+        pt.Mode.Application,
+        version=5,
+        optimize=pt.OptimizeOptions(spill_live_slots=True),
+    )
+    assert actual == expected
+
+
 def test_compile_subroutine_recursive_multiple_args():
     @pt.Subroutine(pt.TealType.uint64)
     def multiplyByAdding(a, b):
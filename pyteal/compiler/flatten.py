@@ -11,6 +11,7 @@ from pyteal.ir import (
     TealBlock,
     TealSimpleBlock,
     TealConditionalBlock,
+    TealMultiwayBlock,
     LabelReference,
 )
 
@@ -36,11 +37,14 @@ def flattenBlocks(blocks: list[TealBlock]) -> list[TealComponent]:
             labelRefs[index] = LabelReference("l{}".format(index))
         return labelRefs[index]
 
+    # blocks are unhashable, so they are indexed by identity
+    indexById: dict[int, int] = {id(b): i for i, b in enumerate(blocks)}
+
     def blockIndexByReference(block: TealBlock) -> int:
-        for i, b in enumerate(blocks):
-            if block is b:
-                return i
-        raise ValueError("Block not present in list: {}".format(block))
+        index = indexById.get(id(block))
+        if index is None:
+            raise ValueError("Block not present in list: {}".format(block))
+        return index
 
     root_expr: Expr | None = None
     for i, block in enumerate(blocks):
@@ -87,6 +91,25 @@ def flattenBlocks(blocks: list[TealBlock]) -> list[TealComponent]:
             references[falseIndex] += 1
             add_if_new(falseIndex, i)
             code.append(TealOp(root_expr, Op.b, indexToLabel(falseIndex)))  # T2PT5
+
+        elif type(block) is TealMultiwayBlock:
+            assert block.defaultBlock is not None
+
+            targetLabels = []
+            for target in block.targets:
+                targetIndex = blockIndexByReference(target)
+                references[targetIndex] += 1
+                add_if_new(targetIndex, i)
+                targetLabels.append(indexToLabel(targetIndex))
+            code.append(TealOp(root_expr, block.op, *targetLabels))  # T2PT5
+
+            defaultIndex = blockIndexByReference(block.defaultBlock)
+            if defaultIndex != i + 1:
+                references[defaultIndex] += 1
+                add_if_new(defaultIndex, i)
+                code.append(
+                    TealOp(root_expr, Op.b, indexToLabel(defaultIndex))
+                )  # T2PT5
         else:
             raise TealInternalError("Unrecognized block type: {}".format(type(block)))
 
@@ -264,6 +264,72 @@ def test_flattenBlocks_multiple_branch_converge():
     assert actual == expected
 
 
+def test_flattenBlocks_multiway():
+    blockOne = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.byte, '"one"'), pt.TealOp(None, pt.Op.return_)]
+    )
+    blockTwo = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.byte, '"two"'), pt.TealOp(None, pt.Op.return_)]
+    )
+    blockDefault = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.err)])
+    block = pt.TealMultiwayBlock(
+        [
+            pt.TealOp(None, pt.Op.byte, '"one"'),
+            pt.TealOp(None, pt.Op.byte, '"two"'),
+            pt.TealOp(None, pt.Op.arg, 0),
+        ]
+    )
+    block.setTargets([blockOne, blockTwo])
+    block.setDefaultBlock(blockDefault)
+    block.addIncoming()
+    block.validateTree()
+    blocks = [block, blockDefault, blockOne, blockTwo]
+
+    expected = [
+        pt.TealOp(None, pt.Op.byte, '"one"'),
+        pt.TealOp(None, pt.Op.byte, '"two"'),
+        pt.TealOp(None, pt.Op.arg, 0),
+        pt.TealOp(None, pt.Op.match, pt.LabelReference("l2"), pt.LabelReference("l3")),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.byte, '"one"'),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, pt.LabelReference("l3")),
+        pt.TealOp(None, pt.Op.byte, '"two"'),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    actual = flattenBlocks(blocks)
+
+    assert actual == expected
+
+
+def test_flattenBlocks_multiway_default_not_next():
+    blockOne = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.byte, '"one"'), pt.TealOp(None, pt.Op.return_)]
+    )
+    blockDefault = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.err)])
+    block = pt.TealMultiwayBlock([pt.TealOp(None, pt.Op.int, 0)], pt.Op.switch)
+    block.setTargets([blockOne])
+    block.setDefaultBlock(blockDefault)
+    block.addIncoming()
+    block.validateTree()
+    blocks = [block, blockOne, blockDefault]
+
+    expected = [
+        pt.TealOp(None, pt.Op.int, 0),
+        pt.TealOp(None, pt.Op.switch, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.b, pt.LabelReference("l2")),
+        pt.TealLabel(None, pt.LabelReference("l1")),
+        pt.TealOp(None, pt.Op.byte, '"one"'),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, pt.LabelReference("l2")),
+        pt.TealOp(None, pt.Op.err),
+    ]
+    actual = flattenBlocks(blocks)
+
+    assert actual == expected
+
+
 def test_flattenSubroutines_no_subroutines():
     subroutineToLabel = OrderedDict()
 
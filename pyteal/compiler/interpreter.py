@@ -0,0 +1,2448 @@
+import base64
+import copy
+import operator
+from dataclasses import dataclass, field
+from math import isqrt
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from algosdk import encoding
+from Cryptodome.Hash import keccak
+from nacl.exceptions import BadSignatureError
+from nacl.signing import VerifyKey
+
+from pyteal.ast.constantfolding import (
+    MAX_BYTE_STRING_LENGTH,
+    MAX_UINT64,
+    _EVALUATORS,
+    _bytes_arg,
+    _Panic,
+    _uint64,
+    _uint64_arg,
+)
+from pyteal.ast.txn import TxnField
+from pyteal.compiler.assembler import (
+    _BYTES,
+    _BYTESES,
+    _INT8,
+    _LABEL,
+    _LABELS,
+    _OPCODES,
+    _UINT8,
+    _VARUINT,
+    _VARUINTS,
+    AssembledProgram,
+    assembleTeal,
+)
+from pyteal.compiler.optimizer.optimizer import _FIXED_STACK_EFFECTS
+from pyteal.compiler.optimizer.subexpressions import _OP_COSTS
+from pyteal.errors import TealInputError
+from pyteal.ir import Mode, Op
+
+StackValue = Union[int, bytes]
+TxnValue = Union[StackValue, List[StackValue]]
+
+MAX_STACK_HEIGHT = 1000
+MAX_LOG_CALLS = 32
+MAX_LOG_SIZE = 1024
+MAX_INNER_TRANSACTIONS = 256
+MAX_BOX_SIZE = 32768
+APP_CALL_BUDGET = 700
+LOGIC_SIG_BUDGET = 20000
+
+ZERO_ADDRESS = bytes(32)
+
+# ops which cost more than 1, in addition to the ones in _OP_COSTS
+_COSTS: Dict[str, int] = {
+    **{str(op): cost for op, cost in _OP_COSTS.items()},
+    "b+": 10,
+    "b-": 10,
+    "b|": 6,
+    "b&": 6,
+    "b^": 6,
+    "b~": 4,
+}
+
+_TXN_FIELDS: Dict[str, TxnField] = {f.arg_name: f for f in TxnField}
+
+# fields which hold an address, so they default to the zero address rather than an empty string
+_ADDRESS_FIELDS = {
+    "Sender",
+    "Receiver",
+    "CloseRemainderTo",
+    "AssetSender",
+    "AssetReceiver",
+    "AssetCloseTo",
+    "RekeyTo",
+    "ConfigAssetManager",
+    "ConfigAssetReserve",
+    "ConfigAssetFreeze",
+    "ConfigAssetClawback",
+    "FreezeAssetAccount",
+    "TxID",
+    "Lease",
+}
+
+# the array fields whose lengths are given by other fields
+_ARRAY_LENGTHS = {
+    "NumAppArgs": "ApplicationArgs",
+    "NumAccounts": "Accounts",
+    "NumAssets": "Assets",
+    "NumApplications": "Applications",
+    "NumLogs": "Logs",
+    "NumApprovalProgramPages": "ApprovalProgramPages",
+    "NumClearStateProgramPages": "ClearStateProgramPages",
+}
+
+_TXN_TYPES = {
+    b"unknown": 0,
+    b"pay": 1,
+    b"keyreg": 2,
+    b"acfg": 3,
+    b"axfer": 4,
+    b"afrz": 5,
+    b"appl": 6,
+}
+
+
+@dataclass
+class MockTransaction:
+    """A transaction for :any:`AVMInterpreter` to evaluate a program with.
+
+    Args:
+        fields: The fields of the transaction, keyed by their names in TEAL, such as
+            :code:`"Sender"` or :code:`"ApplicationArgs"`. Array fields are lists. Like the
+            transactions that algod evaluates, :code:`Accounts` and :code:`Applications` only list
+            the foreign accounts and applications, so :code:`txna Accounts 0` is the sender and
+            :code:`txna Applications 0` is the application ID. Fields which aren't given have the
+            zero value of their type, and the zero address for fields which hold an address.
+    """
+
+    fields: Dict[str, TxnValue] = field(default_factory=dict)
+
+    def value(self, name: str, index: Optional[int] = None) -> StackValue:
+        """Get the value of a field of this transaction, like the :code:`txn` and :code:`txna`
+        ops."""
+        if name in _ARRAY_LENGTHS:
+            return len(self._array(_ARRAY_LENGTHS[name]))
+
+        txnField = _TXN_FIELDS.get(name)
+        if txnField is None:
+            raise _Panic("unknown transaction field {}".format(name))
+
+        if txnField.is_array:
+            if index is None:
+                raise _Panic("{} is an array field".format(name))
+            if name == "Accounts":
+                values = [self.value("Sender")] + self._array(name)
+            elif name == "Applications":
+                values = [self.value("ApplicationID")] + self._array(name)
+            else:
+                values = self._array(name)
+            if index >= len(values):
+                raise _Panic("{} index {} is out of bounds".format(name, index))
+            return values[index]
+
+        if name in self.fields:
+            value = self.fields[name]
+            assert not isinstance(value, list)
+            return value
+        if name == "LastLog":
+            logs = self._array("Logs")
+            return logs[-1] if len(logs) != 0 else b""
+        if name == "TypeEnum" and "Type" in self.fields:
+            return _TXN_TYPES.get(_bytes_arg(self.value("Type")), 0)
+        if name == "Type" and "TypeEnum" in self.fields:
+            names = {enum: name for name, enum in _TXN_TYPES.items()}
+            return names.get(_uint64_arg(self.value("TypeEnum")), b"unknown")
+        if name in _ADDRESS_FIELDS:
+            return ZERO_ADDRESS
+        return 0 if txnField.ret_type.name == "uint64" else b""
+
+    def _array(self, name: str) -> List[StackValue]:
+        values = self.fields.get(name, [])
+        assert isinstance(values, list)
+        return values
+
+
+@dataclass
+class MockLedger:
+    """The state of the accounts, assets and applications that a program can read and change
+    while :any:`AVMInterpreter` evaluates it.
+
+    Args:
+        balances: The balance in microAlgos of each account, keyed by address.
+        min_balances: The minimum balance of each account, keyed by address.
+        global_state: The global state of each application, keyed by application ID.
+        local_state: The local state of each account in each application, keyed by
+            :code:`(address, application ID)`. An account is opted in to an application if it has
+            local state in it.
+        boxes: The boxes of each application, keyed by application ID and then by box name.
+        asset_holdings: The :code:`asset_holding_get` fields of each account for each asset, keyed
+            by :code:`(address, asset ID)` and then by field name, such as
+            :code:`"AssetBalance"`.
+        asset_params: The :code:`asset_params_get` fields of each asset, keyed by asset ID and
+            then by field name.
+        app_params: The :code:`app_params_get` fields of each application, keyed by application ID
+            and then by field name.
+        account_params: The :code:`acct_params_get` fields of each account, keyed by address and
+            then by field name.
+        globals: Values of :code:`global` fields, keyed by field name, which replace the values
+            the interpreter would otherwise use, such as :code:`"LatestTimestamp"`.
+    """
+
+    balances: Dict[bytes, int] = field(default_factory=dict)
+    min_balances: Dict[bytes, int] = field(default_factory=dict)
+    global_state: Dict[int, Dict[bytes, StackValue]] = field(default_factory=dict)
+    local_state: Dict[Tuple[bytes, int], Dict[bytes, StackValue]] = field(
+        default_factory=dict
+    )
+    boxes: Dict[int, Dict[bytes, bytes]] = field(default_factory=dict)
+    asset_holdings: Dict[Tuple[bytes, int], Dict[str, StackValue]] = field(
+        default_factory=dict
+    )
+    asset_params: Dict[int, Dict[str, StackValue]] = field(default_factory=dict)
+    app_params: Dict[int, Dict[str, StackValue]] = field(default_factory=dict)
+    account_params: Dict[bytes, Dict[str, StackValue]] = field(default_factory=dict)
+    globals: Dict[str, StackValue] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ExecutionResult:
+    """The outcome of evaluating a program with :any:`AVMInterpreter`.
+
+    Args:
+        approved: Whether the program approved the transaction.
+        error: A description of the error that stopped the program, or None if it finished.
+        stack: The values on the stack when the program stopped.
+        scratch: The values of the scratch slots when the program stopped.
+        logs: The values logged by the program.
+        cost: The opcode cost of the ops which the program executed.
+        inner_transactions: The inner transactions submitted by the program.
+        pc: The program counter of the last op which the program executed.
+        line: The line of TEAL of the last op which the program executed, if it was assembled from
+            TEAL.
+    """
+
+    approved: bool
+    error: Optional[str]
+    stack: List[StackValue]
+    scratch: List[StackValue]
+    logs: List[bytes]
+    cost: int
+    inner_transactions: List[MockTransaction]
+    pc: int
+    line: Optional[int] = None
+
+    def last_log(self) -> Optional[bytes]:
+        """Get the last value logged by the program, which holds the return value of an ABI
+        method."""
+        return self.logs[-1] if len(self.logs) != 0 else None
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """The outcomes of evaluating a program for many inputs with :any:`AVMInterpreter.run_batch`.
+
+    Each field holds one entry for each input, in the order of the inputs.
+
+    Args:
+        approved: Whether the program approved each input.
+        errors: The error that stopped the program for each input, or None if it finished.
+        stacks: The values on the stack when the program stopped.
+        scratch: The values of the scratch slots when the program stopped.
+        logs: The values logged by the program.
+        costs: The opcode cost of the ops which the program executed.
+        inner_transactions: The inner transactions submitted by the program.
+        pcs: The program counter of the last op which the program executed.
+        lines: The line of TEAL of the last op which the program executed, if it was assembled
+            from TEAL.
+    """
+
+    approved: List[bool]
+    errors: List[Optional[str]]
+    stacks: List[List[StackValue]]
+    scratch: List[List[StackValue]]
+    logs: List[List[bytes]]
+    costs: List[int]
+    inner_transactions: List[List[MockTransaction]]
+    pcs: List[int]
+    lines: List[Optional[int]]
+
+    def __len__(self) -> int:
+        return len(self.approved)
+
+    def result(self, lane: int) -> ExecutionResult:
+        """Get the outcome of evaluating the program for the input at index lane."""
+        return ExecutionResult(
+            approved=self.approved[lane],
+            error=self.errors[lane],
+            stack=self.stacks[lane],
+            scratch=self.scratch[lane],
+            logs=self.logs[lane],
+            cost=self.costs[lane],
+            inner_transactions=self.inner_transactions[lane],
+            pc=self.pcs[lane],
+            line=self.lines[lane],
+        )
+
+
+class _Frame:
+    __slots__ = ("returnIndex", "height", "args", "returns")
+
+    def __init__(self, returnIndex: int, height: int) -> None:
+        self.returnIndex = returnIndex
+        self.height = height
+        self.args = 0
+        self.returns: Optional[int] = None
+
+
+# a key of a value of global state, local state or a box
+_StateKey = Tuple[Any, ...]
+
+# a value that has been deleted from state
+_DELETED = object()
+
+
+def _app_id(txn: MockTransaction) -> int:
+    appID = txn.value("ApplicationID")
+    if appID == 0:
+        appID = txn.value("CreatedApplicationID")
+    return _uint64_arg(appID)
+
+
+class _Context:
+    """The state of one evaluation of a program."""
+
+    def __init__(
+        self,
+        interpreter: "AVMInterpreter",
+        group: Sequence[MockTransaction],
+        groupIndex: int,
+        ledger: MockLedger,
+        args: Sequence[bytes],
+        budget: int,
+    ) -> None:
+        self.interpreter = interpreter
+        self.group = group
+        self.txn = group[groupIndex]
+        self.groupIndex = groupIndex
+        self.ledger = ledger
+        self.args = args
+        self.budget = budget
+
+        self.stack: List[StackValue] = []
+        self.scratch: List[StackValue] = [0] * 256
+        self.frames: List[_Frame] = []
+        self.intcblock: List[int] = []
+        self.bytecblock: List[bytes] = []
+        self.logs: List[bytes] = []
+        self.logSize = 0
+        self.cost = 0
+        # the value passed to return, or None if the program hasn't returned
+        self.returned: Optional[StackValue] = None
+
+        # changes to state, which are only applied to the ledger if the program approves
+        self.writes: Dict[_StateKey, Any] = dict()
+
+        self.innerTransactions: List[MockTransaction] = []
+        self.pendingGroup: Optional[List[MockTransaction]] = None
+        self.lastInnerGroup: List[MockTransaction] = []
+
+        self.appID = _app_id(self.txn)
+
+    def read(self, key: _StateKey, stored: Dict[Any, Any], storedKey: Any) -> Any:
+        value = self.writes.get(key)
+        if value is None:
+            return stored.get(storedKey)
+        return None if value is _DELETED else value
+
+    def commit(self) -> None:
+        ledger = self.ledger
+        for key, value in self.writes.items():
+            kind = key[0]
+            target: Dict[Any, Any]
+            if kind == "global":
+                target = ledger.global_state.setdefault(key[1], dict())
+            elif kind == "local":
+                target = ledger.local_state.setdefault((key[1], key[2]), dict())
+            else:
+                target = ledger.boxes.setdefault(key[1], dict())
+            if value is _DELETED:
+                target.pop(key[-1], None)
+            else:
+                target[key[-1]] = value
+
+
+# Handlers evaluate one op. Ops which change control flow return the index of the next op to
+# execute.
+_Handler = Callable[[_Context, Tuple[Any, ...]], Optional[int]]
+
+
+def _pop_uint64(ctx: _Context) -> int:
+    return _uint64_arg(ctx.stack.pop())
+
+
+def _pop_bytes(ctx: _Context) -> bytes:
+    return _bytes_arg(ctx.stack.pop())
+
+
+def _app_address(appID: int) -> bytes:
+    return encoding.checksum(b"appID" + appID.to_bytes(8, "big"))
+
+
+def _account(ctx: _Context, ref: StackValue) -> bytes:
+    """Resolve an account reference, which is an address or an index into the Accounts array."""
+    if isinstance(ref, bytes):
+        if len(ref) != 32:
+            raise _Panic("invalid account: {!r}".format(ref))
+        return ref
+    return _bytes_arg(ctx.txn.value("Accounts", ref))
+
+
+def _application(ctx: _Context, ref: StackValue) -> int:
+    """Resolve an application reference, which is an application ID or an index into the
+    Applications array."""
+    ref = _uint64_arg(ref)
+    foreign = ctx.txn._array("Applications")
+    if ref == 0:
+        return ctx.appID
+    if ref in foreign or ref == ctx.appID:
+        return ref
+    if ref <= len(foreign):
+        return _uint64_arg(foreign[ref - 1])
+    return ref
+
+
+def _asset(ctx: _Context, ref: StackValue) -> int:
+    """Resolve an asset reference, which is an asset ID or an index into the Assets array."""
+    ref = _uint64_arg(ref)
+    foreign = ctx.txn._array("Assets")
+    if ref not in foreign and ref < len(foreign):
+        return _uint64_arg(foreign[ref])
+    return ref
+
+
+def _global(ctx: _Context, name: str) -> StackValue:
+    if name in ctx.ledger.globals:
+        return ctx.ledger.globals[name]
+    if name == "GroupSize":
+        return len(ctx.group)
+    if name == "OpcodeBudget":
+        return max(ctx.budget - ctx.cost, 0)
+    if name == "CurrentApplicationID":
+        return ctx.appID
+    if name == "CurrentApplicationAddress":
+        return _app_address(ctx.appID)
+    if name == "CreatorAddress":
+        params = ctx.ledger.app_params.get(ctx.appID, dict())
+        return params.get("AppCreator", ZERO_ADDRESS)
+    if name == "LogicSigVersion":
+        return ctx.interpreter.version
+    defaults: Dict[str, StackValue] = {
+        "MinTxnFee": 1000,
+        "MinBalance": 100000,
+        "MaxTxnLife": 1000,
+        "AssetCreateMinBalance": 100000,
+        "AssetOptInMinBalance": 100000,
+    }
+    if name in defaults:
+        return defaults[name]
+    if name in ("ZeroAddress", "GroupID", "CallerApplicationAddress", "GenesisHash"):
+        return ZERO_ADDRESS
+    return 0
+
+
+def _pure(op: Op) -> _Handler:
+    evaluator = _EVALUATORS[op]
+    pops = _FIXED_STACK_EFFECTS[op][0]
+
+    if pops == 1:
+
+        def unary(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+            ctx.stack.append(evaluator((ctx.stack.pop(),)))
+
+        return unary
+
+    assert pops == 2
+
+    def binary(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        stack = ctx.stack
+        b = stack.pop()
+        stack.append(evaluator((stack.pop(), b)))
+
+    return binary
+
+
+def _branch(condition: Optional[bool]) -> _Handler:
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> Optional[int]:
+        if condition is None or (_pop_uint64(ctx) != 0) == condition:
+            return imm[0]
+        return None
+
+    return handler
+
+
+def _callsub(ctx: _Context, imm: Tuple[Any, ...]) -> int:
+    target, returnIndex = imm
+    ctx.frames.append(_Frame(returnIndex, len(ctx.stack)))
+    return target
+
+
+def _retsub(ctx: _Context, imm: Tuple[Any, ...]) -> int:
+    if len(ctx.frames) == 0:
+        raise _Panic("retsub with empty callstack")
+    frame = ctx.frames.pop()
+    if frame.returns is not None:
+        if len(ctx.stack) < frame.height + frame.returns:
+            raise _Panic("retsub executed with stack below frame")
+        returned = ctx.stack[len(ctx.stack) - frame.returns :]
+        del ctx.stack[frame.height - frame.args :]
+        ctx.stack.extend(returned)
+    return frame.returnIndex
+
+
+def _proto(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if len(ctx.frames) == 0:
+        raise _Panic("proto with empty callstack")
+    frame = ctx.frames[-1]
+    args, returns = imm
+    if frame.height < args:
+        raise _Panic("callsub to proto that requires {} args".format(args))
+    frame.args = args
+    frame.returns = returns
+
+
+def _frame_index(ctx: _Context, depth: int) -> int:
+    if len(ctx.frames) == 0 or ctx.frames[-1].returns is None:
+        raise _Panic("frame op without proto")
+    frame = ctx.frames[-1]
+    index = frame.height + depth
+    if index < frame.height - frame.args or index >= len(ctx.stack):
+        raise _Panic("frame op at depth {} is outside of the frame".format(depth))
+    return index
+
+
+def _frame_dig(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(ctx.stack[_frame_index(ctx, imm[0])])
+
+
+def _frame_bury(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = ctx.stack.pop()
+    ctx.stack[_frame_index(ctx, imm[0])] = value
+
+
+def _switch(ctx: _Context, imm: Tuple[Any, ...]) -> Optional[int]:
+    index = _pop_uint64(ctx)
+    if index < len(imm[0]):
+        return imm[0][index]
+    return None
+
+
+def _match(ctx: _Context, imm: Tuple[Any, ...]) -> Optional[int]:
+    targets = imm[0]
+    value = ctx.stack.pop()
+    if len(ctx.stack) < len(targets):
+        raise IndexError
+    cases = ctx.stack[len(ctx.stack) - len(targets) :]
+    del ctx.stack[len(ctx.stack) - len(targets) :]
+    for case, target in zip(cases, targets):
+        if type(case) is type(value) and case == value:
+            return target
+    return None
+
+
+def _return(ctx: _Context, imm: Tuple[Any, ...]) -> int:
+    ctx.returned = ctx.stack[-1]
+    del ctx.stack[:-1]
+    return len(ctx.interpreter._instructions)
+
+
+def _assert(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if _pop_uint64(ctx) == 0:
+        raise _Panic("assert failed")
+
+
+def _err(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    raise _Panic("err opcode executed")
+
+
+def _push(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(imm[0])
+
+
+def _push_all(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.extend(imm[0])
+
+
+def _intcblock(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.intcblock = imm[0]
+
+
+def _bytecblock(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.bytecblock = imm[0]
+
+
+def _constant(block: str, fixedIndex: Optional[int]) -> _Handler:
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        index = imm[0] if fixedIndex is None else fixedIndex
+        constants: Sequence[StackValue]
+        if block == "int":
+            constants = ctx.intcblock
+        else:
+            constants = ctx.bytecblock
+        if index >= len(constants):
+            raise _Panic("{}c {} is beyond the constant block".format(block, index))
+        ctx.stack.append(constants[index])
+
+    return handler
+
+
+def _arg(fixedIndex: Optional[int]) -> _Handler:
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        if fixedIndex is not None:
+            index = fixedIndex
+        elif len(imm) != 0:
+            index = imm[0]
+        else:
+            index = _pop_uint64(ctx)
+        if index >= len(ctx.args):
+            raise _Panic("arg {} is beyond the {} args".format(index, len(ctx.args)))
+        ctx.stack.append(ctx.args[index])
+
+    return handler
+
+
+def _pop(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.pop()
+
+
+def _popn(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if len(ctx.stack) < imm[0]:
+        raise IndexError
+    del ctx.stack[len(ctx.stack) - imm[0] :]
+
+
+def _dup(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(ctx.stack[-1])
+
+
+def _dup2(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if len(ctx.stack) < 2:
+        raise IndexError
+    ctx.stack.extend(ctx.stack[-2:])
+
+
+def _dupn(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.extend([ctx.stack[-1]] * imm[0])
+
+
+def _depth(ctx: _Context, depth: int) -> int:
+    """Get the index of the value depth positions below the top of the stack."""
+    index = len(ctx.stack) - 1 - depth
+    if index < 0:
+        raise IndexError
+    return index
+
+
+def _dig(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(ctx.stack[_depth(ctx, imm[0])])
+
+
+def _bury(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if imm[0] == 0:
+        raise _Panic("bury 0 is not allowed")
+    index = _depth(ctx, imm[0])
+    ctx.stack[index] = ctx.stack.pop()
+
+
+def _swap(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    stack = ctx.stack
+    if len(stack) < 2:
+        raise IndexError
+    stack[-1], stack[-2] = stack[-2], stack[-1]
+
+
+def _select(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    condition = _pop_uint64(ctx)
+    second = ctx.stack.pop()
+    first = ctx.stack.pop()
+    ctx.stack.append(second if condition != 0 else first)
+
+
+def _cover(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    index = _depth(ctx, imm[0])
+    ctx.stack.insert(index, ctx.stack.pop())
+
+
+def _uncover(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    index = _depth(ctx, imm[0])
+    ctx.stack.append(ctx.stack.pop(index))
+
+
+def _load(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(ctx.scratch[imm[0]])
+
+
+def _store(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.scratch[imm[0]] = ctx.stack.pop()
+
+
+def _slot(ctx: _Context) -> int:
+    slot = _pop_uint64(ctx)
+    if slot >= 256:
+        raise _Panic("invalid scratch slot {}".format(slot))
+    return slot
+
+
+def _loads(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(ctx.scratch[_slot(ctx)])
+
+
+def _stores(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = ctx.stack.pop()
+    ctx.scratch[_slot(ctx)] = value
+
+
+def _mulw(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    b = _pop_uint64(ctx)
+    a = _pop_uint64(ctx)
+    ctx.stack.extend(divmod(a * b, 2**64))
+
+
+def _addw(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    b = _pop_uint64(ctx)
+    a = _pop_uint64(ctx)
+    ctx.stack.extend(divmod(a + b, 2**64))
+
+
+def _divmodw(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    divisorLow = _pop_uint64(ctx)
+    divisorHigh = _pop_uint64(ctx)
+    low = _pop_uint64(ctx)
+    high = _pop_uint64(ctx)
+    divisor = (divisorHigh << 64) | divisorLow
+    if divisor == 0:
+        raise _Panic("division by zero")
+    quotient, remainder = divmod((high << 64) | low, divisor)
+    ctx.stack.extend(divmod(quotient, 2**64))
+    ctx.stack.extend(divmod(remainder, 2**64))
+
+
+def _divw(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    divisor = _pop_uint64(ctx)
+    low = _pop_uint64(ctx)
+    high = _pop_uint64(ctx)
+    if divisor == 0:
+        raise _Panic("division by zero")
+    ctx.stack.append(_uint64(((high << 64) | low) // divisor))
+
+
+def _expw(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    b = _pop_uint64(ctx)
+    a = _pop_uint64(ctx)
+    if a == 0 and b == 0:
+        raise _Panic("0 to the power of 0")
+    if a > 1 and b >= 128:
+        raise _Panic("overflow")
+    result = a**b
+    if result >= 2**128:
+        raise _Panic("overflow")
+    ctx.stack.extend(divmod(result, 2**64))
+
+
+def _keccak256(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(keccak.new(digest_bits=256, data=_pop_bytes(ctx)).digest())
+
+
+def _ed25519verify(bare: bool) -> _Handler:
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        key = _pop_bytes(ctx)
+        signature = _pop_bytes(ctx)
+        data = _pop_bytes(ctx)
+        if len(key) != 32 or len(signature) != 64:
+            raise _Panic("invalid public key or signature length")
+        if not bare:
+            data = b"ProgData" + ctx.interpreter.program_hash() + data
+        try:
+            VerifyKey(key).verify(data, signature)
+            ctx.stack.append(1)
+        except BadSignatureError:
+            ctx.stack.append(0)
+
+    return handler
+
+
+def _substring(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if len(imm) == 2:
+        start, end = imm
+    else:
+        end = _pop_uint64(ctx)
+        start = _pop_uint64(ctx)
+    value = _pop_bytes(ctx)
+    if not start <= end <= len(value):
+        raise _Panic("substring range is out of bounds")
+    ctx.stack.append(value[start:end])
+
+
+def _extract(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if len(imm) == 2:
+        start, length = imm
+        value = _pop_bytes(ctx)
+        if length == 0:
+            # extract with a length of 0 extracts the rest of the value
+            length = len(value) - start
+    else:
+        length = _pop_uint64(ctx)
+        start = _pop_uint64(ctx)
+        value = _pop_bytes(ctx)
+    if start + length > len(value) or length < 0:
+        raise _Panic("extraction range is out of bounds")
+    ctx.stack.append(value[start : start + length])
+
+
+def _replace(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    replacement = _pop_bytes(ctx)
+    start = imm[0] if len(imm) == 1 else _pop_uint64(ctx)
+    value = _pop_bytes(ctx)
+    if start + len(replacement) > len(value):
+        raise _Panic("replacement range is out of bounds")
+    ctx.stack.append(value[:start] + replacement + value[start + len(replacement) :])
+
+
+def _getbit(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    index = _pop_uint64(ctx)
+    value = ctx.stack.pop()
+    if isinstance(value, int):
+        if index >= 64:
+            raise _Panic("getbit index is beyond 64 bits")
+        ctx.stack.append((value >> index) & 1)
+        return
+    if index >= len(value) * 8:
+        raise _Panic("getbit index is beyond the byte string")
+    ctx.stack.append((value[index // 8] >> (7 - index % 8)) & 1)
+
+
+def _setbit(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    bit = _pop_uint64(ctx)
+    index = _pop_uint64(ctx)
+    value = ctx.stack.pop()
+    if bit > 1:
+        raise _Panic("setbit value must be 0 or 1")
+    if isinstance(value, int):
+        if index >= 64:
+            raise _Panic("setbit index is beyond 64 bits")
+        ctx.stack.append((value & ~(1 << index)) | (bit << index))
+        return
+    if index >= len(value) * 8:
+        raise _Panic("setbit index is beyond the byte string")
+    updated = bytearray(value)
+    mask = 1 << (7 - index % 8)
+    updated[index // 8] = (updated[index // 8] & ~mask) | (mask if bit else 0)
+    ctx.stack.append(bytes(updated))
+
+
+def _setbyte(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    byte = _pop_uint64(ctx)
+    index = _pop_uint64(ctx)
+    value = _pop_bytes(ctx)
+    if byte > 0xFF:
+        raise _Panic("setbyte value is beyond 255")
+    if index >= len(value):
+        raise _Panic("setbyte index is beyond the byte string")
+    ctx.stack.append(value[:index] + bytes([byte]) + value[index + 1 :])
+
+
+def _base64_decode(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _pop_bytes(ctx)
+    padded = value + b"=" * (-len(value) % 4)
+    try:
+        if imm[0] == "URLEncoding":
+            decoded = base64.urlsafe_b64decode(padded)
+        else:
+            decoded = base64.b64decode(padded, validate=True)
+    except ValueError:
+        raise _Panic("invalid base64 value")
+    ctx.stack.append(decoded)
+
+
+def _big(value: StackValue) -> int:
+    value = _bytes_arg(value)
+    if len(value) > 64:
+        raise _Panic("byte math argument is longer than 64 bytes")
+    return int.from_bytes(value, "big")
+
+
+def _to_big(value: int) -> bytes:
+    return value.to_bytes((value.bit_length() + 7) // 8, "big")
+
+
+def _byte_math(f: Callable[[int, int], int]) -> _Handler:
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        b = _big(ctx.stack.pop())
+        a = _big(ctx.stack.pop())
+        ctx.stack.append(_to_big(f(a, b)))
+
+    return handler
+
+
+def _byte_compare(f: Callable[[int, int], bool]) -> _Handler:
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        b = _big(ctx.stack.pop())
+        a = _big(ctx.stack.pop())
+        ctx.stack.append(int(f(a, b)))
+
+    return handler
+
+
+def _byte_bitwise(f: Callable[[int, int], int]) -> _Handler:
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        b = _pop_bytes(ctx)
+        a = _pop_bytes(ctx)
+        # the shorter value is zero padded on the left, and the result is as long as the longer
+        length = max(len(a), len(b))
+        result = f(int.from_bytes(a, "big"), int.from_bytes(b, "big"))
+        ctx.stack.append(result.to_bytes(length, "big"))
+
+    return handler
+
+
+def _big_sub(a: int, b: int) -> int:
+    if b > a:
+        raise _Panic("byte math underflow")
+    return a - b
+
+
+def _big_div(a: int, b: int) -> int:
+    if b == 0:
+        raise _Panic("division by zero")
+    return a // b
+
+
+def _big_mod(a: int, b: int) -> int:
+    if b == 0:
+        raise _Panic("modulo by zero")
+    return a % b
+
+
+def _b_not(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _pop_bytes(ctx)
+    ctx.stack.append(bytes(~b & 0xFF for b in value))
+
+
+def _bsqrt(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(_to_big(isqrt(_big(ctx.stack.pop()))))
+
+
+def _log(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _pop_bytes(ctx)
+    ctx.logSize += len(value)
+    if len(ctx.logs) >= MAX_LOG_CALLS:
+        raise _Panic("too many log calls")
+    if ctx.logSize > MAX_LOG_SIZE:
+        raise _Panic("logs are longer than {} bytes".format(MAX_LOG_SIZE))
+    ctx.logs.append(value)
+
+
+def _txn_handler(name: str) -> _Handler:
+    """Make a handler for an op which reads a transaction field. The name of the op determines
+    where the transaction and the array index come from."""
+    group = name.startswith("g") and not name.startswith("gitxn")
+    stackGroup = name.startswith("gtxns")
+    inner = "itxn" in name
+    indexed = name.endswith("a")
+    stackIndex = name.endswith("as")
+
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        imm = tuple(imm)
+        index: Optional[int] = None
+        if stackIndex:
+            index = _pop_uint64(ctx)
+        elif indexed:
+            imm, index = imm[:-1], imm[-1]
+
+        if stackGroup:
+            position = _pop_uint64(ctx)
+            fieldName = imm[0]
+        elif group or name.startswith("gitxn"):
+            position, fieldName = imm
+        else:
+            position, fieldName = -1, imm[0]
+
+        if inner:
+            transactions = ctx.lastInnerGroup
+            if len(transactions) == 0:
+                raise _Panic("no inner transaction has been submitted")
+        elif group or stackGroup:
+            transactions = list(ctx.group)
+        else:
+            transactions = [ctx.txn]
+
+        if position >= len(transactions):
+            raise _Panic("transaction {} is beyond the group".format(position))
+        if fieldName == "GroupIndex" and not inner:
+            ctx.stack.append(ctx.groupIndex if position == -1 else position)
+            return
+        ctx.stack.append(transactions[position].value(fieldName, index))
+
+    return handler
+
+
+def _global_handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.stack.append(_global(ctx, imm[0]))
+
+
+def _balance(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    account = _account(ctx, ctx.stack.pop())
+    ctx.stack.append(ctx.ledger.balances.get(account, 0))
+
+
+def _min_balance(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    account = _account(ctx, ctx.stack.pop())
+    ctx.stack.append(ctx.ledger.min_balances.get(account, 0))
+
+
+def _opted_in(ctx: _Context, account: bytes, appID: int) -> bool:
+    return (account, appID) in ctx.ledger.local_state
+
+
+def _app_opted_in(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    appID = _application(ctx, ctx.stack.pop())
+    account = _account(ctx, ctx.stack.pop())
+    ctx.stack.append(int(_opted_in(ctx, account, appID)))
+
+
+def _local(ctx: _Context, account: bytes, appID: int, key: bytes) -> Any:
+    if not _opted_in(ctx, account, appID):
+        raise _Panic("account is not opted in to application {}".format(appID))
+    stored = ctx.ledger.local_state.get((account, appID), dict())
+    return ctx.read(("local", account, appID, key), stored, key)
+
+
+def _app_local_get(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    key = _pop_bytes(ctx)
+    account = _account(ctx, ctx.stack.pop())
+    value = _local(ctx, account, ctx.appID, key)
+    ctx.stack.append(0 if value is None else value)
+
+
+def _app_local_get_ex(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    key = _pop_bytes(ctx)
+    appID = _application(ctx, ctx.stack.pop())
+    account = _account(ctx, ctx.stack.pop())
+    value = _local(ctx, account, appID, key) if _opted_in(ctx, account, appID) else None
+    ctx.stack.extend([0, 0] if value is None else [value, 1])
+
+
+def _global_state(ctx: _Context, appID: int, key: bytes) -> Any:
+    stored = ctx.ledger.global_state.get(appID, dict())
+    return ctx.read(("global", appID, key), stored, key)
+
+
+def _app_global_get(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _global_state(ctx, ctx.appID, _pop_bytes(ctx))
+    ctx.stack.append(0 if value is None else value)
+
+
+def _app_global_get_ex(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    key = _pop_bytes(ctx)
+    appID = _application(ctx, ctx.stack.pop())
+    value = _global_state(ctx, appID, key)
+    ctx.stack.extend([0, 0] if value is None else [value, 1])
+
+
+def _state_value(value: StackValue) -> StackValue:
+    if isinstance(value, bytes) and len(value) > 128:
+        raise _Panic("state value is longer than 128 bytes")
+    return value
+
+
+def _state_key(key: bytes) -> bytes:
+    if len(key) > 64:
+        raise _Panic("state key is longer than 64 bytes")
+    return key
+
+
+def _app_local_put(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _state_value(ctx.stack.pop())
+    key = _state_key(_pop_bytes(ctx))
+    account = _account(ctx, ctx.stack.pop())
+    if not _opted_in(ctx, account, ctx.appID):
+        raise _Panic("account is not opted in to application {}".format(ctx.appID))
+    ctx.writes[("local", account, ctx.appID, key)] = value
+
+
+def _app_global_put(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _state_value(ctx.stack.pop())
+    key = _state_key(_pop_bytes(ctx))
+    ctx.writes[("global", ctx.appID, key)] = value
+
+
+def _app_local_del(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    key = _pop_bytes(ctx)
+    account = _account(ctx, ctx.stack.pop())
+    if not _opted_in(ctx, account, ctx.appID):
+        raise _Panic("account is not opted in to application {}".format(ctx.appID))
+    ctx.writes[("local", account, ctx.appID, key)] = _DELETED
+
+
+def _app_global_del(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    ctx.writes[("global", ctx.appID, _pop_bytes(ctx))] = _DELETED
+
+
+def _params(
+    lookup: Callable[[_Context, StackValue], Optional[Dict[str, StackValue]]],
+    defaults: Dict[str, StackValue],
+) -> _Handler:
+    """Make a handler for an op which reads a field of an account, asset or application, and
+    pushes the field and whether it exists."""
+
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        params = lookup(ctx, ctx.stack.pop())
+        fieldName = imm[0]
+        if params is None:
+            ctx.stack.extend([defaults.get(fieldName, 0), 0])
+            return
+        ctx.stack.extend([params.get(fieldName, defaults.get(fieldName, 0)), 1])
+
+    return handler
+
+
+def _asset_holding(ctx: _Context, ref: StackValue) -> Optional[Dict[str, StackValue]]:
+    assetID = _asset(ctx, ref)
+    account = _account(ctx, ctx.stack.pop())
+    return ctx.ledger.asset_holdings.get((account, assetID))
+
+
+def _asset_params(ctx: _Context, ref: StackValue) -> Optional[Dict[str, StackValue]]:
+    return ctx.ledger.asset_params.get(_asset(ctx, ref))
+
+
+def _app_params(ctx: _Context, ref: StackValue) -> Optional[Dict[str, StackValue]]:
+    appID = _application(ctx, ref)
+    params = ctx.ledger.app_params.get(appID)
+    if params is None:
+        return None
+    return {"AppAddress": _app_address(appID), **params}
+
+
+def _account_params(ctx: _Context, ref: StackValue) -> Optional[Dict[str, StackValue]]:
+    account = _account(ctx, ref)
+    params = ctx.ledger.account_params.get(account)
+    if params is None and account not in ctx.ledger.balances:
+        return None
+    return {
+        "AcctBalance": ctx.ledger.balances.get(account, 0),
+        "AcctMinBalance": ctx.ledger.min_balances.get(account, 0),
+        **(params or dict()),
+    }
+
+
+# the values of address fields for accounts, assets and applications which don't set them
+_ADDRESS_PARAMS: Dict[str, StackValue] = {
+    name: ZERO_ADDRESS
+    for name in (
+        "AssetManager",
+        "AssetReserve",
+        "AssetFreeze",
+        "AssetClawback",
+        "AssetCreator",
+        "AppCreator",
+        "AppAddress",
+        "AcctAuthAddr",
+    )
+}
+_BYTES_PARAMS: Dict[str, StackValue] = {
+    name: b""
+    for name in (
+        "AssetUnitName",
+        "AssetName",
+        "AssetURL",
+        "AssetMetadataHash",
+        "AppApprovalProgram",
+        "AppClearStateProgram",
+    )
+}
+_PARAM_DEFAULTS = {**_ADDRESS_PARAMS, **_BYTES_PARAMS}
+
+
+def _box_name(ctx: _Context) -> bytes:
+    name = _pop_bytes(ctx)
+    if not 1 <= len(name) <= 64:
+        raise _Panic("box names must be 1 to 64 bytes long")
+    return name
+
+
+def _box(ctx: _Context, name: bytes) -> Optional[bytes]:
+    return ctx.read(("box", ctx.appID, name), ctx.ledger.boxes.get(ctx.appID, {}), name)
+
+
+def _existing_box(ctx: _Context, name: bytes) -> bytes:
+    box = _box(ctx, name)
+    if box is None:
+        raise _Panic("no such box: {!r}".format(name))
+    return box
+
+
+def _box_size(size: int) -> int:
+    if size > MAX_BOX_SIZE:
+        raise _Panic("box size is larger than {} bytes".format(MAX_BOX_SIZE))
+    return size
+
+
+def _box_create(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    size = _box_size(_pop_uint64(ctx))
+    name = _box_name(ctx)
+    existing = _box(ctx, name)
+    if existing is not None:
+        if len(existing) != size:
+            raise _Panic("box {!r} already exists with a different size".format(name))
+        ctx.stack.append(0)
+        return
+    ctx.writes[("box", ctx.appID, name)] = bytes(size)
+    ctx.stack.append(1)
+
+
+def _box_extract(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    length = _pop_uint64(ctx)
+    start = _pop_uint64(ctx)
+    box = _existing_box(ctx, _box_name(ctx))
+    if start + length > len(box):
+        raise _Panic("box extraction range is out of bounds")
+    ctx.stack.append(box[start : start + length])
+
+
+def _box_replace(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _pop_bytes(ctx)
+    start = _pop_uint64(ctx)
+    name = _box_name(ctx)
+    box = _existing_box(ctx, name)
+    if start + len(value) > len(box):
+        raise _Panic("box replacement range is out of bounds")
+    ctx.writes[("box", ctx.appID, name)] = (
+        box[:start] + value + box[start + len(value) :]
+    )
+
+
+def _box_splice(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _pop_bytes(ctx)
+    length = _pop_uint64(ctx)
+    start = _pop_uint64(ctx)
+    name = _box_name(ctx)
+    box = _existing_box(ctx, name)
+    if start > len(box):
+        raise _Panic("box splice start is beyond the box")
+    spliced = box[:start] + value + box[min(start + length, len(box)) :]
+    # the box keeps its size, so the result is truncated or zero padded
+    ctx.writes[("box", ctx.appID, name)] = spliced[: len(box)].ljust(len(box), b"\0")
+
+
+def _box_resize(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    size = _box_size(_pop_uint64(ctx))
+    name = _box_name(ctx)
+    box = _existing_box(ctx, name)
+    ctx.writes[("box", ctx.appID, name)] = box[:size].ljust(size, b"\0")
+
+
+def _box_del(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    name = _box_name(ctx)
+    if _box(ctx, name) is None:
+        ctx.stack.append(0)
+        return
+    ctx.writes[("box", ctx.appID, name)] = _DELETED
+    ctx.stack.append(1)
+
+
+def _box_len(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    box = _box(ctx, _box_name(ctx))
+    ctx.stack.extend([0, 0] if box is None else [len(box), 1])
+
+
+def _box_get(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    box = _box(ctx, _box_name(ctx))
+    ctx.stack.extend([b"", 0] if box is None else [box, 1])
+
+
+def _box_put(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    value = _pop_bytes(ctx)
+    name = _box_name(ctx)
+    box = _box(ctx, name)
+    if box is not None and len(box) != len(value):
+        raise _Panic("box_put value must be as long as box {!r}".format(name))
+    ctx.writes[("box", ctx.appID, name)] = value[: _box_size(len(value))]
+
+
+def _itxn_begin(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if ctx.pendingGroup is not None:
+        raise _Panic("itxn_begin without itxn_submit")
+    ctx.pendingGroup = [_new_inner_transaction(ctx)]
+
+
+def _itxn_next(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if ctx.pendingGroup is None:
+        raise _Panic("itxn_next without itxn_begin")
+    ctx.pendingGroup.append(_new_inner_transaction(ctx))
+
+
+def _new_inner_transaction(ctx: _Context) -> MockTransaction:
+    return MockTransaction(
+        {"Sender": _app_address(ctx.appID), "Fee": _global(ctx, "MinTxnFee")}
+    )
+
+
+def _itxn_field(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if ctx.pendingGroup is None:
+        raise _Panic("itxn_field without itxn_begin")
+    value = ctx.stack.pop()
+    fieldName = imm[0]
+    fields = ctx.pendingGroup[-1].fields
+    if _TXN_FIELDS[fieldName].is_array:
+        values = fields.setdefault(fieldName, [])
+        assert isinstance(values, list)
+        values.append(value)
+    else:
+        fields[fieldName] = value
+
+
+def _itxn_submit(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+    if ctx.pendingGroup is None:
+        raise _Panic("itxn_submit without itxn_begin")
+    if len(ctx.innerTransactions) + len(ctx.pendingGroup) > MAX_INNER_TRANSACTIONS:
+        raise _Panic("too many inner transactions")
+    ctx.innerTransactions.extend(ctx.pendingGroup)
+    ctx.lastInnerGroup = ctx.pendingGroup
+    ctx.pendingGroup = None
+
+
+def _unsupported(name: str) -> _Handler:
+    def handler(ctx: _Context, imm: Tuple[Any, ...]) -> None:
+        raise _Panic("{} is not supported by the interpreter".format(name))
+
+    return handler
+
+
+_HANDLERS: Dict[str, _Handler] = {
+    **{str(op): _pure(op) for op in _EVALUATORS},
+    "err": _err,
+    "keccak256": _keccak256,
+    "ed25519verify": _ed25519verify(False),
+    "ed25519verify_bare": _ed25519verify(True),
+    "mulw": _mulw,
+    "addw": _addw,
+    "divmodw": _divmodw,
+    "divw": _divw,
+    "expw": _expw,
+    "intcblock": _intcblock,
+    "intc": _constant("int", None),
+    "bytecblock": _bytecblock,
+    "bytec": _constant("byte", None),
+    "arg": _arg(None),
+    "args": _arg(None),
+    "pushint": _push,
+    "pushbytes": _push,
+    "pushints": _push_all,
+    "pushbytess": _push_all,
+    "bnz": _branch(True),
+    "bz": _branch(False),
+    "b": _branch(None),
+    "callsub": _callsub,
+    "retsub": _retsub,
+    "proto": _proto,
+    "frame_dig": _frame_dig,
+    "frame_bury": _frame_bury,
+    "switch": _switch,
+    "match": _match,
+    "return": _return,
+    "assert": _assert,
+    "pop": _pop,
+    "popn": _popn,
+    "dup": _dup,
+    "dup2": _dup2,
+    "dupn": _dupn,
+    "dig": _dig,
+    "bury": _bury,
+    "swap": _swap,
+    "select": _select,
+    "cover": _cover,
+    "uncover": _uncover,
+    "load": _load,
+    "store": _store,
+    "loads": _loads,
+    "stores": _stores,
+    "substring": _substring,
+    "substring3": _substring,
+    "extract": _extract,
+    "extract3": _extract,
+    "replace2": _replace,
+    "replace3": _replace,
+    "getbit": _getbit,
+    "setbit": _setbit,
+    "setbyte": _setbyte,
+    "base64_decode": _base64_decode,
+    "b+": _byte_math(lambda a, b: a + b),
+    "b-": _byte_math(_big_sub),
+    "b*": _byte_math(lambda a, b: a * b),
+    "b/": _byte_math(_big_div),
+    "b%": _byte_math(_big_mod),
+    "b<": _byte_compare(lambda a, b: a < b),
+    "b>": _byte_compare(lambda a, b: a > b),
+    "b<=": _byte_compare(lambda a, b: a <= b),
+    "b>=": _byte_compare(lambda a, b: a >= b),
+    "b==": _byte_compare(lambda a, b: a == b),
+    "b!=": _byte_compare(lambda a, b: a != b),
+    "b|": _byte_bitwise(lambda a, b: a | b),
+    "b&": _byte_bitwise(lambda a, b: a & b),
+    "b^": _byte_bitwise(lambda a, b: a ^ b),
+    "b~": _b_not,
+    "bsqrt": _bsqrt,
+    "log": _log,
+    "global": _global_handler,
+    "balance": _balance,
+    "min_balance": _min_balance,
+    "app_opted_in": _app_opted_in,
+    "app_local_get": _app_local_get,
+    "app_local_get_ex": _app_local_get_ex,
+    "app_global_get": _app_global_get,
+    "app_global_get_ex": _app_global_get_ex,
+    "app_local_put": _app_local_put,
+    "app_global_put": _app_global_put,
+    "app_local_del": _app_local_del,
+    "app_global_del": _app_global_del,
+    "asset_holding_get": _params(_asset_holding, _PARAM_DEFAULTS),
+    "asset_params_get": _params(_asset_params, _PARAM_DEFAULTS),
+    "app_params_get": _params(_app_params, _PARAM_DEFAULTS),
+    "acct_params_get": _params(_account_params, _PARAM_DEFAULTS),
+    "box_create": _box_create,
+    "box_extract": _box_extract,
+    "box_replace": _box_replace,
+    "box_splice": _box_splice,
+    "box_resize": _box_resize,
+    "box_del": _box_del,
+    "box_len": _box_len,
+    "box_get": _box_get,
+    "box_put": _box_put,
+    "itxn_begin": _itxn_begin,
+    "itxn_next": _itxn_next,
+    "itxn_field": _itxn_field,
+    "itxn_submit": _itxn_submit,
+}
+
+for _name in (
+    "txn",
+    "txna",
+    "txnas",
+    "gtxn",
+    "gtxna",
+    "gtxnas",
+    "gtxns",
+    "gtxnsa",
+    "gtxnsas",
+    "itxn",
+    "itxna",
+    "itxnas",
+    "gitxn",
+    "gitxna",
+    "gitxnas",
+):
+    _HANDLERS[_name] = _txn_handler(_name)
+
+for _i in range(4):
+    _HANDLERS["intc_" + str(_i)] = _constant("int", _i)
+    _HANDLERS["bytec_" + str(_i)] = _constant("byte", _i)
+    _HANDLERS["arg_" + str(_i)] = _arg(_i)
+
+# the name and immediate arguments of every op, keyed by opcode
+_BY_OPCODE: Dict[int, Tuple[str, List[Any]]] = {
+    opcode: (name, kinds) for name, (opcode, kinds) in _OPCODES.items()
+}
+
+
+# the fields of an ExecutionResult, for one lane of a batch
+_LaneResult = Tuple[
+    bool,
+    Optional[str],
+    List[StackValue],
+    List[StackValue],
+    List[bytes],
+    int,
+    List[MockTransaction],
+    int,
+    Optional[int],
+]
+
+
+class _Diverged(Exception):
+    """Raised by a batch handler when the lanes of a batch branch to different ops."""
+
+    def __init__(self, targets: List[Optional[int]]) -> None:
+        super().__init__()
+        self.targets = targets
+
+
+class _Batch:
+    """The state of evaluating a program for several inputs, or lanes, in lockstep while they take
+    the same branches. Each value on the stack, in the scratch space and in the logs is a column
+    with one value for each lane."""
+
+    def __init__(
+        self,
+        interpreter: "AVMInterpreter",
+        groups: List[List[MockTransaction]],
+        groupIndex: int,
+        args: Sequence[Sequence[bytes]],
+        budgets: List[int],
+        results: List[Optional[_LaneResult]],
+    ) -> None:
+        self.interpreter = interpreter
+        self.lanes = list(range(len(groups)))
+        # the inputs, budget and outcome of each lane, indexed by lane
+        self.groups = groups
+        self.groupIndex = groupIndex
+        self.args = args
+        self.budgets = budgets
+        self.results = results
+        self.budget = min(budgets)
+        # the context which ops are evaluated with for a single lane, see bind
+        self.probe = _Context(
+            interpreter, groups[0], groupIndex, MockLedger(), args[0], budgets[0]
+        )
+        # the values of the ops that read inputs, indexed by lane and shared between the batches
+        # of a run
+        self.inputs: Dict[Tuple[Any, ...], List[StackValue]] = dict()
+        self.appIDs: List[Optional[int]] = [None] * len(groups)
+        self.index = 0
+        self.last = 0
+
+        self.stack: List[List[StackValue]] = []
+        # None stands for a column of zeros
+        self.scratch: List[Optional[List[StackValue]]] = [None] * 256
+        self.frames: List[_Frame] = []
+        self.intcblock: List[int] = []
+        self.bytecblock: List[bytes] = []
+        self.logs: List[List[StackValue]] = []
+        self.logSizes = [0] * len(groups)
+        self.cost = 0
+        self.returned: Optional[List[StackValue]] = None
+
+    def bind(self, lane: int) -> _Context:
+        """Get a context to evaluate an op for one lane with. The ops evaluated lane by lane only
+        read the stack, the inputs and the budget of the context."""
+        probe = self.probe
+        group = self.groups[lane]
+        probe.group = group
+        probe.txn = group[self.groupIndex]
+        probe.args = self.args[lane]
+        probe.budget = self.budgets[lane]
+        probe.cost = self.cost
+        appID = self.appIDs[lane]
+        if appID is None:
+            appID = self.appIDs[lane] = _app_id(probe.txn)
+        probe.appID = appID
+        return probe
+
+    def keep(self, positions: List[int]) -> None:
+        """Remove every lane except the ones at positions."""
+        self.lanes = [self.lanes[p] for p in positions]
+        if len(positions) != 0:
+            self.budget = min(self.budgets[lane] for lane in self.lanes)
+        self.logSizes = [self.logSizes[p] for p in positions]
+        self.stack[:] = [[column[p] for p in positions] for column in self.stack]
+        self.scratch[:] = [
+            None if column is None else [column[p] for p in positions]
+            for column in self.scratch
+        ]
+        self.logs[:] = [[column[p] for p in positions] for column in self.logs]
+        if self.returned is not None:
+            self.returned = [self.returned[p] for p in positions]
+
+    def select(self, positions: List[int], index: int) -> "_Batch":
+        """Make a batch of the lanes at positions, which continues at the op index."""
+        batch = copy.copy(self)
+        batch.stack = list(self.stack)
+        batch.scratch = list(self.scratch)
+        batch.logs = list(self.logs)
+        batch.frames = []
+        for frame in self.frames:
+            copied = _Frame(frame.returnIndex, frame.height)
+            copied.args, copied.returns = frame.args, frame.returns
+            batch.frames.append(copied)
+        batch.keep(positions)
+        batch.index = index
+        return batch
+
+    def finish(self, positions: Sequence[int], error: Optional[str]) -> None:
+        """Record the outcome of the lanes at positions."""
+        used = [
+            (slot, column)
+            for slot, column in enumerate(self.scratch)
+            if column is not None
+        ]
+        pc = self.interpreter._pcs[self.last]
+        line = self.interpreter.program.pc_to_line.get(pc)
+        for position in positions:
+            scratch: List[StackValue] = [0] * 256
+            for slot, column in used:
+                scratch[slot] = column[position]
+            approved = (
+                error is None
+                and self.returned is not None
+                and self.returned[position] != 0
+            )
+            self.results[self.lanes[position]] = (
+                approved,
+                error,
+                [column[position] for column in self.stack],
+                scratch,
+                [cast(bytes, column[position]) for column in self.logs],
+                self.cost,
+                [],
+                pc,
+                line,
+            )
+
+    def fail(self, errors: Dict[int, str]) -> None:
+        """Stop evaluating the lanes at the positions in errors."""
+        if len(errors) == 0:
+            return
+        for position, error in errors.items():
+            self.finish((position,), error)
+        self.keep([p for p in range(len(self.lanes)) if p not in errors])
+
+    def uint64s(self, column: List[StackValue]) -> List[int]:
+        """Stop evaluating the lanes whose value in column isn't a uint64, and return the values
+        of the other lanes."""
+        if all(type(value) is int for value in column):
+            return cast(List[int], column)
+        self.fail(
+            {
+                p: "expected a uint64 argument"
+                for p, v in enumerate(column)
+                if type(v) is not int
+            }
+        )
+        return [v for v in column if type(v) is int]
+
+
+# an input value which hasn't been read yet
+_NO_INPUT: Any = object()
+
+# Batch handlers evaluate one op for every lane of a batch. Ops which change control flow return
+# the index of the next op to execute, or raise _Diverged if the lanes branch to different ops.
+_BatchHandler = Callable[[_Batch, Tuple[Any, ...]], Optional[int]]
+
+
+def _lane_op(handler: _Handler, pops: int, pushes: int, inputs: bool) -> _BatchHandler:
+    """Make a batch handler which evaluates an op separately for each lane. If the op reads the
+    inputs, it's evaluated with the context of each lane, and otherwise with the context of any
+    lane."""
+
+    def batched(batch: _Batch, imm: Tuple[Any, ...]) -> None:
+        stack = batch.stack
+        if len(stack) < pops:
+            raise IndexError
+        columns = stack[len(stack) - pops :]
+        del stack[len(stack) - pops :]
+
+        ctx = batch.probe
+        results: List[List[StackValue]] = [[] for _ in range(pushes)]
+        errors: Dict[int, str] = dict()
+        for position, lane in enumerate(batch.lanes):
+            if inputs:
+                batch.bind(lane)
+            ctx.stack = [column[position] for column in columns]
+            try:
+                handler(ctx, imm)
+            except _Panic as panic:
+                errors[position] = str(panic)
+                continue
+            for result, value in zip(results, ctx.stack):
+                result.append(value)
+
+        batch.fail(errors)
+        stack.extend(results)
+
+    return batched
+
+
+def _input(handler: _Handler) -> _BatchHandler:
+    """Make a batch handler for an op which reads an input without popping any values, such as
+    :code:`txna ApplicationArgs 0`. The value of each lane is read once per run."""
+    lanes = _lane_op(handler, 0, 1, True)
+
+    def batched(batch: _Batch, imm: Tuple[Any, ...]) -> None:
+        key = (handler, imm)
+        values = batch.inputs.get(key)
+        if values is None:
+            values = batch.inputs[key] = [_NO_INPUT] * len(batch.budgets)
+        column = []
+        for lane in batch.lanes:
+            value = values[lane]
+            if value is _NO_INPUT:
+                ctx = batch.bind(lane)
+                ctx.stack = []
+                try:
+                    handler(ctx, imm)
+                except _Panic:
+                    # evaluate the op again lane by lane to stop the lanes it fails for
+                    lanes(batch, imm)
+                    return
+                value = values[lane] = ctx.stack[0]
+            column.append(value)
+        batch.stack.append(column)
+
+    return batched
+
+
+def _fits(column: List[int]) -> bool:
+    return min(column) >= 0 and max(column) <= MAX_UINT64
+
+
+def _column(
+    f: Callable[..., List[StackValue]],
+    kinds: Optional[Tuple[type, ...]],
+    valid: Optional[Callable[[List[Any]], bool]] = None,
+    valid_args: Optional[Callable[..., bool]] = None,
+) -> Callable[..., Optional[List[StackValue]]]:
+    """Make a function which evaluates a pure op over whole columns at once. Instead of checking
+    each lane, it checks that every value of each column has the type in kinds, or that the values
+    of each lane have the same type if kinds is None, that valid_args holds for the columns and
+    that valid holds for the result. It returns None if a check fails, since the op may fail for
+    some lanes."""
+
+    def evaluate(*columns: List[StackValue]) -> Optional[List[StackValue]]:
+        if kinds is None:
+            if any(type(a) is not type(b) for a, b in zip(*columns)):
+                return None
+        else:
+            for kind, column in zip(kinds, columns):
+                for value in column:
+                    if type(value) is not kind:
+                        return None
+        if valid_args is not None and not valid_args(*columns):
+            return None
+        try:
+            result = f(*columns)
+        except ZeroDivisionError:
+            return None
+        if valid is not None and not valid(result):
+            return None
+        return result
+
+    return evaluate
+
+
+_UINT64S = (int, int)
+
+# functions which evaluate the most common pure ops over whole columns, keyed by op
+_COLUMN_OPS: Dict[Op, Callable[..., Optional[List[StackValue]]]] = {
+    Op.add: _column(lambda a, b: list(map(operator.add, a, b)), _UINT64S, _fits),
+    Op.minus: _column(lambda a, b: list(map(operator.sub, a, b)), _UINT64S, _fits),
+    Op.mul: _column(lambda a, b: list(map(operator.mul, a, b)), _UINT64S, _fits),
+    Op.div: _column(lambda a, b: list(map(operator.floordiv, a, b)), _UINT64S),
+    Op.mod: _column(lambda a, b: list(map(operator.mod, a, b)), _UINT64S),
+    Op.bitwise_and: _column(lambda a, b: list(map(operator.and_, a, b)), _UINT64S),
+    Op.bitwise_or: _column(lambda a, b: list(map(operator.or_, a, b)), _UINT64S),
+    Op.bitwise_xor: _column(lambda a, b: list(map(operator.xor, a, b)), _UINT64S),
+    Op.lt: _column(lambda a, b: list(map(int, map(operator.lt, a, b))), _UINT64S),
+    Op.gt: _column(lambda a, b: list(map(int, map(operator.gt, a, b))), _UINT64S),
+    Op.le: _column(lambda a, b: list(map(int, map(operator.le, a, b))), _UINT64S),
+    Op.ge: _column(lambda a, b: list(map(int, map(operator.ge, a, b))), _UINT64S),
+    Op.eq: _column(lambda a, b: list(map(int, map(operator.eq, a, b))), None),
+    Op.neq: _column(lambda a, b: list(map(int, map(operator.ne, a, b))), None),
+    Op.logic_and: _column(
+        lambda a, b: [int(x != 0 and y != 0) for x, y in zip(a, b)], _UINT64S
+    ),
+    Op.logic_or: _column(
+        lambda a, b: [int(x != 0 or y != 0) for x, y in zip(a, b)], _UINT64S
+    ),
+    Op.logic_not: _column(lambda a: list(map(int, map(operator.not_, a))), (int,)),
+    Op.itob: _column(lambda a: [v.to_bytes(8, "big") for v in a], (int,)),
+    Op.btoi: _column(
+        lambda a: [int.from_bytes(v, "big") for v in a],
+        (bytes,),
+        valid_args=lambda a: max(map(len, a)) <= 8,
+    ),
+    Op.len: _column(lambda a: list(map(len, a)), (bytes,)),
+    Op.concat: _column(
+        lambda a, b: list(map(operator.add, a, b)),
+        (bytes, bytes),
+        lambda result: max(map(len, result)) <= MAX_BYTE_STRING_LENGTH,
+    ),
+}
+
+
+def _vector(op: Op) -> _BatchHandler:
+    """Make a batch handler for a pure op, which evaluates it over whole columns. If it fails for
+    any lane, the op is evaluated again lane by lane to find the lanes which failed."""
+    evaluator = _EVALUATORS[op]
+    column = _COLUMN_OPS.get(op)
+    pops = _FIXED_STACK_EFFECTS[op][0]
+    lanes = _lane_op(_HANDLERS[str(op)], pops, 1, False)
+
+    if pops == 1:
+
+        def unary(batch: _Batch, imm: Tuple[Any, ...]) -> None:
+            stack = batch.stack
+            result = None if column is None else column(stack[-1])
+            if result is None:
+                try:
+                    result = [evaluator((a,)) for a in stack[-1]]
+                except _Panic:
+                    lanes(batch, imm)
+                    return
+            stack[-1] = result
+
+        return unary
+
+    def binary(batch: _Batch, imm: Tuple[Any, ...]) -> None:
+        stack = batch.stack
+        result = None if column is None else column(stack[-2], stack[-1])
+        if result is None:
+            try:
+                result = [evaluator(args) for args in zip(stack[-2], stack[-1])]
+            except _Panic:
+                lanes(batch, imm)
+                return
+        del stack[-1]
+        stack[-1] = result
+
+    return binary
+
+
+def _broadcast(handler: _Handler) -> _BatchHandler:
+    """Make a batch handler for an op which pushes constants, which pushes a column of each
+    constant."""
+
+    def batched(batch: _Batch, imm: Tuple[Any, ...]) -> None:
+        stack: List[Any] = batch.stack
+        height = len(stack)
+        handler(cast(_Context, batch), imm)
+        lanes = len(batch.lanes)
+        stack[height:] = [[value] * lanes for value in stack[height:]]
+
+    return batched
+
+
+def _jump(targets: List[Optional[int]]) -> Optional[int]:
+    if len(targets) == 0:
+        return None
+    first = targets[0]
+    for target in targets:
+        if target != first:
+            raise _Diverged(targets)
+    return first
+
+
+def _batch_branch(condition: bool) -> _BatchHandler:
+    def handler(batch: _Batch, imm: Tuple[Any, ...]) -> Optional[int]:
+        column = batch.uint64s(batch.stack.pop())
+        return _jump([imm[0] if (v != 0) == condition else None for v in column])
+
+    return handler
+
+
+def _batch_switch(batch: _Batch, imm: Tuple[Any, ...]) -> Optional[int]:
+    targets = imm[0]
+    column = batch.uint64s(batch.stack.pop())
+    return _jump([targets[v] if v < len(targets) else None for v in column])
+
+
+def _batch_match(batch: _Batch, imm: Tuple[Any, ...]) -> Optional[int]:
+    targets = imm[0]
+    stack = batch.stack
+    values = stack.pop()
+    if len(stack) < len(targets):
+        raise IndexError
+    cases = stack[len(stack) - len(targets) :]
+    del stack[len(stack) - len(targets) :]
+
+    matched: List[Optional[int]] = []
+    for position, value in enumerate(values):
+        matched.append(None)
+        for case, target in zip(cases, targets):
+            if type(case[position]) is type(value) and case[position] == value:
+                matched[-1] = target
+                break
+    return _jump(matched)
+
+
+def _batch_load(batch: _Batch, imm: Tuple[Any, ...]) -> None:
+    column = batch.scratch[imm[0]]
+    batch.stack.append([0] * len(batch.lanes) if column is None else column)
+
+
+def _batch_store(batch: _Batch, imm: Tuple[Any, ...]) -> None:
+    batch.scratch[imm[0]] = batch.stack.pop()
+
+
+def _batch_log(batch: _Batch, imm: Tuple[Any, ...]) -> None:
+    column = batch.stack.pop()
+    if len(batch.logs) >= MAX_LOG_CALLS:
+        raise _Panic("too many log calls")
+    errors: Dict[int, str] = dict()
+    for position, value in enumerate(column):
+        if type(value) is not bytes:
+            errors[position] = "expected a byte string argument"
+            continue
+        batch.logSizes[position] += len(value)
+        if batch.logSizes[position] > MAX_LOG_SIZE:
+            errors[position] = "logs are longer than {} bytes".format(MAX_LOG_SIZE)
+    if len(errors) != 0:
+        column = [v for p, v in enumerate(column) if p not in errors]
+        batch.fail(errors)
+    batch.logs.append(column)
+
+
+# ops which don't depend on the values they move treat columns like single values
+_BATCH_HANDLERS: Dict[str, _BatchHandler] = {
+    name: cast(_BatchHandler, _HANDLERS[name])
+    for name in (
+        "err",
+        "intcblock",
+        "bytecblock",
+        "b",
+        "callsub",
+        "retsub",
+        "proto",
+        "frame_dig",
+        "frame_bury",
+        "return",
+        "pop",
+        "popn",
+        "dup",
+        "dup2",
+        "dupn",
+        "dig",
+        "bury",
+        "swap",
+        "cover",
+        "uncover",
+    )
+}
+_BATCH_HANDLERS.update(
+    {
+        **{str(op): _vector(op) for op in _EVALUATORS},
+        "bnz": _batch_branch(True),
+        "bz": _batch_branch(False),
+        "switch": _batch_switch,
+        "match": _batch_match,
+        "load": _batch_load,
+        "store": _batch_store,
+        "log": _batch_log,
+    }
+)
+
+for _name in (
+    "intc",
+    "intc_0",
+    "intc_1",
+    "intc_2",
+    "intc_3",
+    "bytec",
+    "bytec_0",
+    "bytec_1",
+    "bytec_2",
+    "bytec_3",
+    "pushint",
+    "pushbytes",
+    "pushints",
+    "pushbytess",
+):
+    _BATCH_HANDLERS[_name] = _broadcast(_HANDLERS[_name])
+
+# ops which read the inputs without popping values, such as txna ApplicationArgs 0, read the input
+# of each lane once per run
+for _name in ("arg", "txn", "txna", "gtxn", "gtxna"):
+    _BATCH_HANDLERS[_name] = _input(_HANDLERS[_name])
+
+for _i in range(4):
+    _BATCH_HANDLERS["arg_" + str(_i)] = _input(_HANDLERS["arg_" + str(_i)])
+
+# the other ops whose results depend on the inputs, and the ops which may fail for some lanes, are
+# evaluated lane by lane
+_OPS_BY_NAME: Dict[str, Op] = {str(op): op for op in Op}
+for _name, _inputs in (
+    ("args", True),
+    ("global", True),
+    ("txnas", True),
+    ("gtxnas", True),
+    ("gtxns", True),
+    ("gtxnsa", True),
+    ("gtxnsas", True),
+    ("assert", False),
+    ("select", False),
+    ("keccak256", False),
+    ("ed25519verify", True),
+    ("ed25519verify_bare", False),
+    ("mulw", False),
+    ("addw", False),
+    ("divmodw", False),
+    ("divw", False),
+    ("expw", False),
+    ("substring", False),
+    ("substring3", False),
+    ("extract", False),
+    ("extract3", False),
+    ("replace2", False),
+    ("replace3", False),
+    ("getbit", False),
+    ("setbit", False),
+    ("setbyte", False),
+    ("base64_decode", False),
+    ("b+", False),
+    ("b-", False),
+    ("b*", False),
+    ("b/", False),
+    ("b%", False),
+    ("b<", False),
+    ("b>", False),
+    ("b<=", False),
+    ("b>=", False),
+    ("b==", False),
+    ("b!=", False),
+    ("b|", False),
+    ("b&", False),
+    ("b^", False),
+    ("b~", False),
+    ("bsqrt", False),
+):
+    _pops, _pushes = _FIXED_STACK_EFFECTS[_OPS_BY_NAME[_name]]
+    _BATCH_HANDLERS[_name] = _lane_op(_HANDLERS[_name], _pops, _pushes, _inputs)
+
+
+class _Reader:
+    def __init__(self, bytecode: bytes) -> None:
+        self.bytecode = bytecode
+        self.offset = 0
+
+    def byte(self) -> int:
+        if self.offset >= len(self.bytecode):
+            raise TealInputError("Program ends in the middle of an op")
+        value = self.bytecode[self.offset]
+        self.offset += 1
+        return value
+
+    def varuint(self) -> int:
+        value = 0
+        shift = 0
+        while True:
+            byte = self.byte()
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def bytes(self) -> bytes:
+        length = self.varuint()
+        if self.offset + length > len(self.bytecode):
+            raise TealInputError("Program ends in the middle of an op")
+        value = self.bytecode[self.offset : self.offset + length]
+        self.offset += length
+        return value
+
+    def offset16(self) -> int:
+        return int.from_bytes(bytes([self.byte(), self.byte()]), "big", signed=True)
+
+
+class AVMInterpreter:
+    """Evaluate AVM programs in-process, against a mocked ledger and transaction group.
+
+    The interpreter supports the ops which read and change the stack, scratch space, subroutine
+    frames, transaction and global fields, application state and boxes, along with arithmetic,
+    byte string, byte math, hashing and :code:`ed25519verify` ops and logs. Inner transactions are
+    recorded but not executed. The remaining crypto ops, :code:`json_ref`, :code:`block` and the
+    ops which read the scratch space of other transactions raise an error when executed.
+
+    The interpreter doesn't check that the resources a program uses are available to it, or that
+    ops are available in the program's version and mode: the compiler checks those.
+    """
+
+    def __init__(
+        self,
+        program: Union[AssembledProgram, str],
+        mode: Mode = Mode.Application,
+    ) -> None:
+        """Prepare a program for evaluation.
+
+        Args:
+            program: The program to evaluate, either assembled or as TEAL.
+            mode: The mode the program runs in.
+
+        Raises:
+            TealInputError: if the program isn't valid.
+        """
+        if isinstance(program, str):
+            program = assembleTeal(program)
+        self.program: AssembledProgram = program
+        self.mode = mode
+        self._hash: Optional[bytes] = None
+        self._decode()
+
+    def _decode(self) -> None:
+        reader = _Reader(self.program.bytecode)
+        self.version = reader.varuint()
+
+        fieldNames: Dict[int, Dict[int, str]] = dict()
+        # (pc, name, handler, immediates, cost, target pcs)
+        decoded: List[Tuple[int, str, _Handler, List[Any], int, List[int]]] = []
+        while reader.offset < len(self.program.bytecode):
+            pc = reader.offset
+            opcode = reader.byte()
+            if opcode not in _BY_OPCODE:
+                raise TealInputError("Invalid opcode {} at pc {}".format(opcode, pc))
+            name, kinds = _BY_OPCODE[opcode]
+
+            immediates: List[Any] = []
+            offsets: List[int] = []
+            for kind in kinds:
+                if isinstance(kind, dict):
+                    names = fieldNames.setdefault(
+                        id(kind), {v: k for k, v in kind.items()}
+                    )
+                    value = reader.byte()
+                    if value not in names:
+                        raise TealInputError(
+                            "Invalid field {} for {} at pc {}".format(value, name, pc)
+                        )
+                    immediates.append(names[value])
+                elif kind == _UINT8:
+                    immediates.append(reader.byte())
+                elif kind == _INT8:
+                    immediates.append(
+                        int.from_bytes([reader.byte()], "big", signed=True)
+                    )
+                elif kind == _VARUINT:
+                    immediates.append(reader.varuint())
+                elif kind == _BYTES:
+                    immediates.append(reader.bytes())
+                elif kind == _VARUINTS:
+                    immediates.append(
+                        [reader.varuint() for _ in range(reader.varuint())]
+                    )
+                elif kind == _BYTESES:
+                    immediates.append([reader.bytes() for _ in range(reader.varuint())])
+                elif kind == _LABEL:
+                    offsets.append(reader.offset16())
+                else:
+                    assert kind == _LABELS
+                    offsets.extend(reader.offset16() for _ in range(reader.byte()))
+
+            handler = _HANDLERS.get(name)
+            if handler is None:
+                handler = _unsupported(name)
+            targets = [reader.offset + offset for offset in offsets]
+            decoded.append(
+                (pc, name, handler, immediates, _COSTS.get(name, 1), targets)
+            )
+
+        indexes = {d[0]: i for i, d in enumerate(decoded)}
+        indexes[len(self.program.bytecode)] = len(decoded)
+
+        self._pcs: List[int] = []
+        self._instructions: List[Tuple[_Handler, Tuple[Any, ...], int]] = []
+        # the batch handler of each op, or None if the op can't be evaluated in a batch
+        self._batchHandlers: List[Optional[_BatchHandler]] = []
+        for pc, name, handler, immediates, cost, targets in decoded:
+            for target in targets:
+                if target not in indexes:
+                    raise TealInputError(
+                        "Branch at pc {} to {} is not the start of an op".format(
+                            pc, target
+                        )
+                    )
+            if _BY_OPCODE[self.program.bytecode[pc]][1] == [_LABELS]:
+                immediates = [[indexes[t] for t in targets]]
+            elif handler is _callsub:
+                immediates = [indexes[targets[0]], len(self._instructions) + 1]
+            elif len(targets) != 0:
+                immediates = [indexes[targets[0]]]
+            self._pcs.append(pc)
+            self._instructions.append((handler, tuple(immediates), cost))
+            self._batchHandlers.append(_BATCH_HANDLERS.get(name))
+
+    def program_hash(self) -> bytes:
+        """Get the hash of the program, which :code:`ed25519verify` signatures are made over."""
+        if self._hash is None:
+            self._hash = encoding.checksum(b"Program" + self.program.bytecode)
+        return self._hash
+
+    def _context(
+        self,
+        txns: Union[MockTransaction, Sequence[MockTransaction]],
+        groupIndex: int,
+        ledger: MockLedger,
+        args: Sequence[bytes],
+        budget: Optional[int],
+    ) -> _Context:
+        group = [txns] if isinstance(txns, MockTransaction) else list(txns)
+        if not 0 <= groupIndex < len(group):
+            raise TealInputError(
+                "group_index {} is beyond the group of {} transactions".format(
+                    groupIndex, len(group)
+                )
+            )
+        return _Context(
+            self, group, groupIndex, ledger, args, self._budget(group, budget)
+        )
+
+    def _budget(
+        self,
+        txns: Union[MockTransaction, Sequence[MockTransaction]],
+        budget: Optional[int],
+    ) -> int:
+        if budget is not None:
+            return budget
+        group = [txns] if isinstance(txns, MockTransaction) else txns
+        if self.mode == Mode.Application:
+            calls = sum(1 for txn in group if txn.value("TypeEnum") == 6)
+            return APP_CALL_BUDGET * max(calls, 1)
+        return LOGIC_SIG_BUDGET * len(group)
+
+    def run(
+        self,
+        txns: Union[MockTransaction, Sequence[MockTransaction]],
+        *,
+        group_index: int = 0,
+        ledger: Optional[MockLedger] = None,
+        args: Sequence[bytes] = (),
+        budget: Optional[int] = None,
+    ) -> ExecutionResult:
+        """Evaluate the program for a transaction.
+
+        Changes the program makes to application state and boxes are applied to the ledger only
+        if the program approves.
+
+        Args:
+            txns: The transaction, or the group of transactions, to evaluate the program for.
+            group_index (optional): The index in the group of the transaction to evaluate the
+                program for.
+            ledger (optional): The state that the program can read and change. Defaults to an
+                empty ledger.
+            args (optional): The arguments of a logic signature.
+            budget (optional): The opcode budget of the program. Defaults to 700 for each
+                application call in the group for applications, and 20000 for each transaction in
+                the group for logic signatures.
+
+        Returns:
+            The outcome of the evaluation.
+        """
+        if ledger is None:
+            ledger = MockLedger()
+        ctx = self._context(txns, group_index, ledger, args, budget)
+        budget = ctx.budget
+        error: Optional[str] = None
+        instructions = self._instructions
+        count = len(instructions)
+        stack = ctx.stack
+        index = 0
+        last = 0
+        cost = 0
+        try:
+            while index < count:
+                last = index
+                handler, immediates, opCost = instructions[index]
+                cost += opCost
+                if cost > budget:
+                    raise _Panic("dynamic cost budget exceeded")
+                ctx.cost = cost
+                jump = handler(ctx, immediates)
+                if len(stack) > MAX_STACK_HEIGHT:
+                    raise _Panic("stack overflow")
+                index = index + 1 if jump is None else jump
+
+            if ctx.returned is None:
+                if len(stack) != 1:
+                    raise _Panic("stack has {} values at the end".format(len(stack)))
+                ctx.returned = stack[-1]
+            if not isinstance(ctx.returned, int):
+                raise _Panic("program returned a byte string")
+        except _Panic as panic:
+            error = str(panic)
+        except IndexError:
+            error = "stack underflow"
+
+        approved = error is None and ctx.returned != 0
+        if approved:
+            ctx.commit()
+
+        pc = self._pcs[last] if count != 0 else 0
+        return ExecutionResult(
+            approved=approved,
+            error=error,
+            stack=list(stack),
+            scratch=list(ctx.scratch),
+            logs=ctx.logs,
+            cost=ctx.cost,
+            inner_transactions=ctx.innerTransactions,
+            pc=pc,
+            line=self.program.pc_to_line.get(pc),
+        )
+
+    def run_batch(
+        self,
+        txns: Sequence[Union[MockTransaction, Sequence[MockTransaction]]],
+        *,
+        group_index: int = 0,
+        args: Optional[Sequence[Sequence[bytes]]] = None,
+        budget: Optional[int] = None,
+    ) -> BatchResult:
+        """Evaluate the program for many inputs, such as the arguments of a subroutine.
+
+        The inputs are evaluated in lockstep: each op is evaluated once for every input which has
+        reached it, and the stack and scratch space hold a column of values, one for each input.
+        Inputs which branch to different ops continue in separate batches. The ops which read or
+        change application state, boxes, inner transactions or the scratch space of other
+        transactions can't be evaluated in a batch, and when a batch reaches one, each of its
+        inputs is evaluated from the start with :any:`run` instead.
+
+        Each input is evaluated against an empty ledger, and the outcome for each input is the
+        same as the outcome of :any:`run`.
+
+        Args:
+            txns: The transaction, or the group of transactions, of each input.
+            group_index (optional): The index in each group of the transaction to evaluate the
+                program for.
+            args (optional): The arguments of a logic signature for each input.
+            budget (optional): The opcode budget of the program. Defaults to the same budget as
+                :any:`run`.
+
+        Returns:
+            The outcome of the evaluation of each input.
+        """
+        if args is None:
+            args = [()] * len(txns)
+        if len(args) != len(txns):
+            raise TealInputError(
+                "Expected args for each of the {} inputs, got {}".format(
+                    len(txns), len(args)
+                )
+            )
+
+        groups = [
+            [txn] if isinstance(txn, MockTransaction) else list(txn) for txn in txns
+        ]
+        for group in groups:
+            if not 0 <= group_index < len(group):
+                raise TealInputError(
+                    "group_index {} is beyond the group of {} transactions".format(
+                        group_index, len(group)
+                    )
+                )
+
+        results: List[Optional[_LaneResult]] = [None] * len(txns)
+        if len(txns) != 0:
+            budgets = [self._budget(group, budget) for group in groups]
+            pending = [_Batch(self, groups, group_index, args, budgets, results)]
+            while len(pending) != 0:
+                batch = pending.pop()
+                if self._run_batch(batch, pending):
+                    continue
+                # the batch reached an op which can't be evaluated in a batch
+                for lane in batch.lanes:
+                    result = self.run(
+                        groups[lane],
+                        group_index=group_index,
+                        args=args[lane],
+                        budget=budget,
+                    )
+                    results[lane] = (
+                        result.approved,
+                        result.error,
+                        result.stack,
+                        result.scratch,
+                        result.logs,
+                        result.cost,
+                        result.inner_transactions,
+                        result.pc,
+                        result.line,
+                    )
+
+        columns = list(zip(*cast(List[_LaneResult], results)))
+        if len(columns) == 0:
+            columns = [()] * 9
+        return BatchResult(*(list(column) for column in columns))
+
+    def _run_batch(self, batch: _Batch, pending: List[_Batch]) -> bool:
+        """Evaluate a batch until its lanes finish or branch to different ops, which adds a batch
+        for each branch to pending.
+
+        Returns:
+            False if the batch reached an op which can't be evaluated in a batch, and True
+            otherwise.
+        """
+        instructions = self._instructions
+        batchHandlers = self._batchHandlers
+        count = len(instructions)
+        stack = batch.stack
+        index = batch.index
+        cost = batch.cost
+        try:
+            while index < count:
+                handler = batchHandlers[index]
+                if handler is None:
+                    return False
+                batch.last = index
+                opCost = instructions[index][2]
+                cost += opCost
+                if cost > batch.budget:
+                    batch.fail(
+                        {
+                            p: "dynamic cost budget exceeded"
+                            for p, lane in enumerate(batch.lanes)
+                            if cost > batch.budgets[lane]
+                        }
+                    )
+                    if len(batch.lanes) == 0:
+                        return True
+                batch.cost = cost
+                jump = handler(batch, instructions[index][1])
+                if len(batch.lanes) == 0:
+                    return True
+                if len(stack) > MAX_STACK_HEIGHT:
+                    raise _Panic("stack overflow")
+                index = index + 1 if jump is None else jump
+
+            if batch.returned is None:
+                if len(stack) != 1:
+                    raise _Panic("stack has {} values at the end".format(len(stack)))
+                batch.returned = stack[-1]
+            batch.fail(
+                {
+                    p: "program returned a byte string"
+                    for p, value in enumerate(batch.returned)
+                    if not isinstance(value, int)
+                }
+            )
+            error: Optional[str] = None
+        except _Diverged as diverged:
+            branches: Dict[int, List[int]] = dict()
+            for position, target in enumerate(diverged.targets):
+                branches.setdefault(index + 1 if target is None else target, []).append(
+                    position
+                )
+            for target, positions in branches.items():
+                pending.append(batch.select(positions, target))
+            return True
+        except _Panic as panic:
+            error = str(panic)
+        except IndexError:
+            error = "stack underflow"
+
+        batch.finish(range(len(batch.lanes)), error)
+        return True
+
+
+MockTransaction.__module__ = "pyteal"
+MockLedger.__module__ = "pyteal"
+ExecutionResult.__module__ = "pyteal"
+BatchResult.__module__ = "pyteal"
+AVMInterpreter.__module__ = "pyteal"
@@ -0,0 +1,474 @@
+import random
+
+import pytest
+from algosdk import encoding
+from nacl.signing import SigningKey
+
+import pyteal as pt
+
+SENDER = bytes(range(32))
+OTHER = bytes(range(1, 33))
+APP_ID = 7
+
+
+def app_call(*args: bytes, **fields) -> pt.MockTransaction:
+    return pt.MockTransaction(
+        {
+            "Sender": SENDER,
+            "Type": b"appl",
+            "ApplicationID": APP_ID,
+            "ApplicationArgs": list(args),
+            **fields,
+        }
+    )
+
+
+def interpreter(program: pt.Expr, version: int = 8) -> pt.AVMInterpreter:
+    return pt.AVMInterpreter(
+        pt.compileTeal(program, pt.Mode.Application, version=version)
+    )
+
+
+def itob(value: int) -> bytes:
+    return value.to_bytes(8, "big")
+
+
+@pytest.mark.parametrize("version", [6, 8])
+def test_subroutines(version: int):
+    @pt.Subroutine(pt.TealType.uint64)
+    def factorial(n):
+        return pt.If(n <= pt.Int(1)).Then(pt.Int(1)).Else(n * factorial(n - pt.Int(1)))
+
+    program = pt.Seq(
+        pt.Log(pt.Itob(factorial(pt.Btoi(pt.Txn.application_args[0])))),
+        pt.Approve(),
+    )
+
+    result = interpreter(program, version).run(app_call(itob(10)))
+    assert result.error is None
+    assert result.approved
+    assert result.logs == [itob(3628800)]
+    assert result.last_log() == itob(3628800)
+    assert result.stack == [1]
+
+
+def test_bytes_and_scratch():
+    value = pt.ScratchVar(pt.TealType.bytes)
+    program = pt.Seq(
+        value.store(pt.Concat(pt.Txn.application_args[0], pt.Bytes("-suffix"))),
+        pt.Log(pt.Extract(value.load(), pt.Int(1), pt.Int(3))),
+        pt.Log(pt.Substring(value.load(), pt.Int(0), pt.Int(2))),
+        pt.Log(pt.SetByte(value.load(), pt.Int(0), pt.Int(65))),
+        pt.Log(pt.Sha256(value.load())),
+        pt.Log(pt.Keccak256(pt.Bytes(""))),
+        pt.Log(pt.BytesAdd(pt.Bytes(b"\xff"), pt.Bytes(b"\x01"))),
+        pt.Return(pt.GetBit(pt.Bytes(b"\x80"), pt.Int(0))),
+    )
+
+    result = interpreter(program).run(app_call(b"abcdef"))
+    assert result.approved
+    assert result.logs[:3] == [b"bcd", b"ab", b"Abcdef-suffix"]
+    assert result.logs[4].hex() == (
+        "c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470"
+    )
+    assert result.logs[5] == b"\x01\x00"
+
+
+def test_wide_arithmetic():
+    teal = """#pragma version 8
+int 18446744073709551615
+int 2
+mulw
+store 1
+store 0
+load 1
+int 1
+addw
+store 3
+store 2
+load 0
+int 1
+=="""
+    result = pt.AVMInterpreter(teal).run(app_call())
+    assert result.error is None
+    assert result.approved
+    assert result.scratch[:4] == [1, 2**64 - 2, 0, 2**64 - 1]
+
+
+@pytest.mark.parametrize(
+    "teal,error,line",
+    [
+        ("int 1\nint 0\n/", "division by zero", 3),
+        ("int 1\nint 2\n-", "underflow", 3),
+        ("err", "err opcode executed", 1),
+        ("int 0\nassert\nint 1", "assert failed", 2),
+        ("pop", "stack underflow", 1),
+        ('byte "a"', "program returned a byte string", 1),
+        ("int 1\nint 1", "stack has 2 values at the end", 2),
+        ("int 1\nbyte 0x01\n+", "expected a uint64 argument", 3),
+        ("loop:\nb loop", "dynamic cost budget exceeded", 2),
+        ("int 1\narg 0", "arg 0 is beyond the 0 args", 2),
+        ("int 0\nint 1\nint 2\nblock BlkSeed", "not supported", 4),
+    ],
+)
+def test_errors(teal: str, error: str, line: int):
+    result = pt.AVMInterpreter("#pragma version 8\n" + teal).run(app_call())
+    assert not result.approved
+    assert result.error is not None and error in result.error
+    assert result.line == line
+
+
+def test_rejects():
+    result = interpreter(pt.Reject()).run(app_call())
+    assert not result.approved
+    assert result.error is None
+    assert result.cost == 2
+
+
+def test_budget():
+    teal = "#pragma version 8\nbyte 0x01\nkeccak256\npop\nglobal OpcodeBudget"
+    result = pt.AVMInterpreter(teal).run(app_call())
+    assert result.stack == [700 - 1 - 130 - 1 - 1]
+
+    result = pt.AVMInterpreter(teal).run(app_call(), budget=100)
+    assert result.error == "dynamic cost budget exceeded"
+
+    # the budget is pooled between the application calls in a group
+    result = pt.AVMInterpreter(teal).run([app_call(), app_call()])
+    assert result.stack == [1400 - 1 - 130 - 1 - 1]
+
+
+def test_switch_and_match():
+    teal = """#pragma version 8
+txn NumAppArgs
+switch zero one
+int 100
+return
+zero:
+int 1
+int 2
+int 2
+match a b
+int 200
+return
+a:
+int 300
+return
+b:
+int 400
+return
+one:
+int 500
+return"""
+    program = pt.AVMInterpreter(teal)
+    assert program.run(app_call()).stack == [400]
+    assert program.run(app_call(b"")).stack == [500]
+    assert program.run(app_call(b"", b"")).stack == [100]
+
+
+def test_transaction_fields():
+    program = pt.Seq(
+        pt.Assert(pt.Txn.sender() == pt.Txn.accounts[0]),
+        pt.Assert(pt.Txn.accounts[1] == pt.Addr(encoding.encode_address(OTHER))),
+        pt.Assert(pt.Txn.applications[0] == pt.Int(APP_ID)),
+        pt.Assert(pt.Txn.type_enum() == pt.TxnType.ApplicationCall),
+        pt.Assert(pt.Txn.group_index() == pt.Int(1)),
+        pt.Assert(pt.Gtxn[0].amount() == pt.Int(5000)),
+        pt.Assert(pt.Gtxn[0].type_enum() == pt.TxnType.Payment),
+        pt.Assert(pt.Global.group_size() == pt.Int(2)),
+        pt.Assert(pt.Global.current_application_id() == pt.Int(APP_ID)),
+        pt.Assert(pt.Global.latest_timestamp() == pt.Int(1234)),
+        pt.Assert(pt.Txn.rekey_to() == pt.Global.zero_address()),
+        pt.Txn.application_args.length() == pt.Int(0),
+    )
+    payment = pt.MockTransaction({"Type": b"pay", "Amount": 5000})
+    call = app_call(Accounts=[OTHER])
+    ledger = pt.MockLedger(globals={"LatestTimestamp": 1234})
+
+    result = interpreter(program).run([payment, call], group_index=1, ledger=ledger)
+    assert result.error is None
+    assert result.approved
+
+
+def test_state():
+    program = pt.Seq(
+        pt.App.globalPut(
+            pt.Bytes("count"), pt.App.globalGet(pt.Bytes("count")) + pt.Int(1)
+        ),
+        pt.App.localPut(pt.Txn.sender(), pt.Bytes("seen"), pt.Int(1)),
+        pt.App.globalDel(pt.Bytes("old")),
+        pt.Pop(pt.App.box_create(pt.Bytes("box"), pt.Int(4))),
+        pt.App.box_replace(pt.Bytes("box"), pt.Int(1), pt.Bytes("ab")),
+        pt.Return(pt.Btoi(pt.Txn.application_args[0])),
+    )
+    ledger = pt.MockLedger(
+        global_state={APP_ID: {b"count": 1, b"old": b"value"}},
+        local_state={(SENDER, APP_ID): dict()},
+    )
+    program = interpreter(program)
+
+    # changes are discarded when the program rejects
+    result = program.run(app_call(itob(0)), ledger=ledger)
+    assert not result.approved
+    assert ledger.global_state == {APP_ID: {b"count": 1, b"old": b"value"}}
+    assert ledger.boxes == dict()
+
+    result = program.run(app_call(itob(1)), ledger=ledger)
+    assert result.approved
+    assert ledger.global_state == {APP_ID: {b"count": 2}}
+    assert ledger.local_state == {(SENDER, APP_ID): {b"seen": 1}}
+    assert ledger.boxes == {APP_ID: {b"box": b"\x00ab\x00"}}
+
+    # accounts must be opted in to have local state
+    result = program.run(app_call(itob(1), Sender=OTHER), ledger=ledger)
+    assert not result.approved
+    assert result.error == "account is not opted in to application 7"
+
+
+def test_account_and_asset_params():
+    program = pt.Seq(
+        balance := pt.AccountParam.balance(pt.Txn.sender()),
+        holding := pt.AssetHolding.balance(pt.Txn.sender(), pt.Txn.assets[0]),
+        params := pt.AssetParam.total(pt.Int(0)),
+        pt.Assert(balance.hasValue()),
+        pt.Assert(balance.value() == pt.Balance(pt.Txn.sender())),
+        pt.Assert(holding.value() == pt.Int(10)),
+        pt.Assert(params.value() == pt.Int(1000)),
+        pt.Assert(pt.MinBalance(pt.Txn.sender()) == pt.Int(100000)),
+        pt.Approve(),
+    )
+    ledger = pt.MockLedger(
+        balances={SENDER: 5000000},
+        min_balances={SENDER: 100000},
+        asset_holdings={(SENDER, 31): {"AssetBalance": 10}},
+        asset_params={31: {"AssetTotal": 1000}},
+    )
+
+    result = interpreter(program).run(app_call(Assets=[31]), ledger=ledger)
+    assert result.error is None
+    assert result.approved
+
+
+def test_inner_transactions():
+    program = pt.Seq(
+        pt.InnerTxnBuilder.Execute(
+            {
+                pt.TxnField.type_enum: pt.TxnType.Payment,
+                pt.TxnField.receiver: pt.Txn.sender(),
+                pt.TxnField.amount: pt.Int(1000),
+            }
+        ),
+        pt.Return(pt.InnerTxn.amount() == pt.Int(1000)),
+    )
+
+    result = interpreter(program).run(app_call())
+    assert result.approved
+    assert result.inner_transactions == [
+        pt.MockTransaction(
+            {
+                "Sender": encoding.checksum(b"appID" + itob(APP_ID)),
+                "Fee": 1000,
+                "TypeEnum": 1,
+                "Receiver": SENDER,
+                "Amount": 1000,
+            }
+        )
+    ]
+
+
+def test_ed25519verify():
+    key = SigningKey.generate()
+    data = b"data"
+    teal = """#pragma version 8
+txna ApplicationArgs 0
+txna ApplicationArgs 1
+txna ApplicationArgs 2
+ed25519verify_bare"""
+    program = pt.AVMInterpreter(teal)
+    signature = key.sign(data).signature
+    publicKey = bytes(key.verify_key)
+
+    # signature checks cost more than a single application call's budget
+    assert not program.run(app_call(data, signature, publicKey)).approved
+    assert program.run(app_call(data, signature, publicKey), budget=2000).approved
+    assert not program.run(
+        app_call(b"other", signature, publicKey), budget=2000
+    ).approved
+
+    teal = teal.replace("ed25519verify_bare", "ed25519verify")
+    program = pt.AVMInterpreter(teal)
+    signature = key.sign(b"ProgData" + program.program_hash() + data).signature
+    assert program.run(app_call(data, signature, publicKey), budget=2000).approved
+
+
+def test_router():
+    router = pt.Router(
+        "calculator",
+        pt.BareCallActions(no_op=pt.OnCompleteAction.create_only(pt.Approve())),
+    )
+
+    @router.method
+    def add(a: pt.abi.Uint64, b: pt.abi.Uint64, *, output: pt.abi.Uint64) -> pt.Expr:
+        return output.set(a.get() + b.get())
+
+    approval, _, contract = router.compile_program(version=8)
+    program = pt.AVMInterpreter(approval)
+
+    selector = contract.get_method_by_name("add").get_selector()
+    result = program.run(app_call(selector, itob(2), itob(3)))
+    assert result.approved
+    assert result.last_log() == pt.RETURN_HASH_PREFIX + itob(5)
+
+    # bare calls are only allowed on creation
+    assert program.run(app_call(ApplicationID=0, CreatedApplicationID=8)).approved
+    assert not program.run(app_call()).approved
+
+
+def test_logic_signature():
+    program = pt.AVMInterpreter(
+        pt.compileTeal(pt.Arg(0) == pt.Bytes("secret"), pt.Mode.Signature, version=8),
+        mode=pt.Mode.Signature,
+    )
+
+    assert program.run(pt.MockTransaction(), args=[b"secret"]).approved
+    assert not program.run(pt.MockTransaction(), args=[b"guess"]).approved
+
+
+def test_invalid_program():
+    with pytest.raises(pt.TealInputError):
+        pt.AVMInterpreter(pt.AssembledProgram(bytes([8, 0xFF]), {}))
+
+    with pytest.raises(pt.TealInputError):
+        pt.AVMInterpreter(pt.AssembledProgram(bytes([8, 0x42, 0x00]), {}))
+
+
+def batch_programs():
+    x = pt.Btoi(pt.Txn.application_args[0])
+    y = pt.Btoi(pt.Txn.application_args[1])
+    i = pt.ScratchVar(pt.TealType.uint64)
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def poly(a, b):
+        return pt.If(a > b).Then(a * a - b).Else(b * pt.Int(3) + a / pt.Int(2))
+
+    yield "arithmetic", pt.Seq(
+        pt.Log(pt.Itob(poly(x, y))),
+        pt.Log(pt.Concat(pt.Txn.application_args[1], pt.Bytes("!"))),
+        pt.Assert(x != pt.Int(7)),
+        pt.Return(x % pt.Int(3)),
+    )
+    yield "loop", pt.Seq(
+        pt.For(i.store(pt.Int(0)), i.load() < x, i.store(i.load() + pt.Int(1))).Do(
+            pt.Log(pt.Itob(i.load()))
+        ),
+        pt.Return(y > x),
+    )
+    # app_global_put can't be evaluated in a batch
+    yield "state", pt.Seq(
+        pt.If(x > pt.Int(20)).Then(pt.App.globalPut(pt.Bytes("x"), x)),
+        pt.Approve(),
+    )
+
+
+@pytest.mark.parametrize("version", [6, 8])
+@pytest.mark.parametrize("name, expr", list(batch_programs()))
+def test_run_batch(version: int, name: str, expr: pt.Expr):
+    program = interpreter(expr, version)
+    rng = random.Random(version)
+    txns = [
+        app_call(itob(rng.randrange(40)), itob(rng.randrange(2**64)))
+        for _ in range(200)
+    ] + [app_call(itob(1)), app_call(b"\x01" * 9, itob(1))]
+
+    results = program.run_batch(txns, budget=300)
+    assert len(results) == len(txns)
+    for lane, txn in enumerate(txns):
+        assert results.result(lane) == program.run(txn, budget=300)
+    assert len(set(results.errors)) > 1
+
+
+def test_run_batch_btoi_too_long():
+    program = interpreter(pt.Return(pt.Btoi(pt.Txn.application_args[0]) + pt.Int(1)))
+    txns = [app_call(itob(1)), app_call(bytes(9)), app_call(bytes(8))]
+
+    results = program.run_batch(txns)
+    assert results.approved == [True, False, True]
+    assert results.errors[1] == program.run(txns[1]).error
+    assert results.errors[1] is not None
+
+
+def random_arg(rng: random.Random) -> bytes:
+    # longer arguments are padded with zeros, so they are too long for btoi but not too large
+    length = rng.choice([0, 1, 7, 8, 9, 12])
+    return rng.randrange(2 ** (8 * min(length, 8))).to_bytes(length, "big")
+
+
+@pytest.mark.parametrize("name, expr", list(batch_programs()))
+def test_run_batch_matches_run(name: str, expr: pt.Expr):
+    program = interpreter(expr)
+    rng = random.Random(name)
+    txns = [app_call(random_arg(rng), random_arg(rng)) for _ in range(300)]
+
+    results = program.run_batch(txns, budget=300)
+    for lane, txn in enumerate(txns):
+        assert results.result(lane) == program.run(txn, budget=300)
+
+
+def test_run_batch_branches():
+    teal = """#pragma version 8
+arg 0
+btoi
+switch zero one
+int 100
+b end
+zero:
+byte "a"
+byte "b"
+arg 1
+match a b
+int 200
+b end
+a:
+int 300
+b end
+b:
+int 400
+b end
+one:
+int 500
+end:
+dup
+itob
+log
+return"""
+    program = pt.AVMInterpreter(teal, mode=pt.Mode.Signature)
+    args = [
+        [itob(0), b"a"],
+        [itob(0), b"b"],
+        [itob(0), b"z"],
+        [itob(1)],
+        [itob(2)],
+        [itob(0)],
+    ]
+    results = program.run_batch([pt.MockTransaction()] * len(args), args=args)
+    assert results.stacks[:5] == [[300], [400], [200], [500], [100]]
+    assert results.logs[:5] == [
+        [itob(300)],
+        [itob(400)],
+        [itob(200)],
+        [itob(500)],
+        [itob(100)],
+    ]
+    assert results.errors == [None] * 5 + ["arg 1 is beyond the 1 args"]
+    for lane, laneArgs in enumerate(args):
+        assert results.result(lane) == program.run(pt.MockTransaction(), args=laneArgs)
+
+
+def test_run_batch_empty():
+    program = interpreter(pt.Approve())
+    results = program.run_batch([])
+    assert len(results) == 0
+    assert results.approved == []
+
+    with pytest.raises(pt.TealInputError):
+        program.run_batch([app_call()], args=[])
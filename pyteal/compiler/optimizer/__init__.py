@@ -2,3 +2,11 @@ from pyteal.compiler.optimizer.optimizer import (
     OptimizeOptions,
     apply_global_optimizations,
 )
+from pyteal.compiler.optimizer.subexpressions import (
+    apply_common_subexpression_elimination,
+)
+from pyteal.compiler.optimizer.peephole import (
+    PEEPHOLE_RULES,
+    PeepholeRule,
+    apply_peephole_optimizations,
+)
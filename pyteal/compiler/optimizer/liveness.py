@@ -0,0 +1,111 @@
+from typing import AbstractSet, Dict, List, Set, Tuple, Union
+
+from pyteal.ast import ScratchSlot
+from pyteal.ir import Op, TealBlock, TealOp
+
+# The slot accessed by a load or store: a ScratchSlot, or its ID once slots have been assigned
+SlotRef = Union[ScratchSlot, int]
+
+
+def slot_refs(op: TealOp) -> List[SlotRef]:
+    """Get the slots that a load or store op accesses. Other ops access no slots."""
+    if type(op) is not TealOp or op.op not in (Op.load, Op.store):
+        return []
+    return [arg for arg in op.args if isinstance(arg, (ScratchSlot, int))]
+
+
+def _uses_and_defs(ops: List[TealOp]) -> Tuple[Set[SlotRef], Set[SlotRef]]:
+    """Get the slots which are loaded before being stored (uses) and the slots which are stored
+    (defs) by a sequence of ops."""
+    uses: Set[SlotRef] = set()
+    defs: Set[SlotRef] = set()
+    for op in ops:
+        if type(op) is not TealOp:
+            continue
+
+        if op.op == Op.load:
+            for slot in slot_refs(op):
+                if slot not in defs:
+                    uses.add(slot)
+        elif op.op == Op.store:
+            for slot in slot_refs(op):
+                defs.add(slot)
+
+    return uses, defs
+
+
+def live_after_ops(
+    ops: List[TealOp], live_out: AbstractSet[SlotRef]
+) -> List[Set[SlotRef]]:
+    """Compute the slots that are live immediately after each op in a block.
+
+    Args:
+        ops: The ops of a block.
+        live_out: The slots that are live at the end of the block.
+
+    Returns:
+        A list the same length as ops, where element i is the set of slots whose current value may
+        be loaded at some point after ops[i] executes.
+    """
+    result: List[Set[SlotRef]] = [set() for _ in ops]
+    live = set(live_out)
+    for i in range(len(ops) - 1, -1, -1):
+        result[i] = set(live)
+        op = ops[i]
+        if type(op) is not TealOp:
+            continue
+
+        if op.op == Op.store:
+            live -= set(slot_refs(op))
+        elif op.op == Op.load:
+            live |= set(slot_refs(op))
+
+    return result
+
+
+class SlotLiveness:
+    """A backward liveness analysis of the scratch slots used in a control flow graph.
+
+    A slot is live at a point in the graph if there is a path from that point to a load of the slot
+    which does not pass through a store to the slot. The graph is expected to be the graph of a
+    single subroutine, so every block without outgoing blocks is considered to be an exit with no
+    live slots.
+
+    The analysis can be run before or after slot IDs are assigned. Slots are identified by their
+    ScratchSlot before assignment, and by their ID after it.
+    """
+
+    def __init__(self, start: TealBlock) -> None:
+        blocks = list(TealBlock.Iterate(start))
+
+        uses: Dict[int, Set[SlotRef]] = dict()
+        defs: Dict[int, Set[SlotRef]] = dict()
+        for block in blocks:
+            uses[id(block)], defs[id(block)] = _uses_and_defs(block.ops)
+
+        self._live_in: Dict[int, Set[SlotRef]] = {id(b): set() for b in blocks}
+        self._live_out: Dict[int, Set[SlotRef]] = {id(b): set() for b in blocks}
+
+        # iterate to a fixed point, visiting blocks in reverse breadth-first order so that
+        # information flows backwards quickly
+        changed = True
+        while changed:
+            changed = False
+            for block in reversed(blocks):
+                live_out: Set[SlotRef] = set()
+                for nextBlock in block.getOutgoing():
+                    live_out |= self._live_in[id(nextBlock)]
+
+                live_in = uses[id(block)] | (live_out - defs[id(block)])
+                if live_in != self._live_in[id(block)]:
+                    self._live_in[id(block)] = live_in
+                    changed = True
+                self._live_out[id(block)] = live_out
+
+    def live_in(self, block: TealBlock) -> Set[SlotRef]:
+        """Get the slots that are live at the start of block."""
+        return self._live_in[id(block)]
+
+    def live_out(self, block: TealBlock) -> Set[SlotRef]:
+        """Get the slots that are live at the end of block."""
+        return self._live_out[id(block)]
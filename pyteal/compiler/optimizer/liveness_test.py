@@ -0,0 +1,115 @@
+import pyteal as pt
+
+from pyteal.compiler.optimizer.liveness import SlotLiveness, live_after_ops
+
+
+def test_live_after_ops():
+    slot1 = pt.ScratchSlot(1)
+    slot2 = pt.ScratchSlot(2)
+
+    ops = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, slot1),
+        pt.TealOp(None, pt.Op.load, slot1),
+        pt.TealOp(None, pt.Op.store, slot2),
+        pt.TealOp(None, pt.Op.load, slot2),
+        pt.TealOp(None, pt.Op.load, slot1),
+    ]
+
+    actual = live_after_ops(ops, set())
+    assert actual == [
+        set(),
+        {slot1},
+        {slot1},
+        {slot1, slot2},
+        {slot1},
+        set(),
+    ]
+
+    actual = live_after_ops(ops, {slot2})
+    assert actual == [
+        set(),
+        {slot1},
+        {slot1},
+        {slot1, slot2},
+        {slot1, slot2},
+        {slot2},
+    ]
+
+
+def test_liveness_branch():
+    slot1 = pt.ScratchSlot(1)
+    slot2 = pt.ScratchSlot(2)
+
+    blockEnd = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.retsub)])
+    blockTrue = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.load, slot1)])
+    blockTrue.setNextBlock(blockEnd)
+    blockFalse = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.int, 2),
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+        ]
+    )
+    blockFalse.setNextBlock(blockEnd)
+    start = pt.TealConditionalBlock(
+        [
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.store, slot2),
+            pt.TealOp(None, pt.Op.load, slot2),
+        ]
+    )
+    start.setTrueBlock(blockTrue)
+    start.setFalseBlock(blockFalse)
+
+    liveness = SlotLiveness(start)
+
+    assert liveness.live_in(start) == set()
+    assert liveness.live_out(start) == {slot1}
+    assert liveness.live_in(blockTrue) == {slot1}
+    assert liveness.live_out(blockTrue) == set()
+    assert liveness.live_in(blockFalse) == set()
+    assert liveness.live_out(blockFalse) == set()
+    assert liveness.live_in(blockEnd) == set()
+
+
+def test_liveness_loop():
+    slot1 = pt.ScratchSlot(1)
+    slot2 = pt.ScratchSlot(2)
+
+    blockEnd = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.load, slot2), pt.TealOp(None, pt.Op.retsub)]
+    )
+    blockBody = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.load, slot1),
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.minus),
+            pt.TealOp(None, pt.Op.store, slot1),
+        ]
+    )
+    blockCond = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.load, slot1)])
+    blockCond.setTrueBlock(blockBody)
+    blockCond.setFalseBlock(blockEnd)
+    blockBody.setNextBlock(blockCond)
+    start = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.int, 10),
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.int, 0),
+            pt.TealOp(None, pt.Op.store, slot2),
+        ]
+    )
+    start.setNextBlock(blockCond)
+
+    liveness = SlotLiveness(start)
+
+    assert liveness.live_in(start) == set()
+    assert liveness.live_out(start) == {slot1, slot2}
+    assert liveness.live_in(blockCond) == {slot1, slot2}
+    assert liveness.live_out(blockCond) == {slot1, slot2}
+    assert liveness.live_in(blockBody) == {slot1, slot2}
+    assert liveness.live_out(blockBody) == {slot1, slot2}
+    assert liveness.live_in(blockEnd) == {slot2}
@@ -1,7 +1,9 @@
-from typing import Final, Optional, Set
+from collections import Counter
+from typing import Dict, Final, List, Optional, Set, Tuple
 
-from pyteal.ast import ScratchSlot
+from pyteal.ast import Expr, ScratchSlot
 from pyteal.errors import TealInternalError, verifyProgramVersion
+from pyteal.compiler.optimizer.liveness import SlotLiveness, SlotRef, live_after_ops
 from pyteal.ir import Op, TealBlock, TealOp
 
 
@@ -25,6 +27,38 @@ class OptimizeOptions:
             that have no load dependencies elsewhere. Starting with program version 9, defaults to optimizing.
         frame_pointers (optional): employ frame pointers instead of scratch slots during compilation.
             Available only starting in program version 8. Defaults to optimizing starting in program version 8.
+        stack_values (optional): use a liveness analysis of scratch slots to keep values that are
+            loaded only once on the stack instead of in a slot, moving them into place with swap or
+            uncover, and to drop stores to slots that are never loaded again. Defaults to False.
+        peephole (optional): rewrite short sequences of ops in the final program into cheaper
+            equivalents, e.g. `int 0; ==` into `!`. The number of times each rule was applied is
+            accumulated in `peephole_hits` across every compilation that uses these options.
+            Defaults to False.
+        constant_folding (optional): evaluate expressions whose arguments are all known at compile
+            time, such as `Int(2) * Int(1000)` or `Concat(Bytes("a"), Bytes("b"))`, and compile them
+            to a single constant. If such an expression would fail at runtime, e.g. because it
+            overflows, it is compiled unchanged, and a TealCompileError is raised if every execution
+            of the program would evaluate it. Defaults to False.
+        common_subexpressions (optional): within each subroutine, save the value of a repeated
+            side-effect-free expression, such as `Btoi(Txn.application_args[0])`, to a scratch slot
+            the first time it is evaluated, and load it instead of evaluating it again. Expressions
+            are only reused when they are certain to produce the same value, and when doing so
+            reduces the opcode cost. Defaults to False.
+        reuse_slots (optional): assign the same slot ID to local scratch slots whose values are
+            never needed at the same time, based on their lifetimes within each subroutine and
+            across subroutine calls. Slots are always reused if a program would otherwise need more
+            than 256 of them. Defaults to False.
+        spill_live_slots (optional): around calls which may recursively reenter the calling
+            subroutine, spill only the local scratch slots whose values are needed after the call,
+            instead of every local slot of the subroutine. Defaults to False.
+        on_complete_checks (optional): in the approval programs built by a Router, check the
+            OnCompletion and creation state of each call with a guard which reads each transaction
+            field at most once, and when every method allows the same OnCompletion and creation
+            combinations, check them once before dispatching the call instead of in each method.
+            Defaults to False.
+        lazy_method_args (optional): in the approval programs built by a Router, pass each ABI
+            method argument to its handler decoded straight from `Txn.application_args`, instead
+            of first decoding it into a scratch slot or frame variable. Defaults to False.
     """
 
     def __init__(
@@ -32,9 +66,27 @@ class OptimizeOptions:
         *,
         scratch_slots: Optional[bool] = None,
         frame_pointers: Optional[bool] = None,
+        stack_values: bool = False,
+        peephole: bool = False,
+        constant_folding: bool = False,
+        common_subexpressions: bool = False,
+        reuse_slots: bool = False,
+        spill_live_slots: bool = False,
+        on_complete_checks: bool = False,
+        lazy_method_args: bool = False,
     ):
         self._scratch_slots: Final[Optional[bool]] = scratch_slots
         self._frame_pointers: Final[Optional[bool]] = frame_pointers
+        self._stack_values: Final[bool] = stack_values
+        self._peephole: Final[bool] = peephole
+        self._constant_folding: Final[bool] = constant_folding
+        self._common_subexpressions: Final[bool] = common_subexpressions
+        self._reuse_slots: Final[bool] = reuse_slots
+        self._spill_live_slots: Final[bool] = spill_live_slots
+        self._on_complete_checks: Final[bool] = on_complete_checks
+        self._lazy_method_args: Final[bool] = lazy_method_args
+
+        self.peephole_hits: Counter[str] = Counter()
 
         self._skip_slots: Set[ScratchSlot] = set()
 
@@ -46,6 +98,36 @@ class OptimizeOptions:
 
         return self._scratch_slots
 
+    def optimize_stack_values(self, version: int) -> bool:
+        return self._stack_values
+
+    def optimize_peephole(self, version: int) -> bool:
+        return self._peephole
+
+    def optimize_constant_folding(self, version: int) -> bool:
+        return self._constant_folding
+
+    def optimize_common_subexpressions(self, version: int) -> bool:
+        return self._common_subexpressions
+
+    def reuse_slots(self, version: int) -> bool:
+        return self._reuse_slots
+
+    def spill_live_slots(self, version: int) -> bool:
+        return self._spill_live_slots
+
+    def optimize_on_complete_checks(self, version: int) -> bool:
+        return self._on_complete_checks
+
+    def lazy_method_args(self, version: int) -> bool:
+        return self._lazy_method_args
+
+    def optimize_slots(self, version: int) -> bool:
+        """Check if any optimization which rewrites scratch slot accesses is enabled."""
+        return self.optimize_scratch_slots(version) or self.optimize_stack_values(
+            version
+        )
+
     def use_frame_pointers(self, version: int) -> bool:
         from pyteal.compiler.compiler import FRAME_POINTERS_VERSION
 
@@ -62,37 +144,99 @@ class OptimizeOptions:
         return self._frame_pointers
 
 
-def _remove_extraneous_slot_access(start: TealBlock, remove: Set[ScratchSlot]):
-    def keep_op(op: TealOp) -> bool:
-        if type(op) is not TealOp or (op.op != Op.store and op.op != Op.load):
-            return True
+def _is_slot_access(op: TealOp) -> bool:
+    return type(op) is TealOp and (op.op == Op.store or op.op == Op.load)
 
-        return not set(op.getSlots()).issubset(remove)
 
-    for block in TealBlock.Iterate(start):
-        block.ops = list(filter(keep_op, block.ops))
+class _SlotAccessIndex:
+    """An index from scratch slots to the places they are accessed in a subroutine's control flow graph.
+
+    The index is built once per subroutine and is kept up to date as slot accesses are removed,
+    so that load dependency queries don't need to rescan the whole graph.
+    """
 
+    def __init__(self, start: TealBlock) -> None:
+        # slot -> id(block) -> (block, positions of loads from slot within block.ops)
+        self.loads: Dict[ScratchSlot, Dict[int, Tuple[TealBlock, List[int]]]] = dict()
+        # slot -> id(block) -> block, for every block that loads from or stores to slot
+        self.accesses: Dict[ScratchSlot, Dict[int, TealBlock]] = dict()
+        # id(block) -> slots loaded from or stored to by block
+        self.block_slots: Dict[int, Set[ScratchSlot]] = dict()
 
-# Very dumb, overly eager dependency checking. A "dependency" is considered
-# any time the slot is loaded from in the entire control flow graph. This
-# can definitely be improved in the future.
-def _has_load_dependencies(
-    cur_block: TealBlock, start: TealBlock, slot: ScratchSlot, pos: int
-) -> bool:
-    for block in TealBlock.Iterate(start):
+        for block in TealBlock.Iterate(start):
+            self._add_block(block)
+
+    def _add_block(self, block: TealBlock) -> None:
+        slots: Set[ScratchSlot] = set()
         for i, op in enumerate(block.ops):
-            if block == cur_block and i == pos:
+            if not _is_slot_access(op):
                 continue
 
-            if type(op) is TealOp and op.op == Op.load and slot in set(op.getSlots()):
+            for slot in op.getSlots():
+                slots.add(slot)
+                self.accesses.setdefault(slot, dict())[id(block)] = block
+                if op.op == Op.load:
+                    sites = self.loads.setdefault(slot, dict())
+                    if id(block) not in sites:
+                        sites[id(block)] = (block, [])
+                    positions = sites[id(block)][1]
+                    if len(positions) == 0 or positions[-1] != i:
+                        positions.append(i)
+
+        self.block_slots[id(block)] = slots
+
+    def _remove_block(self, block: TealBlock) -> None:
+        for slot in self.block_slots.pop(id(block), set()):
+            self.accesses[slot].pop(id(block), None)
+            if slot in self.loads:
+                self.loads[slot].pop(id(block), None)
+
+    def has_load_dependencies(
+        self, cur_block: TealBlock, slot: ScratchSlot, pos: int
+    ) -> bool:
+        """Check if slot is loaded from anywhere in the graph other than position pos of cur_block.
+
+        Very dumb, overly eager dependency checking. A "dependency" is considered any time the
+        slot is loaded from in the entire control flow graph. This can definitely be improved in
+        the future.
+        """
+        for block, positions in self.loads.get(slot, dict()).values():
+            for i in positions:
+                if i == pos and (block is cur_block or block == cur_block):
+                    continue
+
                 return True
 
-    return False
+        return False
+
+    def remove_slot_access(self, remove: Set[ScratchSlot]) -> None:
+        """Remove every load and store of the given slots from the graph, updating the index."""
+
+        def keep_op(op: TealOp) -> bool:
+            if not _is_slot_access(op):
+                return True
+
+            return not set(op.getSlots()).issubset(remove)
+
+        affected: Dict[int, TealBlock] = dict()
+        for slot in remove:
+            affected.update(self.accesses.get(slot, dict()))
+
+        for block in affected.values():
+            self._remove_block(block)
+            block.ops = list(filter(keep_op, block.ops))
+            self._add_block(block)
 
 
 def _apply_slot_to_stack(
-    cur_block: TealBlock, start: TealBlock, skip_slots: Set[ScratchSlot]
+    cur_block: TealBlock,
+    start: TealBlock,
+    skip_slots: Set[ScratchSlot],
+    index: Optional[_SlotAccessIndex] = None,
 ):
+    if index is None:
+        index = _SlotAccessIndex(start)
+
     slots_to_remove = set()
     # surprisingly, this slicing is totally safe - even if the list is empty.
     for i, op in enumerate(cur_block.ops[:-1]):
@@ -114,26 +258,338 @@ def _apply_slot_to_stack(
         if cur_slots[0] != next_slots[0]:
             continue
 
-        if not _has_load_dependencies(cur_block, start, cur_slots[0], i + 1):
+        if not index.has_load_dependencies(cur_block, cur_slots[0], i + 1):
             slots_to_remove.add(cur_slots[0])
 
-    _remove_extraneous_slot_access(start, slots_to_remove)
+    index.remove_slot_access(slots_to_remove)
+
+
+# The number of values (popped, pushed) by ops whose stack effect does not depend on their
+# immediate arguments. Ops which are not listed here, or in _stack_effect, are treated as
+# barriers when moving values across ops.
+_FIXED_STACK_EFFECTS: Dict[Op, Tuple[int, int]] = {
+    Op.comment: (0, 0),
+    Op.int: (0, 1),
+    Op.pushint: (0, 1),
+    Op.intc: (0, 1),
+    Op.intc_0: (0, 1),
+    Op.intc_1: (0, 1),
+    Op.intc_2: (0, 1),
+    Op.intc_3: (0, 1),
+    Op.byte: (0, 1),
+    Op.pushbytes: (0, 1),
+    Op.bytec: (0, 1),
+    Op.bytec_0: (0, 1),
+    Op.bytec_1: (0, 1),
+    Op.bytec_2: (0, 1),
+    Op.bytec_3: (0, 1),
+    Op.addr: (0, 1),
+    Op.method_signature: (0, 1),
+    Op.arg: (0, 1),
+    Op.args: (1, 1),
+    Op.txn: (0, 1),
+    Op.txna: (0, 1),
+    Op.txnas: (1, 1),
+    Op.gtxn: (0, 1),
+    Op.gtxna: (0, 1),
+    Op.gtxnas: (1, 1),
+    Op.gtxns: (1, 1),
+    Op.gtxnsa: (1, 1),
+    Op.gtxnsas: (2, 1),
+    Op.global_: (0, 1),
+    Op.gload: (0, 1),
+    Op.gloads: (1, 1),
+    Op.gloadss: (2, 1),
+    Op.gaid: (0, 1),
+    Op.gaids: (1, 1),
+    Op.load: (0, 1),
+    Op.store: (1, 0),
+    Op.loads: (1, 1),
+    Op.stores: (2, 0),
+    Op.frame_dig: (0, 1),
+    Op.frame_bury: (1, 0),
+    Op.pop: (1, 0),
+    Op.dup: (1, 2),
+    Op.dup2: (2, 4),
+    Op.swap: (2, 2),
+    Op.select: (3, 1),
+    Op.assert_: (1, 0),
+    Op.add: (2, 1),
+    Op.minus: (2, 1),
+    Op.div: (2, 1),
+    Op.mul: (2, 1),
+    Op.mod: (2, 1),
+    Op.exp: (2, 1),
+    Op.shl: (2, 1),
+    Op.shr: (2, 1),
+    Op.lt: (2, 1),
+    Op.gt: (2, 1),
+    Op.le: (2, 1),
+    Op.ge: (2, 1),
+    Op.eq: (2, 1),
+    Op.neq: (2, 1),
+    Op.logic_and: (2, 1),
+    Op.logic_or: (2, 1),
+    Op.logic_not: (1, 1),
+    Op.bitwise_or: (2, 1),
+    Op.bitwise_and: (2, 1),
+    Op.bitwise_xor: (2, 1),
+    Op.bitwise_not: (1, 1),
+    Op.mulw: (2, 2),
+    Op.addw: (2, 2),
+    Op.divw: (3, 1),
+    Op.divmodw: (4, 4),
+    Op.expw: (2, 2),
+    Op.sqrt: (1, 1),
+    Op.bitlen: (1, 1),
+    Op.len: (1, 1),
+    Op.itob: (1, 1),
+    Op.btoi: (1, 1),
+    Op.sha256: (1, 1),
+    Op.keccak256: (1, 1),
+    Op.sha512_256: (1, 1),
+    Op.sha3_256: (1, 1),
+    Op.ed25519verify: (3, 1),
+    Op.ed25519verify_bare: (3, 1),
+    Op.ecdsa_verify: (5, 1),
+    Op.ecdsa_pk_decompress: (1, 2),
+    Op.ecdsa_pk_recover: (4, 2),
+    Op.vrf_verify: (3, 2),
+    Op.concat: (2, 1),
+    Op.substring: (1, 1),
+    Op.substring3: (3, 1),
+    Op.extract: (1, 1),
+    Op.extract3: (3, 1),
+    Op.extract_uint16: (2, 1),
+    Op.extract_uint32: (2, 1),
+    Op.extract_uint64: (2, 1),
+    Op.replace2: (2, 1),
+    Op.replace3: (3, 1),
+    Op.getbit: (2, 1),
+    Op.setbit: (3, 1),
+    Op.getbyte: (2, 1),
+    Op.setbyte: (3, 1),
+    Op.base64_decode: (1, 1),
+    Op.json_ref: (2, 1),
+    Op.b_add: (2, 1),
+    Op.b_minus: (2, 1),
+    Op.b_div: (2, 1),
+    Op.b_mul: (2, 1),
+    Op.b_mod: (2, 1),
+    Op.b_lt: (2, 1),
+    Op.b_gt: (2, 1),
+    Op.b_le: (2, 1),
+    Op.b_ge: (2, 1),
+    Op.b_eq: (2, 1),
+    Op.b_neq: (2, 1),
+    Op.b_or: (2, 1),
+    Op.b_and: (2, 1),
+    Op.b_xor: (2, 1),
+    Op.b_not: (1, 1),
+    Op.bsqrt: (1, 1),
+    Op.bzero: (1, 1),
+    Op.balance: (1, 1),
+    Op.min_balance: (1, 1),
+    Op.app_opted_in: (2, 1),
+    Op.app_local_get: (2, 1),
+    Op.app_local_get_ex: (3, 2),
+    Op.app_global_get: (1, 1),
+    Op.app_global_get_ex: (2, 2),
+    Op.app_local_put: (3, 0),
+    Op.app_global_put: (2, 0),
+    Op.app_local_del: (2, 0),
+    Op.app_global_del: (1, 0),
+    Op.asset_holding_get: (2, 2),
+    Op.asset_params_get: (1, 2),
+    Op.app_params_get: (1, 2),
+    Op.acct_params_get: (1, 2),
+    Op.block: (1, 1),
+    Op.log: (1, 0),
+    Op.itxn_begin: (0, 0),
+    Op.itxn_next: (0, 0),
+    Op.itxn_field: (1, 0),
+    Op.itxn_submit: (0, 0),
+    Op.itxn: (0, 1),
+    Op.itxna: (0, 1),
+    Op.itxnas: (1, 1),
+    Op.gitxn: (0, 1),
+    Op.gitxna: (0, 1),
+    Op.gitxnas: (1, 1),
+    Op.box_create: (2, 1),
+    Op.box_extract: (3, 1),
+    Op.box_replace: (3, 0),
+    Op.box_splice: (4, 0),
+    Op.box_del: (1, 1),
+    Op.box_len: (1, 2),
+    Op.box_get: (1, 2),
+    Op.box_put: (2, 0),
+    Op.box_resize: (2, 0),
+    Op.ec_add: (2, 1),
+    Op.ec_scalar_mul: (2, 1),
+    Op.ec_pairing_check: (2, 1),
+    Op.ec_multi_scalar_mul: (2, 1),
+    Op.ec_subgroup_check: (1, 1),
+    Op.ec_map_to: (1, 1),
+}
+
+# ops which only push a value and have no side effects, so a value they push which is then
+# discarded can be removed along with them
+_DISCARDABLE_PUSHES: Set[Op] = {
+    Op.int,
+    Op.pushint,
+    Op.byte,
+    Op.pushbytes,
+    Op.addr,
+    Op.method_signature,
+    Op.load,
+    Op.dup,
+}
+
+
+def _stack_effect(op: TealOp) -> Optional[Tuple[int, int]]:
+    """Get the number of values (popped, pushed) by an op, or None if it is not known.
+
+    Ops that reach below the top of the stack, such as dig and cover, are described as popping
+    every value they can access and pushing back the values they leave.
+    """
+    if op.op in _FIXED_STACK_EFFECTS:
+        return _FIXED_STACK_EFFECTS[op.op]
+
+    if len(op.args) != 1 or type(op.args[0]) is not int:
+        return None
+
+    n = op.args[0]
+    if op.op == Op.dig:
+        return n + 1, n + 2
+    if op.op == Op.cover or op.op == Op.uncover:
+        return n + 1, n + 1
+    if op.op == Op.bury:
+        return n + 1, n
+    if op.op == Op.popn:
+        return n, 0
+    if op.op == Op.dupn:
+        return 1, n + 1
+
+    return None
+
+
+def _move_to_top(
+    expr: Optional[Expr], depth: int, version: int
+) -> Optional[List[TealOp]]:
+    """Get the ops which move the value depth positions below the top of the stack to the top,
+    or None if that is not possible in version."""
+    if depth == 0:
+        return []
+    if depth == 1 and version >= Op.swap.min_version:
+        return [TealOp(expr, Op.swap)]
+    if version >= Op.uncover.min_version and depth <= 255:
+        return [TealOp(expr, Op.uncover, depth)]
+    return None
+
+
+def _keep_value_on_stack(
+    block: TealBlock,
+    live_out: Set[SlotRef],
+    skip_slots: Set[ScratchSlot],
+    version: int,
+) -> bool:
+    """Apply a single liveness based optimization to the ops of block, if one is possible.
+
+    Two rewrites are attempted for each store to an optimizable slot:
+    1. If the slot is not live after the store, the stored value is never loaded. The store is
+        replaced with a pop, or removed along with the op that pushed the value.
+    2. If the next access to the slot in the block is a load after which the slot is no longer live,
+        the value is left on the stack instead. The store is removed and the load is replaced with
+        ops that move the value to the top of the stack, provided the ops in between never pop it.
+
+    Returns:
+        True if and only if block was changed.
+    """
+    ops = block.ops
+    live_after = live_after_ops(ops, live_out)
+
+    for i, op in enumerate(ops):
+        if type(op) is not TealOp or op.op != Op.store:
+            continue
+
+        slots = op.getSlots()
+        if len(slots) != 1:
+            raise TealInternalError("store op does not have exactly one slot argument")
+        slot = slots[0]
+        if slot in skip_slots:
+            continue
+
+        if slot not in live_after[i]:
+            prev = ops[i - 1] if i > 0 else None
+            if type(prev) is TealOp and prev.op in _DISCARDABLE_PUSHES:
+                block.ops = ops[: i - 1] + ops[i + 1 :]
+            else:
+                block.ops = ops[:i] + [TealOp(op.expr, Op.pop)] + ops[i + 1 :]
+            return True
+
+        height = 0
+        for j in range(i + 1, len(ops)):
+            next_op = ops[j]
+            if slot in next_op.getSlots():
+                if next_op.op != Op.load or slot in live_after[j]:
+                    break
+
+                moves = _move_to_top(next_op.expr, height, version)
+                if moves is None:
+                    break
+
+                block.ops = ops[:i] + ops[i + 1 : j] + moves + ops[j + 1 :]
+                return True
+
+            effect = _stack_effect(next_op)
+            if effect is None:
+                break
+
+            pops, pushes = effect
+            if height < pops:
+                # this op would consume the value
+                break
+            height += pushes - pops
+
+    return False
+
+
+def _apply_liveness_optimizations(
+    start: TealBlock, skip_slots: Set[ScratchSlot], version: int
+) -> None:
+    changed = True
+    while changed:
+        changed = False
+        # Every rewrite removes a store, and can only shrink the sets of live slots, so the
+        # liveness computed at the start of a round remains a safe over-approximation for the
+        # whole round.
+        liveness = SlotLiveness(start)
+        for block in TealBlock.Iterate(start):
+            while _keep_value_on_stack(
+                block, liveness.live_out(block), skip_slots, version
+            ):
+                changed = True
 
 
 def apply_global_optimizations(
     start: TealBlock, options: OptimizeOptions, version: int
 ) -> TealBlock:
+    index = _SlotAccessIndex(start)
+
     # limit number of iterations to length of teal program to avoid potential
     # infinite loops.
     for block in TealBlock.Iterate(start):
         for _ in range(len(block.ops)):
             prev_ops = block.ops.copy()
             if options.optimize_scratch_slots(version):
-                _apply_slot_to_stack(block, start, options._skip_slots)
+                _apply_slot_to_stack(block, start, options._skip_slots, index)
 
             if prev_ops == block.ops:
                 break
 
+    if options.optimize_stack_values(version):
+        _apply_liveness_optimizations(start, options._skip_slots, version)
+
     return start
 
 
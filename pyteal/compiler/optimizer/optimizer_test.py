@@ -1,6 +1,10 @@
 import pytest
 
-from pyteal.compiler.optimizer.optimizer import OptimizeOptions, _apply_slot_to_stack
+from pyteal.compiler.optimizer.optimizer import (
+    OptimizeOptions,
+    _apply_slot_to_stack,
+    _SlotAccessIndex,
+)
 
 import pyteal as pt
 
@@ -65,6 +69,51 @@ def test_optimize_single_block():
     assert block == expected
 
 
+def test_slot_access_index():
+    slot1 = pt.ScratchSlot(1)
+    slot2 = pt.ScratchSlot(2)
+
+    blockEnd = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.load, slot2),
+            pt.TealOp(None, pt.Op.return_),
+        ]
+    )
+    block = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.store, slot1),
+            pt.TealOp(None, pt.Op.load, slot1),
+            pt.TealOp(None, pt.Op.store, slot2),
+        ]
+    )
+    block.setNextBlock(blockEnd)
+
+    index = _SlotAccessIndex(block)
+    assert not index.has_load_dependencies(block, slot1, 2)
+    assert index.has_load_dependencies(block, slot1, 1)
+    assert index.has_load_dependencies(block, slot2, 0)
+    assert not index.has_load_dependencies(blockEnd, slot2, 0)
+
+    index.remove_slot_access({slot1})
+    assert block.ops == [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, slot2),
+    ]
+    assert blockEnd.ops == [
+        pt.TealOp(None, pt.Op.load, slot2),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+    assert not index.has_load_dependencies(block, slot1, 2)
+    assert index.has_load_dependencies(block, slot2, 0)
+
+    # positions are updated as ops are removed
+    index.remove_slot_access({slot2})
+    assert block.ops == [pt.TealOp(None, pt.Op.int, 1)]
+    assert blockEnd.ops == [pt.TealOp(None, pt.Op.return_)]
+    assert not index.has_load_dependencies(blockEnd, slot2, 1)
+
+
 def test_optimize_subroutine():
     @pt.Subroutine(pt.TealType.uint64)
     def add(a1: pt.Expr, a2: pt.Expr) -> pt.Expr:
@@ -573,11 +622,27 @@ def test_optimize_default_for_version_etc():
     assert oo.optimize_scratch_slots(9) is True
     assert oo.use_frame_pointers(9) is True
 
+    assert oo.optimize_stack_values(7) is False
+    assert oo.optimize_stack_values(9) is False
+    assert oo.optimize_slots(8) is False
+    assert oo.optimize_slots(9) is True
+    assert oo.optimize_constant_folding(9) is False
+    assert oo.optimize_common_subexpressions(9) is False
+    assert oo.reuse_slots(9) is False
+    assert oo.spill_live_slots(9) is False
+    assert oo.optimize_on_complete_checks(9) is False
+    assert oo.lazy_method_args(9) is False
+
     oo = OptimizeOptions(scratch_slots=True)
     assert oo.optimize_scratch_slots(7) is True
     assert oo.optimize_scratch_slots(8) is True
     assert oo.optimize_scratch_slots(9) is True
 
+    oo = OptimizeOptions(scratch_slots=False, stack_values=True)
+    assert oo.optimize_scratch_slots(9) is False
+    assert oo.optimize_stack_values(7) is True
+    assert oo.optimize_slots(7) is True
+
     oo = OptimizeOptions(scratch_slots=False)
     assert oo.optimize_scratch_slots(7) is False
     assert oo.optimize_scratch_slots(8) is False
@@ -595,3 +660,150 @@ def test_optimize_default_for_version_etc():
 
     assert oo.use_frame_pointers(8) is True
     assert oo.use_frame_pointers(9) is True
+
+
+def test_optimize_stack_values():
+    a = pt.ScratchVar(pt.TealType.uint64)
+    b = pt.ScratchVar(pt.TealType.uint64)
+    c = pt.ScratchVar(pt.TealType.uint64)
+    d = pt.ScratchVar(pt.TealType.uint64)
+    reserved = pt.ScratchVar(pt.TealType.uint64, 100)
+    program = pt.Seq(
+        a.store(pt.Txn.fee()),
+        b.store(pt.Txn.first_valid()),
+        c.store(pt.Int(5)),
+        reserved.store(pt.Int(6)),
+        pt.Pop(pt.Txn.last_valid() - b.load() + a.load()),
+        a.store(pt.Txn.fee()),
+        d.store(pt.Txn.amount()),
+        pt.Pop(pt.Txn.first_valid() * (pt.Txn.last_valid() + d.load())),
+        pt.Approve(),
+    )
+
+    optimize_options = OptimizeOptions(stack_values=True)
+
+    # values can't be moved without swap, only dead stores are removed
+    expected = """#pragma version 2
+txn Fee
+store 0
+txn FirstValid
+store 1
+int 6
+store 100
+txn LastValid
+load 1
+-
+load 0
++
+pop
+txn Fee
+pop
+txn Amount
+store 2
+txn FirstValid
+txn LastValid
+load 2
++
+*
+pop
+int 1
+return""".strip()
+    actual = pt.compileTeal(
+        program, version=2, mode=pt.Mode.Application, optimize=optimize_options
+    )
+    assert actual == expected
+
+    # values one position below the top of the stack are moved with swap
+    expected = """#pragma version 4
+txn Fee
+txn FirstValid
+int 6
+store 100
+txn LastValid
+swap
+-
+swap
++
+pop
+txn Fee
+pop
+txn Amount
+store 0
+txn FirstValid
+txn LastValid
+load 0
++
+*
+pop
+int 1
+return""".strip()
+    actual = pt.compileTeal(
+        program, version=4, mode=pt.Mode.Application, optimize=optimize_options
+    )
+    assert actual == expected
+
+    # values further down the stack are moved with uncover
+    expected = """#pragma version 5
+txn Fee
+txn FirstValid
+int 6
+store 100
+txn LastValid
+swap
+-
+swap
++
+pop
+txn Fee
+pop
+txn Amount
+txn FirstValid
+txn LastValid
+uncover 2
++
+*
+pop
+int 1
+return""".strip()
+    actual = pt.compileTeal(
+        program, version=5, mode=pt.Mode.Application, optimize=optimize_options
+    )
+    assert actual == expected
+
+
+def test_optimize_stack_values_live_across_blocks():
+    x = pt.ScratchVar(pt.TealType.uint64)
+    program = pt.Seq(
+        x.store(pt.Txn.fee()),
+        pt.If(pt.Txn.amount() > pt.Int(0))
+        .Then(pt.Pop(pt.Txn.amount() + x.load()))
+        .Else(pt.Pop(x.load())),
+        pt.Approve(),
+    )
+
+    # x is loaded in both branches, so it must stay in its slot
+    expected = """#pragma version 6
+txn Fee
+store 0
+txn Amount
+int 0
+>
+bnz main_l2
+load 0
+pop
+b main_l3
+main_l2:
+txn Amount
+load 0
++
+pop
+main_l3:
+int 1
+return""".strip()
+    actual = pt.compileTeal(
+        program,
+        version=6,
+        mode=pt.Mode.Application,
+        optimize=OptimizeOptions(stack_values=True),
+    )
+    assert actual == expected
@@ -0,0 +1,258 @@
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Union
+
+from pyteal.ir import LabelReference, Op, TealComponent, TealLabel, TealOp
+
+if TYPE_CHECKING:
+    from pyteal.ast import ScratchSlot, SubroutineDefinition
+
+
+def _derived_op(
+    source: TealComponent,
+    op: Op,
+    *args: Union[int, str, LabelReference, "ScratchSlot", "SubroutineDefinition"]
+) -> TealOp:
+    """Create a TealOp which replaces source, keeping the source's stack frames so that sourcemaps
+    still point to the code that produced the original op."""
+    derived = TealOp(source.expr, op, *args)
+    derived._sframes_container = source._sframes_container
+    derived._stack_frames = source._stack_frames
+    return derived
+
+
+def _is_op(component: TealComponent, op: Op, *args) -> bool:
+    if type(component) is not TealOp or component.op != op:
+        return False
+    return len(args) == 0 or component.args == list(args)
+
+
+def _as_op(component: TealComponent) -> TealOp:
+    assert type(component) is TealOp
+    return component
+
+
+def _is_int_zero(component: TealComponent) -> bool:
+    # "NoOp" is the named constant for OnComplete.NoOp, which is 0
+    return _is_op(component, Op.int, 0) or _is_op(component, Op.int, "NoOp")
+
+
+def _is_jump_to_label(jump: TealComponent, label: TealComponent) -> bool:
+    return (
+        type(jump) is TealOp
+        and type(label) is TealLabel
+        and len(jump.args) == 1
+        and jump.args[0] == label.getLabelRef()
+    )
+
+
+@dataclass(frozen=True)
+class PeepholeRule:
+    """A rewrite of a window of consecutive TealComponents.
+
+    Args:
+        name: A unique name for the rule, used to count how often it applies.
+        last: The op that the last component of the window must have, or None if the last component
+            must be a label.
+        size: The number of components in the window.
+        matches: A function which determines whether the rule applies to a window.
+        rewrite: A function which returns the components that replace a matched window.
+    """
+
+    name: str
+    last: Optional[Op]
+    size: int
+    matches: Callable[[Sequence[TealComponent]], bool]
+    rewrite: Callable[[Sequence[TealComponent]], List[TealComponent]]
+
+
+PEEPHOLE_RULES: List[PeepholeRule] = [
+    # x == 0 is the same as !x
+    PeepholeRule(
+        "int 0; == -> !",
+        Op.eq,
+        2,
+        lambda w: _is_int_zero(w[0]),
+        lambda w: [_derived_op(w[1], Op.logic_not)],
+    ),
+    PeepholeRule(
+        "itob; btoi -> (nothing)",
+        Op.btoi,
+        2,
+        lambda w: _is_op(w[0], Op.itob),
+        lambda w: [],
+    ),
+    PeepholeRule(
+        "dup; pop -> (nothing)",
+        Op.pop,
+        2,
+        lambda w: _is_op(w[0], Op.dup),
+        lambda w: [],
+    ),
+    PeepholeRule(
+        "swap; swap -> (nothing)",
+        Op.swap,
+        2,
+        lambda w: _is_op(w[0], Op.swap),
+        lambda w: [],
+    ),
+    PeepholeRule(
+        "!; bz -> bnz",
+        Op.bz,
+        2,
+        lambda w: _is_op(w[0], Op.logic_not),
+        lambda w: [_derived_op(w[1], Op.bnz, *_as_op(w[1]).args)],
+    ),
+    PeepholeRule(
+        "!; bnz -> bz",
+        Op.bnz,
+        2,
+        lambda w: _is_op(w[0], Op.logic_not),
+        lambda w: [_derived_op(w[1], Op.bz, *_as_op(w[1]).args)],
+    ),
+    PeepholeRule(
+        "b L; L: -> L:",
+        None,
+        2,
+        lambda w: _is_op(w[0], Op.b) and _is_jump_to_label(w[0], w[1]),
+        lambda w: [w[1]],
+    ),
+    PeepholeRule(
+        "bz L; L: -> pop; L:",
+        None,
+        2,
+        lambda w: _is_op(w[0], Op.bz) and _is_jump_to_label(w[0], w[1]),
+        lambda w: [_derived_op(w[0], Op.pop), w[1]],
+    ),
+    PeepholeRule(
+        "bnz L; L: -> pop; L:",
+        None,
+        2,
+        lambda w: _is_op(w[0], Op.bnz) and _is_jump_to_label(w[0], w[1]),
+        lambda w: [_derived_op(w[0], Op.pop), w[1]],
+    ),
+]
+
+# the name of the rule which replaces a branch to a short exiting tail of code with a copy of it
+INLINE_TAIL_RULE = "b L; ...; L: <exit> -> <exit>"
+
+
+def _exit_tails(components: List[TealComponent]) -> Dict[str, List[TealOp]]:
+    """Find the labels that are immediately followed by a short sequence of code that exits the
+    program or subroutine, i.e. `retsub`, `err`, or `int N; return`."""
+    tails: Dict[str, List[TealOp]] = dict()
+    for i, component in enumerate(components):
+        if type(component) is not TealLabel:
+            continue
+
+        following = components[i + 1 : i + 3]
+        if len(following) >= 1 and (
+            _is_op(following[0], Op.retsub) or _is_op(following[0], Op.err)
+        ):
+            tails[component.getLabelRef().getLabel()] = [_as_op(following[0])]
+        elif (
+            len(following) == 2
+            and _is_op(following[0], Op.int)
+            and _is_op(following[1], Op.return_)
+        ):
+            tails[component.getLabelRef().getLabel()] = [
+                _as_op(following[0]),
+                _as_op(following[1]),
+            ]
+
+    return tails
+
+
+def _inline_exit_tails(
+    components: List[TealComponent], hits: "Counter[str]"
+) -> List[TealComponent]:
+    """Replace unconditional branches to exiting tails of code with copies of those tails. This
+    saves the cost of the branch every time it is taken, at the expense of program size.
+    """
+    tails = _exit_tails(components)
+
+    result: List[TealComponent] = []
+    for i, component in enumerate(components):
+        if not _is_op(component, Op.b) or len(_as_op(component).args) != 1:
+            result.append(component)
+            continue
+
+        targetRef = _as_op(component).args[0]
+        if not isinstance(targetRef, LabelReference):
+            result.append(component)
+            continue
+
+        target = targetRef.getLabel()
+        nextComponent = components[i + 1] if i + 1 < len(components) else None
+        if target not in tails or (
+            nextComponent is not None and _is_jump_to_label(component, nextComponent)
+        ):
+            # jumps to the very next label are removed by the "b L; L:" rule instead
+            result.append(component)
+            continue
+
+        hits[INLINE_TAIL_RULE] += 1
+        result += [
+            _derived_op(component, tailOp.op, *tailOp.args) for tailOp in tails[target]
+        ]
+
+    return result
+
+
+def apply_peephole_optimizations(
+    components: List[TealComponent],
+    rules: Optional[List[PeepholeRule]] = None,
+    hits: Optional["Counter[str]"] = None,
+) -> List[TealComponent]:
+    """Apply peephole optimizations to a flattened program.
+
+    Rules are matched against the end of the optimized program as each component is added to it.
+    The components produced by a rewrite are added back one at a time, so that rewrites can enable
+    further rewrites, e.g. `int 0; ==; bz L` becomes `!; bz L` and then `bnz L`.
+
+    Args:
+        components: The program to optimize. It's expected that subroutines have been resolved and
+            the program has been flattened.
+        rules (optional): The rules to apply. Defaults to PEEPHOLE_RULES.
+        hits (optional): A counter which will be incremented by the name of each rule every time it
+            is applied.
+
+    Returns:
+        The optimized program.
+    """
+    if rules is None:
+        rules = PEEPHOLE_RULES
+    if hits is None:
+        hits = Counter()
+
+    rulesByLast: Dict[Optional[Op], List[PeepholeRule]] = dict()
+    for rule in rules:
+        rulesByLast.setdefault(rule.last, []).append(rule)
+
+    pending = deque(_inline_exit_tails(components, hits))
+    result: List[TealComponent] = []
+    while len(pending) != 0:
+        component = pending.popleft()
+        result.append(component)
+
+        if type(component) is TealOp:
+            last: Optional[Op] = component.op
+        elif type(component) is TealLabel:
+            last = None
+        else:
+            continue
+
+        for rule in rulesByLast.get(last, []):
+            if len(result) < rule.size:
+                continue
+
+            window = result[-rule.size :]
+            if not rule.matches(window):
+                continue
+
+            hits[rule.name] += 1
+            del result[-rule.size :]
+            pending.extendleft(reversed(rule.rewrite(window)))
+            break
+
+    return result
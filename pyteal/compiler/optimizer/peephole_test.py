@@ -0,0 +1,231 @@
+from collections import Counter
+
+import pyteal as pt
+
+from pyteal.compiler.optimizer.peephole import (
+    INLINE_TAIL_RULE,
+    apply_peephole_optimizations,
+)
+
+
+def test_peephole_no_change():
+    components = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.int, 0),
+        pt.TealOp(None, pt.Op.neq),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    hits: Counter[str] = Counter()
+    actual = apply_peephole_optimizations(components, hits=hits)
+
+    assert actual == components
+    assert hits == Counter()
+
+
+def test_peephole_rules():
+    cases = [
+        (
+            [pt.TealOp(None, pt.Op.int, 0), pt.TealOp(None, pt.Op.eq)],
+            [pt.TealOp(None, pt.Op.logic_not)],
+            "int 0; == -> !",
+        ),
+        (
+            [pt.TealOp(None, pt.Op.int, "NoOp"), pt.TealOp(None, pt.Op.eq)],
+            [pt.TealOp(None, pt.Op.logic_not)],
+            "int 0; == -> !",
+        ),
+        (
+            [pt.TealOp(None, pt.Op.itob), pt.TealOp(None, pt.Op.btoi)],
+            [],
+            "itob; btoi -> (nothing)",
+        ),
+        (
+            [pt.TealOp(None, pt.Op.dup), pt.TealOp(None, pt.Op.pop)],
+            [],
+            "dup; pop -> (nothing)",
+        ),
+        (
+            [pt.TealOp(None, pt.Op.swap), pt.TealOp(None, pt.Op.swap)],
+            [],
+            "swap; swap -> (nothing)",
+        ),
+    ]
+
+    for pattern, replacement, name in cases:
+        components = (
+            [pt.TealOp(None, pt.Op.txn, "Fee")]
+            + pattern
+            + [pt.TealOp(None, pt.Op.return_)]
+        )
+        expected = (
+            [pt.TealOp(None, pt.Op.txn, "Fee")]
+            + replacement
+            + [pt.TealOp(None, pt.Op.return_)]
+        )
+
+        hits: Counter[str] = Counter()
+        with pt.TealComponent.Context.ignoreExprEquality():
+            actual = apply_peephole_optimizations(components, hits=hits)
+            assert actual == expected, name
+        assert hits == Counter({name: 1})
+
+
+def test_peephole_cascade():
+    l1 = pt.LabelReference("l1")
+    components = [
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.int, 0),
+        pt.TealOp(None, pt.Op.eq),
+        pt.TealOp(None, pt.Op.bnz, l1),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, l1),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    expected = [
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.bz, l1),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, l1),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    hits: Counter[str] = Counter()
+    with pt.TealComponent.Context.ignoreExprEquality():
+        actual = apply_peephole_optimizations(components, hits=hits)
+        assert actual == expected
+    assert hits == Counter({"int 0; == -> !": 1, "!; bnz -> bz": 1})
+
+
+def test_peephole_jump_to_next_label():
+    l1 = pt.LabelReference("l1")
+    l2 = pt.LabelReference("l2")
+    components = [
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.bz, l1),
+        pt.TealLabel(None, l1),
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.b, l2),
+        pt.TealLabel(None, l2),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    expected = [
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealLabel(None, l1),
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealLabel(None, l2),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    hits: Counter[str] = Counter()
+    with pt.TealComponent.Context.ignoreExprEquality():
+        actual = apply_peephole_optimizations(components, hits=hits)
+        assert actual == expected
+    assert hits == Counter({"bz L; L: -> pop; L:": 1, "b L; L: -> L:": 1})
+
+
+def test_peephole_inline_exit_tail():
+    l1 = pt.LabelReference("l1")
+    l2 = pt.LabelReference("l2")
+    sub = pt.LabelReference("sub_0")
+    components = [
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.bnz, l1),
+        pt.TealOp(None, pt.Op.callsub, "sub_0"),
+        pt.TealOp(None, pt.Op.b, l1),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, l1),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, sub, "sub"),
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.bz, l2),
+        pt.TealOp(None, pt.Op.b, l2),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, l2),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+
+    expected = [
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.bnz, l1),
+        pt.TealOp(None, pt.Op.callsub, "sub_0"),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, l1),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.return_),
+        pt.TealLabel(None, sub, "sub"),
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.bz, l2),
+        pt.TealOp(None, pt.Op.retsub),
+        pt.TealOp(None, pt.Op.err),
+        pt.TealLabel(None, l2),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+
+    hits: Counter[str] = Counter()
+    with pt.TealComponent.Context.ignoreExprEquality():
+        actual = apply_peephole_optimizations(components, hits=hits)
+        assert actual == expected
+    assert hits == Counter({INLINE_TAIL_RULE: 2})
+
+
+def test_peephole_keeps_expr():
+    eq_expr = pt.Txn.fee() == pt.Int(0)
+    components = [
+        pt.TealOp(None, pt.Op.txn, "Fee"),
+        pt.TealOp(None, pt.Op.int, 0),
+        pt.TealOp(eq_expr, pt.Op.eq),
+    ]
+
+    actual = apply_peephole_optimizations(components)
+
+    assert len(actual) == 2
+    assert actual[1] == pt.TealOp(eq_expr, pt.Op.logic_not)
+    assert actual[1].stack_frames() is eq_expr.stack_frames
+
+
+def test_peephole_compile():
+    program = pt.Seq(
+        pt.If(pt.Txn.application_id() == pt.Int(0)).Then(pt.Approve()),
+        pt.Assert(pt.Txn.on_completion() == pt.OnComplete.NoOp),
+        pt.Approve(),
+    )
+
+    optimize_options = pt.OptimizeOptions(peephole=True)
+
+    expected = """#pragma version 6
+txn ApplicationID
+bnz main_l2
+int 1
+return
+main_l2:
+txn OnCompletion
+!
+assert
+int 1
+return""".strip()
+    actual = pt.compileTeal(
+        program, version=6, mode=pt.Mode.Application, optimize=optimize_options
+    )
+    assert actual == expected
+    assert optimize_options.peephole_hits == Counter(
+        {"int 0; == -> !": 2, "!; bz -> bnz": 1}
+    )
+
+    # hits accumulate across compilations
+    pt.compileTeal(
+        program, version=6, mode=pt.Mode.Application, optimize=optimize_options
+    )
+    assert optimize_options.peephole_hits == Counter(
+        {"int 0; == -> !": 4, "!; bz -> bnz": 2}
+    )
@@ -0,0 +1,314 @@
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from pyteal.ast import ScratchSlot
+from pyteal.compiler.optimizer.optimizer import _stack_effect
+from pyteal.compiler.optimizer.peephole import _derived_op
+from pyteal.ir import Op, OpPurity, TealBlock, TealOp
+
+# The opcode cost of ops which cost more than 1. Only ops which can appear in a common
+# subexpression are listed.
+_OP_COSTS: Dict[Op, int] = {
+    Op.sha256: 35,
+    Op.keccak256: 130,
+    Op.sha512_256: 45,
+    Op.sha3_256: 130,
+    Op.ed25519verify: 1900,
+    Op.ed25519verify_bare: 1900,
+    Op.ecdsa_verify: 1700,
+    Op.ecdsa_pk_decompress: 650,
+    Op.ecdsa_pk_recover: 2000,
+    Op.bsqrt: 40,
+    Op.b_mul: 20,
+    Op.b_div: 20,
+    Op.b_mod: 20,
+}
+
+# The cost of materializing a subexpression: `dup; store` after its first evaluation
+_MATERIALIZE_COST = 2
+
+
+def _purity(op: TealOp) -> OpPurity:
+    if op.op == Op.global_ and op.args == ["OpcodeBudget"]:
+        # the budget decreases after every op, so this is never safe to reuse
+        return OpPurity.effect
+    return op.op.purity
+
+
+@dataclass
+class _Occurrence:
+    """A sequence of ops, block.ops[start:end], which computes a single value from nothing."""
+
+    block: TealBlock
+    start: int
+    end: int
+    # the occurrences which reuse the value computed by this one
+    uses: List["_Occurrence"] = field(default_factory=list)
+
+
+class _Dominators:
+    """The dominator tree of a control flow graph.
+
+    Block A dominates block B if every path from the start of the graph to B passes through A.
+    """
+
+    def __init__(self, start: TealBlock) -> None:
+        # compute a reverse postorder of the graph
+        postorder: List[TealBlock] = []
+        visited = {id(start)}
+        stack: List[Tuple[TealBlock, int]] = [(start, 0)]
+        while len(stack) != 0:
+            block, i = stack.pop()
+            outgoing = block.getOutgoing()
+            if i < len(outgoing):
+                stack.append((block, i + 1))
+                nextBlock = outgoing[i]
+                if id(nextBlock) not in visited:
+                    visited.add(id(nextBlock))
+                    stack.append((nextBlock, 0))
+            else:
+                postorder.append(block)
+        order = list(reversed(postorder))
+
+        self.blocks = order
+        index = {id(b): i for i, b in enumerate(order)}
+        preds: Dict[int, List[TealBlock]] = {id(b): [] for b in order}
+        for block in order:
+            for nextBlock in block.getOutgoing():
+                preds[id(nextBlock)].append(block)
+
+        # the iterative algorithm from "A Simple, Fast Dominance Algorithm" by Cooper, Harvey and
+        # Kennedy
+        idom: Dict[int, TealBlock] = {id(start): start}
+
+        def intersect(a: TealBlock, b: TealBlock) -> TealBlock:
+            while a is not b:
+                while index[id(a)] > index[id(b)]:
+                    a = idom[id(a)]
+                while index[id(b)] > index[id(a)]:
+                    b = idom[id(b)]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                newIdom: Optional[TealBlock] = None
+                for pred in preds[id(block)]:
+                    if id(pred) in idom:
+                        newIdom = pred if newIdom is None else intersect(pred, newIdom)
+                if newIdom is not None and idom.get(id(block)) is not newIdom:
+                    idom[id(block)] = newIdom
+                    changed = True
+
+        # number the dominator tree so that dominance can be checked in constant time
+        children: Dict[int, List[TealBlock]] = {id(b): [] for b in order}
+        for block in order[1:]:
+            children[id(idom[id(block)])].append(block)
+
+        self._enter: Dict[int, int] = dict()
+        self._exit: Dict[int, int] = dict()
+        counter = 0
+        numbering: List[Tuple[TealBlock, bool]] = [(start, False)]
+        while len(numbering) != 0:
+            block, done = numbering.pop()
+            counter += 1
+            if done:
+                self._exit[id(block)] = counter
+                continue
+            self._enter[id(block)] = counter
+            numbering.append((block, True))
+            for child in reversed(children[id(block)]):
+                numbering.append((child, False))
+
+    def dominates(self, a: TealBlock, b: TealBlock) -> bool:
+        """Check if block a dominates block b. Every block dominates itself."""
+        return (
+            self._enter[id(a)] <= self._enter[id(b)]
+            and self._exit[id(b)] <= self._exit[id(a)]
+        )
+
+    def preorder(self, block: TealBlock) -> int:
+        """Get the position of block in a preorder traversal of the dominator tree."""
+        return self._enter[id(block)]
+
+
+def _expression_start(ops: List[TealOp], end: int) -> Optional[int]:
+    """Find the start of the shortest sequence of ops ending at ops[end] which computes a single
+    value from nothing, using only ops which read values without side effects and push exactly one
+    value.
+
+    Returns:
+        The index of the first op of the sequence, or None if there is no such sequence.
+    """
+    needed = 1
+    for i in range(end, -1, -1):
+        op = ops[i]
+        if type(op) is not TealOp or _purity(op) not in (
+            OpPurity.pure,
+            OpPurity.environment,
+            OpPurity.state,
+        ):
+            return None
+
+        effect = _stack_effect(op)
+        if effect is None or effect[1] != 1:
+            return None
+
+        needed += effect[0] - 1
+        if needed == 0:
+            return i
+
+    return None
+
+
+def _key(ops: List[TealOp]) -> Hashable:
+    return tuple((op.op, tuple(op.args)) for op in ops)
+
+
+def apply_common_subexpression_elimination(start: TealBlock) -> int:
+    """Compute repeated subexpressions of a subroutine only once.
+
+    A subexpression is a sequence of ops which computes a single value from nothing, such as
+    `txna ApplicationArgs 0; btoi`. When the same subexpression is evaluated again at a point that
+    is dominated by an earlier evaluation, the earlier value is saved to a new scratch slot and the
+    later evaluation is replaced by a load of that slot. This is only done when the value is
+    certain to be the same:
+
+    * The ops of a subexpression must read only their arguments, or values that are fixed for the
+      whole execution of the program, such as transaction fields.
+    * A subexpression which reads values that the program can change, such as application state,
+      is only reused if there are no ops with side effects between the two evaluations.
+
+    Larger subexpressions are considered first, and a subexpression is only materialized if doing
+    so reduces the opcode cost of the subroutine.
+
+    Args:
+        start: The start of the subroutine's control flow graph. It will be modified in place.
+
+    Returns:
+        The number of subexpression evaluations which were replaced.
+    """
+    dominators = _Dominators(start)
+
+    effectsAnywhere = False
+    occurrences: Dict[Hashable, List[_Occurrence]] = dict()
+    for block in dominators.blocks:
+        for end, op in enumerate(block.ops):
+            if _purity(op) == OpPurity.effect:
+                effectsAnywhere = True
+
+            exprStart = _expression_start(block.ops, end)
+            if exprStart is None or exprStart == end and _OP_COSTS.get(op.op, 1) <= 1:
+                # replacing a single op which costs 1 with a load saves nothing
+                continue
+
+            key = _key(block.ops[exprStart : end + 1])
+            occurrences.setdefault(key, []).append(
+                _Occurrence(block, exprStart, end + 1)
+            )
+
+    def reads_state(occurrence: _Occurrence) -> bool:
+        return any(
+            _purity(op) == OpPurity.state
+            for op in occurrence.block.ops[occurrence.start : occurrence.end]
+        )
+
+    def effect_between(first: _Occurrence, second: _Occurrence) -> bool:
+        return any(
+            _purity(op) == OpPurity.effect
+            for op in first.block.ops[first.end : second.start]
+        )
+
+    def reusable(first: _Occurrence, second: _Occurrence, state: bool) -> bool:
+        if first.block is second.block:
+            if first.end > second.start:
+                return False
+            return not state or not effect_between(first, second)
+        if state and effectsAnywhere:
+            return False
+        return dominators.dominates(first.block, second.block)
+
+    # id(block) -> ranges of ops which have already been rewritten
+    claimed: Dict[int, List[Tuple[int, int]]] = dict()
+
+    def is_claimed(occurrence: _Occurrence) -> bool:
+        return any(
+            start < occurrence.end and occurrence.start < end
+            for start, end in claimed.get(id(occurrence.block), [])
+        )
+
+    rewrites: List[Tuple[_Occurrence, ScratchSlot]] = []
+    for key, found in sorted(
+        occurrences.items(),
+        # larger subexpressions first, breaking ties by first occurrence to be deterministic
+        key=lambda item: (
+            item[1][0].start - item[1][0].end,
+            dominators.preorder(item[1][0].block),
+            item[1][0].start,
+        ),
+    ):
+        if len(found) < 2:
+            continue
+
+        state = reads_state(found[0])
+        definitions: List[_Occurrence] = []
+        for occurrence in sorted(
+            found, key=lambda o: (dominators.preorder(o.block), o.start)
+        ):
+            if is_claimed(occurrence):
+                continue
+
+            for definition in definitions:
+                if reusable(definition, occurrence, state):
+                    definition.uses.append(occurrence)
+                    break
+            else:
+                definitions.append(occurrence)
+
+        cost = sum(
+            _OP_COSTS.get(op.op, 1)
+            for op in found[0].block.ops[found[0].start : found[0].end]
+        )
+        for definition in definitions:
+            if len(definition.uses) * (cost - 1) <= _MATERIALIZE_COST:
+                # each reuse saves the cost of the subexpression minus the cost of a load
+                continue
+
+            slot = ScratchSlot()
+            for occurrence in [definition] + definition.uses:
+                claimed.setdefault(id(occurrence.block), []).append(
+                    (occurrence.start, occurrence.end)
+                )
+            rewrites.append((definition, slot))
+
+    # rewrite each block from its last op to its first, so that earlier positions remain valid
+    edits: Dict[int, List[Tuple[int, int, List[TealOp]]]] = dict()
+    replaced = 0
+    for definition, slot in rewrites:
+        last = definition.block.ops[definition.end - 1]
+        edits.setdefault(id(definition.block), []).append(
+            (
+                definition.start,
+                definition.end,
+                definition.block.ops[definition.start : definition.end]
+                + [_derived_op(last, Op.dup), _derived_op(last, Op.store, slot)],
+            )
+        )
+        for use in definition.uses:
+            edits.setdefault(id(use.block), []).append(
+                (
+                    use.start,
+                    use.end,
+                    [_derived_op(use.block.ops[use.end - 1], Op.load, slot)],
+                )
+            )
+            replaced += 1
+
+    for block in dominators.blocks:
+        for editStart, editEnd, newOps in sorted(
+            edits.get(id(block), []), key=lambda edit: edit[0], reverse=True
+        ):
+            block.ops = block.ops[:editStart] + newOps + block.ops[editEnd:]
+
+    return replaced
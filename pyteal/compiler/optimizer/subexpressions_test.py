@@ -0,0 +1,242 @@
+import pyteal as pt
+
+from pyteal.compiler.optimizer.subexpressions import (
+    apply_common_subexpression_elimination,
+)
+
+
+def compile_with_cse(program: pt.Expr, version: int = 8) -> str:
+    return pt.compileTeal(
+        program,
+        pt.Mode.Application,
+        version=version,
+        optimize=pt.OptimizeOptions(common_subexpressions=True),
+    )
+
+
+def test_cse_block():
+    slot = pt.ScratchSlot()
+    ops = [
+        pt.TealOp(None, pt.Op.txna, "ApplicationArgs", 0),
+        pt.TealOp(None, pt.Op.btoi),
+        pt.TealOp(None, pt.Op.txna, "ApplicationArgs", 0),
+        pt.TealOp(None, pt.Op.btoi),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.txna, "ApplicationArgs", 0),
+        pt.TealOp(None, pt.Op.btoi),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.txna, "ApplicationArgs", 0),
+        pt.TealOp(None, pt.Op.btoi),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.store, slot),
+    ]
+    block = pt.TealSimpleBlock(ops)
+
+    assert apply_common_subexpression_elimination(block) == 3
+
+    actual = [(op.op, op.args) for op in block.ops]
+    new_slot = block.ops[3].args[0]
+    assert new_slot != slot
+    assert actual == [
+        (pt.Op.txna, ["ApplicationArgs", 0]),
+        (pt.Op.btoi, []),
+        (pt.Op.dup, []),
+        (pt.Op.store, [new_slot]),
+        (pt.Op.load, [new_slot]),
+        (pt.Op.add, []),
+        (pt.Op.load, [new_slot]),
+        (pt.Op.add, []),
+        (pt.Op.load, [new_slot]),
+        (pt.Op.add, []),
+        (pt.Op.store, [slot]),
+    ]
+
+
+def test_cse_not_profitable():
+    # a single op which costs 1 is as cheap as a load
+    program = pt.Return(pt.Txn.fee() + pt.Txn.fee() + pt.Txn.fee())
+    expected = pt.compileTeal(program, pt.Mode.Application, version=8)
+
+    assert compile_with_cse(program) == expected
+
+    # a two op expression needs to be reused at least 3 times to pay for the dup and store
+    note_length = pt.Len(pt.Txn.note())
+    program = pt.Return(note_length + note_length + note_length)
+    expected = pt.compileTeal(program, pt.Mode.Application, version=8)
+
+    assert compile_with_cse(program) == expected
+
+
+def test_cse_expensive_op():
+    program = pt.Seq(
+        pt.Log(pt.Sha256(pt.Txn.sender())),
+        pt.Log(pt.Sha256(pt.Txn.sender())),
+        pt.Approve(),
+    )
+
+    expected = """#pragma version 8
+txn Sender
+sha256
+dup
+store 0
+log
+load 0
+log
+int 1
+return""".strip()
+
+    assert compile_with_cse(program) == expected
+
+
+def test_cse_dominated_branches():
+    arg = pt.Btoi(pt.Txn.application_args[0])
+    program = pt.Seq(
+        pt.Assert(arg > pt.Int(3)),
+        pt.If(arg == pt.Int(5))
+        .Then(pt.Log(pt.Itob(arg)))
+        .Else(pt.Log(pt.Itob(arg + arg))),
+        pt.Return(arg),
+    )
+
+    expected = """#pragma version 8
+txna ApplicationArgs 0
+btoi
+dup
+store 0
+int 3
+>
+assert
+load 0
+int 5
+==
+bnz main_l2
+load 0
+load 0
++
+itob
+log
+b main_l3
+main_l2:
+load 0
+itob
+log
+main_l3:
+load 0
+return""".strip()
+
+    assert compile_with_cse(program) == expected
+
+
+def test_cse_not_dominated():
+    # the first evaluation is conditional, so it can't be reused after the If
+    value = pt.Btoi(pt.Txn.note())
+    program = pt.Seq(
+        pt.If(pt.Txn.fee() == pt.Int(0)).Then(pt.Log(pt.Itob(value))),
+        pt.Log(pt.Itob(value + value + value + value)),
+        pt.Approve(),
+    )
+
+    expected = """#pragma version 8
+txn Fee
+int 0
+==
+bz main_l2
+txn Note
+btoi
+itob
+log
+main_l2:
+txn Note
+btoi
+dup
+store 0
+load 0
++
+load 0
++
+load 0
++
+itob
+log
+int 1
+return""".strip()
+
+    assert compile_with_cse(program) == expected
+
+
+def test_cse_state_invalidated_by_effects():
+    value = pt.App.globalGet(pt.Bytes("k"))
+    program = pt.Seq(
+        pt.Pop(value + value + value + value),
+        pt.App.globalPut(pt.Bytes("k"), pt.Int(1)),
+        pt.Return(value + value),
+    )
+
+    expected = """#pragma version 8
+byte "k"
+app_global_get
+dup
+store 0
+load 0
++
+load 0
++
+load 0
++
+pop
+byte "k"
+int 1
+app_global_put
+byte "k"
+app_global_get
+byte "k"
+app_global_get
++
+return""".strip()
+
+    assert compile_with_cse(program) == expected
+
+
+def test_cse_opcode_budget():
+    budget = pt.Global.opcode_budget()
+    program = pt.Return(pt.Add(*[budget + pt.Int(1) for _ in range(4)]))
+    expected = pt.compileTeal(program, pt.Mode.Application, version=8)
+
+    assert compile_with_cse(program) == expected
+
+
+def test_cse_subroutine():
+    @pt.Subroutine(pt.TealType.uint64)
+    def quadruple_arg():
+        arg = pt.Btoi(pt.Txn.application_args[1])
+        return arg + arg + arg + arg
+
+    program = pt.Return(
+        quadruple_arg() + pt.Btoi(pt.Txn.application_args[1]) + quadruple_arg()
+    )
+
+    expected = """#pragma version 8
+callsub quadruplearg_0
+txna ApplicationArgs 1
+btoi
++
+callsub quadruplearg_0
++
+return
+
+// quadruple_arg
+quadruplearg_0:
+proto 0 1
+txna ApplicationArgs 1
+btoi
+dup
+store 0
+load 0
++
+load 0
++
+load 0
++
+retsub""".strip()
+
+    assert compile_with_cse(program) == expected
@@ -4,6 +4,7 @@ from pyteal.ast import ScratchSlot, SubroutineDefinition
 from pyteal.ir import TealBlock, Op
 from pyteal.errors import TealInternalError
 from pyteal.config import NUM_SLOTS
+from pyteal.compiler.optimizer.liveness import SlotLiveness, live_after_ops
 
 
 def collect_unoptimized_slots(
@@ -87,16 +88,115 @@ def collectScratchSlots(
     return global_slots, local_slots
 
 
+def _reachableSubroutines(
+    subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+) -> Dict[SubroutineDefinition, Set[SubroutineDefinition]]:
+    """Find the subroutines which may run during a call to each subroutine, including itself."""
+    calls: Dict[Optional[SubroutineDefinition], Set[SubroutineDefinition]] = dict()
+    for subroutine, start in subroutineBlocks.items():
+        called: Set[SubroutineDefinition] = set()
+        for block in TealBlock.Iterate(start):
+            for op in block.ops:
+                called.update(op.getSubroutines())
+        calls[subroutine] = called
+
+    reachable: Dict[SubroutineDefinition, Set[SubroutineDefinition]] = dict()
+    for subroutine in calls:
+        if subroutine is None:
+            continue
+
+        found = {subroutine}
+        pending = [subroutine]
+        while len(pending) != 0:
+            for callee in calls.get(pending.pop(), set()):
+                if callee not in found:
+                    found.add(callee)
+                    pending.append(callee)
+        reachable[subroutine] = found
+
+    return reachable
+
+
+def buildSlotInterferenceGraph(
+    subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    localSlots: Dict[Optional[SubroutineDefinition], Set[ScratchSlot]],
+) -> Dict[ScratchSlot, Set[ScratchSlot]]:
+    """Find the local slots which cannot share the same slot ID.
+
+    Two local slots interfere if one of them may be stored to while the other holds a value that
+    will be loaded later. This happens if:
+        1. Both slots belong to the same subroutine, and one is stored to while the other is live.
+        2. A slot is live across a call to a subroutine which may, directly or through other
+           subroutines, run code that stores to the other slot.
+
+    Slots of a recursive subroutine do not interfere with each other because of recursion, since
+    the compiler spills them to the stack around calls which may reenter the subroutine.
+
+    Args:
+        subroutineBlocks: A mapping from subroutine to the subroutine's control flow graph.
+            The key None is taken to mean the main program routine.
+        localSlots: The local slots of each subroutine, as returned by collectScratchSlots.
+
+    Returns:
+        A dictionary whose keys are all local slots, and whose values are the local slots each
+        key interferes with.
+    """
+    graph: Dict[ScratchSlot, Set[ScratchSlot]] = {
+        slot: set() for slots in localSlots.values() for slot in slots
+    }
+    reachable = _reachableSubroutines(subroutineBlocks)
+
+    def interfere(a: ScratchSlot, others: Set[ScratchSlot]) -> None:
+        for b in others:
+            if a is not b:
+                graph[a].add(b)
+                graph[b].add(a)
+
+    for subroutine, start in subroutineBlocks.items():
+        slots = localSlots[subroutine]
+        if len(slots) == 0:
+            continue
+
+        liveness = SlotLiveness(start)
+        for block in TealBlock.Iterate(start):
+            live_after = live_after_ops(block.ops, liveness.live_out(block))
+            for op, live in zip(block.ops, live_after):
+                liveLocals = cast(Set[ScratchSlot], live & slots)
+                if op.op == Op.store:
+                    for slot in op.getSlots():
+                        if slot in slots:
+                            interfere(slot, liveLocals)
+
+                for called in op.getSubroutines():
+                    clobbered: Set[ScratchSlot] = set()
+                    for other in reachable[called]:
+                        if other is not subroutine:
+                            clobbered |= localSlots.get(other, set())
+                    for slot in liveLocals:
+                        interfere(slot, clobbered)
+
+    return graph
+
+
 def assignScratchSlotsToSubroutines(
     subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+    reuseSlots: bool = False,
 ) -> Dict[Optional[SubroutineDefinition], Set[int]]:
     """Assign scratch slot values for an entire program.
 
+    By default, every scratch slot receives a unique slot ID. If reuseSlots is True, or if the
+    program references more scratch slots than are available, the IDs are instead assigned by
+    colouring the graph returned by buildSlotInterferenceGraph, so that local slots whose values
+    are never needed at the same time share a slot ID. Global slots, reserved slots, and slots
+    referenced by DynamicScratchVars always receive their own IDs.
+
     Args:
         subroutineBlocks: A mapping from subroutine to the control flow graph of the subroutine's
             blocks. The key None is taken to mean the main program routine. The values of this
             map will be modified in order to assign specific slot values to all referenced scratch
             slots.
+        reuseSlots (optional): Whether to assign the same slot ID to local slots whose lifetimes
+            do not overlap, even if every slot could receive a unique ID. Defaults to False.
 
     Raises:
         TealInternalError: if the scratch slots referenced by the program do not fit into 256 slots,
@@ -127,13 +227,6 @@ def assignScratchSlotsToSubroutines(
             )
         slotIds.add(slot.id)
 
-    if len(allSlots) > NUM_SLOTS:
-        # TODO: identify which slots can be reused
-        # subroutines which never invoke each other can use the same slot ID for local slots
-        raise TealInternalError(
-            "Too many slots in use: {}, maximum is {}".format(len(allSlots), NUM_SLOTS)
-        )
-
     # verify that all local slots are assigned to before being loaded.
     # TODO: for simplicity, the current implementation does not perform this check with global slots
     # as well, but that would be a good improvement
@@ -145,8 +238,20 @@ def assignScratchSlotsToSubroutines(
             )
             raise TealInternalError(msg) from errors[0]
 
+    # slots which must not share an ID with any other slot
+    exclusiveSlots: Set[ScratchSlot] = allSlots
+    if reuseSlots or len(allSlots) > NUM_SLOTS:
+        exclusiveSlots = set(global_slots)
+        for start in subroutineBlocks.values():
+            for block in TealBlock.Iterate(start):
+                for op in block.ops:
+                    for slot in op.getSlots():
+                        # dynamic slot or reserved slot
+                        if op.op == Op.int or slot.isReservedSlot:
+                            exclusiveSlots.add(slot)
+
     nextSlotIndex = 0
-    for slot in sorted(allSlots, key=lambda slot: slot.id):
+    for slot in sorted(exclusiveSlots, key=lambda slot: slot.id):
         # Find next vacant slot that compiler can assign to
         while nextSlotIndex in slotIds:
             nextSlotIndex += 1
@@ -158,6 +263,27 @@ def assignScratchSlotsToSubroutines(
             slotAssignments[slot] = nextSlotIndex
             slotIds.add(nextSlotIndex)
 
+    sharedSlots = allSlots - exclusiveSlots
+    if len(sharedSlots) != 0:
+        interference = buildSlotInterferenceGraph(subroutineBlocks, local_slots)
+        # colour greedily in order of creation, which keeps assignments deterministic
+        for slot in sorted(sharedSlots, key=lambda slot: slot.id):
+            taken = set(
+                slotAssignments[other]
+                for other in interference[slot]
+                if other in slotAssignments
+            )
+            colour = 0
+            while colour in slotIds or colour in taken:
+                colour += 1
+            slotAssignments[slot] = colour
+
+    slotsInUse = len(set(slotAssignments.values()))
+    if max(slotAssignments.values(), default=0) >= NUM_SLOTS:
+        raise TealInternalError(
+            "Too many slots in use: {}, maximum is {}".format(slotsInUse, NUM_SLOTS)
+        )
+
     for start in subroutineBlocks.values():
         for block in TealBlock.Iterate(start):
             for op in block.ops:
@@ -5,6 +5,7 @@ import pyteal as pt
 from pyteal.compiler.scratchslots import (
     collectScratchSlots,
     assignScratchSlotsToSubroutines,
+    buildSlotInterferenceGraph,
 )
 
 
@@ -433,3 +434,240 @@ def test_assignScratchSlotsToSubroutines_slot_used_before_assignment():
 
     with pytest.raises(pt.TealInternalError):
         assignScratchSlotsToSubroutines(subroutineBlocks)
+
+
+def test_buildSlotInterferenceGraph():
+    def sub1Impl():
+        return None
+
+    def sub2Impl():
+        return None
+
+    subroutine1 = pt.SubroutineDefinition(sub1Impl, pt.TealType.none)
+    subroutine2 = pt.SubroutineDefinition(sub2Impl, pt.TealType.none)
+
+    subroutine1Slot1 = pt.ScratchSlot()
+    subroutine1Ops = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, subroutine1Slot1),
+        pt.TealOp(None, pt.Op.load, subroutine1Slot1),
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+
+    subroutine2Slot1 = pt.ScratchSlot()
+    subroutine2Ops = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, subroutine2Slot1),
+        pt.TealOp(None, pt.Op.load, subroutine2Slot1),
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+
+    mainSlot1 = pt.ScratchSlot()
+    mainSlot2 = pt.ScratchSlot()
+    mainSlot3 = pt.ScratchSlot()
+    mainOps = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, mainSlot1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.store, mainSlot2),
+        # mainSlot1 is live across the call to subroutine1
+        pt.TealOp(None, pt.Op.callsub, subroutine1),
+        pt.TealOp(None, pt.Op.load, mainSlot1),
+        pt.TealOp(None, pt.Op.load, mainSlot2),
+        pt.TealOp(None, pt.Op.add),
+        # no slots are live across the call to subroutine2
+        pt.TealOp(None, pt.Op.callsub, subroutine2),
+        pt.TealOp(None, pt.Op.store, mainSlot3),
+        pt.TealOp(None, pt.Op.load, mainSlot3),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    subroutineBlocks = {
+        None: pt.TealSimpleBlock(mainOps),
+        subroutine1: pt.TealSimpleBlock(subroutine1Ops),
+        subroutine2: pt.TealSimpleBlock(subroutine2Ops),
+    }
+
+    _, localSlots = collectScratchSlots(subroutineBlocks)
+    actual = buildSlotInterferenceGraph(subroutineBlocks, localSlots)
+
+    assert actual == {
+        mainSlot1: {mainSlot2, subroutine1Slot1},
+        mainSlot2: {mainSlot1, subroutine1Slot1},
+        mainSlot3: set(),
+        subroutine1Slot1: {mainSlot1, mainSlot2},
+        subroutine2Slot1: set(),
+    }
+
+
+def test_assignScratchSlotsToSubroutines_reuse_slots():
+    def sub1Impl():
+        return None
+
+    subroutine1 = pt.SubroutineDefinition(sub1Impl, pt.TealType.none)
+
+    globalSlot1 = pt.ScratchSlot()
+    reservedSlot1 = pt.ScratchSlot(requestedSlotId=1)
+    dynamicSlot1 = pt.ScratchSlot()
+
+    subroutine1Slot1 = pt.ScratchSlot()
+    subroutine1Slot2 = pt.ScratchSlot()
+    subroutine1Ops = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, subroutine1Slot1),
+        pt.TealOp(None, pt.Op.load, subroutine1Slot1),
+        pt.TealOp(None, pt.Op.store, subroutine1Slot2),
+        pt.TealOp(None, pt.Op.load, subroutine1Slot2),
+        pt.TealOp(None, pt.Op.load, globalSlot1),
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.pop),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+
+    mainSlot1 = pt.ScratchSlot()
+    mainSlot2 = pt.ScratchSlot()
+    mainOps = [
+        pt.TealOp(None, pt.Op.int, 7),
+        pt.TealOp(None, pt.Op.store, globalSlot1),
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.store, mainSlot1),
+        pt.TealOp(None, pt.Op.load, mainSlot1),
+        pt.TealOp(None, pt.Op.store, reservedSlot1),
+        pt.TealOp(None, pt.Op.int, dynamicSlot1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.stores),
+        pt.TealOp(None, pt.Op.callsub, subroutine1),
+        pt.TealOp(None, pt.Op.int, 2),
+        pt.TealOp(None, pt.Op.store, mainSlot2),
+        pt.TealOp(None, pt.Op.load, mainSlot2),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    subroutineBlocks = {
+        None: pt.TealSimpleBlock(mainOps),
+        subroutine1: pt.TealSimpleBlock(subroutine1Ops),
+    }
+
+    # global, reserved, and dynamic slots are never shared
+    expectedAssignments = {
+        globalSlot1: 0,
+        reservedSlot1: 1,
+        dynamicSlot1: 2,
+        subroutine1Slot1: 3,
+        subroutine1Slot2: 3,
+        mainSlot1: 3,
+        mainSlot2: 3,
+    }
+
+    expected = {
+        None: {1, 2, 3},
+        subroutine1: {3},
+    }
+
+    actual = assignScratchSlotsToSubroutines(subroutineBlocks, reuseSlots=True)
+
+    assert actual == expected
+
+    assert mainOps[1] == pt.TealOp(None, pt.Op.store, expectedAssignments[globalSlot1])
+    assert mainOps[5] == pt.TealOp(
+        None, pt.Op.store, expectedAssignments[reservedSlot1]
+    )
+    assert mainOps[6] == pt.TealOp(None, pt.Op.int, expectedAssignments[dynamicSlot1])
+    assert subroutine1Ops[3] == pt.TealOp(
+        None, pt.Op.store, expectedAssignments[subroutine1Slot2]
+    )
+
+
+def test_assignScratchSlotsToSubroutines_too_many_slots():
+    slots = [pt.ScratchSlot() for _ in range(pt.NUM_SLOTS + 1)]
+
+    # every slot is only live until the next one is stored to, so they can share an ID
+    ops: list[pt.TealOp] = []
+    for slot in slots:
+        ops += [
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.store, slot),
+            pt.TealOp(None, pt.Op.load, slot),
+            pt.TealOp(None, pt.Op.pop),
+        ]
+    ops.append(pt.TealOp(None, pt.Op.retsub))
+
+    actual = assignScratchSlotsToSubroutines({None: pt.TealSimpleBlock(ops)})
+
+    assert actual == {None: {0}}
+
+    # every slot is live at the end, so they can't share an ID
+    ops = []
+    for slot in slots:
+        ops += [
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.store, slot),
+        ]
+    for slot in slots:
+        ops += [
+            pt.TealOp(None, pt.Op.load, slot),
+            pt.TealOp(None, pt.Op.pop),
+        ]
+    ops.append(pt.TealOp(None, pt.Op.retsub))
+
+    with pytest.raises(pt.TealInternalError, match="Too many slots in use: 257"):
+        assignScratchSlotsToSubroutines({None: pt.TealSimpleBlock(ops)})
+
+
+def test_reuse_slots_recursion():
+    @pt.Subroutine(pt.TealType.uint64)
+    def fact(n):
+        a = pt.ScratchVar()
+        return pt.Seq(
+            a.store(n + pt.Int(0)),
+            pt.If(a.load() == pt.Int(0))
+            .Then(pt.Int(1))
+            .Else(a.load() * fact(a.load() - pt.Int(1))),
+        )
+
+    program = pt.Return(fact(pt.Int(5)))
+
+    # the argument slot is dead once it is copied to a, so the two can share a slot, and only
+    # one slot needs to be spilled around the recursive call
+    expected = """#pragma version 6
+int 5
+callsub fact_0
+return
+
+// fact
+fact_0:
+store 0
+load 0
+int 0
++
+store 0
+load 0
+int 0
+==
+bnz fact_0_l2
+load 0
+load 0
+int 1
+-
+load 0
+swap
+callsub fact_0
+swap
+store 0
+*
+b fact_0_l3
+fact_0_l2:
+int 1
+fact_0_l3:
+retsub""".strip()
+
+    actual = pt.compileTeal(
+        program,
+        pt.Mode.Application,
+        version=6,
+        optimize=pt.OptimizeOptions(reuse_slots=True),
+    )
+
+    assert actual == expected
@@ -13,6 +13,7 @@ from algosdk.source_map import SourceMap as PCSourceMap  # disambiguate
 from algosdk.v2client.algod import AlgodClient
 
 import pyteal as pt
+from pyteal.compiler.assembler import assembleTeal
 from pyteal.errors import TealInternalError
 from pyteal.stack_frame import (
     PT_GENERATED,
@@ -479,6 +480,7 @@ class TealMapItem(PyTealFrame):
             full_stack=pt_frame.full_stack,
             rel_paths=pt_frame.rel_paths,
             parent=pt_frame.parent,
+            call_site=pt_frame.call_site,
         )
         self.teal_lineno: Final[int] = teal_lineno
         self.teal_line: Final[str] = teal_line
@@ -684,10 +686,10 @@ class _PyTealSourceMapper:
                 This file isn't actually saved
             include_pcs (optional): specifies whether program counters
                 should be included in the map
-            algod (optional): when `include_pcs == True`, an algod client is required
-                and calls the compile endpoint in order to retrieve the PC's.
-                In the case `include_pcs == True` but `algod` isn't provided, an algod
-                client will be bootstrapped via pyteal.util.algod_with_assertion
+            algod (optional): when `include_pcs == True` and an algod client is provided,
+                its compile endpoint is called in order to retrieve the PC's.
+                In the case `include_pcs == True` but `algod` isn't provided, the PC's
+                are retrieved by assembling the program with pyteal.assembleTeal
             build (default=True): when True, building the sourcemap occurs at initialization
             verbose (default=False): when True, more debugging information will be logged
             annotate_teal (default=False): when True, a TEAL file will be provided with
@@ -697,8 +699,8 @@ class _PyTealSourceMapper:
             annotate_teal_concise (default=True): when False, additional columns will be added
                 to the annotated TEAL file
         """
-        if include_pcs:
-            # bootstrap an algod_client if not provided, and in either case, run a healthcheck
+        if include_pcs and algod is not None:
+            # run a healthcheck on the provided algod_client
             algod = algod_with_assertion(
                 algod, msg="Adding PC's to sourcemap requires live Algod"
             )
@@ -934,14 +936,17 @@ WARNING: Source mapping is unknown for the following:
         """
         Prereq: self.teal_chunks - a Final member
         """
-        algod = algod_with_assertion(
-            self.algod, msg="Adding PC's to sourcemap requires live Algod"
-        )
-
         teal: str = self.compiled_teal()
         for placeholder in pt.Tmpl.session_templates():
             teal = teal.replace(placeholder, pt.Tmpl.zero(placeholder))
 
+        if self.algod is None:
+            self._cached_pc_sourcemap = PCSourceMap(assembleTeal(teal).sourcemap())
+            return
+
+        algod = algod_with_assertion(
+            self.algod, msg="Adding PC's to sourcemap requires live Algod"
+        )
         algod_compilation = algod.compile(teal, source_map=True)
         raw_sourcemap = algod_compilation.get("sourcemap")
         if not raw_sourcemap:
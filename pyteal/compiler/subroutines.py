@@ -5,31 +5,71 @@ from collections import OrderedDict
 from pyteal.errors import TealInputError
 from pyteal.types import TealType
 from pyteal.ast import SubroutineDefinition
-from pyteal.ir import TealComponent, TealOp, Op
+from pyteal.ir import TealComponent, TealOp, TealBlock, Op
+from pyteal.compiler.optimizer.liveness import SlotLiveness, live_after_ops
 
 # generic type variable
 Node = TypeVar("Node")
 
 
-def graph_search(graph: Dict[Node, Set[Node]], start: Node, end: Node) -> bool:
-    """Check whether a path between start and end exists in the graph.
+def stronglyConnectedComponents(graph: Dict[Node, Set[Node]]) -> Dict[Node, int]:
+    """Find the strongly connected components of a graph using Tarjan's algorithm.
 
-    This works even if start == end, in which case True is only returned if the
-    node belongs to a cycle.
-    """
-    visited: Set[Node] = set()
-    stack: List[Node] = list(graph[start])
+    Two nodes are in the same component if and only if each has a path to the other.
+
+    Args:
+        graph: A graph in which each key is a node and each value is the set of nodes it has edges
+            to. Every node which has an edge to it must also be a key.
 
-    while len(stack) != 0:
-        current = stack.pop()
-        if current in visited:
+    Returns:
+        A dictionary which maps each node to the index of its component. Components are numbered in
+        reverse topological order, so an edge between different components always goes from a
+        higher index to a lower one.
+    """
+    component: Dict[Node, int] = dict()
+    index: Dict[Node, int] = dict()
+    lowlink: Dict[Node, int] = dict()
+    onStack: Set[Node] = set()
+    stack: List[Node] = []
+    count = 0
+
+    for root in graph:
+        if root in index:
             continue
-        visited.add(current)
-        if end == current:
-            return True
-        stack += list(graph[current])
 
-    return False
+        # an explicit stack of (node, iterator over its successors) avoids the recursion limit
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        onStack.add(root)
+
+        while len(work) != 0:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    onStack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    break
+                if successor in onStack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if len(work) != 0:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        onStack.remove(member)
+                        component[member] = count
+                        if member is node:
+                            break
+                    count += 1
+
+    return component
 
 
 def findRecursionPoints(
@@ -49,43 +89,104 @@ def findRecursionPoints(
         the key's values from subroutineGraph. Each element in this subset represents a subroutine
         which may reenter the calling subroutine.
     """
-    reentryPoints: Dict[SubroutineDefinition, Set[SubroutineDefinition]] = dict()
-
-    for subroutine in subroutineGraph.keys():
-        # perform a depth first search to see which callers (if any) have a path to invoke the calling subroutine again
-        reentryPoints[subroutine] = set(
-            callee
-            for callee in subroutineGraph[subroutine]
-            if graph_search(subroutineGraph, callee, subroutine)
-        )
+    # a callee can invoke its caller again if and only if they are in the same strongly connected
+    # component of the call graph
+    component = stronglyConnectedComponents(subroutineGraph)
 
-    return reentryPoints
+    return {
+        subroutine: set(
+            callee for callee in callees if component[callee] == component[subroutine]
+        )
+        for subroutine, callees in subroutineGraph.items()
+    }
 
 
 def find_recursive_path(
     subroutine_graph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
     subroutine: SubroutineDefinition,
 ) -> List[SubroutineDefinition]:
-    visited = set()
-    loop = []
+    """Find a shortest call path from a subroutine back to itself.
+
+    Returns:
+        The subroutines along the path, starting and ending with subroutine, or an empty list if
+        the subroutine is not recursive.
+    """
+    component = stronglyConnectedComponents(subroutine_graph)
+
+    # breadth first search, restricted to the subroutines which can reach subroutine again
+    parents: Dict[SubroutineDefinition, SubroutineDefinition] = dict()
+    queue = [subroutine]
+    for current in queue:
+        for callee in sorted(subroutine_graph[current], key=lambda s: s.id):
+            if callee == subroutine:
+                path = [callee, current]
+                while path[-1] != subroutine:
+                    path.append(parents[path[-1]])
+                return path[::-1]
 
-    def dfs(x):
-        if x in visited:
-            return False
+            if component[callee] == component[subroutine] and callee not in parents:
+                parents[callee] = current
+                queue.append(callee)
 
-        visited.add(x)
-        loop.append(x)
-        for y in subroutine_graph[x]:
-            if y == subroutine:
-                loop.append(y)
-                return True
-            if dfs(y):
-                return True
-        loop.pop()
-        return False
+    return []
 
-    found = dfs(subroutine)
-    return loop if found else []
+
+def findSlotsLiveAcrossCalls(
+    subroutineBlocks: Dict[Optional[SubroutineDefinition], TealBlock],
+) -> Dict[int, Set[int]]:
+    """Find the slots whose values are needed after each subroutine call.
+
+    A slot is needed after a call if it may have been stored to before the call, and its value may
+    be loaded after the call returns without being stored to again. This is meant to be used after
+    slot IDs have been assigned and before the subroutines' blocks are flattened.
+
+    Args:
+        subroutineBlocks: A mapping from subroutine to the control flow graph of the subroutine's
+            blocks. The key None is taken to mean the main program routine.
+
+    Returns:
+        A dictionary whose keys are the ids of callsub ops, and whose values are the IDs of the slots
+        needed after each call. If the program accesses slots dynamically with loads or stores, the
+        slots a call affects cannot be known, so an empty dictionary is returned.
+    """
+    for start in subroutineBlocks.values():
+        for block in TealBlock.Iterate(start):
+            for op in block.ops:
+                if op.op in (Op.loads, Op.stores):
+                    return dict()
+
+    liveAcrossCalls: Dict[int, Set[int]] = dict()
+    for start in subroutineBlocks.values():
+        blocks = list(TealBlock.Iterate(start))
+
+        # a forward analysis of the slots which may have been stored to at the start of each block
+        storedIn: Dict[int, Set[int]] = {id(b): set() for b in blocks}
+        changed = True
+        while changed:
+            changed = False
+            for block in blocks:
+                stored = set(storedIn[id(block)])
+                for op in block.ops:
+                    if op.op == Op.store:
+                        stored.update(arg for arg in op.args if type(arg) is int)
+                for nextBlock in block.getOutgoing():
+                    if not stored <= storedIn[id(nextBlock)]:
+                        storedIn[id(nextBlock)] |= stored
+                        changed = True
+
+        liveness = SlotLiveness(start)
+        for block in blocks:
+            stored = set(storedIn[id(block)])
+            live_after = live_after_ops(block.ops, liveness.live_out(block))
+            for op, live in zip(block.ops, live_after):
+                if op.op == Op.store:
+                    stored.update(arg for arg in op.args if type(arg) is int)
+                elif op.op == Op.callsub:
+                    liveAcrossCalls[id(op)] = set(
+                        slot for slot in live if type(slot) is int and slot in stored
+                    )
+
+    return liveAcrossCalls
 
 
 def spillLocalSlotsDuringRecursion(
@@ -93,6 +194,7 @@ def spillLocalSlotsDuringRecursion(
     subroutineMapping: Dict[Optional[SubroutineDefinition], List[TealComponent]],
     subroutineGraph: Dict[SubroutineDefinition, Set[SubroutineDefinition]],
     localSlots: Dict[Optional[SubroutineDefinition], Set[int]],
+    liveAcrossCalls: Optional[Dict[int, Set[int]]] = None,
 ) -> None:
     """In order to prevent recursion from modifying the local scratch slots a subroutine uses,
     subroutines must "spill" their local slots to the stack before calling any other subroutine
@@ -113,6 +215,9 @@ def spillLocalSlotsDuringRecursion(
             graph.
         localSlots: The output from the function `assignScratchSlotsToSubroutines`, which indicates
             the local slots which must be spilled for each subroutine.
+        liveAcrossCalls (optional): The output from the function `findSlotsLiveAcrossCalls`. If
+            provided, only the local slots which are needed after a call are spilled around it.
+            Calls which are not present are assumed to need every local slot.
     """
     recursivePoints = findRecursionPoints(subroutineGraph)
 
@@ -135,10 +240,13 @@ def spillLocalSlotsDuringRecursion(
 
     coverAvailable = version >= Op.cover.min_version
 
+    if liveAcrossCalls is None:
+        liveAcrossCalls = dict()
+
     for subroutine, reentryPoints in recursivePoints.items():
-        slots = list(sorted(slot for slot in localSlots[subroutine]))
+        allSlots = list(sorted(slot for slot in localSlots[subroutine]))
 
-        if len(reentryPoints) == 0 or len(slots) == 0:
+        if len(reentryPoints) == 0 or len(allSlots) == 0:
             # no need to spill slots
             continue
 
@@ -157,7 +265,13 @@ def spillLocalSlotsDuringRecursion(
             ), "Multiple subroutines are called from the same TealComponent"
 
             reentrySubroutineCalls = list(reentryPoints.intersection(calledSubroutines))
-            if len(reentrySubroutineCalls) != 0:
+
+            slots = allSlots
+            if id(stmt) in liveAcrossCalls:
+                # slots which are not needed after the call can be safely overwritten by it
+                slots = [slot for slot in allSlots if slot in liveAcrossCalls[id(stmt)]]
+
+            if len(reentrySubroutineCalls) != 0 and len(slots) != 0:
                 # A subroutine is being called which may reenter the current subroutine, so insert
                 # ops to spill local slots to the stack before calling the subroutine and also to
                 # restore the local slots after returning from the subroutine. This prevents a
@@ -285,9 +399,11 @@ def resolveSubroutines(
         safer_name = re.sub(r"[^A-Za-z0-9]", "", subroutine.name())
         subroutineToLabel[subroutine] = "{}_{}".format(safer_name, index)
 
-    for subroutine, label in subroutineToLabel.items():
-        for ops in subroutineMapping.values():
-            for stmt in ops:
-                stmt.resolveSubroutine(subroutine, label)
+    for ops in subroutineMapping.values():
+        for stmt in ops:
+            for subroutine in stmt.getSubroutines():
+                label = subroutineToLabel.get(subroutine)
+                if label is not None:
+                    stmt.resolveSubroutine(subroutine, label)
 
     return subroutineToLabel
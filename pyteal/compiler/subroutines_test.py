@@ -5,7 +5,10 @@ import pytest
 import pyteal as pt
 
 from pyteal.compiler.subroutines import (
+    find_recursive_path,
     findRecursionPoints,
+    findSlotsLiveAcrossCalls,
+    stronglyConnectedComponents,
     spillLocalSlotsDuringRecursion,
     resolveSubroutines,
 )
@@ -139,6 +142,94 @@ def test_findRecursionPoints_direct_and_mutual_recursion():
     assert actual == expected
 
 
+def test_stronglyConnectedComponents():
+    graph = {
+        0: {1},
+        1: {2, 4},
+        2: {3},
+        3: {1},
+        4: {4, 5},
+        5: set(),
+        6: {0},
+    }
+
+    actual = stronglyConnectedComponents(graph)
+
+    assert actual[1] == actual[2] == actual[3]
+    assert len({actual[0], actual[1], actual[4], actual[5], actual[6]}) == 5
+
+    # components are numbered in reverse topological order
+    for node, successors in graph.items():
+        for successor in successors:
+            assert actual[node] >= actual[successor]
+
+
+def test_stronglyConnectedComponents_long_chain():
+    # deep graphs must not hit the recursion limit
+    n = 5000
+    graph = {i: {i + 1} for i in range(n)}
+    graph[n] = {0}
+
+    actual = stronglyConnectedComponents(graph)
+    assert set(actual.values()) == {0}
+
+
+def test_findRecursionPoints_large_cycle():
+    subroutines = [
+        pt.SubroutineDefinition(lambda: pt.Int(1), pt.TealType.uint64)
+        for _ in range(2000)
+    ]
+
+    # each subroutine calls the next and a subroutine outside of the cycle
+    outside = pt.SubroutineDefinition(lambda: pt.Int(1), pt.TealType.uint64)
+    graph = {
+        subroutine: {subroutines[(i + 1) % len(subroutines)], outside}
+        for i, subroutine in enumerate(subroutines)
+    }
+    graph[outside] = set()
+
+    actual = findRecursionPoints(graph)
+
+    assert actual[outside] == set()
+    for i, subroutine in enumerate(subroutines):
+        assert actual[subroutine] == {subroutines[(i + 1) % len(subroutines)]}
+
+
+def test_find_recursive_path():
+    def sub1Impl():
+        return None
+
+    def sub2Impl(a1):
+        return None
+
+    def sub3Impl(a1, a2, a3):
+        return None
+
+    def sub4Impl():
+        return None
+
+    subroutine1 = pt.SubroutineDefinition(sub1Impl, pt.TealType.uint64)
+    subroutine2 = pt.SubroutineDefinition(sub2Impl, pt.TealType.bytes)
+    subroutine3 = pt.SubroutineDefinition(sub3Impl, pt.TealType.none)
+    subroutine4 = pt.SubroutineDefinition(sub4Impl, pt.TealType.none)
+
+    subroutines = {
+        subroutine1: {subroutine2, subroutine4},
+        subroutine2: {subroutine3, subroutine4},
+        subroutine3: {subroutine1, subroutine3},
+        subroutine4: set(),
+    }
+
+    assert find_recursive_path(subroutines, subroutine1) == [
+        subroutine1,
+        subroutine2,
+        subroutine3,
+        subroutine1,
+    ]
+    assert find_recursive_path(subroutines, subroutine3) == [subroutine3, subroutine3]
+    assert find_recursive_path(subroutines, subroutine4) == []
+
+
 def test_spillLocalSlotsDuringRecursion_no_subroutines():
     for version in (4, 5):
         l1Label = pt.LabelReference("l1")
@@ -1279,6 +1370,128 @@ def test_spillLocalSlotsDuringRecursion_recursive_more_slots_than_args_v5():
     }
 
 
+def test_findSlotsLiveAcrossCalls():
+    def sub1Impl(a1):
+        return None
+
+    subroutine = pt.SubroutineDefinition(sub1Impl, pt.TealType.uint64)
+
+    # slot 0 is needed after the first call, slot 1 is only stored to before it, and slot 2 is
+    # only stored to after it
+    firstCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    secondCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    start = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.store, 0),
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.store, 1),
+            pt.TealOp(None, pt.Op.load, 0),
+            firstCall,
+        ]
+    )
+    cond = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.store, 2)])
+    blockTrue = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.load, 0), pt.TealOp(None, pt.Op.load, 2), secondCall]
+    )
+    blockEnd = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.load, 2), pt.TealOp(None, pt.Op.retsub)]
+    )
+    start.setNextBlock(cond)
+    cond.setTrueBlock(blockTrue)
+    cond.setFalseBlock(blockEnd)
+    blockTrue.setNextBlock(blockEnd)
+
+    mainCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    main = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.int, 1), mainCall, pt.TealOp(None, pt.Op.return_)]
+    )
+
+    actual = findSlotsLiveAcrossCalls({None: main, subroutine: start})
+
+    assert actual == {id(mainCall): set(), id(firstCall): {0}, id(secondCall): {2}}
+
+
+def test_findSlotsLiveAcrossCalls_dynamic_slots():
+    def sub1Impl(a1):
+        return None
+
+    subroutine = pt.SubroutineDefinition(sub1Impl, pt.TealType.uint64)
+
+    start = pt.TealSimpleBlock(
+        [
+            pt.TealOp(None, pt.Op.store, 0),
+            pt.TealOp(None, pt.Op.callsub, subroutine),
+            pt.TealOp(None, pt.Op.int, 0),
+            pt.TealOp(None, pt.Op.loads),
+            pt.TealOp(None, pt.Op.retsub),
+        ]
+    )
+
+    assert findSlotsLiveAcrossCalls({subroutine: start}) == dict()
+
+
+def test_spillLocalSlotsDuringRecursion_live_slots_only():
+    def sub1Impl(a1):
+        return None
+
+    subroutine = pt.SubroutineDefinition(sub1Impl, pt.TealType.uint64)
+
+    firstCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    secondCall = pt.TealOp(None, pt.Op.callsub, subroutine)
+    subroutineOps = [
+        pt.TealOp(None, pt.Op.store, 0),
+        pt.TealOp(None, pt.Op.load, 0),
+        pt.TealOp(None, pt.Op.store, 1),
+        pt.TealOp(None, pt.Op.load, 0),
+        firstCall,
+        pt.TealOp(None, pt.Op.load, 1),
+        secondCall,
+        pt.TealOp(None, pt.Op.add),
+        pt.TealOp(None, pt.Op.retsub),
+    ]
+
+    mainOps = [
+        pt.TealOp(None, pt.Op.int, 1),
+        pt.TealOp(None, pt.Op.callsub, subroutine),
+        pt.TealOp(None, pt.Op.return_),
+    ]
+
+    subroutineMapping = {None: mainOps, subroutine: subroutineOps}
+
+    subroutineGraph = {subroutine: {subroutine}}
+
+    localSlots = {None: set(), subroutine: {0, 1}}
+
+    liveAcrossCalls = {id(firstCall): {1}, id(secondCall): set()}
+
+    spillLocalSlotsDuringRecursion(
+        5, subroutineMapping, subroutineGraph, localSlots, liveAcrossCalls
+    )
+
+    assert subroutineMapping == {
+        None: [
+            pt.TealOp(None, pt.Op.int, 1),
+            pt.TealOp(None, pt.Op.callsub, subroutine),
+            pt.TealOp(None, pt.Op.return_),
+        ],
+        subroutine: [
+            pt.TealOp(None, pt.Op.store, 0),
+            pt.TealOp(None, pt.Op.load, 0),
+            pt.TealOp(None, pt.Op.store, 1),
+            pt.TealOp(None, pt.Op.load, 0),
+            pt.TealOp(None, pt.Op.load, 1),
+            pt.TealOp(None, pt.Op.swap),
+            pt.TealOp(None, pt.Op.callsub, subroutine),
+            pt.TealOp(None, pt.Op.swap),
+            pt.TealOp(None, pt.Op.store, 1),
+            pt.TealOp(None, pt.Op.load, 1),
+            pt.TealOp(None, pt.Op.callsub, subroutine),
+            pt.TealOp(None, pt.Op.add),
+            pt.TealOp(None, pt.Op.retsub),
+        ],
+    }
+
+
 def test_spillLocalSlotsDuringRecursion_recursive_with_scratchvar():
     # modifying test_spillLocalSlotsDuringRecursion_multiple_subroutines_no_recursion()
     # to be recursive and fail due to by-ref args
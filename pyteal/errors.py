@@ -60,6 +60,8 @@ class TealCompileError(Exception):
         if self.sourceExpr is None:
             return self.msg
         trace = self.sourceExpr.getDefinitionTrace()
+        if len(trace) == 0:
+            return self.msg
         return (
             self.msg
             + "\nTraceback of origin expression (most recent call last):\n"
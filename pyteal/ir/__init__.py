@@ -1,8 +1,9 @@
-from pyteal.ir.ops import Op, Mode
+from pyteal.ir.ops import Op, OpPurity, Mode
 from pyteal.ir.tealblock import TealBlock
 from pyteal.ir.tealcomponent import TealComponent
 from pyteal.ir.tealconditionalblock import TealConditionalBlock
 from pyteal.ir.teallabel import TealLabel
+from pyteal.ir.tealmultiwayblock import TealMultiwayBlock
 from pyteal.ir.tealop import TealOp
 from pyteal.ir.tealpragma import TealPragma
 from pyteal.ir.tealsimpleblock import TealSimpleBlock
@@ -13,10 +14,12 @@ __all__ = [
     "LabelReference",
     "Mode",
     "Op",
+    "OpPurity",
     "TealBlock",
     "TealComponent",
     "TealConditionalBlock",
     "TealLabel",
+    "TealMultiwayBlock",
     "TealOp",
     "TealPragma",
     "TealSimpleBlock",
@@ -12,6 +12,30 @@ class Mode(Flag):
 Mode.__module__ = "pyteal"
 
 
+class OpPurity(Enum):
+    """Enum describing what an op reads and whether it has side effects.
+
+    This determines whether two executions of an op with the same arguments are guaranteed to
+    produce the same result.
+    """
+
+    # the result only depends on the op's arguments and immediate arguments
+    pure = auto()
+    # the result also depends on values which are fixed for a whole execution of the program, such
+    # as the fields of the transaction being evaluated
+    environment = auto()
+    # the result also depends on values which the program itself can change while it runs, such as
+    # scratch slots, application state, or the results of inner transactions
+    state = auto()
+    # the op only moves values on the stack or changes control flow
+    control = auto()
+    # the op may change values read by state ops, or has other side effects
+    effect = auto()
+
+
+OpPurity.__module__ = "pyteal"
+
+
 @dataclass
 class OpType:
     value: str
@@ -35,6 +59,15 @@ class Op(Enum):
         """Get the minimum version where this op is available."""
         return self.value.min_version
 
+    @property
+    def purity(self) -> OpPurity:
+        """Get what this op reads and whether it has side effects.
+
+        Note that :code:`global OpcodeBudget` changes as the program runs, even though the other
+        fields accessed by :code:`global` are fixed.
+        """
+        return _OP_PURITY[self]
+
     # fmt: off
     # meta
     comment             = OpType("//",                  Mode.Signature | Mode.Application,  0)
@@ -208,6 +241,9 @@ class Op(Enum):
     frame_dig           = OpType("frame_dig",           Mode.Signature | Mode.Application,  8)
     frame_bury          = OpType("frame_bury",          Mode.Signature | Mode.Application,  8)
     proto               = OpType("proto",               Mode.Signature | Mode.Application,  8)
+    switch              = OpType("switch",              Mode.Signature | Mode.Application,  8)
+    match               = OpType("match",               Mode.Signature | Mode.Application,  8)
+    pushbytess          = OpType("pushbytess",          Mode.Signature | Mode.Application,  8)
     box_splice          = OpType("box_splice",          Mode.Application,                  10)
     box_resize          = OpType("box_resize",          Mode.Application,                  10)
     ec_add              = OpType("ec_add",              Mode.Signature | Mode.Application, 10)
@@ -220,3 +256,189 @@ class Op(Enum):
 
 
 Op.__module__ = "pyteal"
+
+_OP_PURITY: dict[Op, OpPurity] = {
+    Op.comment: OpPurity.control,
+    Op.err: OpPurity.control,
+    Op.sha256: OpPurity.pure,
+    Op.keccak256: OpPurity.pure,
+    Op.sha512_256: OpPurity.pure,
+    # in signature mode, ed25519verify also reads the hash of the program
+    Op.ed25519verify: OpPurity.environment,
+    Op.add: OpPurity.pure,
+    Op.minus: OpPurity.pure,
+    Op.div: OpPurity.pure,
+    Op.mul: OpPurity.pure,
+    Op.lt: OpPurity.pure,
+    Op.gt: OpPurity.pure,
+    Op.le: OpPurity.pure,
+    Op.ge: OpPurity.pure,
+    Op.logic_and: OpPurity.pure,
+    Op.logic_or: OpPurity.pure,
+    Op.eq: OpPurity.pure,
+    Op.neq: OpPurity.pure,
+    Op.logic_not: OpPurity.pure,
+    Op.len: OpPurity.pure,
+    Op.itob: OpPurity.pure,
+    Op.btoi: OpPurity.pure,
+    Op.mod: OpPurity.pure,
+    Op.bitwise_or: OpPurity.pure,
+    Op.bitwise_and: OpPurity.pure,
+    Op.bitwise_xor: OpPurity.pure,
+    Op.bitwise_not: OpPurity.pure,
+    Op.mulw: OpPurity.pure,
+    Op.addw: OpPurity.pure,
+    Op.intcblock: OpPurity.control,
+    Op.intc: OpPurity.pure,
+    Op.intc_0: OpPurity.pure,
+    Op.intc_1: OpPurity.pure,
+    Op.intc_2: OpPurity.pure,
+    Op.intc_3: OpPurity.pure,
+    Op.int: OpPurity.pure,
+    Op.bytecblock: OpPurity.control,
+    Op.bytec: OpPurity.pure,
+    Op.bytec_0: OpPurity.pure,
+    Op.bytec_1: OpPurity.pure,
+    Op.bytec_2: OpPurity.pure,
+    Op.bytec_3: OpPurity.pure,
+    Op.byte: OpPurity.pure,
+    Op.addr: OpPurity.pure,
+    Op.method_signature: OpPurity.pure,
+    Op.arg: OpPurity.environment,
+    Op.txn: OpPurity.environment,
+    Op.global_: OpPurity.environment,
+    Op.gtxn: OpPurity.environment,
+    Op.load: OpPurity.state,
+    Op.store: OpPurity.effect,
+    Op.txna: OpPurity.environment,
+    Op.gtxna: OpPurity.environment,
+    Op.bnz: OpPurity.control,
+    Op.bz: OpPurity.control,
+    Op.b: OpPurity.control,
+    Op.return_: OpPurity.control,
+    Op.pop: OpPurity.control,
+    Op.dup: OpPurity.control,
+    Op.dup2: OpPurity.control,
+    Op.concat: OpPurity.pure,
+    Op.substring: OpPurity.pure,
+    Op.substring3: OpPurity.pure,
+    Op.balance: OpPurity.state,
+    Op.app_opted_in: OpPurity.state,
+    Op.app_local_get: OpPurity.state,
+    Op.app_local_get_ex: OpPurity.state,
+    Op.app_global_get: OpPurity.state,
+    Op.app_global_get_ex: OpPurity.state,
+    Op.app_local_put: OpPurity.effect,
+    Op.app_global_put: OpPurity.effect,
+    Op.app_local_del: OpPurity.effect,
+    Op.app_global_del: OpPurity.effect,
+    Op.asset_holding_get: OpPurity.state,
+    Op.asset_params_get: OpPurity.state,
+    Op.gtxns: OpPurity.environment,
+    Op.gtxnsa: OpPurity.environment,
+    Op.assert_: OpPurity.control,
+    Op.dig: OpPurity.control,
+    Op.swap: OpPurity.control,
+    Op.select: OpPurity.pure,
+    Op.getbit: OpPurity.pure,
+    Op.setbit: OpPurity.pure,
+    Op.getbyte: OpPurity.pure,
+    Op.setbyte: OpPurity.pure,
+    Op.min_balance: OpPurity.state,
+    Op.pushbytes: OpPurity.pure,
+    Op.pushint: OpPurity.pure,
+    Op.shl: OpPurity.pure,
+    Op.shr: OpPurity.pure,
+    Op.sqrt: OpPurity.pure,
+    Op.bitlen: OpPurity.pure,
+    Op.exp: OpPurity.pure,
+    Op.divmodw: OpPurity.pure,
+    Op.expw: OpPurity.pure,
+    Op.b_add: OpPurity.pure,
+    Op.b_minus: OpPurity.pure,
+    Op.b_div: OpPurity.pure,
+    Op.b_mul: OpPurity.pure,
+    Op.b_lt: OpPurity.pure,
+    Op.b_gt: OpPurity.pure,
+    Op.b_le: OpPurity.pure,
+    Op.b_ge: OpPurity.pure,
+    Op.b_eq: OpPurity.pure,
+    Op.b_neq: OpPurity.pure,
+    Op.b_mod: OpPurity.pure,
+    Op.b_or: OpPurity.pure,
+    Op.b_and: OpPurity.pure,
+    Op.b_xor: OpPurity.pure,
+    Op.b_not: OpPurity.pure,
+    Op.bzero: OpPurity.pure,
+    Op.gload: OpPurity.environment,
+    Op.gloads: OpPurity.environment,
+    Op.gaid: OpPurity.environment,
+    Op.gaids: OpPurity.environment,
+    # the called subroutine may have any effect
+    Op.callsub: OpPurity.effect,
+    Op.retsub: OpPurity.control,
+    Op.ecdsa_verify: OpPurity.pure,
+    Op.ecdsa_pk_decompress: OpPurity.pure,
+    Op.ecdsa_pk_recover: OpPurity.pure,
+    Op.loads: OpPurity.state,
+    Op.stores: OpPurity.effect,
+    Op.cover: OpPurity.control,
+    Op.uncover: OpPurity.control,
+    Op.extract: OpPurity.pure,
+    Op.extract3: OpPurity.pure,
+    Op.extract_uint16: OpPurity.pure,
+    Op.extract_uint32: OpPurity.pure,
+    Op.extract_uint64: OpPurity.pure,
+    Op.app_params_get: OpPurity.state,
+    Op.log: OpPurity.effect,
+    Op.itxn_begin: OpPurity.effect,
+    Op.itxn_field: OpPurity.effect,
+    Op.itxn_submit: OpPurity.effect,
+    Op.itxn: OpPurity.state,
+    Op.itxna: OpPurity.state,
+    Op.txnas: OpPurity.environment,
+    Op.gtxnas: OpPurity.environment,
+    Op.gtxnsas: OpPurity.environment,
+    Op.args: OpPurity.environment,
+    Op.bsqrt: OpPurity.pure,
+    Op.divw: OpPurity.pure,
+    Op.itxn_next: OpPurity.effect,
+    Op.itxnas: OpPurity.state,
+    Op.gitxn: OpPurity.state,
+    Op.gitxna: OpPurity.state,
+    Op.gitxnas: OpPurity.state,
+    Op.gloadss: OpPurity.environment,
+    Op.acct_params_get: OpPurity.state,
+    Op.replace2: OpPurity.pure,
+    Op.replace3: OpPurity.pure,
+    Op.base64_decode: OpPurity.pure,
+    Op.json_ref: OpPurity.pure,
+    Op.ed25519verify_bare: OpPurity.pure,
+    Op.sha3_256: OpPurity.pure,
+    Op.vrf_verify: OpPurity.pure,
+    Op.block: OpPurity.environment,
+    Op.box_create: OpPurity.effect,
+    Op.box_extract: OpPurity.state,
+    Op.box_replace: OpPurity.effect,
+    Op.box_del: OpPurity.effect,
+    Op.box_len: OpPurity.state,
+    Op.box_get: OpPurity.state,
+    Op.box_put: OpPurity.effect,
+    Op.popn: OpPurity.control,
+    Op.dupn: OpPurity.control,
+    Op.bury: OpPurity.control,
+    Op.frame_dig: OpPurity.state,
+    Op.frame_bury: OpPurity.effect,
+    Op.proto: OpPurity.control,
+    Op.switch: OpPurity.control,
+    Op.match: OpPurity.control,
+    Op.pushbytess: OpPurity.pure,
+    Op.box_splice: OpPurity.effect,
+    Op.box_resize: OpPurity.effect,
+    Op.ec_add: OpPurity.pure,
+    Op.ec_scalar_mul: OpPurity.pure,
+    Op.ec_pairing_check: OpPurity.pure,
+    Op.ec_multi_scalar_mul: OpPurity.pure,
+    Op.ec_subgroup_check: OpPurity.pure,
+    Op.ec_map_to: OpPurity.pure,
+}
@@ -0,0 +1,16 @@
+import pyteal as pt
+
+
+def test_purity_defined_for_every_op():
+    for op in pt.Op:
+        assert isinstance(op.purity, pt.OpPurity)
+
+
+def test_purity():
+    assert pt.Op.add.purity == pt.OpPurity.pure
+    assert pt.Op.txna.purity == pt.OpPurity.environment
+    assert pt.Op.app_global_get.purity == pt.OpPurity.state
+    assert pt.Op.load.purity == pt.OpPurity.state
+    assert pt.Op.dup.purity == pt.OpPurity.control
+    assert pt.Op.app_global_put.purity == pt.OpPurity.effect
+    assert pt.Op.callsub.purity == pt.OpPurity.effect
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections import deque
 
 from typing import Dict, List, Tuple, Set, Iterator, cast, TYPE_CHECKING
 
@@ -39,54 +40,82 @@ class TealBlock(ABC):
     def validateTree(
         self,
         parent: "TealBlock | None" = None,
-        visited: List["TealBlock"] | None = None,
+        visited: Set[int] | None = None,
     ) -> None:
         """Check that this block and its children have valid parent pointers.
 
         Args:
             parent (optional): The parent block to this one, if it has one. Defaults to None.
-            visited (optional): Used internally to remember blocks that have been visited. Set to None.
+            visited (optional): Used internally to remember the ids of blocks that have been visited.
+                Set to None.
         """
         if visited is None:
-            # using a list instead of a set as TealBlock is not hashable and PyTEAL programs should be short anyway
-            visited = []
-
-        if parent is not None:
-            count = 0
-            for block in self.incoming:
-                if parent is block:
-                    count += 1
-            assert count == 1
-
-        if all(self is not b for b in visited):
-            # if the block was not already visited
-            visited.append(self)
-            for block in self.getOutgoing():
-                block.validateTree(self, visited)
+            # TealBlock is not hashable, so blocks are tracked by their id
+            visited = set()
+
+        # cache of id(incoming block) -> number of occurrences, per block id
+        incomingCounts: Dict[int, Dict[int, int]] = dict()
+
+        # explicit stack of (block, parent) pairs to avoid recursion limits on large graphs.
+        # Children are pushed in reverse so blocks are visited in the same order as a recursive
+        # depth-first traversal.
+        stack: List[Tuple[TealBlock, TealBlock | None]] = [(self, parent)]
+        while len(stack) != 0:
+            block, blockParent = stack.pop()
+
+            if blockParent is not None:
+                counts = incomingCounts.get(id(block))
+                if counts is None:
+                    counts = dict()
+                    for b in block.incoming:
+                        counts[id(b)] = counts.get(id(b), 0) + 1
+                    incomingCounts[id(block)] = counts
+                assert counts.get(id(blockParent), 0) == 1
+
+            if id(block) not in visited:
+                # if the block was not already visited
+                visited.add(id(block))
+                for child in reversed(block.getOutgoing()):
+                    stack.append((child, block))
 
     def addIncoming(
         self,
         parent: "TealBlock | None" = None,
-        visited: List["TealBlock"] | None = None,
+        visited: Set[int] | None = None,
     ) -> None:
         """Calculate the parent blocks for this block and its children.
 
         Args:
             parent (optional): The parent block to this one, if it has one. Defaults to None.
-            visited (optional): Used internally to remember blocks that have been visited. Set to None.
+            visited (optional): Used internally to remember the ids of blocks that have been visited.
+                Set to None.
         """
         if visited is None:
-            # using a list instead of a set as TealBlock is not hashable and PyTEAL programs should be short anyway
-            visited = []
-
-        if parent is not None and all(parent is not b for b in self.incoming):
-            self.incoming.append(parent)
+            # TealBlock is not hashable, so blocks are tracked by their id
+            visited = set()
 
-        if all(self is not b for b in visited):
-            # if the block was not already visited
-            visited.append(self)
-            for b in self.getOutgoing():
-                b.addIncoming(self, visited)
+        # id(block) -> ids of the blocks already present in block.incoming
+        incomingIds: Dict[int, Set[int]] = dict()
+
+        # see validateTree for why an explicit, reverse-ordered stack is used
+        stack: List[Tuple[TealBlock, TealBlock | None]] = [(self, parent)]
+        while len(stack) != 0:
+            block, blockParent = stack.pop()
+
+            if blockParent is not None:
+                ids = incomingIds.get(id(block))
+                if ids is None:
+                    ids = {id(b) for b in block.incoming}
+                    incomingIds[id(block)] = ids
+                if id(blockParent) not in ids:
+                    ids.add(id(blockParent))
+                    block.incoming.append(blockParent)
+
+            if id(block) not in visited:
+                # if the block was not already visited
+                visited.add(id(block))
+                for child in reversed(block.getOutgoing()):
+                    stack.append((child, block))
 
     def validateSlots(
         self,
@@ -170,22 +199,16 @@ class TealBlock(ABC):
     @classmethod
     def Iterate(cls, start: "TealBlock") -> Iterator["TealBlock"]:
         """Perform a breadth-first search of the graph of blocks starting with start."""
-        queue = [start]
-        visited = list(queue)
-
-        def is_in_visited(block):
-            for v in visited:
-                if block is v:
-                    return True
-            return False
+        queue = deque([start])
+        visited = {id(start)}
 
         while len(queue) != 0:
-            w = queue.pop(0)
+            w = queue.popleft()
             nextBlocks = w.getOutgoing()
             yield w
             for nextBlock in nextBlocks:
-                if not is_in_visited(nextBlock):
-                    visited.append(nextBlock)
+                if id(nextBlock) not in visited:
+                    visited.add(id(nextBlock))
                     queue.append(nextBlock)
 
     @classmethod
@@ -224,9 +247,11 @@ class TealBlock(ABC):
                             outgoingBlock.incoming.pop(i)
                             break
 
+                    outgoingIncomingIds = {id(b) for b in outgoingBlock.incoming}
                     for prev in block.incoming:
                         prev.replaceOutgoing(block, outgoing[0])
-                        if id(prev) not in [id(b) for b in outgoingBlock.incoming]:
+                        if id(prev) not in outgoingIncomingIds:
+                            outgoingIncomingIds.add(id(prev))
                             outgoingBlock.incoming.append(prev)
 
                     if block is start:
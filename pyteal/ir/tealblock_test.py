@@ -1,5 +1,7 @@
 from typing import NamedTuple, List
 
+import pytest
+
 import pyteal as pt
 
 options = pt.CompileOptions()
@@ -149,6 +151,62 @@ def test_iterate_branch_converge():
     assert blocks == [block, blockTrue, blockFalse, blockEnd]
 
 
+def test_iterate_long_sequence():
+    blocks = [pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, i)]) for i in range(5000)]
+    for prev, block in zip(blocks[:-1], blocks[1:]):
+        prev.setNextBlock(block)
+
+    assert list(pt.TealBlock.Iterate(blocks[0])) == blocks
+
+
+def test_add_incoming_long_sequence():
+    # long chains of blocks used to exceed the recursion limit
+    blocks = [pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, i)]) for i in range(5000)]
+    for prev, block in zip(blocks[:-1], blocks[1:]):
+        prev.setNextBlock(block)
+
+    blocks[0].addIncoming()
+    blocks[0].validateTree()
+
+    assert blocks[0].incoming == []
+    for prev, block in zip(blocks[:-1], blocks[1:]):
+        assert len(block.incoming) == 1
+        assert block.incoming[0] is prev
+
+
+def test_add_incoming_branch_converge():
+    blockEnd = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.return_)])
+    blockTrue = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"true"')])
+    blockTrue.setNextBlock(blockEnd)
+    blockFalse = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"false"')])
+    blockFalse.setNextBlock(blockEnd)
+    block = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.int, 1)])
+    block.setTrueBlock(blockTrue)
+    block.setFalseBlock(blockFalse)
+
+    block.addIncoming()
+    # adding incoming blocks a second time must not introduce duplicates
+    block.addIncoming()
+    block.validateTree()
+
+    assert block.incoming == []
+    assert blockTrue.incoming == [block]
+    assert blockFalse.incoming == [block]
+    assert len(blockEnd.incoming) == 2
+    assert blockEnd.incoming[0] is blockTrue
+    assert blockEnd.incoming[1] is blockFalse
+
+
+def test_validate_tree_duplicate_incoming():
+    blockNext = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, 2)])
+    block = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, 1)])
+    block.setNextBlock(blockNext)
+    blockNext.incoming = [block, block]
+
+    with pytest.raises(AssertionError):
+        block.validateTree()
+
+
 def test_normalize_single():
     original = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, 1)])
 
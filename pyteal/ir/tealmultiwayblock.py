@@ -0,0 +1,68 @@
+from typing import List, TYPE_CHECKING
+
+from pyteal.ir.ops import Op
+from pyteal.ir.tealop import TealOp
+from pyteal.ir.tealblock import TealBlock
+
+if TYPE_CHECKING:
+    from pyteal.ast import Expr
+
+
+class TealMultiwayBlock(TealBlock):
+    """Represents a basic block of TealComponents in a graph ending with a multi-way branch, i.e. a
+    switch or match op."""
+
+    def __init__(
+        self,
+        ops: List[TealOp],
+        op: Op = Op.match,
+        root_expr: "Expr | None" = None,
+    ) -> None:
+        super().__init__(ops, root_expr=root_expr)
+        if op not in (Op.switch, Op.match):
+            raise ValueError("Unsupported multi-way branch op: {}".format(op))
+        self.op = op
+        self.targets: List[TealBlock] = []
+        self.defaultBlock: TealBlock | None = None
+
+    def setTargets(self, blocks: List[TealBlock]) -> None:
+        """Set the blocks that this one should branch to, in the order of the branch op's labels."""
+        self.targets = list(blocks)
+
+    def setDefaultBlock(self, block: TealBlock) -> None:
+        """Set the block that this one should continue to if no target is selected."""
+        self.defaultBlock = block
+
+    def getOutgoing(self) -> List[TealBlock]:
+        outgoing = list(self.targets)
+        if self.defaultBlock is not None:
+            outgoing.append(self.defaultBlock)
+        return outgoing
+
+    def replaceOutgoing(self, oldBlock: TealBlock, newBlock: TealBlock) -> None:
+        for i, target in enumerate(self.targets):
+            if target is oldBlock:
+                self.targets[i] = newBlock
+        if self.defaultBlock is oldBlock:
+            self.defaultBlock = newBlock
+
+    def __repr__(self) -> str:
+        return "TealMultiwayBlock({}, op={}, targets={}, default={})".format(
+            repr(self.ops),
+            str(self.op),
+            repr(self.targets),
+            repr(self.defaultBlock),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not TealMultiwayBlock:
+            return False
+        return (
+            self.ops == other.ops
+            and self.op == other.op
+            and self.targets == other.targets
+            and self.defaultBlock == other.defaultBlock
+        )
+
+
+TealMultiwayBlock.__module__ = "pyteal"
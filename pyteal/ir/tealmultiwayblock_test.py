@@ -0,0 +1,52 @@
+import pytest
+
+import pyteal as pt
+
+
+def test_constructor():
+    block1 = pt.TealMultiwayBlock([])
+    assert block1.ops == []
+    assert block1.op == pt.Op.match
+    assert block1.targets == []
+    assert block1.defaultBlock is None
+
+    block2 = pt.TealMultiwayBlock([pt.TealOp(None, pt.Op.int, 1)], pt.Op.switch)
+    assert block2.ops == [pt.TealOp(None, pt.Op.int, 1)]
+    assert block2.op == pt.Op.switch
+
+    with pytest.raises(ValueError):
+        pt.TealMultiwayBlock([], pt.Op.bnz)
+
+
+def test_outgoing():
+    target1 = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"one"')])
+    target2 = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"two"')])
+    default = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.err)])
+
+    block = pt.TealMultiwayBlock([])
+    assert block.getOutgoing() == []
+
+    block.setTargets([target1, target2])
+    assert block.getOutgoing() == [target1, target2]
+
+    block.setDefaultBlock(default)
+    assert block.getOutgoing() == [target1, target2, default]
+
+
+def test_replace_outgoing():
+    target1 = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"one"')])
+    target2 = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"two"')])
+    default = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.err)])
+    replacement = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.byte, '"new"')])
+
+    block = pt.TealMultiwayBlock([])
+    block.setTargets([target1, target2, target1])
+    block.setDefaultBlock(default)
+
+    block.replaceOutgoing(target1, replacement)
+    assert block.targets[0] is replacement
+    assert block.targets[1] is target2
+    assert block.targets[2] is replacement
+
+    block.replaceOutgoing(default, replacement)
+    assert block.defaultBlock is replacement
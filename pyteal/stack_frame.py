@@ -1,16 +1,51 @@
 from feature_gates import FeatureGates
 
 from ast import AST, FunctionDef, unparse
+from collections import OrderedDict
 from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import IntEnum
-from inspect import FrameInfo, stack
-from typing import Callable, Final, cast
+from inspect import FrameInfo, findsource, getfile, getsourcefile, stack
+from itertools import islice
+from types import CodeType, FrameType
+from typing import Callable, ClassVar, Final, NamedTuple, TypeVar, cast
 import os
 import re
+import sys
 
 from executing import Source
 
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+# how many call sites, and how many code objects, the source mapper remembers
+_CALL_SITE_CACHE_SIZE = 8192
+_CODE_CACHE_SIZE = 2048
+
+
+class _LRUCache(OrderedDict[_K, _V]):
+    """
+    A dict which discards its least recently used item once it holds more than maxsize items,
+    so that caches keyed by code objects don't keep every code object that ever built an Expr
+    alive, e.g. in a long running notebook.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.maxsize: Final[int] = maxsize
+
+    def lookup(self, key: _K) -> _V | None:
+        """Get the value of key, or None if it isn't cached, and mark it as recently used."""
+        value = self.get(key)
+        if value is not None:
+            self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: _K, value: _V) -> None:
+        super().__setitem__(key, value)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
 
 class SourceMapStackFramesError(RuntimeError):
     def __init__(self, msg: str):
@@ -67,6 +102,9 @@ class StackFrame:
     # for debugging purposes:
     full_stack: list[FrameInfo] | None = None
 
+    # shared by every StackFrame created by the same instruction
+    call_site: "_CallSite | None" = None
+
     @classmethod
     def _init_or_drop(
         cls, creator: "NatalStackFrame", f: FrameInfo, full_stack: list[FrameInfo]
@@ -76,12 +114,60 @@ class StackFrame:
         However, if the resulting is considered "Python Crud" abandon and return None.
         When debugging, also persist the full_stack that was provided.
         """
-        node = cast(AST | None, Source.executing(f.frame).node)
+        call_site = cls._call_site(f.frame)
         frame = StackFrame(
-            f, node, creator, full_stack if NatalStackFrame._debugging() else None
+            f,
+            call_site.node,
+            creator,
+            full_stack if NatalStackFrame._debugging() else None,
+            call_site,
         )
         return frame if frame._not_py_crud() else None
 
+    # call sites, keyed by code object and bytecode offset, as found by _call_site()
+    _call_sites: ClassVar[_LRUCache[tuple[CodeType, int], "_CallSite"]] = _LRUCache(
+        _CALL_SITE_CACHE_SIZE
+    )
+    _call_site_hits: ClassVar[int] = 0
+    _call_site_misses: ClassVar[int] = 0
+
+    @classmethod
+    def _call_site(cls, frame: FrameType) -> "_CallSite":
+        """
+        Get the call site that frame is currently executing. Every Expr created by the same
+        instruction shares the same AST node, so the node is only recovered by
+        `Source.executing()` the first time an instruction is seen.
+        """
+        key = (frame.f_code, frame.f_lasti)
+        call_site = cls._call_sites.lookup(key)
+        if call_site is None:
+            StackFrame._call_site_misses += 1
+            call_site = _CallSite(
+                frame.f_code,
+                cast(AST | None, Source.executing(frame).node),
+                Source.for_frame(frame),
+                _source_span(frame),
+            )
+            cls._call_sites[key] = call_site
+        else:
+            StackFrame._call_site_hits += 1
+        return call_site
+
+    @classmethod
+    def call_site_cache_info(cls) -> "CallSiteCacheInfo":
+        """
+        Report how often the AST node of a new StackFrame was found in the call site cache.
+        """
+        return CallSiteCacheInfo(
+            cls._call_site_hits, cls._call_site_misses, len(cls._call_sites)
+        )
+
+    @classmethod
+    def clear_call_site_cache(cls) -> None:
+        cls._call_sites.clear()
+        StackFrame._call_site_hits = 0
+        StackFrame._call_site_misses = 0
+
     # TODO: when a source mapper is instantiated, it ought to survey
     # the user's project files and warn in the case that some file
     # matches the _internal_paths pattern
@@ -115,6 +201,7 @@ class StackFrame:
             full_stack=self.full_stack,
             rel_paths=True,
             parent=None,
+            call_site=self.call_site,
         )
 
     @classmethod
@@ -133,6 +220,21 @@ class StackFrame:
     def _frame_info_is_pyteal(cls, f: FrameInfo) -> bool:
         return bool(cls._internal_paths_re.search(f.filename))
 
+    # code objects of functions in the pyteal library, or not, as determined by _code_is_pyteal()
+    _pyteal_codes: ClassVar[_LRUCache[CodeType, bool]] = _LRUCache(_CODE_CACHE_SIZE)
+
+    @classmethod
+    def _code_is_pyteal(cls, code: CodeType) -> bool:
+        """
+        Same as _frame_info_is_pyteal() for any frame executing code, but memoized
+        per code object so that it can be used on every frame without building FrameInfo's.
+        """
+        is_pyteal = cls._pyteal_codes.lookup(code)
+        if is_pyteal is None:
+            is_pyteal = bool(cls._internal_paths_re.search(code.co_filename))
+            cls._pyteal_codes[code] = is_pyteal
+        return is_pyteal
+
     @classmethod
     def _frame_info_is_pyteal_import(cls, f: FrameInfo) -> bool:
         """
@@ -163,6 +265,27 @@ class StackFrame:
     def _frame_info_not_py_crud(cls, f: FrameInfo) -> bool:
         return bool(f.code_context) or not f.filename.startswith("<")
 
+    # code objects whose frames are kept or discarded by _frame_not_py_crud()
+    _not_py_crud_codes: ClassVar[_LRUCache[CodeType, bool]] = _LRUCache(
+        _CODE_CACHE_SIZE
+    )
+
+    @classmethod
+    def _frame_not_py_crud(cls, frame: FrameType) -> bool:
+        """
+        Same as _frame_info_not_py_crud(), but only looks up the source code of
+        frames whose filename begins with "<", once per code object.
+        """
+        code = frame.f_code
+        if not code.co_filename.startswith("<"):
+            return True
+
+        not_py_crud = cls._not_py_crud_codes.lookup(code)
+        if not_py_crud is None:
+            not_py_crud = cls._frame_info_not_py_crud(_frame_info(frame))
+            cls._not_py_crud_codes[code] = not_py_crud
+        return not_py_crud
+
     def __repr__(self) -> str:
         node = unparse(n) if (n := self.node) else None
         context = "".join(cc) if (cc := (fi := self.frame_info).code_context) else None
@@ -189,6 +312,168 @@ class StackFrame:
             cls._compilation_gateways[k]
         )
 
+    @classmethod
+    def _code_is_compilation_gateway(cls, code: CodeType) -> bool:
+        """Same as _is_compilation_gateway() for any frame executing code."""
+        return (
+            k := code.co_name
+        ) in cls._compilation_gateways and code.co_filename.endswith(
+            cls._compilation_gateways[k]
+        )
+
+
+class CallSiteCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    currsize: int
+
+
+class _CallSite:
+    """
+    What is known about one instruction of a code object which creates PyTeal Expr's.
+    Derived source code is computed at most once, however many frames share the call site.
+    """
+
+    def __init__(
+        self,
+        code: CodeType,
+        node: AST | None,
+        source: Source,
+        span: "tuple[int, int, int, int] | None" = None,
+    ):
+        self.code: Final[CodeType] = code
+        self.node: Final[AST | None] = node
+        self.source: Final[Source] = source
+        # (lineno, col_offset, end_lineno, end_col_offset) of the instruction, when known and
+        # the same as the node's. The positions of a method call split over several lines start
+        # at the method, while the node spans the whole chain, so the node wins when they differ.
+        self.span: Final[tuple[int, int, int, int] | None] = (
+            span if node is None or span == _node_span(node) else None
+        )
+
+        self._qualname: str | None = None
+        self._node_source: str | None = None
+        self._hybrid: dict[str, tuple[str, int]] = {}
+
+    def qualname(self) -> str:
+        if self._qualname is None:
+            self._qualname = self.source.code_qualname(self.code)
+
+        return self._qualname
+
+    def node_source(self) -> str:
+        if self._node_source is None:
+            self._node_source = unparse(self.node) if self.node else ""
+
+        return self._node_source
+
+
+def _node_span(node: AST) -> tuple[int | None, int | None, int | None, int | None]:
+    return (
+        getattr(node, "lineno", None),
+        getattr(node, "col_offset", None),
+        getattr(node, "end_lineno", None),
+        getattr(node, "end_col_offset", None),
+    )
+
+
+# the source file and source lines of each code object, as found by inspect
+_code_sources: _LRUCache[CodeType, tuple[str, list[str] | None]] = _LRUCache(
+    _CODE_CACHE_SIZE
+)
+
+
+def _code_source(frame: FrameType) -> tuple[str, list[str] | None]:
+    """
+    Get the source file and source lines of the code that frame is executing.
+    Locating a source file is slow, so it is only done once per code object.
+    """
+    code = frame.f_code
+    source = _code_sources.lookup(code)
+    if source is None:
+        lines: list[str] | None
+        try:
+            lines = findsource(frame)[0]
+        except OSError:
+            lines = None
+        source = (getsourcefile(frame) or getfile(frame), lines)
+        _code_sources[code] = source
+    return source
+
+
+def _positions(
+    frame: FrameType,
+) -> tuple[int | None, int | None, int | None, int | None]:
+    """
+    Get the (lineno, end_lineno, col_offset, end_col_offset) of the instruction that frame
+    is executing, as recorded by the compiler in Python 3.11 and later.
+    """
+    if sys.version_info >= (3, 11) and frame.f_lasti >= 0:
+        return next(islice(frame.f_code.co_positions(), frame.f_lasti // 2, None))
+    return (None, None, None, None)
+
+
+def _source_span(frame: FrameType) -> tuple[int, int, int, int] | None:
+    """
+    Get the (lineno, col_offset, end_lineno, end_col_offset) of the expression that frame is
+    executing, directly from its code object's positions. These usually agree with the AST node
+    that `executing` recovers, but not when a decorator is being applied: the source map points
+    a decorated function at its `def`, which only the AST knows about. So None is returned
+    in that case, as well as when positions aren't available.
+    """
+    lineno, end_lineno, col_offset, end_col_offset = _positions(frame)
+    if lineno is None or end_lineno is None or col_offset is None:
+        return None
+    if end_col_offset is None:
+        return None
+
+    lines = _code_source(frame)[1]
+    if lines is None or not 0 < lineno <= len(lines):
+        return None
+
+    # column offsets count UTF-8 bytes
+    prefix = lines[lineno - 1].encode()[:col_offset].decode(errors="ignore")
+    if prefix.rstrip().endswith("@"):
+        return None
+
+    return lineno, col_offset, end_lineno, end_col_offset
+
+
+def _frame_info(frame: FrameType) -> FrameInfo:
+    """
+    Create the same FrameInfo for frame that inspect.stack() would.
+    """
+    code = frame.f_code
+    filename, lines = _code_source(frame)
+
+    lineno = frame.f_lineno
+    if sys.version_info >= (3, 11):
+        positions = _positions(frame)
+        if positions[0] is None:
+            positions = (lineno, *positions[1:])
+        lineno = cast(int, positions[0])
+
+    code_context: list[str] | None = None
+    index: int | None = None
+    if lines is not None:
+        start = max(0, min(lineno - 1, len(lines) - 1))
+        code_context = lines[start : start + 1]
+        index = lineno - 1 - start
+
+    if sys.version_info >= (3, 11):
+        from dis import Positions
+
+        return FrameInfo(
+            frame,
+            filename,
+            lineno,
+            code.co_name,
+            code_context,
+            index,
+            positions=Positions(*positions),
+        )
+    return FrameInfo(frame, filename, lineno, code.co_name, code_context, index)
+
 
 @contextmanager
 def sourcemapping_off_context():
@@ -253,11 +538,19 @@ class NatalStackFrame:
         if self.sourcemapping_is_off():
             return
 
-        # 1. get the full stack trace
-        full_stack = stack()
+        # 1. walk the stack, starting from this frame. Frames are cheap to walk, while
+        # creating a FrameInfo reads source code, so FrameInfo's are only created for
+        # the frames which are kept or whose source code must be examined
+        # 2. discard frames whose filename begins with "<" and which have no source code
+        frames: list[FrameType] = []
+        frame: FrameType | None = sys._getframe()
+        while frame is not None:
+            if StackFrame._frame_not_py_crud(frame):
+                frames.append(frame)
+            frame = frame.f_back
 
-        # 2. discard frames whose filename begins with "<"
-        frame_infos = list(filter(StackFrame._frame_info_not_py_crud, full_stack))
+        # the full stack trace is only kept when debugging
+        full_stack: list[FrameInfo] = stack() if self._debugging() else []
 
         def _make_stack_frames(fis):
             return [
@@ -266,8 +559,8 @@ class NatalStackFrame:
                 if (frame := StackFrame._init_or_drop(self, f, full_stack))
             ]
 
-        if self._keep_all_debugging or len(frame_infos) <= 1:
-            self._frames = _make_stack_frames(frame_infos)
+        if self._keep_all_debugging or len(frames) <= 1:
+            self._frames = _make_stack_frames([_frame_info(f) for f in frames])
             return
 
         # 3. start the best frame search right after where NatalStackFrame() was constructed
@@ -277,37 +570,32 @@ class NatalStackFrame:
 
         # 4. fast forward the right bound until we're out of pyteal-library code
         # This sets last_keep_idx to the first frame index which isn't pyteal
-        while i < len(frame_infos) and StackFrame._frame_info_is_pyteal(frame_infos[i]):
+        while i < len(frames) and StackFrame._code_is_pyteal(frames[i].f_code):
             i += 1
         last_keep_idx = i
 
         # 5. back up looking for a compiler gateway and so signal that the expression was generated by pyteal itself
         for i in range(last_keep_idx, -1, -1):
-            if StackFrame._is_compilation_gateway(frame_infos[i]):
+            if StackFrame._code_is_compilation_gateway(frames[i].f_code):
                 self._pyteal_gen = True
                 break
 
         # 6. if the pyteal-library exit point was an import, the expression was
         # generated by pyteal itself. So let's back up and look for a "# T2PT*" comment
         # which will give us a clue for what to do with this expression
-        if StackFrame._frame_info_is_pyteal_import(frame_infos[last_keep_idx]):
-            found = False
-            i = -1
+        kept = _frame_info(frames[last_keep_idx])
+        if StackFrame._frame_info_is_pyteal_import(kept):
             for i in range(last_keep_idx - 1, -1, -1):
-                if StackFrame._frame_info_compiler_generated(frame_infos[i]):
-                    found = True
+                frame_info = _frame_info(frames[i])
+                if StackFrame._frame_info_compiler_generated(frame_info):
+                    kept = frame_info
                     break
 
-            if found and i >= 0:
-                last_keep_idx = i
-
         # 7. Keep only the last frame in the list. We maintain _as_ a list
         # since in the case of `self._debug == True`, we'd like access to the full list.
         # TODO: this is likely obsolete since full_stack is available on the PyTealFrame object when debugging
-        frame_infos = frame_infos[last_keep_idx : last_keep_idx + 1]
-
         # 8. we finish by constructing a list[StackFrame] from our one remaining frame_info
-        self._frames = _make_stack_frames(frame_infos)
+        self._frames = _make_stack_frames([kept])
 
     def user_defined(self) -> bool:
         return not self._pyteal_gen
@@ -581,12 +869,14 @@ class PyTealFrame(StackFrame):
         full_stack: list[FrameInfo] | None,
         rel_paths: bool = True,
         parent: "PyTealFrame | None" = None,
+        call_site: "_CallSite | None" = None,
     ):
-        super().__init__(frame_info, node, creator, full_stack)
+        super().__init__(frame_info, node, creator, full_stack, call_site)
         self.rel_paths: Final[bool] = rel_paths
         self.parent: "Final[PyTealFrame | None]" = parent
 
         self._raw_code: str | None = None
+        self._node_source: str | None = None
         self._status: PyTealFrameStatus | None = None
         self._file: str | None = None
         self._root: str | None = None
@@ -617,6 +907,7 @@ class PyTealFrame(StackFrame):
             creator=self.creator,
             full_stack=self.full_stack,
             rel_paths=self.rel_paths,
+            call_site=self.call_site,
         )
         ptf._status = status
 
@@ -642,11 +933,13 @@ class PyTealFrame(StackFrame):
         return self._root
 
     def code_qualname(self) -> str:
-        return (
-            Source.executing(self.frame_info.frame).code_qualname()
-            if self.frame_info
-            else ""
-        )
+        if not self.frame_info:
+            return ""
+
+        if self.call_site:
+            return self.call_site.qualname()
+
+        return Source.executing(self.frame_info.frame).code_qualname()
 
     def lineno(self) -> int | None:
         naive_lineno = self.frame_info.lineno if self.frame_info else None
@@ -704,8 +997,17 @@ class PyTealFrame(StackFrame):
         """
         raw_code = self.raw_code()
         node = self.node
+        call_site = (
+            self.call_site if self.call_site and self.call_site.node is node else None
+        )
+        if call_site and (hybrid := call_site._hybrid.get(raw_code)):
+            return hybrid
+
         pt_chunk = self.node_source()
-        return self._hybrid_impl(raw_code, node, pt_chunk)
+        hybrid = self._hybrid_impl(raw_code, node, pt_chunk)
+        if call_site:
+            call_site._hybrid[raw_code] = hybrid
+        return hybrid
 
     @classmethod
     def _hybrid_impl(
@@ -771,20 +1073,43 @@ class PyTealFrame(StackFrame):
         return self.status_code().human()
 
     def node_source(self) -> str:
-        return unparse(self.node) if self.node else ""
+        if self._node_source is None:
+            if self.call_site and self.node is self.call_site.node:
+                self._node_source = self.call_site.node_source()
+            else:
+                self._node_source = unparse(self.node) if self.node else ""
+
+        return self._node_source
+
+    def _span(self) -> tuple[int, int, int, int] | None:
+        """
+        The source span of the call site from its instruction's positions, when available
+        and the node hasn't been replaced.
+        """
+        if self.call_site and self.node is self.call_site.node:
+            return self.call_site.span
+        return None
 
     def node_lineno(self) -> int | None:
+        if span := self._span():
+            return span[0]
         return getattr(self.node, "lineno", None) if self.node else None
 
     def node_col_offset(self) -> int | None:
         """0-indexed BEGINNING column offset"""
+        if span := self._span():
+            return span[1]
         return getattr(self.node, "col_offset", None) if self.node else None
 
     def node_end_lineno(self) -> int | None:
+        if span := self._span():
+            return span[2]
         return getattr(self.node, "end_lineno", None) if self.node else None
 
     def node_end_col_offset(self) -> int | None:
         """0-indexed ENDING column offset"""
+        if span := self._span():
+            return span[3]
         return getattr(self.node, "end_col_offset", None) if self.node else None
 
     def node_source_window(self) -> str:
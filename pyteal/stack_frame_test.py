@@ -1,9 +1,11 @@
+import inspect
+import sys
 from copy import deepcopy
 from unittest.mock import Mock, patch
 
 import pytest
 
-from pyteal.stack_frame import NatalStackFrame, PyTealFrame, StackFrame
+from pyteal.stack_frame import NatalStackFrame, PyTealFrame, StackFrame, _frame_info
 
 
 @pytest.mark.serial
@@ -144,3 +146,59 @@ def test_root():
     with patch("os.getcwd", return_value="FOOFOO"):
         assert ptf.root() == "FOOFOO"
         assert ptf._root == "FOOFOO"
+
+
+@pytest.mark.serial
+def test_frame_info_matches_inspect():
+    def capture():
+        return _frame_info(sys._getframe(1)), inspect.stack()[1]
+
+    actual, expected = capture()
+
+    assert actual.frame is expected.frame
+    assert actual.filename == expected.filename
+    assert actual.lineno == expected.lineno
+    assert actual.function == expected.function
+    assert actual.code_context == expected.code_context
+    assert actual.index == expected.index
+    if sys.version_info >= (3, 11):
+        assert actual.positions == expected.positions
+
+
+def test_lru_cache():
+    from pyteal.stack_frame import _LRUCache
+
+    cache: _LRUCache[str, int] = _LRUCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.lookup("a") == 1
+
+    # "b" is now the least recently used
+    cache["c"] = 3
+    assert list(cache) == ["a", "c"]
+    assert cache.lookup("b") is None
+
+    cache["d"] = 4
+    assert list(cache) == ["c", "d"]
+
+
+def test_caches_are_bounded():
+    from pyteal.stack_frame import _code_sources
+
+    for cache in (
+        StackFrame._call_sites,
+        StackFrame._pyteal_codes,
+        StackFrame._not_py_crud_codes,
+        _code_sources,
+    ):
+        assert 0 < cache.maxsize < float("inf")
+
+    codes = [
+        compile(str(i), "<test>", "eval")
+        for i in range(StackFrame._pyteal_codes.maxsize + 10)
+    ]
+    for code in codes:
+        StackFrame._code_is_pyteal(code)
+    assert len(StackFrame._pyteal_codes) == StackFrame._pyteal_codes.maxsize
+    assert codes[0] not in StackFrame._pyteal_codes
+    assert codes[-1] in StackFrame._pyteal_codes
@@ -30,6 +30,8 @@ from pyteal.ast.subroutine import OutputKwArgInfo
 from pyteal import (
     abi,
     Arg,
+    AVMInterpreter,
+    BatchResult,
     Btoi,
     Bytes,
     CallConfig,
@@ -40,6 +42,7 @@ from pyteal import (
     Len,
     Log,
     MethodConfig,
+    MockTransaction,
     Mode,
     Pop,
     Router,
@@ -478,6 +481,45 @@ class PyTealDryRunExecutor:
             args, txn_params=txn_params, verbose=verbose
         )
 
+    def encode_args(self, args: Sequence[PyTypes]) -> list[bytes]:
+        """Encode the arguments of one input the same way as graviton's dry runs"""
+        arg_types: Sequence[sdk_abi.ABIType | None] = [None] * len(args)
+        if abi_types := self.abi_argument_types():
+            arg_types = abi_types
+
+        def encode(arg, arg_type):
+            if arg_type is not None:
+                return arg_type.encode(arg)
+            if isinstance(arg, int):
+                return arg.to_bytes(8, "big")
+            if isinstance(arg, str):
+                return arg.encode()
+            return arg
+
+        return [encode(arg, t) for arg, t in zip(args, arg_types)]
+
+    def run_batch(
+        self, inputs: Sequence[Sequence[PyTypes]], *, compiler_version=6
+    ) -> BatchResult:
+        """Run the program for every input with the in-process AVMInterpreter instead of dry runs.
+
+        The inputs are evaluated in lockstep, so sweeping thousands of inputs is much faster
+        than one dry run per input. No algod is needed.
+        """
+        interpreter = AVMInterpreter(self.compile(compiler_version), mode=self.mode)
+        encoded = [self.encode_args(args) for args in inputs]
+        if self.mode == Mode.Signature:
+            return interpreter.run_batch(
+                [MockTransaction()] * len(inputs), args=encoded
+            )
+
+        return interpreter.run_batch(
+            [
+                MockTransaction({"TypeEnum": 6, "ApplicationArgs": list(args)})
+                for args in encoded
+            ]
+        )
+
 
 def as_on_complete(oc_str: str) -> OnComplete:
     match oc_str:
@@ -0,0 +1,164 @@
+"""
+Compile time benchmarks for large programs.
+
+These are skipped by default. To run them and see the timings:
+
+    PYTEAL_BENCHMARKS=1 pytest tests/unit/benchmark_test.py -s
+"""
+
+import os
+import time
+
+import pytest
+
+import pyteal as pt
+
+benchmark = pytest.mark.skipif(
+    not os.environ.get("PYTEAL_BENCHMARKS"),
+    reason="Benchmarks are too slow to run every time. Set PYTEAL_BENCHMARKS=1 to run them.",
+)
+
+
+def best_of(f, trials: int = 3) -> float:
+    best = float("inf")
+    for _ in range(trials):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def router_with_n_methods(n: int) -> pt.Router:
+    router = pt.Router(
+        f"Router{n}",
+        pt.BareCallActions(no_op=pt.OnCompleteAction.create_only(pt.Approve())),
+    )
+    for i in range(n):
+
+        def impl(
+            a: pt.abi.Uint64, b: pt.abi.Uint64, *, output: pt.abi.Uint64
+        ) -> pt.Expr:
+            return output.set(a.get() + b.get())
+
+        impl.__name__ = f"method_{i}"
+        router.add_method_handler(
+            pt.ABIReturnSubroutine(impl),
+            method_config=pt.MethodConfig(no_op=pt.CallConfig.CALL),
+        )
+    return router
+
+
+@benchmark
+@pytest.mark.serial
+@pytest.mark.parametrize("n", [100, 300])
+def test_benchmark_router_compile(n: int):
+    router = router_with_n_methods(n)
+
+    elapsed = best_of(lambda: router.compile(version=8))
+    print(f"\nRouter with {n} methods: {elapsed:.3f}s")
+
+
+def program_with_n_scratch_vars(n: int) -> pt.Expr:
+    @pt.Subroutine(pt.TealType.uint64)
+    def big(x: pt.Expr) -> pt.Expr:
+        svs = [pt.ScratchVar(pt.TealType.uint64) for _ in range(n)]
+        ops: list[pt.Expr] = [svs[0].store(x)]
+        for prev, sv in zip(svs[:-1], svs[1:]):
+            ops.append(sv.store(prev.load() + pt.Int(1)))
+        return pt.Seq(*ops, svs[-1].load())
+
+    return pt.Return(big(pt.Int(1)))
+
+
+@benchmark
+@pytest.mark.serial
+@pytest.mark.parametrize("n", [250, 1000])
+def test_benchmark_scratch_slot_optimizer(n: int):
+    program = program_with_n_scratch_vars(n)
+
+    elapsed = best_of(
+        lambda: pt.compileTeal(
+            program,
+            pt.Mode.Application,
+            version=9,
+            optimize=pt.OptimizeOptions(scratch_slots=True),
+        )
+    )
+    print(f"\nSubroutine with {n} scratch vars, optimized: {elapsed:.3f}s")
+
+
+def program_with_n_subroutines(n: int) -> pt.Expr:
+    subroutines = []
+    for i in range(n):
+
+        def impl(x: pt.Expr) -> pt.Expr:
+            return pt.If(x > pt.Int(i)).Then(x - pt.Int(1)).Else(x + pt.Int(1))
+
+        impl.__name__ = f"sub_{i}"
+        subroutines.append(pt.Subroutine(pt.TealType.uint64)(impl))
+
+    return pt.Seq(
+        *[pt.Pop(subroutine(pt.Txn.fee())) for subroutine in subroutines],
+        pt.Approve(),
+    )
+
+
+@benchmark
+@pytest.mark.serial
+@pytest.mark.parametrize("n", [200, 800])
+def test_benchmark_many_subroutines(n: int):
+    program = program_with_n_subroutines(n)
+
+    elapsed = best_of(lambda: pt.compileTeal(program, pt.Mode.Application, version=8))
+    print(
+        f"\nProgram with {n} subroutines: {elapsed:.3f}s ({elapsed / n * 1e6:.0f}us each)"
+    )
+
+
+def blocks_with_n_branches(n: int) -> list[pt.TealBlock]:
+    # a chain of conditional blocks which each jump ahead to the block after the next
+    end = pt.TealSimpleBlock(
+        [pt.TealOp(None, pt.Op.int, 1), pt.TealOp(None, pt.Op.return_)]
+    )
+    blocks: list[pt.TealBlock] = [end]
+    for i in range(n):
+        skip = pt.TealSimpleBlock([pt.TealOp(None, pt.Op.int, i)])
+        skip.setNextBlock(blocks[-1])
+        branch = pt.TealConditionalBlock([pt.TealOp(None, pt.Op.txn, "Fee")])
+        branch.setTrueBlock(skip)
+        branch.setFalseBlock(blocks[-1])
+        blocks += [skip, branch]
+    return list(reversed(blocks))
+
+
+@benchmark
+@pytest.mark.serial
+@pytest.mark.parametrize("n", [1000, 4000])
+def test_benchmark_flatten_blocks(n: int):
+    from pyteal.compiler.flatten import flattenBlocks
+
+    blocks = blocks_with_n_branches(n)
+
+    elapsed = best_of(lambda: flattenBlocks(blocks))
+    print(
+        f"\nFlattening {len(blocks)} blocks: {elapsed:.3f}s ({elapsed / len(blocks) * 1e6:.1f}us each)"
+    )
+
+
+@benchmark
+@pytest.mark.serial
+@pytest.mark.parametrize("n", [500, 2000])
+def test_benchmark_recursion_analysis(n: int):
+    from pyteal.compiler.subroutines import findRecursionPoints
+
+    # helpers which each call a few of the others, forming one large cycle
+    helpers = [
+        pt.SubroutineDefinition(lambda: pt.Int(1), pt.TealType.uint64) for _ in range(n)
+    ]
+    graph = {
+        helper: {helpers[(i + k) % n] for k in (1, 7, 31)}
+        for i, helper in enumerate(helpers)
+    }
+
+    elapsed = best_of(lambda: findRecursionPoints(graph))
+    print(f"\nRecursion analysis of {n} mutually calling subroutines: {elapsed:.3f}s")
@@ -272,6 +272,25 @@ def test_PyTealBlackboxExecutor_abi_return_type(
         assert PyTealDryRunExecutor(fn, mode).abi_return_type() is None
 
 
+@pytest.mark.parametrize("mode", (pt.Mode.Application, pt.Mode.Signature))
+@pytest.mark.serial
+def test_PyTealBlackboxExecutor_run_batch(mode: pt.Mode):
+    inputs = [[0], [1], [2**64 - 1]]
+    results = PyTealDryRunExecutor(fn_1arg_1ret, mode).run_batch(inputs)
+    assert len(results) == 3
+    assert results.approved == [True] * 3
+    assert results.errors == [None] * 3
+    if mode == pt.Mode.Application:
+        assert [logs[-1] for logs in results.logs] == [
+            pt.RETURN_HASH_PREFIX + n.to_bytes(8, "big") for n, in inputs
+        ]
+
+    mixed_inputs = [(0, "a", b"b"), (2, "bc", b"")]
+    results = PyTealDryRunExecutor(utest_int_args, mode).run_batch(mixed_inputs)
+    assert results.approved == [False, False]
+    assert results.stacks == [[0], [0]]
+
+
 def successful_RouterSimulation(router, model_router, predicates, algod):
     rsim = RouterSimulation(
         router,
@@ -13,6 +13,8 @@ def test_feature_gates():
 
     default_sourcemap_gate: bool = FeatureGates._gates.sourcemap_enabled
     default_sourcemap_debug_gate: bool = FeatureGates._gates.sourcemap_debug
+    assert FeatureGates.definition_traces() is True
+    assert FeatureGates.sourcemap_paranoid() is False
     assert FeatureGates.get("sourcemap_enabled") is default_sourcemap_gate
     assert FeatureGates.get("sourcemap_debug") is default_sourcemap_debug_gate
     assert FeatureGates.sourcemap_enabled() is default_sourcemap_gate
@@ -554,3 +554,104 @@ keep_one_frame_only: bool = True,
     trial(annotated_teal)
 
     assert False
+
+
+@pytest.mark.serial
+def test_call_site_cache(sourcemap_enabled):
+    import pyteal as pt
+    from pyteal.stack_frame import StackFrame
+
+    StackFrame.clear_call_site_cache()
+    assert StackFrame.call_site_cache_info() == (0, 0, 0)
+
+    exprs = []
+    for i in range(10):
+        exprs.append(pt.Int(i))
+    hits, misses, currsize = StackFrame.call_site_cache_info()
+    assert misses == currsize == 1
+    assert hits == 9
+
+    frames = [e.stack_frames._best_frame().as_pyteal_frame() for e in exprs]
+    first = frames[0]
+    assert all(f.call_site is first.call_site for f in frames)
+    assert all(f.node is first.node for f in frames)
+    assert first.node_source() == "pt.Int(i)"
+    assert first.code_qualname() == "test_call_site_cache"
+    assert first.hybrid_unparsed() == "pt.Int(i)"
+
+    StackFrame.clear_call_site_cache()
+    assert StackFrame.call_site_cache_info() == (0, 0, 0)
+
+
+@pytest.mark.serial
+@pytest.mark.skipif(
+    "sys.version_info < (3, 11)", reason="co_positions() is new in 3.11"
+)
+def test_call_site_positions(sourcemap_enabled):
+    import pyteal as pt
+
+    expr = pt.Int(1) + pt.Int(2)
+    frame = expr.stack_frames._best_frame().as_pyteal_frame()
+    node = frame.node
+
+    assert frame.call_site and frame.call_site.span
+    assert isinstance(node, ast.BinOp)
+    assert frame.node_lineno() == node.lineno
+    assert frame.node_col_offset() == node.col_offset == 11
+    assert frame.node_end_lineno() == node.end_lineno
+    assert frame.node_end_col_offset() == node.end_col_offset == 32
+
+    @pt.Subroutine(pt.TealType.uint64)
+    def decorated() -> pt.Expr:
+        return pt.Int(1)
+
+    frame = decorated.subroutine.stack_frames._best_frame().as_pyteal_frame()
+
+    # decorated functions are mapped to their def, which only the AST knows about
+    assert frame.call_site and frame.call_site.span is None
+    assert isinstance(frame.node, ast.FunctionDef)
+    assert frame.node_lineno() == frame.node.lineno
+
+    x = pt.ScratchVar(pt.TealType.uint64)
+    # fmt: off
+    expr = (
+        x
+        .load()
+    )
+    # fmt: on
+    frame = expr.stack_frames._best_frame().as_pyteal_frame()
+    node = frame.node
+
+    # the positions of a method call split over several lines start at the method, so the
+    # source map keeps the span of the whole call
+    assert frame.call_site and frame.call_site.span is None
+    assert isinstance(node, ast.Call)
+    assert frame.node_lineno() == node.lineno == frame.node_end_lineno() - 1
+    assert frame.node_col_offset() == node.col_offset == 8
+    assert frame.node_end_col_offset() == node.end_col_offset == 15
+
+
+@pytest.mark.serial
+def test_sourcemap_paranoid(sourcemap_enabled):
+    from feature_gates import FeatureGates
+
+    import pyteal as pt
+
+    program = pt.Seq(pt.Log(pt.Bytes("paranoid")), pt.Approve())
+    compilation = pt.Compilation(program, pt.Mode.Application, version=8)
+
+    with mock.patch(
+        "pyteal.compiler.compiler.compileTeal", wraps=pt.compileTeal
+    ) as recompile:
+        plain = compilation.compile(with_sourcemap=True)
+        assert recompile.call_count == 0
+
+        previous = FeatureGates.sourcemap_paranoid()
+        FeatureGates.set_sourcemap_paranoid(True)
+        try:
+            paranoid = compilation.compile(with_sourcemap=True)
+        finally:
+            FeatureGates.set_sourcemap_paranoid(previous)
+        assert recompile.call_count == 1
+
+    assert plain.teal == paranoid.teal